@@ -25,6 +25,7 @@ import numpy as np
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 import logging
+import re
 from pathlib import Path
 
 # Adiciona o diretório raiz do projeto ao PYTHONPATH
@@ -126,6 +127,21 @@ except ImportError as e:
 except Exception as e:
     logger.error(f"❌ Erro ao carregar router NFe: {e}")
 
+# ============================================================================
+# COMPACTAÇÃO PERIÓDICA DA MEMÓRIA (opcional)
+# ============================================================================
+@app.on_event("startup")
+async def start_memory_compaction():
+    from src.settings import MEMORY_COMPACTION_ENABLED
+    if not MEMORY_COMPACTION_ENABLED:
+        return
+    try:
+        from src.memory.compaction import start_compaction_task
+        app.state.memory_compaction_task = start_compaction_task()
+        logger.info("✅ Compactação periódica da memória agendada")
+    except Exception as e:
+        logger.warning(f"⚠️ Compactação da memória indisponível: {e}")
+
 # Modelos Pydantic
 class HealthResponse(BaseModel):
     status: str
@@ -494,6 +510,11 @@ async def upload_csv(file: UploadFile = File(...)):
         # Lê o arquivo CSV
         content = await file.read()
         df = pd.read_csv(io.BytesIO(content))
+        del content  # os bytes do upload não ficam vivos junto com o DataFrame
+        
+        # Tipos reduzidos: o DataFrame fica em memória enquanto o file_id existir
+        from src.data.memory_policy import optimize_dtypes
+        df, memory_report = optimize_dtypes(df)
         
         # Gera ID único para o arquivo
         file_id = f"csv_{int(datetime.now().timestamp())}_{file.filename.replace('.csv', '')}"
@@ -504,7 +525,8 @@ async def upload_csv(file: UploadFile = File(...)):
             'dataframe': df,
             'upload_date': datetime.now().isoformat(),
             'rows': len(df),
-            'columns': len(df.columns)
+            'columns': len(df.columns),
+            'memory_bytes': memory_report['bytes_after']
         }
         
         # Verifica se é um dataset de fraude (detecta colunas típicas)
@@ -692,11 +714,23 @@ async def detect_fraud(request: FraudDetectionRequest):
         logger.error(f"Erro na detecção de fraude: {e}")
         raise HTTPException(status_code=500, detail=f"Erro na análise: {str(e)}")
 
+# Extensão → tipo MIME dos arquivos servidos (.svgz é SVG com gzip)
+STATIC_CHART_TYPES = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.webp': 'image/webp',
+    '.svgz': 'image/svg+xml',
+    '.json': 'application/json',
+}
+# Nomes gerados pelo GraphGenerator: <tipo>_<sha256[:16]>.<ext> (conteúdo imutável)
+CONTENT_HASHED_NAME = re.compile(r'_[0-9a-f]{16}\.')
+
 @app.get("/files/histogramas/{filename}")
 async def serve_histogram(filename: str):
-    """Serve arquivos PNG de histogramas do diretório configurado"""
+    """Serve imagens e specs de gráficos do diretório configurado"""
     from fastapi.responses import FileResponse
-    from src.settings import HISTOGRAMS_DIR
+    from src.settings import GRAPH_STATIC_MAX_AGE, HISTOGRAMS_DIR
     
     # Valida nome do arquivo para evitar path traversal
     if ".." in filename or "/" in filename or "\\" in filename:
@@ -707,10 +741,20 @@ async def serve_histogram(filename: str):
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="Imagem não encontrada")
     
-    if not file_path.suffix.lower() in ['.png', '.jpg', '.jpeg']:
+    suffix = file_path.suffix.lower()
+    if suffix not in STATIC_CHART_TYPES:
         raise HTTPException(status_code=400, detail="Tipo de arquivo não suportado")
     
-    return FileResponse(file_path, media_type="image/png")
+    headers = {}
+    if suffix == '.svgz':
+        headers['Content-Encoding'] = 'gzip'
+    if CONTENT_HASHED_NAME.search(filename):
+        headers['Cache-Control'] = f"public, max-age={GRAPH_STATIC_MAX_AGE}, immutable"
+    else:
+        # Nomes fixos (ex.: hist_<coluna>.png) são regravados: revalida pelo ETag
+        headers['Cache-Control'] = "no-cache"
+    
+    return FileResponse(file_path, media_type=STATIC_CHART_TYPES[suffix], headers=headers)
 
 @app.get("/csv/files")
 async def list_files():
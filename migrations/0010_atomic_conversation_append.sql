@@ -0,0 +1,100 @@
+-- ============================================================================
+-- Migration 0010: Persistência de conversação em um único round-trip
+-- ============================================================================
+-- Descrição: Substitui o fluxo de 3 chamadas do SupabaseMemoryManager
+--            (lookup da sessão -> MAX(conversation_turn) -> INSERT) por uma
+--            função RPC que resolve a sessão, reserva os turnos de forma
+--            atômica e insere uma ou várias mensagens em uma só chamada.
+--
+--            O contador por sessão (agent_sessions.last_conversation_turn)
+--            é incrementado com UPDATE ... RETURNING, que mantém lock de
+--            linha na sessão até o fim da transação: duas gravações
+--            concorrentes na mesma sessão nunca recebem o mesmo turno.
+-- ============================================================================
+
+-- ---------------------------------------------------------------------------
+-- 1. Contador de turnos por sessão
+-- ---------------------------------------------------------------------------
+ALTER TABLE agent_sessions
+    ADD COLUMN IF NOT EXISTS last_conversation_turn INTEGER NOT NULL DEFAULT 0;
+
+COMMENT ON COLUMN agent_sessions.last_conversation_turn IS 'Último conversation_turn atribuído na sessão (mantido por append_conversation_messages)';
+
+-- Backfill a partir do histórico existente
+UPDATE agent_sessions s
+SET last_conversation_turn = c.max_turn
+FROM (
+    SELECT session_id, MAX(conversation_turn) AS max_turn
+    FROM agent_conversations
+    GROUP BY session_id
+) c
+WHERE c.session_id = s.id
+  AND s.last_conversation_turn < c.max_turn;
+
+-- ---------------------------------------------------------------------------
+-- 2. Função de append atômico (uma ou várias mensagens)
+-- ---------------------------------------------------------------------------
+-- p_messages: array JSON de objetos com as colunas de agent_conversations
+--   [{"message_type": "query", "content": "...", "metadata": {...}}, ...]
+-- Cada mensagem recebe um turno consecutivo, na ordem do array.
+CREATE OR REPLACE FUNCTION append_conversation_messages(
+    p_session_id VARCHAR(255),
+    p_agent_name VARCHAR(100),
+    p_messages JSONB
+)
+RETURNS SETOF agent_conversations
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_session_uuid UUID;
+    v_last_turn INTEGER;
+    v_count INTEGER;
+BEGIN
+    v_count := jsonb_array_length(p_messages);
+    IF v_count = 0 THEN
+        RETURN;
+    END IF;
+
+    UPDATE agent_sessions
+    SET last_conversation_turn = last_conversation_turn + v_count
+    WHERE session_id = p_session_id
+    RETURNING id, last_conversation_turn INTO v_session_uuid, v_last_turn;
+
+    IF v_session_uuid IS NULL THEN
+        RAISE EXCEPTION 'Sessão não encontrada: %', p_session_id
+            USING ERRCODE = 'no_data_found';
+    END IF;
+
+    RETURN QUERY
+    WITH inserted AS (
+        INSERT INTO agent_conversations (
+            session_id, agent_name, conversation_turn, message_type, content,
+            content_format, processing_time_ms, token_count, model_used,
+            confidence_score, metadata, timestamp
+        )
+        SELECT
+            v_session_uuid,
+            COALESCE(m.value->>'agent_name', p_agent_name),
+            v_last_turn - v_count + m.ordinality::INTEGER,
+            m.value->>'message_type',
+            m.value->>'content',
+            COALESCE(m.value->>'content_format', 'text'),
+            (m.value->>'processing_time_ms')::INTEGER,
+            (m.value->>'token_count')::INTEGER,
+            m.value->>'model_used',
+            (m.value->>'confidence_score')::DECIMAL(3,2),
+            COALESCE(m.value->'metadata', '{}'::JSONB),
+            COALESCE((m.value->>'timestamp')::TIMESTAMPTZ, NOW())
+        FROM jsonb_array_elements(p_messages) WITH ORDINALITY AS m(value, ordinality)
+        ORDER BY m.ordinality
+        RETURNING *
+    )
+    SELECT * FROM inserted ORDER BY conversation_turn;
+END;
+$$;
+
+COMMENT ON FUNCTION append_conversation_messages(VARCHAR, VARCHAR, JSONB) IS 'Resolve a sessão, reserva turnos atomicamente e insere N mensagens em um único round-trip';
+
+-- ============================================================================
+-- FIM DA MIGRATION 0010
+-- ============================================================================
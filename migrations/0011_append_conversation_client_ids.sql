@@ -0,0 +1,75 @@
+-- ============================================================================
+-- Migration 0011: IDs gerados pelo cliente em append_conversation_messages
+-- ============================================================================
+-- Descrição: O writer write-behind da memória (src/memory/write_behind.py)
+--            gera o UUID de cada mensagem ao enfileirá-la. Esta versão da
+--            função usa esse id quando presente e ignora ids já gravados,
+--            tornando idempotente o replay do journal local após um crash
+--            entre o INSERT e a confirmação (ack) no journal.
+--
+--            Mensagens ignoradas por conflito ainda consomem turnos do
+--            contador da sessão; a numeração continua única e crescente,
+--            apenas com lacunas nesse caso raro.
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION append_conversation_messages(
+    p_session_id VARCHAR(255),
+    p_agent_name VARCHAR(100),
+    p_messages JSONB
+)
+RETURNS SETOF agent_conversations
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_session_uuid UUID;
+    v_last_turn INTEGER;
+    v_count INTEGER;
+BEGIN
+    v_count := jsonb_array_length(p_messages);
+    IF v_count = 0 THEN
+        RETURN;
+    END IF;
+
+    UPDATE agent_sessions
+    SET last_conversation_turn = last_conversation_turn + v_count
+    WHERE session_id = p_session_id
+    RETURNING id, last_conversation_turn INTO v_session_uuid, v_last_turn;
+
+    IF v_session_uuid IS NULL THEN
+        RAISE EXCEPTION 'Sessão não encontrada: %', p_session_id
+            USING ERRCODE = 'no_data_found';
+    END IF;
+
+    RETURN QUERY
+    WITH inserted AS (
+        INSERT INTO agent_conversations (
+            id, session_id, agent_name, conversation_turn, message_type, content,
+            content_format, processing_time_ms, token_count, model_used,
+            confidence_score, metadata, timestamp
+        )
+        SELECT
+            COALESCE((m.value->>'id')::UUID, gen_random_uuid()),
+            v_session_uuid,
+            COALESCE(m.value->>'agent_name', p_agent_name),
+            v_last_turn - v_count + m.ordinality::INTEGER,
+            m.value->>'message_type',
+            m.value->>'content',
+            COALESCE(m.value->>'content_format', 'text'),
+            (m.value->>'processing_time_ms')::INTEGER,
+            (m.value->>'token_count')::INTEGER,
+            m.value->>'model_used',
+            (m.value->>'confidence_score')::DECIMAL(3,2),
+            COALESCE(m.value->'metadata', '{}'::JSONB),
+            COALESCE((m.value->>'timestamp')::TIMESTAMPTZ, NOW())
+        FROM jsonb_array_elements(p_messages) WITH ORDINALITY AS m(value, ordinality)
+        ORDER BY m.ordinality
+        ON CONFLICT (id) DO NOTHING
+        RETURNING *
+    )
+    SELECT * FROM inserted ORDER BY conversation_turn;
+END;
+$$;
+
+-- ============================================================================
+-- FIM DA MIGRATION 0011
+-- ============================================================================
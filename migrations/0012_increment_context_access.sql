@@ -0,0 +1,34 @@
+-- ============================================================================
+-- Migration 0012: Incremento em lote dos contadores de acesso a contexto
+-- ============================================================================
+-- Descrição: Cada get_context fazia um read-modify-write em agent_context
+--            (SELECT access_count -> UPDATE) só para atualizar contadores.
+--            O SupabaseMemoryManager agora agrega os acessos em memória e
+--            os aplica periodicamente com esta função: um único UPDATE para
+--            todos os contextos acessados no intervalo.
+-- ============================================================================
+
+-- p_counts: objeto JSON {"<context_id>": <nº de acessos>, ...}
+CREATE OR REPLACE FUNCTION increment_context_access(p_counts JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    UPDATE agent_context c
+    SET access_count = c.access_count + e.value::INTEGER,
+        last_accessed_at = NOW()
+    FROM jsonb_each_text(p_counts) AS e(key, value)
+    WHERE c.id = e.key::UUID;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$;
+
+COMMENT ON FUNCTION increment_context_access(JSONB) IS 'Soma acessos agregados por contexto e atualiza last_accessed_at em um único UPDATE';
+
+-- ============================================================================
+-- FIM DA MIGRATION 0012
+-- ============================================================================
@@ -0,0 +1,23 @@
+-- ============================================================================
+-- Migration 0013: Perfis de dataset calculados na ingestão
+-- ============================================================================
+-- Descrição: O pipeline de ingestão calcula uma única vez o perfil completo
+--            do dataset (tipos, contagens, nulos, min/max, momentos,
+--            quantis, top-k, histogramas e matriz de correlação) e o grava
+--            aqui por ingestion_id. Os handlers de análise respondem a partir
+--            deste perfil sem reprocessar os dados brutos.
+--            Ver src/data/dataset_profile.py.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS dataset_profiles (
+    ingestion_id TEXT PRIMARY KEY,
+    source TEXT,
+    n_rows BIGINT NOT NULL,
+    n_columns INTEGER NOT NULL,
+    profile JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_dataset_profiles_created_at ON dataset_profiles(created_at DESC);
+
+COMMENT ON TABLE dataset_profiles IS 'Perfil estatístico completo de cada ingestão (um registro por ingestion_id)';
@@ -0,0 +1,145 @@
+"""Benchmark da reconstrução do DataFrame a partir dos chunks da tabela embeddings.
+
+Gera um CSV sintético no formato do creditcard.csv (Time, V1..V28, Amount,
+Class), quebra em chunks CSV_ROW com o mesmo chunker/overlap do RAGAgent e
+compara:
+
+- legado: PythonDataAnalyzer._parse_chunk_text_to_dataframe (linha a linha +
+  to_numeric por coluna), alimentado por um único select (o PostgREST corta
+  em --server-cap registros);
+- vetorizado: fetch_embedding_rows (keyset em id) + reconstruct_dataframe_from_chunks
+  (um único pd.read_csv, overlap descartado pelo índice da linha).
+
+O cliente é simulado com latência fixa por requisição (--latency-ms), então
+o resultado não depende da rede.
+
+Uso:
+    python scripts/benchmark_chunk_reconstruction.py --rows 285000
+    python scripts/benchmark_chunk_reconstruction.py --rows 50000 --chunk-rows 500 --overlap 50
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data.chunk_reconstruction import DATA_MARKER, fetch_embedding_rows, reconstruct_dataframe_from_chunks
+from src.embeddings.chunker import TextChunker
+
+
+class _SimulatedClient:
+    """Tabela embeddings em memória com ordenação por id, gt, limit e max-rows."""
+
+    def __init__(self, rows, latency_s, server_cap):
+        self.rows = rows
+        self.latency_s = latency_s
+        self.server_cap = server_cap
+        self.requests = 0
+
+    def table(self, _name):
+        return _SimulatedQuery(self)
+
+
+class _SimulatedQuery:
+    def __init__(self, client):
+        self._client = client
+        self._after = None
+        self._limit = None
+
+    def gt(self, _column, value):
+        self._after = int(value)
+        return self
+
+    def limit(self, size):
+        self._limit = size
+        return self
+
+    def __getattr__(self, _name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        self._client.requests += 1
+        time.sleep(self._client.latency_s)
+        start = 0 if self._after is None else self._after + 1
+        size = min(self._limit or self._client.server_cap, self._client.server_cap)
+        return SimpleNamespace(data=self._client.rows[start:start + size])
+
+
+def build_rows(n_rows: int, chunk_rows: int, overlap: int):
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame(rng.normal(size=(n_rows, 28)).round(6), columns=[f"V{i}" for i in range(1, 29)])
+    df.insert(0, "Time", np.sort(rng.integers(0, 172800, size=n_rows)).astype(float))
+    df["Amount"] = rng.exponential(88, size=n_rows).round(2)
+    df["Class"] = (rng.random(n_rows) < 0.0017).astype(int)
+
+    csv_text = df.to_csv(index=False, quoting=2)  # header entre aspas, como no creditcard.csv
+    chunker = TextChunker(csv_chunk_size_rows=chunk_rows, csv_overlap_rows=overlap)
+    rows = []
+    for i, chunk in enumerate(chunker._chunk_csv_data(csv_text, "creditcard")):
+        info = chunk.metadata.additional_info
+        text = (f"Chunk do dataset creditcard.csv (linhas {info['start_row']} a {info['end_row']})\n\n"
+                f"{DATA_MARKER}\n{chunk.content}")
+        rows.append({"id": str(i), "chunk_text": text,
+                     "metadata": {"source": "creditcard", "strategy": "csv_row", **info}})
+    return df, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=285_000)
+    parser.add_argument('--chunk-rows', type=int, default=20, help='linhas por chunk (padrão do RAGAgent)')
+    parser.add_argument('--overlap', type=int, default=4, help='linhas de overlap (padrão do RAGAgent)')
+    parser.add_argument('--latency-ms', type=float, default=30.0, help='latência simulada por requisição')
+    parser.add_argument('--server-cap', type=int, default=1000, help='max-rows do PostgREST')
+    args = parser.parse_args()
+
+    source, rows = build_rows(args.rows, args.chunk_rows, args.overlap)
+    print(f"Dataset: {len(source):,} linhas, {len(rows):,} chunks "
+          f"({args.chunk_rows} linhas/chunk, overlap {args.overlap})")
+
+    # Legado: um select('*') truncado + parser linha a linha
+    try:
+        from src.tools.python_analyzer import PythonDataAnalyzer
+        analyzer = PythonDataAnalyzer(caller_agent='test_system')
+        client = _SimulatedClient(rows, args.latency_ms / 1000, args.server_cap)
+        started = time.perf_counter()
+        page = client.table('embeddings').select('*').execute().data
+        fetched = time.perf_counter()
+        legacy_truncated = analyzer._parse_chunk_text_to_dataframe(pd.DataFrame(page))
+        legacy_truncated_s = time.perf_counter() - fetched
+        fetch_s = fetched - started
+        print(f"legado (1 select):     {len(legacy_truncated):>9,} linhas  "
+              f"fetch {fetch_s * 1000:8.1f} ms  parse {legacy_truncated_s * 1000:8.1f} ms")
+
+        started = time.perf_counter()
+        legacy_full = analyzer._parse_chunk_text_to_dataframe(pd.DataFrame(rows))
+        legacy_full_s = time.perf_counter() - started
+        print(f"legado (todos chunks): {len(legacy_full):>9,} linhas  "
+              f"{'':>19}parse {legacy_full_s * 1000:8.1f} ms  (overlap não removido)")
+    except ImportError as e:
+        legacy_full_s = None
+        print(f"legado: indisponível ({e})")
+
+    client = _SimulatedClient(rows, args.latency_ms / 1000, args.server_cap)
+    started = time.perf_counter()
+    fetched_rows = fetch_embedding_rows(client, page_size=args.server_cap)
+    fetched = time.perf_counter()
+    rebuilt = reconstruct_dataframe_from_chunks(fetched_rows)
+    parse_s = time.perf_counter() - fetched
+    print(f"vetorizado:            {len(rebuilt):>9,} linhas  "
+          f"fetch {(fetched - started) * 1000:8.1f} ms  parse {parse_s * 1000:8.1f} ms  "
+          f"({client.requests} requisições)")
+
+    exact = rebuilt.shape == source.shape and np.allclose(rebuilt.to_numpy(float), source.to_numpy(float))
+    print(f"Reconstrução idêntica ao CSV fonte: {'sim' if exact else 'NÃO'}")
+    if legacy_full_s:
+        print(f"Parse: {legacy_full_s / parse_s:.1f}x mais rápido")
+
+
+if __name__ == '__main__':
+    main()
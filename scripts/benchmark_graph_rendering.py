@@ -0,0 +1,141 @@
+"""Tempo de geração dos gráficos do GraphGenerator por número de linhas.
+
+Compara, para histograma (com KDE), dispersão, boxplot agrupado e heatmap:
+
+- legado: desenho sobre os dados brutos (``sns.histplot(kde=True)`` em todos
+  os valores, ``ax.scatter`` com todos os pontos, ``sns.boxplot`` e
+  ``DataFrame.corr()`` em float64);
+- atual: ``GraphGenerator`` sem cache, desenhando os agregados de
+  ``src.tools.chart_data`` na própria thread.
+
+Uso:
+    python scripts/benchmark_graph_rendering.py
+    python scripts/benchmark_graph_rendering.py --rows 10000 300000 3000000
+"""
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+import src.tools.chart_render as chart_render
+from src.tools.chart_data import correlation_cache
+from src.tools.chart_render import _figure_bytes, plt, sns
+from src.tools.graph_generator import GraphGenerator
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    valor = rng.gamma(2.0, 150.0, rows)
+    frame = pd.DataFrame({
+        'valor_total': valor,
+        'quantidade': rng.integers(1, 100, rows).astype(float),
+        'frete': valor * 0.05 + rng.normal(0, 5, rows),
+        'desconto': rng.exponential(10.0, rows),
+        'uf': rng.choice(['SP', 'RJ', 'MG', 'RS', 'PR', 'BA'], rows),
+    })
+    for i in range(8):
+        frame[f'imposto_{i}'] = valor * rng.uniform(0.01, 0.2) + rng.normal(0, 1, rows)
+    return frame
+
+
+def _finish(fig, ax, title, xlabel, ylabel, legend=True):
+    """Títulos, legenda e layout como nas funções de desenho antigas."""
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.set_xlabel(xlabel, fontsize=12)
+    ax.set_ylabel(ylabel, fontsize=12)
+    if legend:
+        ax.legend()
+    plt.tight_layout()
+    return _figure_bytes(fig)
+
+
+def legacy_histogram(df):
+    values = df['valor_total'].dropna()
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.histplot(values.to_numpy(), bins=30, kde=True, color='skyblue', ax=ax)
+    ax.axvline(values.mean(), color='red', linestyle='--', linewidth=2, label='Média')
+    ax.axvline(values.median(), color='green', linestyle='--', linewidth=2, label='Mediana')
+    return _finish(fig, ax, 'Distribuição de valor_total', 'valor_total', 'Frequência')
+
+
+def legacy_scatter(df):
+    x, y = df['valor_total'].to_numpy(), df['frete'].to_numpy()
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.scatter(x, y, s=50, alpha=0.6, color='steelblue')
+    line_x = np.array([x.min(), x.max()])
+    ax.plot(line_x, np.poly1d(np.polyfit(x, y, 1))(line_x), "r--", alpha=0.8, label='Correlação')
+    return _finish(fig, ax, 'frete vs valor_total', 'valor_total', 'frete')
+
+
+def legacy_boxplot(df):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.boxplot(x=df['uf'].to_numpy(), y=df['valor_total'].to_numpy(), ax=ax)
+    return _finish(fig, ax, 'Boxplot de valor_total', 'uf', 'valor_total', legend=False)
+
+
+def legacy_heatmap(df):
+    corr = df.select_dtypes(include=[np.number]).corr()
+    fig, ax = plt.subplots(figsize=(12, 8))
+    sns.heatmap(corr, annot=True, cmap='coolwarm', center=0, square=True, linewidths=1,
+                cbar_kws={"shrink": 0.8}, ax=ax)
+    ax.set_title('Matriz de Correlação', fontsize=14, fontweight='bold')
+    plt.tight_layout()
+    return _figure_bytes(fig)
+
+
+def current_charts(generator: GraphGenerator):
+    return {
+        'histograma': lambda df: generator.histogram(df, 'valor_total', bins=30, kde=True),
+        'dispersão': lambda df: generator.scatter_plot(df, 'valor_total', 'frete'),
+        'boxplot': lambda df: generator.boxplot(df, 'valor_total', group_by='uf'),
+        'heatmap': lambda df: generator.correlation_heatmap(df),
+    }
+
+
+LEGACY = {
+    'histograma': legacy_histogram,
+    'dispersão': legacy_scatter,
+    'boxplot': legacy_boxplot,
+    'heatmap': legacy_heatmap,
+}
+
+
+def timed(fn, df) -> float:
+    start = time.perf_counter()
+    fn(df)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 300_000, 3_000_000])
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    chart_render.GRAPH_RENDER_WORKERS = 0  # desenho na thread: mede só preparo + rasterização
+    generator = GraphGenerator(output_dir=Path(tempfile.mkdtemp()), cache=None)
+    current = current_charts(generator)
+    warmup = make_frame(1_000)
+    for name, legacy in LEGACY.items():  # fontes e caches do matplotlib
+        legacy(warmup)
+        current[name](warmup)
+
+    print(f"{'linhas':>10} {'gráfico':<11} {'antes (s)':>10} {'depois (s)':>11}")
+    for rows in args.rows:
+        df = make_frame(rows)
+        for name, legacy in LEGACY.items():
+            correlation_cache._entries.clear()
+            before = timed(legacy, df)
+            after = timed(current[name], df)
+            print(f"{rows:>10} {name:<11} {before:>10.2f} {after:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
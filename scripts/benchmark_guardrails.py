@@ -0,0 +1,145 @@
+"""Tempo de validação de respostas longas pelo StatisticsGuardrails.
+
+Compara, para um dataset com N colunas (estatísticas e distribuições reais)
+e respostas de tamanho crescente:
+
+- legado: padrões montados por coluna/categoria e ``re.findall`` sobre a
+  resposta inteira para cada um (validadores antes da extração única);
+- atual: ``StatisticsGuardrails.validate_response``, que extrai todas as
+  afirmações em uma passada e as confere por consulta a dicionário.
+
+A resposta gerada é correta; a coluna "issues" conta os falsos positivos.
+
+Uso:
+    python scripts/benchmark_guardrails.py
+    python scripts/benchmark_guardrails.py --columns 30 --paragraphs 10 50 200
+"""
+import argparse
+import logging
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from src.tools.guardrails import StatisticsGuardrails
+
+
+def make_context(columns: int) -> dict:
+    rng = np.random.default_rng(0)
+    names = [f'valor_{i}' for i in range(columns - 2)] + ['uf', 'tipo']
+    estatisticas = {name: {'mean': float(rng.uniform(1, 1000)), 'min': 0.0,
+                           'max': float(rng.uniform(1000, 5000))} for name in names[:-2]}
+    return {'csv_analysis': {
+        'total_records': 284807,
+        'total_columns': columns,
+        'tipos_dados': {'total_numericos': columns - 2, 'total_categoricos': 2},
+        'estatisticas': estatisticas,
+        'distribuicao': {
+            'uf': {'SP': 120000, 'RJ': 90000, 'MG': 74807},
+            'tipo': {'entrada': 200000, 'saida': 84807},
+        },
+    }}
+
+
+def make_answer(context: dict, paragraphs: int) -> str:
+    """Resposta no estilo do LLM: cada parágrafo cita estatísticas de algumas colunas."""
+    real = context['csv_analysis']
+    names = list(real['estatisticas'])
+    rng = np.random.default_rng(1)
+    records = f"{real['total_records']:,}".replace(',', '.')
+    lines = [f"O dataset possui {records} registros e {real['total_columns']} colunas, "
+             f"sendo {real['tipos_dados']['total_numericos']} colunas numéricas."]
+    for i in range(paragraphs):
+        a, b = rng.choice(names, 2, replace=False)
+        stats_a, stats_b = real['estatisticas'][a], real['estatisticas'][b]
+        lines.append(
+            f"A coluna {a} tem média {stats_a['mean']:.2f}".replace('.', ',') +
+            f" e máximo {stats_a['max']:.2f}".replace('.', ',') +
+            f"; já {b} varia entre {stats_b['min']:.0f} e {stats_b['max']:.0f}, "
+            f"com valores concentrados nas notas de SP (42,13%) e de entrada (70,22%). "
+            f"Essas features do dataset indicam um padrão temporal nas transações do parágrafo {i}."
+        )
+    return "\n".join(lines)
+
+
+# ============================================================================
+# VALIDADORES LEGADOS (padrões por coluna, uma varredura por padrão)
+# ============================================================================
+
+def legacy_validate(guardrails: StatisticsGuardrails, content: str, context: dict) -> list:
+    issues = []
+    guardrails._validates_semantic_interpretation(content, context)
+    real_data = context['csv_analysis']
+
+    real_records = real_data['total_records']
+    for pattern in [r'(\d{1,3}(?:[,.]?\d{3})*)\s*registros', r'Total.*?(\d{1,3}(?:[,.]?\d{3})*)',
+                    r'(\d{1,3}(?:[,.]?\d{3})*)\s*transações']:
+        for match in re.findall(pattern, content, re.IGNORECASE):
+            if abs(int(match.replace(',', '').replace('.', '')) - real_records) > 100:
+                issues.append(f"Registros incorretos: {match}")
+    for pattern in [r'(\d+)\s*colunas', r'Total.*?colunas.*?(\d+)', r'(\d+)\s*variáveis']:
+        for match in re.findall(pattern, content, re.IGNORECASE):
+            if int(match) != real_data['total_columns']:
+                issues.append(f"Colunas incorretas: {match}")
+
+    for match in re.findall(r'(\d+)\s*(?:colunas?\s*)?(?:numéricas?|numéricos?)', content, re.IGNORECASE):
+        if int(match) != real_data['tipos_dados']['total_numericos']:
+            issues.append(f"Tipos incorretos: {match}")
+
+    for col, stats in real_data['estatisticas'].items():
+        for pattern in [rf'{col}.*?média.*?R?\$?\s*([\d,.]+)', rf'média.*?{col}.*?R?\$?\s*([\d,.]+)',
+                        rf'média.*?R?\$?\s*([\d,.]+)']:
+            for match in re.findall(pattern, content, re.IGNORECASE):
+                try:
+                    if abs(float(match.replace(',', '.')) - stats['mean']) > abs(stats['mean'] * 0.01):
+                        issues.append(f"Média {col} incorreta: {match}")
+                except ValueError:
+                    continue
+
+    for col, dist in real_data['distribuicao'].items():
+        for value, count in dist.items():
+            real_percentage = count / real_data['total_records'] * 100
+            for pattern in [rf'{value}.*?(\d+(?:[,.]?\d+)?)%', rf'(\d+(?:[,.]?\d+)?)%.*?{value}']:
+                for match in re.findall(pattern, content, re.IGNORECASE):
+                    if abs(float(match.replace(',', '.')) - real_percentage) > 1.0:
+                        issues.append(f"Percentual {col}={value} incorreto: {match}%")
+    return issues
+
+
+def timed(fn, repeat: int) -> float:
+    fn()  # compila/aquece o cache de padrões do módulo re
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--columns', type=int, default=30)
+    parser.add_argument('--paragraphs', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    guardrails = StatisticsGuardrails()
+    context = make_context(args.columns)
+
+    print(f"{'parágrafos':>10} {'caracteres':>10} {'antes (ms)':>11} {'depois (ms)':>12} "
+          f"{'issues antes':>13} {'issues depois':>14}")
+    for paragraphs in args.paragraphs:
+        content = make_answer(context, paragraphs)
+        before = timed(lambda: legacy_validate(guardrails, content, context), args.repeat)
+        after = timed(lambda: guardrails.validate_response(content, context), args.repeat)
+        issues_before = len(legacy_validate(guardrails, content, context))
+        issues_after = len(guardrails.validate_response(content, context).issues)
+        print(f"{paragraphs:>10} {len(content):>10} {before * 1000:>11.2f} {after * 1000:>12.2f} "
+              f"{issues_before:>13} {issues_after:>14}")
+
+
+if __name__ == '__main__':
+    main()
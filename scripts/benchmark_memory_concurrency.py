@@ -0,0 +1,184 @@
+"""Benchmark de latência do event loop com chats concorrentes na camada de memória.
+
+Simula N chats simultâneos executando o mesmo ciclo de memória de um /chat
+(recall do histórico + query + resposta) e mede o atraso de um heartbeat no
+event loop, comparando:
+
+- inline:  .execute() do supabase-py chamado direto no loop (comportamento antigo)
+- offload: .execute() enviado ao pool limitado de threads da memória
+- write-behind: offload + gravações enfileiradas e enviadas em lote
+  (src/memory/write_behind.py); a latência por chat só inclui o recall
+
+Por padrão usa um cliente simulado com latência fixa por round-trip, para
+que o resultado não dependa da rede. Use --real para apontar ao Supabase
+configurado em configs/.env (cria sessões de benchmark no banco).
+
+Uso:
+    python scripts/benchmark_memory_concurrency.py --chats 50 --latency-ms 40
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class _SimulatedQuery:
+    """Query mínima: qualquer método encadeado retorna a própria query."""
+
+    def __init__(self, client, table):
+        self._client = client
+        self._table = table
+        self._payload = None
+
+    def insert(self, payload):
+        self._payload = payload
+        return self
+
+    def __getattr__(self, _name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        time.sleep(self._client.latency_s)
+        now = datetime.now().isoformat()
+        if self._table == 'agent_sessions':
+            return SimpleNamespace(data=[{'id': str(uuid4())}])
+        if self._payload is not None:
+            row = {'id': str(uuid4()), 'timestamp': now, **self._payload}
+            return SimpleNamespace(data=[row])
+        return SimpleNamespace(data=[])
+
+
+class _SimulatedRpc:
+    """RPC append_conversation_messages: devolve as mensagens com sessão/turno."""
+
+    def __init__(self, client, params):
+        self._client = client
+        self._params = params
+
+    def execute(self):
+        time.sleep(self._client.latency_s)
+        session_uuid = str(uuid4())
+        return SimpleNamespace(data=[
+            {'id': str(uuid4()), 'session_id': session_uuid, 'conversation_turn': turn, **message}
+            for turn, message in enumerate(self._params['p_messages'], start=1)
+        ])
+
+
+class _SimulatedSupabase:
+    def __init__(self, latency_s):
+        self.latency_s = latency_s
+
+    def table(self, name):
+        return _SimulatedQuery(self, name)
+
+    def rpc(self, _name, params=None):
+        return _SimulatedRpc(self, params or {})
+
+
+async def _heartbeat(stop, samples, interval=0.005):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def _chat_cycle(manager, session_id, latencies):
+    start = time.perf_counter()
+    await manager.get_conversation_history(session_id, limit=20)
+    await manager.add_interaction('pergunta', 'resposta', session_id)
+    latencies.append((time.perf_counter() - start) * 1000)
+
+
+def _percentile(values, q):
+    return values[max(int(len(values) * q) - 1, 0)] if values else 0.0
+
+
+async def _run(mode, chats, real):
+    from src.memory.supabase_memory import SupabaseMemoryManager
+
+    manager = SupabaseMemoryManager('benchmark_agent')
+    if mode == 'inline':
+        async def _inline_execute(query):
+            return query.execute()
+        manager._execute = _inline_execute
+
+    writer = None
+    if mode == 'write-behind':
+        from src.memory.write_behind import MemoryWriteBehindWriter, WriteBehindMemoryManager
+        writer = MemoryWriteBehindWriter(lambda _name: manager, journal_dir=Path(tempfile.mkdtemp()))
+        manager = WriteBehindMemoryManager(manager, writer=writer)
+
+    session_ids = [f'bench_{uuid4().hex[:8]}' for _ in range(chats)]
+    if real:
+        for session_id in session_ids:
+            await manager.create_session(session_id)
+
+    stop = asyncio.Event()
+    samples, latencies = [], []
+    heartbeat = asyncio.create_task(_heartbeat(stop, samples))
+    start = time.perf_counter()
+    await asyncio.gather(*[_chat_cycle(manager, sid, latencies) for sid in session_ids])
+    wall = time.perf_counter() - start
+    stop.set()
+    await heartbeat
+
+    drain = 0.0
+    if writer is not None:
+        drain_start = time.perf_counter()
+        await manager.flush(timeout=60)
+        drain = time.perf_counter() - drain_start
+        writer.close()
+
+    samples.sort()
+    latencies.sort()
+    return {
+        'wall_s': wall,
+        'drain_s': drain,
+        'chat_p50_ms': _percentile(latencies, 0.5),
+        'chat_p99_ms': _percentile(latencies, 0.99),
+        'lag_p50_ms': statistics.median(samples) if samples else 0.0,
+        'lag_p99_ms': _percentile(samples, 0.99),
+        'lag_max_ms': samples[-1] if samples else 0.0,
+        'heartbeats': len(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--chats', type=int, default=50)
+    parser.add_argument('--latency-ms', type=float, default=40.0,
+                        help='latência simulada por round-trip (ignorada com --real)')
+    parser.add_argument('--real', action='store_true', help='usa o Supabase configurado')
+    args = parser.parse_args()
+
+    if not args.real:
+        os.environ.setdefault('SUPABASE_URL', 'http://127.0.0.1:54321')
+        os.environ.setdefault('SUPABASE_KEY', 'benchmark')
+
+    from src.memory import supabase_memory
+    from src.settings import MEMORY_IO_MAX_WORKERS
+    if not args.real:
+        supabase_memory.supabase = _SimulatedSupabase(args.latency_ms / 1000)
+
+    print(f"Chats concorrentes: {args.chats} | workers de I/O: {MEMORY_IO_MAX_WORKERS} | "
+          f"backend: {'Supabase real' if args.real else f'simulado ({args.latency_ms:.0f} ms/round-trip)'}")
+    print(f"{'modo':<13} {'wall (s)':>9} {'chat p50':>10} {'chat p99':>10} "
+          f"{'lag p99':>9} {'lag max':>9} {'drain (s)':>10}")
+    for mode in ('inline', 'offload', 'write-behind'):
+        r = asyncio.run(_run(mode, args.chats, args.real))
+        print(f"{mode:<13} {r['wall_s']:>9.2f} {r['chat_p50_ms']:>8.1f}ms {r['chat_p99_ms']:>8.1f}ms "
+              f"{r['lag_p99_ms']:>7.1f}ms {r['lag_max_ms']:>7.1f}ms {r['drain_s']:>10.2f}")
+    supabase_memory.shutdown_memory_io_executor()
+
+
+if __name__ == '__main__':
+    main()
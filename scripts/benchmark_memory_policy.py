@@ -0,0 +1,111 @@
+"""Benchmark do pico de memória (RSS) de uma análise estatística sobre um CSV de NFe.
+
+Gera um CSV de referência com --rows linhas (UF, CFOP, NCM, emitente,
+chave de acesso, datas, valores e quantidades) e mede, cada modo num
+subprocesso novo (o pico de RSS só cresce dentro de um processo):
+
+- legado: ``pd.read_csv`` com tipos padrão, cópia do DataFrame (como em
+  ``DataLoader.load_from_dataframe``/``DataValidator.clean_dataframe``) e
+  ``StatisticalAnalyzer.analyze``;
+- política: ``plan_csv_load`` com projeção nas colunas numéricas, tipos
+  reduzidos e ``read_csv_bounded``;
+- orçamento: a mesma análise com --budget-mb, caindo para execução em blocos.
+
+Uso:
+    python scripts/benchmark_memory_policy.py
+    python scripts/benchmark_memory_policy.py --rows 2000000 --budget-mb 64
+"""
+import argparse
+import logging
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+MODES = ('legado', 'politica', 'orcamento')
+
+
+def build_csv(path: Path, n_rows: int, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    block = 500_000
+    for start in range(0, n_rows, block):
+        n = min(block, n_rows - start)
+        emissao = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365 * 86400, n), unit='s')
+        pd.DataFrame({
+            'chave_acesso': [f"3524{i:040d}" for i in range(start, start + n)],
+            'data_emissao': emissao.strftime('%d/%m/%Y %H:%M:%S'),
+            'uf_emitente': rng.choice(['SP', 'MG', 'RJ', 'PR', 'RS', 'BA'], n),
+            'emitente': rng.choice([f"Empresa {i} Ltda" for i in range(2000)], n),
+            'cfop': rng.integers(5100, 6999, n),
+            'ncm': rng.integers(10_000_000, 99_999_999, n),
+            'quantidade': rng.integers(1, 500, n),
+            'valor_unitario': rng.gamma(2.0, 40.0, n).round(2),
+            'valor_total': rng.gamma(2.0, 300.0, n).round(2),
+        }).to_csv(path, mode='a' if start else 'w', header=not start, index=False)
+
+
+def run_mode(mode: str, csv_path: Path, budget_mb: int) -> None:
+    from src.analysis.statistical_analyzer import StatisticalAnalyzer
+    from src.data.memory_policy import (
+        LOAD_CHUNKED, MemoryPolicy, iter_csv_chunks, peak_rss_bytes, plan_csv_load, read_csv_bounded,
+    )
+
+    logging.disable(logging.INFO)
+    analyzer = StatisticalAnalyzer()
+    start = time.perf_counter()
+    if mode == 'legado':
+        df = pd.read_csv(csv_path, low_memory=False)
+        working = df.copy()
+        analyzer.analyze(working)
+        frame_mb = df.memory_usage(deep=True).sum() / 1024 ** 2
+    else:
+        policy = MemoryPolicy(budget_bytes=budget_mb * 1024 ** 2) if mode == 'orcamento' else MemoryPolicy()
+        numeric = pd.read_csv(csv_path, nrows=1000).select_dtypes('number').columns.tolist()
+        plan = plan_csv_load(csv_path, numeric, policy, streaming=True)
+        if plan.mode == LOAD_CHUNKED:
+            state = None
+            for chunk in iter_csv_chunks(csv_path, plan):
+                state = analyzer.accumulate(chunk, numeric, state)
+            analyzer.analyze_state(state)
+            frame_mb = 0.0
+        else:
+            df = read_csv_bounded(csv_path, plan)
+            analyzer.analyze(df)
+            frame_mb = df.memory_usage(deep=True).sum() / 1024 ** 2
+    elapsed = time.perf_counter() - start
+    print(f"{mode}\t{peak_rss_bytes() / 1024 ** 2:.0f}\t{frame_mb:.0f}\t{elapsed:.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--budget-mb', type=int, default=64)
+    parser.add_argument('--csv', type=Path, default=Path('/tmp/benchmark_memory_policy.csv'))
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.csv, args.budget_mb)
+        return
+
+    if not args.csv.exists():
+        print(f"Gerando {args.rows:,} linhas em {args.csv}...")
+        build_csv(args.csv, args.rows)
+    print(f"CSV de referência: {args.csv.stat().st_size / 1024 ** 2:.0f} MB\n")
+    print(f"{'modo':<12} {'pico RSS (MB)':>14} {'DataFrame (MB)':>15} {'tempo (s)':>10}")
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, '--mode', mode, '--csv', str(args.csv), '--budget-mb', str(args.budget_mb)],
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        name, rss, frame, elapsed = output.split('\t')
+        print(f"{name:<12} {rss:>14} {frame:>15} {elapsed:>10}")
+
+
+if __name__ == '__main__':
+    main()
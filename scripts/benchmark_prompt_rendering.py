@@ -0,0 +1,112 @@
+"""Custo de montagem de prompts e fração do prompt reaproveitável pelo cache do provedor.
+
+Compara, para uma sequência de consultas sobre datasets diferentes:
+
+- legado: ``str.format`` a cada chamada e o prompt de análise montado por
+  concatenação, com arquivo, estatísticas e consulta antes das instruções;
+- atual: templates compilados uma vez (``PromptManager.render``) e prompts
+  montados por ``PromptManager.compose`` (prefixo fixo + sufixo volátil).
+
+A coluna "prefixo comum" é a média do maior prefixo compartilhado entre prompts
+consecutivos, em fração do tamanho do prompt: é o que o cache de prompt dos
+provedores (OpenAI/Groq) consegue reaproveitar.
+
+Uso:
+    python scripts/benchmark_prompt_rendering.py
+    python scripts/benchmark_prompt_rendering.py --calls 5000
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.prompts.manager import AgentRole, PromptManager
+
+
+def make_contexts(calls: int) -> list:
+    return [{
+        'file_path': f'data/notas_fiscais_{i % 7}.csv',
+        'csv_analysis': '\n'.join(f'valor_{c}: mean={(i + 1) * 3.7 + c:.2f} std={c * 1.3:.2f}' for c in range(20)),
+        'columns_summary': ', '.join(f'valor_{c}' for c in range(20)),
+        'shape': (1000 + i, 20),
+        'query': f'Qual a média da coluna valor_{i % 20}?',
+    } for i in range(calls)]
+
+
+def legacy_analysis_prompt(manager: PromptManager, context: dict) -> str:
+    """Montagem anterior: dados voláteis antes das instruções fixas."""
+    instructions = manager.prompts['orchestrator']['csv_data_instructions'].content
+    base, critical = instructions.split('\n\n', 1)
+    return '\n'.join([
+        base,
+        f"\n📊 ARQUIVO CARREGADO: {context['file_path']}",
+        f"\n📈 ANÁLISE DOS DADOS:\n{context['csv_analysis']}",
+        f"\n📋 COLUNAS: {context['columns_summary']}",
+        f"\n📐 DIMENSÕES: {context['shape']}",
+        f"\n❓ CONSULTA DO USUÁRIO: {context['query']}",
+        f"\n{critical}",
+    ])
+
+
+def current_analysis_prompt(manager: PromptManager, context: dict) -> str:
+    return manager.compose(AgentRole.ORCHESTRATOR, ('csv_data_instructions',), [
+        f"📊 ARQUIVO CARREGADO: {context['file_path']}",
+        f"📈 ANÁLISE DOS DADOS:\n{context['csv_analysis']}",
+        f"📋 COLUNAS: {context['columns_summary']}",
+        f"📐 DIMENSÕES: {context['shape']}",
+        f"❓ CONSULTA DO USUÁRIO: {context['query']}",
+    ]).text
+
+
+def legacy_search_prompt(manager: PromptManager, context: dict) -> str:
+    """``str.format`` a cada chamada, com a ordem anterior (contexto antes das instruções)."""
+    instructions, search_context = manager.prompts['rag_specialist']['search_context'].content.split('\n\n', 1)
+    content = f"{search_context}\n\n{instructions}"
+    return content.format(query=context['query'], num_results=5, avg_similarity=0.8,
+                          context_chunks=context['csv_analysis'])
+
+
+def current_search_prompt(manager: PromptManager, context: dict) -> str:
+    return manager.get_prompt(AgentRole.RAG_SPECIALIST, 'search_context', query=context['query'],
+                              num_results=5, avg_similarity=0.8, context_chunks=context['csv_analysis'])
+
+
+def shared_prefix(prompts: list) -> float:
+    """Média do prefixo comum entre prompts consecutivos, em fração do prompt."""
+    shares = [len(os.path.commonprefix([a, b])) / len(b) for a, b in zip(prompts, prompts[1:])]
+    return sum(shares) / len(shares)
+
+
+def timed(fn, contexts: list):
+    start = time.perf_counter()
+    prompts = [fn(context) for context in contexts]
+    return (time.perf_counter() - start) / len(contexts), prompts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=2000)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    start = time.perf_counter()
+    manager = PromptManager()
+    print(f"Catálogo compilado em {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    contexts = make_contexts(args.calls)
+    print(f"{'prompt':>10} {'antes (µs)':>11} {'depois (µs)':>12} {'prefixo comum antes':>20} "
+          f"{'prefixo comum depois':>21}")
+    for name, legacy, current in [('análise', legacy_analysis_prompt, current_analysis_prompt),
+                                  ('busca', legacy_search_prompt, current_search_prompt)]:
+        before, legacy_prompts = timed(lambda context: legacy(manager, context), contexts)
+        after, current_prompts = timed(lambda context: current(manager, context), contexts)
+        print(f"{name:>10} {before * 1e6:>11.2f} {after * 1e6:>12.2f} "
+              f"{shared_prefix(legacy_prompts):>20.1%} {shared_prefix(current_prompts):>21.1%}")
+
+
+if __name__ == '__main__':
+    main()
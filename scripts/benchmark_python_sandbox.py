@@ -0,0 +1,94 @@
+"""Latência da execução de código gerado por LLM sobre um dataset em parquet.
+
+Compara, para o mesmo trecho de análise:
+
+- subprocesso frio: ``python -c`` por execução (importa pandas, lê o parquet
+  e executa o código), como um sandbox sem processos pré-aquecidos;
+- pool aquecido: ``PythonSandboxPool`` com o dataset já carregado no worker;
+- no processo: ``execute_snippet`` direto (sem isolamento, referência).
+
+Uso:
+    python scripts/benchmark_python_sandbox.py
+    python scripts/benchmark_python_sandbox.py --rows 300000 --repeat 20
+"""
+import argparse
+import logging
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from src.tools.python_sandbox import PythonSandboxPool, execute_snippet, load_dataset
+
+CODE = "result = df.groupby('uf')['valor_total'].agg(['sum', 'mean', 'count'])"
+
+COLD_TEMPLATE = """
+import pandas as pd
+import numpy as np
+df = pd.read_parquet({path!r})
+exec({code!r}, {{'df': df, 'pd': pd, 'np': np}})
+"""
+
+
+def make_dataset(rows: int) -> str:
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        'valor_total': rng.gamma(2.0, 150.0, rows),
+        'quantidade': rng.integers(1, 100, rows),
+        'uf': rng.choice(['SP', 'RJ', 'MG', 'RS', 'PR', 'BA'], rows),
+    })
+    path = Path(tempfile.mkdtemp()) / 'notas.parquet'
+    frame.to_parquet(path)
+    return str(path)
+
+
+def measure(fn, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=300_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    path = make_dataset(args.rows)
+    dataset = ('parquet', path)
+
+    cold_code = COLD_TEMPLATE.format(path=path, code=CODE)
+    cold = measure(lambda: subprocess.run([sys.executable, '-c', cold_code], check=True), args.repeat)
+
+    start = time.perf_counter()
+    pool = PythonSandboxPool(size=1)
+    startup = time.perf_counter() - start
+    try:
+        first = measure(lambda: pool.run(CODE, dataset=dataset), 1)[0]
+        warm = measure(lambda: pool.run(CODE, dataset=dataset), args.repeat)
+    finally:
+        pool.close()
+
+    frame = load_dataset(dataset)
+    inline = measure(lambda: execute_snippet(CODE, frame, None, 'result'), args.repeat)
+
+    print(f"{args.rows} linhas, {args.repeat} execuções (mediana / p95 em ms)")
+    print(f"  início do pool: {startup * 1000:.0f} ms; primeira execução (carrega o dataset): {first * 1000:.0f} ms")
+    for name, timings in (('subprocesso frio', cold), ('pool aquecido', warm), ('no processo', inline)):
+        p95 = sorted(timings)[max(0, int(len(timings) * 0.95) - 1)]
+        print(f"  {name:<17} {statistics.median(timings) * 1000:>8.1f} {p95 * 1000:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
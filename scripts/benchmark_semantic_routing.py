@@ -0,0 +1,97 @@
+"""Contagem de embeddings e RPCs por pergunta roteada pelo SemanticRouter.
+
+Substitui o generator e o VectorStore do roteador por versões que contam
+chamadas (scores sintéticos, sem modelo nem Supabase) e compara, para três
+cenários (intenção encontrada, só contexto, nada encontrado):
+
+- legado: ``classify_intent`` com ``search_with_expansion(0.7, 3)`` e, sem
+  intenção, ``fallback_contextual`` refazendo ``search_with_expansion(0.6, 1)``;
+- atual: ``route`` com um único conjunto de candidatos memoizado.
+
+Uso:
+    python scripts/benchmark_semantic_routing.py
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import src.router.semantic_router as semantic_router
+from src.embeddings.vector_store import VectorSearchResult
+
+SCENARIOS = {
+    'intenção': 0.82,
+    'contexto': 0.64,
+    'nenhum': 0.30,
+}
+
+
+class CountingGenerator:
+    def __init__(self):
+        self.embeddings = 0
+
+    def generate_embedding(self, text):
+        self.embeddings += 1
+        return type('EmbeddingResult', (), {'embedding': [0.0] * 384})()
+
+    def embed_texts(self, texts):
+        self.embeddings += len(texts)
+        return [[0.0] * 384 for _ in texts]
+
+
+class CountingStore:
+    def __init__(self, score: float):
+        self.score = score
+        self.rpcs = 0
+
+    def search_similar(self, query_embedding, similarity_threshold=0.7, limit=5, filters=None):
+        self.rpcs += 1
+        if self.score < similarity_threshold:
+            return []
+        return [VectorSearchResult(chunk_text='chunk', similarity_score=self.score,
+                                   metadata={'category': 'statistical_analysis'},
+                                   embedding_id='e1', source='bench', chunk_index=0)]
+
+    def search_similar_many(self, query_embeddings, similarity_threshold=0.7, limit=5,
+                            filters=None, stop_when=None):
+        return [self.search_similar(e, similarity_threshold, limit, filters) for e in query_embeddings]
+
+
+def legacy_route(router, question: str) -> None:
+    if router.search_with_expansion(question, base_threshold=0.7, base_limit=3):
+        return
+    router.search_with_expansion(question, base_threshold=0.6, base_limit=1)
+
+
+def measure(score: float, legacy: bool) -> tuple:
+    generator, store = CountingGenerator(), CountingStore(score)
+    semantic_router._query_refiner = None
+    semantic_router.embedding_generator, semantic_router.vector_store = generator, store
+    refiner = semantic_router.get_query_refiner()
+    refiner.enable_paraphrase = False
+
+    router = semantic_router.SemanticRouter(ingestion_id='bench')
+    question = 'qual a média do valor total por uf?'
+    if legacy:
+        legacy_route(router, question)
+    else:
+        router.route(question)
+    return generator.embeddings, store.rpcs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    print(f"{'cenário':<10} {'embeddings antes':>17} {'depois':>7} {'RPCs antes':>11} {'depois':>7}")
+    for name, score in SCENARIOS.items():
+        emb_before, rpc_before = measure(score, legacy=True)
+        emb_after, rpc_after = measure(score, legacy=False)
+        print(f"{name:<10} {emb_before:>17} {emb_after:>7} {rpc_before:>11} {rpc_after:>7}")
+
+
+if __name__ == '__main__':
+    main()
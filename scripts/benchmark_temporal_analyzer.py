@@ -0,0 +1,112 @@
+"""Benchmark da análise temporal de múltiplas séries (ex.: valor diário por UF/CFOP).
+
+Gera --series séries diárias de --years anos (tendência + ciclo semanal e
+anual + ruído + picos) e compara:
+
+- legado: uma chamada por série com LinearRegression do sklearn,
+  ``Series.autocorr`` nas defasagens 1/7/30/365 e z-score das diferenças
+  (o que o TemporalAnalyzer fazia por coluna);
+- por série: ``TemporalAnalyzer.analyze`` atual chamado em laço;
+- vetorizado: ``TemporalAnalyzer.analyze_matrix`` sobre a matriz inteira.
+
+Também mede ``analyze_many`` a partir de registros com timestamps
+irregulares (--records linhas, uma série por grupo), incluindo a
+reamostragem.
+
+Uso:
+    python scripts/benchmark_temporal_analyzer.py
+    python scripts/benchmark_temporal_analyzer.py --series 500 --years 3 --records 2000000
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analysis.temporal_analyzer import TemporalAnalyzer
+
+
+def build_matrix(n_series: int, years: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2022-01-01', periods=int(years * 365.25), freq='D')
+    t = np.arange(len(index))[:, None]
+    slope = rng.normal(0, 0.05, n_series)
+    weekly = rng.uniform(0, 5, n_series) * (index.dayofweek.to_numpy()[:, None] < 5)
+    annual = rng.uniform(0, 8, n_series) * np.sin(2 * np.pi * t / 365.25)
+    values = 100 + slope * t + weekly + annual + rng.normal(0, 2, (len(index), n_series))
+    spikes = rng.random(values.shape) < 0.002
+    values[spikes] += rng.normal(0, 40, spikes.sum())
+    return pd.DataFrame(values, index=index, columns=[f"serie_{i}" for i in range(n_series)])
+
+
+def build_records(n_records: int, n_groups: int, years: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    offsets = pd.to_timedelta(rng.uniform(0, years * 365.25, n_records), unit='D')
+    return pd.DataFrame({
+        'data_emissao': pd.Timestamp('2022-01-01') + offsets,
+        'cfop': rng.integers(0, n_groups, n_records).astype(str),
+        'valor_total': rng.gamma(2.0, 150.0, n_records),
+    })
+
+
+def legacy_analyze(serie: pd.Series) -> dict:
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import r2_score
+
+    X = np.arange(len(serie)).reshape(-1, 1)
+    y = serie.values.reshape(-1, 1)
+    model = LinearRegression().fit(X, y)
+    r2 = r2_score(y, model.predict(X))
+    lag1 = serie.autocorr(lag=1)
+    seasonal = max(abs(serie.autocorr(lag=lag)) for lag in (7, 30, 365) if len(serie) > lag * 2)
+    diffs = np.diff(serie.values)
+    zscore = (diffs - diffs.mean()) / diffs.std()
+    return {'slope': float(model.coef_[0][0]), 'r2': r2, 'lag1': lag1,
+            'seasonal': seasonal, 'anomalies': int((np.abs(zscore) > 3).sum())}
+
+
+def timed(label: str, n_series: int, func) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed * 1000:>10.1f} ms   {n_series / elapsed:>10.0f} séries/s")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--series', type=int, default=500)
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--records', type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    analyzer = TemporalAnalyzer()
+    matrix = build_matrix(args.series, args.years)
+    frame = matrix.reset_index(drop=True)
+    print(f"{args.series} séries × {len(matrix)} dias\n")
+
+    legacy = timed("legado (laço sklearn/autocorr)", args.series,
+                   lambda: [legacy_analyze(frame[col]) for col in frame.columns])
+    timed("analyze() por série", args.series,
+          lambda: [analyzer.analyze(frame, col) for col in frame.columns])
+    vectorized = timed("analyze_matrix()", args.series, lambda: analyzer.analyze_matrix(matrix))
+    print(f"\nGanho vetorizado vs legado: {legacy / vectorized:.0f}x")
+
+    records = build_records(args.records, args.series, args.years)
+    print(f"\n{args.records} registros irregulares, {args.series} grupos")
+    timed("analyze_many() (reamostra + analisa)", args.series,
+          lambda: analyzer.analyze_many(records, 'data_emissao', ['valor_total'], group_col='cfop'))
+
+    result = analyzer.analyze_matrix(matrix)
+    print("\nSazonalidade detectada:")
+    print(result.series['seasonality'].value_counts().to_string())
+
+
+if __name__ == '__main__':
+    main()
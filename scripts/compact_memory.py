@@ -0,0 +1,69 @@
+"""Compacta o histórico de memória dos agentes (resumo cumulativo + embeddings representativos).
+
+Substitui turnos antigos de agent_conversations por um registro de resumo,
+reduz embeddings antigos de agent_memory_embeddings a alguns representativos
+e aplica a cota de bytes por sessão (ver src/memory/compaction.py).
+
+Uso:
+    python scripts/compact_memory.py                      # todas as sessões
+    python scripts/compact_memory.py --session-id abc123  # sessões específicas
+    python scripts/compact_memory.py --dry-run --measure-recall
+    python scripts/compact_memory.py --keep-turns 20 --max-age-hours 12 --json
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.memory.compaction import CompactionPolicy, MemoryCompactor
+
+
+def main():
+    defaults = CompactionPolicy()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--session-id', action='append', dest='session_ids',
+                        help='session_id a compactar (pode repetir); padrão: todas')
+    parser.add_argument('--keep-turns', type=int, default=defaults.keep_recent_turns)
+    parser.add_argument('--min-keep-turns', type=int, default=defaults.min_keep_turns)
+    parser.add_argument('--max-age-hours', type=float, default=defaults.max_age_hours)
+    parser.add_argument('--max-embeddings', type=int, default=defaults.max_embeddings)
+    parser.add_argument('--quota-bytes', type=int, default=defaults.max_session_bytes)
+    parser.add_argument('--dry-run', action='store_true', help='só calcula o relatório')
+    parser.add_argument('--measure-recall', action='store_true',
+                        help='mede a latência do recall antes/depois em cada sessão compactada')
+    parser.add_argument('--json', action='store_true', help='imprime o relatório em JSON')
+    args = parser.parse_args()
+
+    policy = CompactionPolicy(
+        keep_recent_turns=args.keep_turns,
+        max_age_hours=args.max_age_hours,
+        max_session_bytes=args.quota_bytes,
+        max_embeddings=args.max_embeddings,
+        min_keep_turns=args.min_keep_turns,
+    )
+    compactor = MemoryCompactor(policy, dry_run=args.dry_run)
+    report = asyncio.run(compactor.run(args.session_ids, measure_recall=args.measure_recall))
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2, ensure_ascii=False))
+        return
+
+    print(f"{'(dry-run) ' if args.dry_run else ''}Sessões: {report.sessions_scanned} analisadas, "
+          f"{report.sessions_compacted} compactadas, {report.quota_violations} acima da cota")
+    print(f"Linhas: -{report.conversation_rows_deleted} conversas, -{report.embedding_rows_deleted} embeddings, "
+          f"+{report.summary_rows_written} resumos (recuperadas: {report.rows_reclaimed})")
+    print(f"Bytes: {report.bytes_before:,} -> {report.bytes_after:,} (recuperados: {report.bytes_reclaimed:,})")
+    if report.recall_ms_before is not None:
+        print(f"Recall: {report.recall_ms_before:.1f} ms -> {report.recall_ms_after:.1f} ms (média por sessão)")
+    if report.errors:
+        print(f"Erros: {len(report.errors)}")
+        for error in report.errors[:10]:
+            print(f"  - {error}")
+    print(f"Duração: {report.duration_s:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
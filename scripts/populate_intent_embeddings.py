@@ -19,8 +19,16 @@ COMO ADICIONAR NOVAS INTENÇÕES:
 2. Defina exemplos de consultas
 3. Especifique metadados (palavras-chave, prioridade)
 4. Execute o script: python scripts/populate_intent_embeddings.py
+
+O script também grava o índice de protótipos em memória usado pelo
+SemanticRouter (src/router/intent_index.py, padrão data/intent_index.npz);
+servidores em execução recarregam o arquivo automaticamente. Para gerar só
+o índice, sem gravar no Supabase:
+
+    python scripts/populate_intent_embeddings.py --index-only
 """
 
+import argparse
 import sys
 import os
 from pathlib import Path
@@ -33,6 +41,8 @@ sys.path.insert(0, str(root_dir))
 
 from src.embeddings.generator import EmbeddingGenerator, EmbeddingProvider
 from src.embeddings.vector_store import VectorStore
+from src.router.intent_index import save_intent_index
+from src.settings import INTENT_INDEX_PATH
 from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -306,6 +316,31 @@ def store_intent_embeddings(
     return stats
 
 
+def export_intent_index(
+    embeddings_data: List[Dict[str, Any]],
+    model: str,
+    index_path: Path
+) -> str:
+    """
+    Grava os embeddings de intenção no índice de protótipos local.
+    
+    Args:
+        embeddings_data: Lista de embeddings com metadados
+        model: Modelo de embeddings usado (gravado no índice)
+        index_path: Arquivo .npz de destino
+    
+    Returns:
+        Versão do índice gravado
+    """
+    return save_intent_index(
+        index_path,
+        texts=[item["chunk_text"] for item in embeddings_data],
+        labels=[item["metadata"]["category"] for item in embeddings_data],
+        embeddings=[item["embedding"] for item in embeddings_data],
+        model=model
+    )
+
+
 def validate_intent_classification(
     vector_store: VectorStore,
     embedding_generator: EmbeddingGenerator,
@@ -382,10 +417,18 @@ def main():
     1. Inicializa embedding generator e vector store
     2. Para cada categoria de intenção:
        - Gera embeddings dos exemplos
-       - Armazena no Supabase com metadados
+       - Grava o índice de protótipos local
+       - Armazena no Supabase com metadados (exceto com --index-only)
     3. Valida classificação com queries de teste
     4. Exibe estatísticas finais
     """
+    parser = argparse.ArgumentParser(description="Popula embeddings de categorias de intenção")
+    parser.add_argument("--index-path", type=Path, default=INTENT_INDEX_PATH,
+                        help="Arquivo do índice de protótipos (padrão: INTENT_INDEX_PATH)")
+    parser.add_argument("--index-only", action="store_true",
+                        help="Grava apenas o índice local, sem inserir no Supabase")
+    args = parser.parse_args()
+    
     logger.info("\n" + "="*80)
     logger.info("🚀 INICIANDO POPULAÇÃO DE EMBEDDINGS DE INTENÇÕES")
     logger.info("="*80 + "\n")
@@ -403,8 +446,9 @@ def main():
         logger.info("✅ EmbeddingGenerator inicializado")
         
         # Inicializar vector store
-        vector_store = VectorStore()
-        logger.info("✅ VectorStore inicializado\n")
+        vector_store = None if args.index_only else VectorStore()
+        if vector_store:
+            logger.info("✅ VectorStore inicializado\n")
         
         # ============================================================================
         # ETAPA 2: GERAÇÃO E ARMAZENAMENTO
@@ -422,6 +466,12 @@ def main():
         
         logger.info(f"\n✅ Total de embeddings gerados: {len(all_embeddings)}\n")
         
+        # Índice de protótipos em memória do SemanticRouter
+        version = export_intent_index(all_embeddings, embedding_generator.model, args.index_path)
+        logger.info(f"✅ Índice de intenções gravado em {args.index_path} (versão {version})\n")
+        if args.index_only:
+            return
+        
         # Armazenar embeddings no Supabase
         storage_stats = store_intent_embeddings(all_embeddings, vector_store)
         
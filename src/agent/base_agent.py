@@ -12,6 +12,7 @@ from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional
 
 from src.utils.logging_config import get_logger
+from src.settings import MEMORY_WRITE_BEHIND_ENABLED
 
 # Import do LLM Manager para abstração de provedores
 try:
@@ -25,10 +26,12 @@ except ImportError:
 
 try:
     from src.memory.supabase_memory import SupabaseMemoryManager
+    from src.memory.write_behind import WriteBehindMemoryManager
     MEMORY_AVAILABLE = True
 except ImportError:
     MEMORY_AVAILABLE = False
     SupabaseMemoryManager = None
+    WriteBehindMemoryManager = None
 
 class AgentError(Exception):
     """Exceção específica para erros em agentes."""
@@ -58,6 +61,9 @@ class BaseAgent(ABC):
         if self._memory_enabled:
             try:
                 self._memory_manager = SupabaseMemoryManager(agent_name=self.name)
+                if MEMORY_WRITE_BEHIND_ENABLED:
+                    # Gravações de memória saem do caminho crítico (fila + journal local)
+                    self._memory_manager = WriteBehindMemoryManager(self._memory_manager)
                 self.logger.info(f"Memória LangChain+Supabase habilitada para agente {name}")
             except Exception as e:
                 self.logger.warning(f"Falha ao inicializar memória Supabase: {e}")
@@ -132,14 +138,9 @@ class BaseAgent(ABC):
             return False
         
         try:
-            # Salva query
-            await self._memory_manager.add_user_query(
-                query, self._current_session_id, metadata
-            )
-            
-            # Salva response
-            await self._memory_manager.add_agent_response(
-                response, self._current_session_id, 
+            # Salva query + response em uma única gravação
+            await self._memory_manager.add_interaction(
+                query, response, self._current_session_id,
                 processing_time_ms, confidence, model_used, metadata
             )
             
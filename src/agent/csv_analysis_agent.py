@@ -621,6 +621,44 @@ class EmbeddingsAnalysisAgent(BaseAgent):
             'conformidade': 'embeddings_only'
         })
     
+    def _numeric_column_stats(self, analyzer) -> Optional[Dict[str, Any]]:
+        """Estatísticas por coluna numérica (min, max, mean, median, std, var, mode) da ingestão ativa.
+        
+        Usa o perfil calculado na ingestão; sem ele, calcula sobre o snapshot do dataset.
+        
+        Returns:
+            Dicionário com 'stats' (DataFrame coluna x estatística), 'total_records'
+            e 'method', ou None se não há dados
+        """
+        profile = analyzer.get_dataset_profile()
+        if profile is not None:
+            return {
+                'stats': profile.numeric_stats(),
+                'total_records': profile.n_rows,
+                'method': 'Perfil estatístico calculado na ingestão'
+            }
+        
+        df = analyzer.get_dataset_snapshot()
+        if df is None or df.empty:
+            return None
+        self.logger.info(f"✅ DataFrame carregado: {len(df)} registros, {len(df.columns)} colunas")
+        numeric = df.select_dtypes(include=[np.number])
+        modes = numeric.mode()
+        stats = pd.DataFrame({
+            'min': numeric.min(),
+            'max': numeric.max(),
+            'mean': numeric.mean(),
+            'median': numeric.median(),
+            'std': numeric.std(),
+            'var': numeric.var(),
+            'mode': modes.iloc[0] if len(modes) else np.nan
+        }, index=numeric.columns)
+        return {
+            'stats': stats,
+            'total_records': len(df),
+            'method': 'Parsing de chunk_text + análise com pandas'
+        }
+    
     def _handle_statistics_query_from_embeddings(self, query: str, context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Processa consultas sobre estatísticas (min, max, intervalos) usando dados reais dos embeddings.
         
@@ -645,19 +683,19 @@ class EmbeddingsAnalysisAgent(BaseAgent):
                     metadata={"error": True}
                 )
             
-            # Obter DataFrame real dos chunks
-            df = analyzer.get_data_from_embeddings(limit=None, parse_chunk_text=True)
+            # Estatísticas da ingestão ativa (perfil da ingestão ou snapshot compartilhado)
+            column_stats = self._numeric_column_stats(analyzer)
             
-            if df is None or df.empty:
+            if column_stats is None:
                 return self._build_response(
                     "❌ Não foi possível obter dados dos embeddings para calcular estatísticas",
                     metadata={"error": True}
                 )
             
-            self.logger.info(f"✅ DataFrame carregado: {len(df)} registros, {len(df.columns)} colunas")
-            
-            # Calcular intervalos (min/max) para TODAS as colunas numéricas
-            numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+            # Intervalos (min/max) para TODAS as colunas numéricas
+            stats = column_stats['stats']
+            total_records = column_stats['total_records']
+            numeric_cols = stats.index.tolist()
             
             if not numeric_cols:
                 return self._build_response(
@@ -668,8 +706,8 @@ class EmbeddingsAnalysisAgent(BaseAgent):
             # Calcular estatísticas de intervalo
             stats_data = []
             for col in numeric_cols:
-                col_min = df[col].min()
-                col_max = df[col].max()
+                col_min = stats.at[col, 'min']
+                col_max = stats.at[col, 'max']
                 col_range = col_max - col_min
                 stats_data.append({
                     'variavel': col,
@@ -682,7 +720,7 @@ class EmbeddingsAnalysisAgent(BaseAgent):
             response = f"""📊 **Intervalo de Cada Variável (Mínimo e Máximo)**
 
 **Fonte:** Dados reais extraídos da tabela embeddings (coluna chunk_text parseada)
-**Total de registros analisados:** {len(df):,}
+**Total de registros analisados:** {total_records:,}
 **Total de variáveis numéricas:** {len(numeric_cols)}
 
 """
@@ -705,10 +743,10 @@ class EmbeddingsAnalysisAgent(BaseAgent):
                     response += f"| {var_name} | {var_min:.2f} | {var_max:.2f} | {var_range:.2f} |\n"
             
             response += f"\n✅ **Conformidade:** Dados obtidos exclusivamente da tabela embeddings\n"
-            response += f"✅ **Método:** Parsing de chunk_text + análise com pandas\n"
+            response += f"✅ **Método:** {column_stats['method']}\n"
             
             return self._build_response(response, metadata={
-                'total_records': len(df),
+                'total_records': total_records,
                 'total_numeric_columns': len(numeric_cols),
                 'statistics': stats_data,
                 'conformidade': 'embeddings_only',
@@ -748,19 +786,19 @@ class EmbeddingsAnalysisAgent(BaseAgent):
                     metadata={"error": True}
                 )
             
-            # Obter DataFrame real dos chunks (GENÉRICO - qualquer CSV)
-            df = analyzer.get_data_from_embeddings(limit=None, parse_chunk_text=True)
+            # Estatísticas da ingestão ativa (GENÉRICO - qualquer CSV)
+            column_stats = self._numeric_column_stats(analyzer)
             
-            if df is None or df.empty:
+            if column_stats is None:
                 return self._build_response(
                     "❌ Não foi possível obter dados dos embeddings para calcular variabilidade",
                     metadata={"error": True}
                 )
             
-            self.logger.info(f"✅ DataFrame carregado: {len(df)} registros, {len(df.columns)} colunas")
-            
-            # Calcular VARIABILIDADE para TODAS as colunas numéricas (GENÉRICO)
-            numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+            # VARIABILIDADE para TODAS as colunas numéricas (GENÉRICO)
+            stats = column_stats['stats']
+            total_records = column_stats['total_records']
+            numeric_cols = stats.index.tolist()
             
             if not numeric_cols:
                 return self._build_response(
@@ -771,9 +809,9 @@ class EmbeddingsAnalysisAgent(BaseAgent):
             # Calcular medidas de DISPERSÃO
             variability_data = []
             for col in numeric_cols:
-                col_std = df[col].std()  # Desvio padrão
-                col_var = df[col].var()  # Variância
-                col_mean = df[col].mean()
+                col_std = stats.at[col, 'std']  # Desvio padrão
+                col_var = stats.at[col, 'var']  # Variância
+                col_mean = stats.at[col, 'mean']
                 col_cv = (col_std / col_mean) * 100 if col_mean != 0 else 0  # Coeficiente de Variação
                 
                 variability_data.append({
@@ -787,7 +825,7 @@ class EmbeddingsAnalysisAgent(BaseAgent):
             response = f"""📊 **Variabilidade dos Dados (Desvio Padrão e Variância)**
 
 **Fonte:** Dados reais extraídos da tabela embeddings (coluna chunk_text parseada)
-**Total de registros analisados:** {len(df):,}
+**Total de registros analisados:** {total_records:,}
 **Total de variáveis numéricas:** {len(numeric_cols)}
 
 """
@@ -807,14 +845,14 @@ class EmbeddingsAnalysisAgent(BaseAgent):
                 response += f"| {var_name} | {var_std:.6f} | {var_var:.6f} | {var_cv:.2f} |\n"
             
             response += f"\n✅ **Conformidade:** Dados obtidos exclusivamente da tabela embeddings\n"
-            response += f"✅ **Método:** Parsing de chunk_text + cálculo std() e var() com pandas\n"
+            response += f"✅ **Método:** {column_stats['method']}\n"
             response += f"\n**Interpretação:**\n"
             response += f"- **Desvio Padrão:** Mede a dispersão dos dados em relação à média\n"
             response += f"- **Variância:** Quadrado do desvio padrão (mesma medida, escala diferente)\n"
             response += f"- **Coef. Variação:** Percentual de dispersão relativa (útil para comparar variáveis)\n"
             
             return self._build_response(response, metadata={
-                'total_records': len(df),
+                'total_records': total_records,
                 'total_numeric_columns': len(numeric_cols),
                 'variability_data': variability_data,
                 'conformidade': 'embeddings_only',
@@ -852,19 +890,19 @@ class EmbeddingsAnalysisAgent(BaseAgent):
                     metadata={"error": True}
                 )
             
-            # Obter DataFrame real dos chunks (APENAS EMBEDDINGS - NUNCA CSV)
-            df = analyzer.get_data_from_embeddings(limit=None, parse_chunk_text=True)
+            # Estatísticas da ingestão ativa (APENAS EMBEDDINGS - NUNCA CSV)
+            column_stats = self._numeric_column_stats(analyzer)
             
-            if df is None or df.empty:
+            if column_stats is None:
                 return self._build_response(
                     "❌ Não foi possível obter dados dos embeddings para calcular medidas de tendência central",
                     metadata={"error": True}
                 )
             
-            self.logger.info(f"✅ DataFrame carregado: {len(df)} registros, {len(df.columns)} colunas")
-            
-            # Calcular medidas de tendência central para TODAS as colunas numéricas
-            numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+            # Medidas de tendência central para TODAS as colunas numéricas
+            stats = column_stats['stats']
+            total_records = column_stats['total_records']
+            numeric_cols = stats.index.tolist()
             
             if not numeric_cols:
                 return self._build_response(
@@ -875,12 +913,12 @@ class EmbeddingsAnalysisAgent(BaseAgent):
             # Calcular média, mediana e moda
             stats_data = []
             for col in numeric_cols:
-                col_mean = df[col].mean()
-                col_median = df[col].median()
+                col_mean = stats.at[col, 'mean']
+                col_median = stats.at[col, 'median']
                 
-                # Moda (pode ter múltiplas modas)
-                mode_values = df[col].mode()
-                col_mode = mode_values.iloc[0] if len(mode_values) > 0 else None
+                # Moda (primeira, quando há múltiplas modas)
+                col_mode = stats.at[col, 'mode']
+                col_mode = None if pd.isna(col_mode) else col_mode
                 
                 stats_data.append({
                     'variavel': col,
@@ -893,7 +931,7 @@ class EmbeddingsAnalysisAgent(BaseAgent):
             response = f"""📊 **Medidas de Tendência Central**
 
 **Fonte:** Dados reais extraídos da tabela embeddings (coluna chunk_text parseada)
-**Total de registros analisados:** {len(df):,}
+**Total de registros analisados:** {total_records:,}
 **Total de variáveis numéricas:** {len(numeric_cols)}
 
 **O que são Medidas de Tendência Central?**
@@ -931,10 +969,10 @@ As medidas de tendência central são estatísticas que descrevem o valor centra
             response += f"• Para distribuições simétricas, média e mediana têm valores próximos.\n"
             
             response += f"\n✅ **Conformidade:** Dados obtidos exclusivamente da tabela embeddings\n"
-            response += f"✅ **Método:** Parsing de chunk_text + análise com pandas\n"
+            response += f"✅ **Método:** {column_stats['method']}\n"
             
             return self._build_response(response, metadata={
-                'total_records': len(df),
+                'total_records': total_records,
                 'total_numeric_columns': len(numeric_cols),
                 'central_tendency': stats_data,
                 'conformidade': 'embeddings_only',
@@ -964,6 +1002,13 @@ As medidas de tendência central são estatísticas que descrevem o valor centra
             from src.tools.python_analyzer import PythonDataAnalyzer
             analyzer = PythonDataAnalyzer()
             
+            # Matriz pré-calculada na ingestão (perfil do dataset)
+            profile = analyzer.get_dataset_profile()
+            corr_matrix = profile.correlation_frame() if profile is not None else None
+            if corr_matrix is not None:
+                total_numeric = profile.correlation.get('total_numeric', len(corr_matrix.columns))
+                return self._format_correlation_response(corr_matrix, total_numeric=total_numeric)
+            
             # Parsing dos chunks para DataFrame
             # Primeiro, tentar reconstruir dados via Supabase embeddings (método público recomendado)
             df = analyzer.reconstruct_original_data()
@@ -992,33 +1037,7 @@ As medidas de tendência central são estatísticas que descrevem o valor centra
             
             # Calcular matriz de correlação
             corr_matrix = df[numeric_cols].corr()
-            
-            response = f"## 🔗 Matriz de Correlação\n\n"
-            response += f"**Total de variáveis analisadas:** {len(numeric_cols)}\n\n"
-            
-            # Formatar matriz
-            response += "| Variáveis |"
-            for col in numeric_cols[:10]:  # Limitar para não ficar muito grande
-                response += f" {col} |"
-            response += "\n|"
-            response += "---|" * (len(numeric_cols[:10]) + 1)
-            response += "\n"
-            
-            for idx in numeric_cols[:10]:
-                response += f"| {idx} |"
-                for col in numeric_cols[:10]:
-                    corr_val = corr_matrix.loc[idx, col]
-                    response += f" {corr_val:.3f} |"
-                response += "\n"
-            
-            response += f"\n✅ **Conformidade:** Dados obtidos exclusivamente da tabela embeddings\n"
-            
-            return self._build_response(response, metadata={
-                'total_variables': len(numeric_cols),
-                'correlation_matrix': corr_matrix.to_dict(),
-                'conformidade': 'embeddings_only',
-                'query_type': 'correlation'
-            })
+            return self._format_correlation_response(corr_matrix)
             
         except Exception as e:
             self.logger.error(f"❌ Erro ao calcular correlação: {str(e)}")
@@ -1027,6 +1046,49 @@ As medidas de tendência central são estatísticas que descrevem o valor centra
                 metadata={"error": True}
             )
     
+    def _format_correlation_response(self, corr_matrix: pd.DataFrame,
+                                     total_numeric: Optional[int] = None) -> Dict[str, Any]:
+        """Formata a matriz de correlação (tabela limitada às 10 primeiras variáveis).
+
+        ``total_numeric`` é o número de colunas numéricas do dataset quando a matriz
+        pré-calculada cobre só parte delas; a resposta informa o corte.
+        """
+        numeric_cols = corr_matrix.columns.tolist()
+        total_numeric = max(total_numeric or 0, len(numeric_cols))
+        truncated = total_numeric > len(numeric_cols)
+        
+        response = f"## 🔗 Matriz de Correlação\n\n"
+        response += f"**Total de variáveis analisadas:** {len(numeric_cols)}\n\n"
+        if truncated:
+            response += (f"⚠️ **Matriz parcial:** o dataset tem {total_numeric} variáveis numéricas; "
+                         f"a matriz cobre as {len(numeric_cols)} de maior variância.\n\n")
+        
+        # Formatar matriz
+        response += "| Variáveis |"
+        for col in numeric_cols[:10]:  # Limitar para não ficar muito grande
+            response += f" {col} |"
+        response += "\n|"
+        response += "---|" * (len(numeric_cols[:10]) + 1)
+        response += "\n"
+        
+        for idx in numeric_cols[:10]:
+            response += f"| {idx} |"
+            for col in numeric_cols[:10]:
+                corr_val = corr_matrix.loc[idx, col]
+                response += f" {corr_val:.3f} |"
+            response += "\n"
+        
+        response += f"\n✅ **Conformidade:** Dados obtidos exclusivamente da tabela embeddings\n"
+        
+        return self._build_response(response, metadata={
+            'total_variables': len(numeric_cols),
+            'total_numeric_variables': total_numeric,
+            'correlation_truncated': truncated,
+            'correlation_matrix': corr_matrix.to_dict(),
+            'conformidade': 'embeddings_only',
+            'query_type': 'correlation'
+        })
+    
     def _handle_distribution_query_from_embeddings(self, query: str, context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Processa consultas sobre distribuição de dados usando embeddings.
         
@@ -18,6 +18,18 @@ def atomic_ingestion_and_query(csv_path, supabase, vector_store):
         logger.info(f"[Atomicidade] Deleção de registros antigos concluída. Total removido (estimado): {deleted}")
     except Exception as del_err:
         logger.warning(f"[Atomicidade] Falha ao remover embeddings anteriores via delete_except_ingestion: {del_err}")
+    # 2.6 Publicar snapshot do dataset (Parquet + memória) e invalidar os anteriores
+    df = None
+    try:
+        from src.data.dataset_snapshot import get_dataset_snapshot_service
+        df = pd.read_csv(csv_path, low_memory=False)
+        get_dataset_snapshot_service().publish(ingestion_id, df=df, csv_path=csv_path)
+    except Exception as snap_err:
+        logger.warning(f"[Atomicidade] Falha ao publicar snapshot do dataset: {snap_err}")
+    # 2.7 Perfil do dataset (tipos, momentos, quantis, top-k, correlação) calculado uma única vez
+    if df is not None and DATASET_PROFILE_ENABLED:
+        from src.data.dataset_profile import profile_ingestion
+        profile_ingestion(df, ingestion_id, source=os.path.basename(str(csv_path)))
     # 3. Refresh memória/cache
     vector_store.refresh_embeddings(ingestion_id)
     logger.info(f"[Atomicidade] Memória/cache atualizada para ingestion_id={ingestion_id}")
@@ -73,6 +85,8 @@ import numpy as np
 import logging
 import warnings
 from datetime import datetime
+import os
+from src.settings import DATASET_PROFILE_ENABLED
 
 logger = logging.getLogger("eda.data_ingestor")
 
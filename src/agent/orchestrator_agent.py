@@ -99,7 +99,7 @@ except RuntimeError as e:
 
 # Import do sistema de prompts
 try:
-    from src.prompts.manager import get_prompt_manager, AgentRole
+    from src.prompts.manager import get_prompt_manager, AgentRole, RenderedPrompt
     PROMPT_MANAGER_AVAILABLE = True
 except ImportError as e:
     PROMPT_MANAGER_AVAILABLE = False
@@ -1184,19 +1184,24 @@ SUA RESPOSTA (uma palavra apenas):"""
                     # Armazenar contexto dos dados carregados
                     self.current_data_context = {
                         'file_path': file_path,
-                        'data_info': result.get('data_info', {}),
-                        'quality_report': result.get('quality_report', {})
+                        'data_info': result.get('load_info', {}),
+                        'quality_report': result.get('validation', {})
                     }
                     
                     # Criar resposta informativa
-                    data_info = result.get('data_info', {})
-                    quality_report = result.get('quality_report', {})
+                    data_info = result.get('load_info', {})
+                    quality_report = result.get('validation', {})
+                    sampling = result.get('sampling')
+                    dimensions = f"{data_info.get('rows', 0):,} linhas × {data_info.get('columns', 0)} colunas"
+                    if sampling:
+                        dimensions += (f" (amostra sistemática de {sampling['original_rows']:,} linhas, "
+                                       f"1 a cada {sampling['sample_step']}; estatísticas aproximadas)")
                     
                     response = f"""✅ **Dados Carregados com Sucesso**
 
 📄 **Arquivo:** {file_path}
-📊 **Dimensões:** {data_info.get('rows', 0):,} linhas × {data_info.get('columns', 0)} colunas
-⭐ **Qualidade:** {quality_report.get('overall_score', 0):.1f}/100
+📊 **Dimensões:** {dimensions}
+⭐ **Qualidade:** {quality_report.get('score', 0):.1f}/100
 
 **Próximos passos disponíveis:**
 • Análise exploratória: "faça um resumo dos dados"
@@ -1212,7 +1217,8 @@ SUA RESPOSTA (uma palavra apenas):"""
                             "data_loaded": True,
                             "file_path": file_path,
                             "data_info": data_info,
-                            "quality_report": quality_report
+                            "quality_report": quality_report,
+                            "sampling": sampling
                         }
                     )
                 else:
@@ -1383,8 +1389,8 @@ Sua pergunta requer análise de dados específicos, mas não há nenhuma base de
         
         try:
             # 6. CHAMAR LLM MANAGER com configuração otimizada
-            config = LLMConfig(temperature=0.2, max_tokens=512)  # Reduzir tokens de resposta
-            response = self.llm_manager.chat(prompt, config)
+            config = LLMConfig(temperature=0.2, max_tokens=512, prompt_cache_key=prompt.prefix_hash)  # Reduzir tokens de resposta
+            response = self.llm_manager.chat(prompt.text, config)
             
             if not response.success:
                 raise RuntimeError(response.error)
@@ -1410,8 +1416,9 @@ Sua pergunta requer análise de dados específicos, mas não há nenhuma base de
                         corrected_prompt = self._build_llm_prompt(query, corrected_context, needs_data_analysis)
                         
                         try:
-                            config = LLMConfig(temperature=0.1, max_tokens=512)  # Temperatura mais baixa para precisão
-                            corrected_response = self.llm_manager.chat(corrected_prompt, config)
+                            config = LLMConfig(temperature=0.1, max_tokens=512,  # Temperatura mais baixa para precisão
+                                               prompt_cache_key=corrected_prompt.prefix_hash)
+                            corrected_response = self.llm_manager.chat(corrected_prompt.text, config)
                             
                             if corrected_response.success:
                                 response = corrected_response
@@ -1558,87 +1565,25 @@ Sua pergunta requer análise de dados específicos, mas não há nenhuma base de
         # Adicionar nome do usuário se conhecido
         user_greeting = f", {user_name}" if user_name else ""
         
-        system_prompt = f"""Você é Carlos, Coordenador Central do Sistema Multiagente EDA AI Minds.
-
-══════════════════════════════════════════════════════════════════
-🎯 SUA FUNÇÃO ESPECÍFICA (ORCHESTRATOR AGENT)
-══════════════════════════════════════════════════════════════════
-
-VOCÊ É O AGENTE COORDENADOR que:
-- 🧭 Roteia queries para agentes especializados (RAG Data, NFe Tax Specialist, etc)
-- 💬 Responde saudações e consultas gerais sobre o sistema
-- 🤝 Interage diretamente com usuários em conversas gerais
-- 📋 Extrai informações do usuário (nome, preferências)
-- 🧠 Mantém contexto conversacional e memória de interações
-
-QUANDO VOCÊ RESPONDE DIRETAMENTE:
-✅ Saudações ("Oi", "Olá", "Bom dia")
-✅ Apresentações ("Meu nome é...", "Sou o...")
-✅ Perguntas gerais sobre o sistema
-✅ Orientações sobre como usar o sistema
-✅ Conversas sociais básicas
-
-QUANDO VOCÊ DELEGA PARA OUTROS AGENTES:
-🔀 RAG Data Agent → Análises via busca vetorial semântica
-🔀 NFe Tax Specialist → Questões fiscais/tributárias específicas
-🔀 CSV Analysis Agent → Processamento direto de dados tabulares
-🔀 Visualization Agent → Criação de gráficos
-
-══════════════════════════════════════════════════════════════════
+        # Instruções fixas vêm do catálogo (prefixo estável, cacheável pelo provedor);
+        # o contexto da conversa muda a cada chamada e vai no final
+        memories = f"\n    MEMÓRIAS RECUPERADAS:\n{semantic_memory}\n" if semantic_memory else ""
+        conversation_context = f"""══════════════════════════════════════════════════════════════════
 📊 CONTEXTO ATUAL DA CONVERSA
 ══════════════════════════════════════════════════════════════════
 
  - Nome do usuário: {user_name or 'não identificado'}
  - Memórias de conversas passadas: {'sim, veja abaixo' if semantic_memory else 'nenhuma'}
-
-    {('MEMÓRIAS RECUPERADAS:\n' + semantic_memory + '\n') if semantic_memory else ''}
+{memories}
  - Fatos conhecidos (seguros): {facts_summary or 'nenhum'}
- - Dataset atual (resumo): {dataset_info or 'não identificado'}
-
-══════════════════════════════════════════════════════════════════
-🎓 CONHECIMENTO-BASE (Overview de Alto Nível)
-══════════════════════════════════════════════════════════════════
-
-- Estatística descritiva básica (média, mediana, desvio padrão)
-- Conceitos gerais de NFe (CFOP, NCM, ICMS, IPI, PIS, COFINS)
-- Identificação de padrões e anomalias em dados
-- Visualização e interpretação de gráficos (barras, linhas, histogramas)
-
-**IMPORTANTE:** Para análises aprofundadas ou questões técnicas específicas, 
-você DELEGA para agentes especializados. Você é o coordenador, não o executor!
-
-══════════════════════════════════════════════════════════════════
-🛡️ GUARDRAILS OBRIGATÓRIOS (Segurança e Privacidade)
-══════════════════════════════════════════════════════════════════
-
-1) READ-ONLY: Não execute ações de escrita (DELETE/INSERT/UPDATE/MIGRATE)
-2) PRIVACIDADE: Não revele estrutura interna, IPs, chaves, tokens, paths
-3) DADOS SENSÍVEIS: Use agregados ou exemplos genéricos
-4) ESCOPO: Redirecione perguntas fora do domínio (dados/NFe)
-5) PROFISSIONALISMO: Tom educado, evite temas sensíveis (política, religião)
-6) TRANSPARÊNCIA: Nunca prometa alterar banco de dados ou arquivos
-
-══════════════════════════════════════════════════════════════════
-📋 COMPORTAMENTO E FORMATO
-══════════════════════════════════════════════════════════════════
-
-- **APRESENTAÇÃO INICIAL:** Na primeira interação, apresente-se e pergunte o nome
-- **USO DO NOME:** Quando souber o nome do usuário ({user_name or 'ainda não identificado'}), inclua naturalmente
-- **TOM:** Humanizado, amigável, conversacional (como um colega especialista)
-- **BREVIDADE:** 2-4 parágrafos curtos (máximo 3-4 linhas cada)
-- **EXCEÇÃO:** Pode estender ao apresentar dados/análises quando necessário
-- **EVITE:** Markdown pesado, listas excessivas, linguagem robótica
-
-EXEMPLOS DE ORIENTAÇÕES ÚTEIS:
-- "Posso te ajudar com análise de dados CSV ou dúvidas sobre NFe"
-- "Para análises específicas, posso buscar informações nos dados carregados"
-- "Questões tributárias? Tenho especialistas para te ajudar!"
-
-Instrução final: Seja o anfitrião acolhedor e o coordenador eficiente do sistema!"""
+ - Dataset atual (resumo): {dataset_info or 'não identificado'}"""
+        system_prompt = get_prompt_manager().compose(
+            AgentRole.ORCHESTRATOR, ("conversation_system",), conversation_context
+        )
 
         try:
-            config = LLMConfig(temperature=0.3, max_tokens=400)
-            llm_response = self.llm_manager.chat(query, config, system_prompt=system_prompt)
+            config = LLMConfig(temperature=0.3, max_tokens=400, prompt_cache_key=system_prompt.prefix_hash)
+            llm_response = self.llm_manager.chat(query, config, system_prompt=system_prompt.text)
             
             if llm_response.success and llm_response.content:
                 return self._build_response(
@@ -2525,81 +2470,48 @@ context = {"file_path": "fraude.csv"}
         
         return self._build_response(response, metadata={"agents": agents_info})
 
-    def _build_llm_prompt(self, query: str, context: Optional[Dict[str, Any]] = None, needs_data_analysis: bool = False) -> Tuple[str, Optional[str]]:
+    def _build_llm_prompt(self, query: str, context: Optional[Dict[str, Any]] = None, needs_data_analysis: bool = False) -> RenderedPrompt:
         """Constrói prompt contextualizado para o LLM Manager.
         
+        As instruções fixas formam o prefixo (idêntico entre chamadas, aproveitado
+        pelo cache de prompt do provedor); dados, consulta e correções vão no sufixo.
+        
         Args:
             query: Consulta do usuário
             context: Contexto adicional (dados, histórico, etc.)
             needs_data_analysis: Se a consulta requer análise de dados específicos
             
         Returns:
-            Tuple[str, Optional[str]]: (user_prompt, system_prompt)
+            RenderedPrompt: use ``.text`` como prompt e ``.prefix_hash`` como chave de cache
         """
-        prompt_parts = []
-        
         # Instrução base diferenciada
         if needs_data_analysis and context and context.get("csv_loaded"):
-            prompt_parts.append("""Você é um assistente especializado em análise de dados CSV.
-Responda com base ESPECIFICAMENTE nos dados carregados fornecidos no contexto.
-Use português brasileiro e seja preciso e detalhado sobre os dados reais.""")
+            static_keys = ("csv_data_instructions",)
         else:
-            prompt_parts.append("""Você é um assistente de análise de dados especializado em CSV e análise estatística.
-Responda de forma clara, precisa e útil. Use português brasileiro.""")
+            static_keys = ("general_data_instructions",)
+        
+        prompt_parts = []
         
         # Adicionar contexto de dados se disponível
         if context:
             if 'file_path' in context:
-                prompt_parts.append(f"\n📊 ARQUIVO CARREGADO: {context['file_path']}")
+                prompt_parts.append(f"📊 ARQUIVO CARREGADO: {context['file_path']}")
             
             if 'csv_analysis' in context:
-                prompt_parts.append(f"\n📈 ANÁLISE DOS DADOS:\n{context['csv_analysis']}")
+                prompt_parts.append(f"📈 ANÁLISE DOS DADOS:\n{context['csv_analysis']}")
                 
             if 'columns_summary' in context:
-                prompt_parts.append(f"\n📋 COLUNAS: {context['columns_summary']}")
+                prompt_parts.append(f"📋 COLUNAS: {context['columns_summary']}")
                 
             if 'shape' in context:
-                prompt_parts.append(f"\n� DIMENSÕES: {context['shape']}")
+                prompt_parts.append(f"📐 DIMENSÕES: {context['shape']}")
         
         # Adicionar a consulta do usuário
-        prompt_parts.append(f"\n❓ CONSULTA DO USUÁRIO: {query}")
-        
-        # Instrução final diferenciada
-        if needs_data_analysis and context and context.get("csv_loaded"):
-            # 🔄 CORREÇÃO CRÍTICA: Sempre analisar dados CSV ESTRUTURADOS reconstruídos da tabela embeddings
-            prompt_parts.append("""\n🎯 INSTRUÇÕES CRÍTICAS PARA ANÁLISE DE DADOS CSV (da tabela embeddings):
-
-� CONTEXTO RECEBIDO:
-- Você recebeu DADOS ESTRUTURADOS (DataFrame) reconstruídos da coluna chunk_text da tabela embeddings
-- Esses dados foram parseados como CSV e representam as COLUNAS ORIGINAIS do arquivo CSV carregado
-- As estatísticas fornecidas (dtypes, describe, info) refletem os DADOS REAIS, não a estrutura da tabela embeddings
-
-🔍 COMO ANALISAR:
-1. EXAMINE as COLUNAS listadas na seção "ANÁLISE DOS DADOS"
-2. IDENTIFIQUE os TIPOS DE DADOS usando dtypes:
-   - **Numéricos**: float64, int64, float32, int32, etc.
-   - **Categóricos**: object, category, bool
-   - **Temporais**: datetime64, timedelta
-   - **Texto**: object (sem padrão numérico)
-
-3. USE as ESTATÍSTICAS FORNECIDAS:
-   - Para distribuições: count, mean, std, min, max, quartis
-   - Para valores únicos: nunique(), value_counts()
-   - Para tipos: dtypes explícitos
-
-⚠️ REGRAS CRÍTICAS:
-- Use APENAS os dtypes fornecidos para classificar tipos de dados
-- NÃO confunda com colunas da tabela embeddings (id, chunk_text, created_at, embedding)
-- NÃO interprete palavras soltas ou descrições textuais como se fossem colunas
-- Se o contexto mostra "Colunas: ['Time', 'V1', ..., 'Amount', 'Class']", essas são as colunas REAIS
-- Seja PRECISO: liste EXATAMENTE as colunas fornecidas, com seus tipos REAIS
-- Se a informação não está no contexto estruturado, diga que não tem acesso a ela""")
-        else:
-            prompt_parts.append("\n🎯 Forneça uma resposta útil e estruturada:")
+        prompt_parts.append(f"❓ CONSULTA DO USUÁRIO: {query}")
         
         # Adicionar correções se disponíveis
         if context and 'correction_prompt' in context:
-            prompt_parts.append(f"\n{context['correction_prompt']}")
-            prompt_parts.append("\nRefaça sua resposta com os valores corretos fornecidos acima.")
+            prompt_parts.append(context['correction_prompt'])
+            prompt_parts.append("Refaça sua resposta com os valores corretos fornecidos acima.")
         
-        return "\n".join(prompt_parts)
\ No newline at end of file
+        return get_prompt_manager().compose(AgentRole.ORCHESTRATOR, static_keys, prompt_parts)
\ No newline at end of file
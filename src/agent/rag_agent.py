@@ -22,6 +22,7 @@ from src.embeddings.chunker import TextChunker, ChunkStrategy, TextChunk
 from src.embeddings.generator import EmbeddingGenerator, EmbeddingProvider
 from src.embeddings.vector_store import VectorStore, VectorSearchResult
 from src.api.sonar_client import send_sonar_query
+from src.settings import DATASET_PROFILE_ENABLED
 
 
 class RAGAgent(BaseAgent):
@@ -212,9 +213,32 @@ class RAGAgent(BaseAgent):
                         self.logger.warning("⚠️ Falha ao gerar embeddings para chunks de metadados")
             except Exception as e:
                 self.logger.warning(f"⚠️ Falha ao gerar chunks de metadados: {e}")
+            self._publish_dataset_snapshot(csv_text, source_id)
         
         return result
 
+    def _publish_dataset_snapshot(self, csv_text: str, source_id: str) -> None:
+        """Publica o snapshot e o perfil do dataset recém-ingerido para os handlers de análise.
+
+        A chave é a mesma que os agentes de resposta resolvem a partir do último
+        chunk gravado, então a próxima pergunta usa este DataFrame (ou o
+        Parquet) em vez de reconstruí-lo a partir dos chunks.
+        """
+        try:
+            from src.data.dataset_snapshot import get_dataset_snapshot_service, resolve_snapshot_key
+            key = resolve_snapshot_key(self.vector_store.supabase)
+            if key is None:
+                return
+            df = pd.read_csv(io.StringIO(csv_text), low_memory=False)
+            get_dataset_snapshot_service().publish(key, df=df, name=Path(source_id).stem)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Falha ao publicar snapshot do dataset: {e}")
+            return
+        if DATASET_PROFILE_ENABLED:
+            # Perfil completo sob a mesma chave: handlers respondem sem reprocessar os dados
+            from src.data.dataset_profile import profile_ingestion
+            profile_ingestion(df, key, source=Path(source_id).name)
+
     def _enrich_csv_chunks_light(self, chunks: List[TextChunk]) -> List[TextChunk]:
         """VERSÃO BALANCEADA - Enriquecimento leve que mantém precisão sem comprometer velocidade."""
         enriched_chunks: List[TextChunk] = []
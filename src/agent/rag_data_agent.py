@@ -61,6 +61,7 @@ from src.embeddings.generator import EmbeddingGenerator
 from src.utils.logging_config import get_logger
 from src.analysis.intent_classifier import IntentClassifier, AnalysisIntent
 from src.analysis.orchestrator import AnalysisOrchestrator
+from src.data.csv_frame_cache import file_fingerprint, get_csv_frame_cache
 
 # Imports LangChain
 try:
@@ -70,7 +71,6 @@ try:
     from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
     from langchain.chains import ConversationChain
     from langchain.memory import ConversationBufferMemory
-    from langchain_experimental.tools import PythonREPLTool
     LANGCHAIN_AVAILABLE = True
 except ImportError as e:
     LANGCHAIN_AVAILABLE = False
@@ -79,7 +79,6 @@ except ImportError as e:
     HumanMessage = None
     SystemMessage = None
     AIMessage = None
-    PythonREPLTool = None
     print(f"⚠️ LangChain não disponível: {e}")
 
 
@@ -410,6 +409,9 @@ LEMBRE-SE: Você sintetiza análises PRÉ-PROCESSADAS armazenadas em embeddings.
                     results_summary.append(f"**{analyzer_name.title()}**: Análise executada com sucesso")
                 elif isinstance(result, dict) and 'error' in result:
                     results_summary.append(f"**{analyzer_name.title()}**: Erro - {result['error']}")
+            sampling_note = orchestration_result.get('metadata', {}).get('sampling_note')
+            if sampling_note:
+                results_summary.append(f"{sampling_note} Informe isso ao usuário.")
             
             user_prompt = f"""
 **Pergunta do Usuário:**
@@ -521,10 +523,14 @@ Responda de forma clara e estruturada.
         except Exception as e:
             return f"Erro ao processar análise: {str(e)}"
 
-    def _executar_instrucao(self, df, instrucao):
+    def _executar_instrucao(self, df, instrucao, dataset=None):
         """
         Executa uma instrução analítica sobre o DataFrame.
         Suporta métricas nativas pandas/NumPy e delega compostas à LLM.
+        
+        O código gerado pela LLM roda no sandbox (src/tools/python_sandbox.py);
+        com ``dataset`` (``dataset_ref('csv', caminho)``) o processo do sandbox usa
+        o DataFrame que já mantém carregado em vez de receber uma cópia de ``df``.
         """
         acao = instrucao.get('acao','')
         colunas = instrucao.get('colunas', list(df.columns))
@@ -551,11 +557,9 @@ Responda de forma clara e estruturada.
             if acao_norm in ('estatísticas gerais', 'estatisticas gerais', 'describe', 'summary', 'resumo'):
                 return df[colunas].describe().T
             # Métricas compostas ou extraordinárias: delega à LLM com execução SEGURA
-            if self.llm and PythonREPLTool:
+            if self.llm:
+                code = None
                 try:
-                    # 🔒 SEGURANÇA: Usar PythonREPLTool com sandbox isolado
-                    python_repl = PythonREPLTool()
-                    
                     prompt = (
                         f"Receba instrução analítica: {instrucao}.\n"
                         f"DataFrame já está disponível como variável 'df'.\n"
@@ -578,26 +582,26 @@ Responda de forma clara e estruturada.
                         code = code.split("```")[1].split("```")[0].strip()
                     
                     # Log código antes de executar (auditoria)
-                    self.logger.info(f"🔒 Executando código seguro via PythonREPLTool:\n{code[:200]}...")
-                    
-                    # Preparar contexto com DataFrame
-                    import pandas as pd
-                    import numpy as np
-                    globals_context = {'df': df, 'pd': pd, 'np': np}
+                    self.logger.info(f"🔒 Executando código no sandbox:\n{code[:200]}...")
                     
-                    # 🔒 Execução segura via PythonREPLTool (sandbox isolado)
-                    # Nota: PythonREPLTool executa em ambiente isolado sem acesso ao filesystem
-                    resultado = python_repl.run(code, globals=globals_context)
+                    # 🔒 Processo separado com limites de CPU, memória e tempo (isola recursos, não permissões)
+                    from src.tools.python_sandbox import run_python
+                    execucao = run_python(code, dataset=dataset, frame=None if dataset else df,
+                                          result_var='resultado')
+                    if not execucao.success:
+                        self.logger.error(f"❌ Erro ao executar código no sandbox: {execucao.error}")
+                        self.logger.debug(f"Código problemático: {code}")
+                        return None
                     
-                    self.logger.info(f"✅ Código executado com sucesso via PythonREPLTool")
-                    return resultado
+                    self.logger.info(f"✅ Código executado no sandbox em {execucao.execution_time:.3f}s")
+                    return execucao.result if execucao.result is not None else execucao.output
                     
                 except Exception as e:
-                    self.logger.error(f"❌ Erro ao executar código via PythonREPLTool: {e}")
+                    self.logger.error(f"❌ Erro ao executar código no sandbox: {e}")
                     self.logger.debug(f"Código problemático: {code}")
                     return None
             else:
-                self.logger.warning("LLM ou PythonREPLTool não disponível para métricas compostas")
+                self.logger.warning("LLM não disponível para métricas compostas")
                 return None
         except Exception as e:
             self.logger.warning(f"Falha ao executar instrução: {instrucao} | Erro: {e}")
@@ -632,17 +636,8 @@ Responda de forma clara e estruturada.
         from src.analysis.temporal_detection import TemporalColumnDetector, TemporalDetectionConfig
         from src.analysis.temporal_analyzer import TemporalAnalyzer
         
-        # Carregar dados com encoding apropriado (NFe CSV em latin-1)
-        try:
-            df = pd.read_csv(csv_path, encoding='utf-8')
-        except UnicodeDecodeError:
-            try:
-                df = pd.read_csv(csv_path, encoding='latin-1')
-            except Exception as e:
-                try:
-                    df = pd.read_csv(csv_path, encoding='cp1252')
-                except Exception as final_error:
-                    raise ValueError(f"Não foi possível ler o CSV com nenhum encoding (utf-8, latin-1, cp1252): {final_error}")
+        # Carregar dados via cache (encoding detectado uma vez; NFe CSV em latin-1)
+        df = get_csv_frame_cache().load(csv_path)
         
         logger = self.logger if hasattr(self, 'logger') else logging.getLogger(__name__)
         logger.info({
@@ -664,8 +659,12 @@ Responda de forma clara e estruturada.
         detector = TemporalColumnDetector(config=detection_config)
         
         try:
-            detection_results = detector.detect(df, override_column=override_temporal_col)
+            # Identidade do arquivo como chave: reperguntas sobre o mesmo CSV reutilizam a detecção
+            detection_results = detector.detect(
+                df, override_column=override_temporal_col, fingerprint=file_fingerprint(csv_path)
+            )
             temporal_cols = detector.get_detected_columns(detection_results)
+            detected = {r.column_name: r for r in detection_results if r.detected}
             detection_summary = detector.get_detection_summary(detection_results)
             
             logger.info({
@@ -677,7 +676,7 @@ Responda de forma clara e estruturada.
             })
         except Exception as e:
             logger.error(f"Erro na detecção de colunas temporais: {e}", exc_info=True)
-            temporal_cols = []
+            temporal_cols, detected = [], {}
         
         # ═══════════════════════════════════════════════════════════════
         # ETAPA 2: ANÁLISE TEMPORAL (se colunas detectadas)
@@ -691,6 +690,9 @@ Responda de forma clara e estruturada.
             
             for col in temporal_cols:
                 try:
+                    # Texto convertido numa passada com o formato detectado na amostra
+                    df[col] = detector.parse_column(df[col], detected.get(col))
+                    
                     # Executar análise temporal avançada
                     result = analyzer.analyze(df, col, enable_advanced=True)
                     
@@ -736,9 +738,11 @@ Responda de forma clara e estruturada.
         instrucoes = self._interpretar_pergunta_llm(pergunta, df)
         
         # Executar instruções e consolidar resultados
+        from src.tools.python_sandbox import dataset_ref
+        dataset = dataset_ref('csv', csv_path)
         resultados = []
         for instrucao in instrucoes:
-            resultado = self._executar_instrucao(df, instrucao)
+            resultado = self._executar_instrucao(df, instrucao, dataset=dataset)
             if resultado is not None:
                 justificativa = instrucao.get('justificativa', '')
                 if hasattr(resultado, 'to_markdown'):
@@ -1206,7 +1210,9 @@ Responda de forma clara e estruturada.
                                 "cost_saved_estimate_usd": 50.0
                             }
                         )
-                        viz_df = pd.read_csv(csv_path)
+                        # Frame inteiro: os gráficos usam colunas que a pergunta não cita
+                        # (ex.: "Class" para agrupar histogramas); em memória ele já é compartilhado
+                        viz_df = get_csv_frame_cache().load(csv_path)
                         self.logger.info(
                             f"✅ CSV carregado para visualização: {viz_df.shape[0]:,} linhas × {viz_df.shape[1]} colunas | "
                             f"Tamanho: {csv_size_mb:.2f} MB"
@@ -1497,7 +1503,7 @@ IMPORTANTE: Você está acessando MEMÓRIA CONVERSACIONAL, não dados analítico
                         csv_path = memory_context['csv_data'].get('path')
                         if csv_path:
                             try:
-                                df = pd.read_csv(csv_path)
+                                df = get_csv_frame_cache().load(csv_path)
                                 self.logger.info(f"📊 DataFrame carregado: {df.shape}")
                             except Exception as e:
                                 self.logger.error(f"Erro ao carregar CSV: {e}")
@@ -5,11 +5,12 @@ Fornece detecção inteligente de colunas temporais e análises estatísticas/te
 """
 
 from .temporal_detection import TemporalColumnDetector, TemporalDetectionConfig
-from .temporal_analyzer import TemporalAnalyzer, TemporalAnalysisResult
+from .temporal_analyzer import TemporalAnalyzer, TemporalAnalysisResult, MultiSeriesTemporalResult
 
 __all__ = [
     'TemporalColumnDetector',
     'TemporalDetectionConfig',
     'TemporalAnalyzer',
     'TemporalAnalysisResult',
+    'MultiSeriesTemporalResult',
 ]
@@ -4,19 +4,50 @@ Análise de Clustering Modular - Agrupamentos e Segmentação
 Módulo especializado em análise de clustering, detecção de
 agrupamentos naturais nos dados.
 
+Datasets grandes (acima de ``large_dataset_rows``) usam um caminho
+escalável: MiniBatchKMeans com partial_fit em blocos, hierárquico/DBSCAN
+ajustados numa amostra estratificada com rótulos propagados ao restante,
+silhouette estimado em amostras com intervalo de confiança e seleção de k
+paralela.
+
 Autor: EDA AI Minds Team
 Data: 2025-10-16
 Versão: 3.0.0
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence, Tuple
 import pandas as pd
 import numpy as np
 import logging
 from datetime import datetime
 
 
+def _nearest_center(X: np.ndarray, centers: np.ndarray, block_rows: int = 65_536) -> np.ndarray:
+    """Índice do centro mais próximo de cada ponto, calculado em blocos."""
+    from sklearn.metrics import pairwise_distances_argmin
+    
+    return np.concatenate([
+        pairwise_distances_argmin(X[start:start + block_rows], centers)
+        for start in range(0, len(X), block_rows)
+    ])
+
+
+def _evaluate_k(X: np.ndarray, k: int, random_state: int, silhouette_sample: int) -> Dict[str, float]:
+    """Ajusta KMeans com k clusters e retorna inércia e silhouette (amostral)."""
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.metrics import silhouette_score
+    
+    model = MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=3, batch_size=4096)
+    labels = model.fit_predict(X)
+    silhouette = float('nan')
+    if len(set(labels)) > 1:
+        silhouette = float(silhouette_score(
+            X, labels, sample_size=min(silhouette_sample, len(X)), random_state=random_state
+        ))
+    return {'k': k, 'inertia': float(model.inertia_), 'silhouette': silhouette}
+
+
 @dataclass
 class ClusteringAnalysisResult:
     """
@@ -96,19 +127,43 @@ class ClusteringAnalyzer:
         >>> print(result.to_markdown())
     """
     
-    def __init__(self, logger: Optional[logging.Logger] = None):
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        large_dataset_rows: int = 50_000,
+        sample_size: int = 10_000,
+        silhouette_sample_size: int = 5_000,
+        silhouette_repeats: int = 5,
+        batch_size: int = 4096,
+        n_jobs: int = -1,
+        random_state: int = 42
+    ):
         """
         Inicializa analisador de clustering.
         
         Args:
             logger: Logger opcional
+            large_dataset_rows: A partir deste número de linhas usa o caminho escalável
+            sample_size: Tamanho da amostra estratificada (hierárquico/DBSCAN e seleção de k)
+            silhouette_sample_size: Pontos por amostra na estimativa do silhouette
+            silhouette_repeats: Amostras usadas no intervalo de confiança do silhouette
+            batch_size: Linhas por bloco do MiniBatchKMeans
+            n_jobs: Processos na seleção automática de k (-1 = todos os núcleos)
+            random_state: Semente para reprodutibilidade
         """
         self.logger = logger or logging.getLogger(__name__)
+        self.large_dataset_rows = large_dataset_rows
+        self.sample_size = sample_size
+        self.silhouette_sample_size = silhouette_sample_size
+        self.silhouette_repeats = silhouette_repeats
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+        self.random_state = random_state
     
     def analyze(
         self,
         df: pd.DataFrame,
-        n_clusters: int = 3,
+        n_clusters: Optional[int] = 3,
         method: str = 'kmeans',
         features: Optional[List[str]] = None,
         scale_features: bool = True
@@ -118,7 +173,7 @@ class ClusteringAnalyzer:
         
         Args:
             df: DataFrame a analisar
-            n_clusters: Número de clusters (para KMeans)
+            n_clusters: Número de clusters (KMeans/hierárquico); None = seleção automática
             method: Método de clustering ('kmeans', 'dbscan', 'hierarchical')
             features: Features específicas (None = todas numéricas)
             scale_features: Se deve escalar features antes do clustering
@@ -155,14 +210,20 @@ class ClusteringAnalyzer:
             else:
                 X_scaled = X.values
             
+            large = len(X_scaled) > self.large_dataset_rows
+            k_selection = None
+            if n_clusters is None and method.lower() != 'dbscan':
+                k_selection = self.select_n_clusters(X_scaled)
+                n_clusters = k_selection['best_k']
+            
             # Executar clustering
             if method.lower() == 'kmeans':
-                labels, centers = self._kmeans_clustering(X_scaled, n_clusters)
+                labels, centers, model_info = self._kmeans_clustering(X_scaled, n_clusters)
             elif method.lower() == 'dbscan':
-                labels, centers = self._dbscan_clustering(X_scaled)
+                labels, centers, model_info = self._dbscan_clustering(X_scaled)
                 n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
             elif method.lower() == 'hierarchical':
-                labels, centers = self._hierarchical_clustering(X_scaled, n_clusters)
+                labels, centers, model_info = self._hierarchical_clustering(X_scaled, n_clusters)
             else:
                 raise ValueError(f"Método desconhecido: {method}")
             
@@ -195,8 +256,12 @@ class ClusteringAnalyzer:
                 "total_features": len(features),
                 "total_points": len(X),
                 "scaled": scale_features,
+                "scalable_path": large,
+                **model_info,
                 "timestamp": datetime.now().isoformat()
             }
+            if k_selection is not None:
+                result.metadata["k_selection"] = k_selection
             
             self.logger.info(f"✅ Clustering concluído: {n_clusters} clusters identificados")
             
@@ -206,22 +271,141 @@ class ClusteringAnalyzer:
             self.logger.error(f"Erro na análise de clustering: {e}", exc_info=True)
             raise
     
+    def select_n_clusters(
+        self,
+        X: np.ndarray,
+        k_range: Sequence[int] = range(2, 11)
+    ) -> Dict[str, Any]:
+        """
+        Seleciona o número de clusters por silhouette (com cotovelo da inércia).
+        
+        Cada k é avaliado em paralelo (joblib) sobre uma amostra estratificada.
+        
+        Args:
+            X: Matriz de features (já escalada)
+            k_range: Valores de k avaliados
+            
+        Returns:
+            Dicionário com 'best_k', 'elbow_k' e as métricas de cada k
+        """
+        from joblib import Parallel, delayed
+        
+        sample = X[self._stratified_sample_indices(X)] if len(X) > self.sample_size else X
+        k_values = [k for k in k_range if 1 < k < len(sample)]
+        if not k_values:
+            raise ValueError("Dados insuficientes para selecionar o número de clusters")
+        
+        scores = Parallel(n_jobs=self.n_jobs)(
+            delayed(_evaluate_k)(sample, k, self.random_state, self.silhouette_sample_size)
+            for k in k_values
+        )
+        
+        valid = [s for s in scores if not np.isnan(s['silhouette'])]
+        best_k = max(valid, key=lambda s: s['silhouette'])['k'] if valid else k_values[0]
+        
+        # Cotovelo: maior distância à reta entre o primeiro e o último ponto da curva de inércia
+        inertia = np.array([s['inertia'] for s in scores])
+        elbow_k = k_values[0]
+        if len(k_values) > 2:
+            x = np.array(k_values, dtype=float)
+            x_n = (x - x[0]) / (x[-1] - x[0])
+            y_n = (inertia - inertia[-1]) / (inertia[0] - inertia[-1] or 1.0)
+            elbow_k = k_values[int(np.argmax(np.abs(1 - x_n - y_n)))]
+        
+        self.logger.info(f"Seleção de k: silhouette → {best_k}, cotovelo → {elbow_k}")
+        return {
+            'best_k': int(best_k),
+            'elbow_k': int(elbow_k),
+            'scores': scores,
+            'sample_points': len(sample)
+        }
+    
+    def _stratified_sample_indices(self, X: np.ndarray) -> np.ndarray:
+        """
+        Amostra estratificada por micro-clusters (coreset leve).
+        
+        Os pontos são particionados por um MiniBatchKMeans grosseiro; cada
+        estrato contribui proporcionalmente ao tamanho, com um mínimo que
+        preserva regiões pequenas (ex.: classes raras).
+        """
+        from sklearn.cluster import MiniBatchKMeans
+        
+        rng = np.random.default_rng(self.random_state)
+        n_strata = int(min(50, max(2, self.sample_size // 200)))
+        strata = MiniBatchKMeans(
+            n_clusters=n_strata, random_state=self.random_state, n_init=1, batch_size=self.batch_size
+        ).fit_predict(X)
+        
+        ids, counts = np.unique(strata, return_counts=True)
+        quota = np.maximum(np.round(counts / len(X) * self.sample_size), np.minimum(counts, 20)).astype(int)
+        indices = [
+            rng.choice(np.flatnonzero(strata == stratum), size=min(q, c), replace=False)
+            for stratum, q, c in zip(ids, quota, counts)
+        ]
+        return np.sort(np.concatenate(indices))
+    
     def _kmeans_clustering(self, X: np.ndarray, n_clusters: int):
-        """Executa KMeans clustering."""
-        from sklearn.cluster import KMeans
+        """Executa KMeans clustering (MiniBatchKMeans em blocos para datasets grandes)."""
+        from sklearn.cluster import KMeans, MiniBatchKMeans
         
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-        labels = kmeans.fit_predict(X)
-        centers = kmeans.cluster_centers_
+        if len(X) <= self.large_dataset_rows:
+            kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+            labels = kmeans.fit_predict(X)
+            return labels, kmeans.cluster_centers_, {'inertia': float(kmeans.inertia_)}
+        
+        # partial_fit em blocos embaralhados: memória por passo limitada ao bloco
+        rng = np.random.default_rng(self.random_state)
+        kmeans = MiniBatchKMeans(
+            n_clusters=n_clusters, random_state=self.random_state,
+            batch_size=self.batch_size, n_init=3
+        )
+        order = rng.permutation(len(X))
+        first_block = max(self.batch_size, 3 * n_clusters)
+        kmeans.partial_fit(X[order[:first_block]])
+        for _ in range(2):  # épocas
+            for start in range(0, len(X), self.batch_size):
+                kmeans.partial_fit(X[order[start:start + self.batch_size]])
+            order = rng.permutation(len(X))
         
-        return labels, centers
+        centers = kmeans.cluster_centers_
+        labels = _nearest_center(X, centers)
+        inertia = float(sum(
+            ((X[start:start + 65_536] - centers[labels[start:start + 65_536]]) ** 2).sum()
+            for start in range(0, len(X), 65_536)
+        ))
+        return labels, centers, {'inertia': inertia, 'algorithm': 'MiniBatchKMeans'}
     
     def _dbscan_clustering(self, X: np.ndarray):
-        """Executa DBSCAN clustering."""
+        """Executa DBSCAN clustering (numa amostra estratificada para datasets grandes)."""
         from sklearn.cluster import DBSCAN
         
-        dbscan = DBSCAN(eps=0.5, min_samples=5)
-        labels = dbscan.fit_predict(X)
+        eps, min_samples = 0.5, 5
+        if len(X) <= self.large_dataset_rows:
+            fit_X = X
+        else:
+            fit_X = X[self._stratified_sample_indices(X)]
+            # Mesma densidade mínima por volume que no dataset completo
+            min_samples = max(2, int(round(min_samples * len(fit_X) / len(X))))
+        
+        dbscan = DBSCAN(eps=eps, min_samples=min_samples)
+        fit_labels = dbscan.fit_predict(fit_X)
+        
+        model_info = {}
+        if fit_X is X:
+            labels = fit_labels
+        else:
+            # Propagação: rótulo do core point mais próximo dentro de eps; senão ruído
+            from sklearn.neighbors import NearestNeighbors
+            
+            labels = np.full(len(X), -1)
+            core = dbscan.core_sample_indices_
+            if len(core):
+                nn = NearestNeighbors(n_neighbors=1).fit(fit_X[core])
+                for start in range(0, len(X), 65_536):
+                    dist, idx = nn.kneighbors(X[start:start + 65_536])
+                    block_labels = fit_labels[core][idx[:, 0]]
+                    labels[start:start + 65_536] = np.where(dist[:, 0] <= eps, block_labels, -1)
+            model_info = {'fit_sample_points': len(fit_X), 'label_propagation': 'nearest_core_point'}
         
         # DBSCAN não tem centros pré-calculados
         # Calcular centros manualmente
@@ -233,23 +417,31 @@ class ClusteringAnalyzer:
                 center = cluster_points.mean(axis=0)
                 centers.append(center)
         
-        return labels, np.array(centers) if centers else None
+        return labels, (np.array(centers) if centers else None), model_info
     
     def _hierarchical_clustering(self, X: np.ndarray, n_clusters: int):
-        """Executa clustering hierárquico."""
+        """Executa clustering hierárquico (numa amostra estratificada para datasets grandes)."""
         from sklearn.cluster import AgglomerativeClustering
         
+        fit_X = X if len(X) <= self.large_dataset_rows else X[self._stratified_sample_indices(X)]
+        
         hierarchical = AgglomerativeClustering(n_clusters=n_clusters)
-        labels = hierarchical.fit_predict(X)
+        fit_labels = hierarchical.fit_predict(fit_X)
         
         # Calcular centros manualmente
         centers = []
         for label in range(n_clusters):
-            cluster_points = X[labels == label]
+            cluster_points = fit_X[fit_labels == label]
             center = cluster_points.mean(axis=0)
             centers.append(center)
+        centers = np.array(centers)
+        
+        if fit_X is X:
+            return fit_labels, centers, {}
         
-        return labels, np.array(centers)
+        # Demais pontos recebem o rótulo do centróide mais próximo
+        model_info = {'fit_sample_points': len(fit_X), 'label_propagation': 'nearest_centroid'}
+        return _nearest_center(X, centers), centers, model_info
     
     def _compute_cluster_stats(
         self,
@@ -283,7 +475,21 @@ class ClusteringAnalyzer:
             
             # Silhouette Score (quanto maior, melhor)
             if len(set(labels)) > 1:
-                metrics['silhouette_score'] = float(silhouette_score(X, labels))
+                if len(X) <= self.silhouette_sample_size:
+                    metrics['silhouette_score'] = float(silhouette_score(X, labels))
+                else:
+                    # O(n²): média de amostras independentes com IC de 95%
+                    estimates = np.array([
+                        silhouette_score(
+                            X, labels, sample_size=self.silhouette_sample_size,
+                            random_state=self.random_state + i
+                        )
+                        for i in range(self.silhouette_repeats)
+                    ])
+                    margin = 1.96 * estimates.std(ddof=1) / np.sqrt(len(estimates)) if len(estimates) > 1 else 0.0
+                    metrics['silhouette_score'] = float(estimates.mean())
+                    metrics['silhouette_ci95_low'] = float(estimates.mean() - margin)
+                    metrics['silhouette_ci95_high'] = float(estimates.mean() + margin)
                 
                 # Davies-Bouldin Index (quanto menor, melhor)
                 metrics['davies_bouldin_index'] = float(davies_bouldin_score(X, labels))
@@ -4,18 +4,26 @@ Análise de Frequência Modular - Distribuições e Contagens
 Módulo especializado em análises de frequência, valores mais/menos
 comuns, distribuições e contagens.
 
+Cada coluna tem um único ``value_counts`` compartilhado por todas as
+sub-análises. Acima de ``sketch_rows_threshold`` linhas (ou em fluxo, via
+``analyze_stream``) as contagens vêm de sketches de memória limitada
+(heavy hitters + Count-Min + HyperLogLog), com o erro reportado nos metadados.
+
 Autor: EDA AI Minds Team
 Data: 2025-10-16
 Versão: 3.0.0
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, Iterable, List, Optional, Any, Tuple
 import pandas as pd
 import numpy as np
 import logging
 from datetime import datetime
 
+from .frequency_sketches import ColumnFrequencySketch, sketch_frames, to_categorical
+from .streaming_statistics import iter_row_blocks
+
 
 @dataclass
 class FrequencyAnalysisResult:
@@ -87,21 +95,37 @@ class FrequencyAnalyzer:
         >>> print(result.to_markdown())
     """
     
-    def __init__(self, logger: Optional[logging.Logger] = None):
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        sketch_rows_threshold: int = 5_000_000,
+        block_rows: int = 500_000,
+        sketch_capacity: int = 1000,
+        hll_precision: int = 14
+    ):
         """
         Inicializa analisador de frequência.
         
         Args:
             logger: Logger opcional
+            sketch_rows_threshold: Acima deste número de linhas usa sketches
+            block_rows: Linhas por bloco no caminho com sketches
+            sketch_capacity: Valores rastreados por coluna nos heavy hitters
+            hll_precision: Precisão do HyperLogLog (14 → ~0,8% de erro nos distintos)
         """
         self.logger = logger or logging.getLogger(__name__)
+        self.sketch_rows_threshold = sketch_rows_threshold
+        self.block_rows = block_rows
+        self.sketch_capacity = sketch_capacity
+        self.hll_precision = hll_precision
     
     def analyze(
         self,
         df: pd.DataFrame,
         columns: Optional[List[str]] = None,
         top_n: int = 10,
-        rare_threshold: float = 0.01  # 1%
+        rare_threshold: float = 0.01,  # 1%
+        categorical: bool = False
     ) -> FrequencyAnalysisResult:
         """
         Executa análise de frequência completa.
@@ -111,6 +135,7 @@ class FrequencyAnalyzer:
             columns: Colunas específicas (None = todas)
             top_n: Número de valores mais frequentes a retornar
             rare_threshold: Threshold para classificar valor como raro (0.01 = 1%)
+            categorical: Converter colunas texto para ``category`` antes das contagens
             
         Returns:
             Resultado completo da análise
@@ -127,84 +152,215 @@ class FrequencyAnalyzer:
             if not columns:
                 raise ValueError("Nenhuma coluna encontrada")
             
+            metadata = {}
+            if categorical:
+                df, savings = to_categorical(df, columns=[
+                    col for col in columns if df[col].dtype == object or pd.api.types.is_string_dtype(df[col])
+                ])
+                metadata["categorical_bytes_saved"] = savings
+            
+            if len(df) > self.sketch_rows_threshold:
+                sketches = sketch_frames(
+                    iter_row_blocks(df, self.block_rows), columns, **self._sketch_options()
+                )
+                return self.analyze_sketches(sketches, top_n, rare_threshold, metadata)
+            
             result = FrequencyAnalysisResult()
+            total = len(df)
+            
+            # Um único value_counts por coluna, compartilhado pelas sub-análises
+            counts = {col: self._value_counts(df[col]) for col in columns}
             
             # Tabelas de frequência
-            result.frequency_tables = self._compute_frequency_tables(df, columns, top_n)
+            result.frequency_tables = self._compute_frequency_tables(counts, total, top_n)
             
             # Estatísticas de moda
-            result.mode_stats = self._compute_mode_stats(df, columns)
+            result.mode_stats = self._compute_mode_stats(counts, total)
             
             # Contagens de valores
-            result.value_counts = self._compute_value_counts(df, columns)
+            result.value_counts = self._compute_value_counts(counts, total)
             
             # Análise de raridade
             result.rarity_analysis = self._compute_rarity_analysis(
-                df, columns, rare_threshold
+                counts, total, rare_threshold
             )
             
-            # Interpretação
-            result.interpretation = self._generate_interpretation(result)
-            
-            # Recomendações
-            result.recommendations = self._generate_recommendations(result)
-            
-            # Metadados
-            result.metadata = {
-                "columns_analyzed": columns,
-                "total_columns": len(columns),
-                "total_rows": len(df),
-                "top_n": top_n,
-                "rare_threshold": rare_threshold,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            self.logger.info(f"✅ Análise de frequência concluída: {len(columns)} colunas")
-            
+            self._finish(result, columns, total, top_n, rare_threshold, metadata)
             return result
             
         except Exception as e:
             self.logger.error(f"Erro na análise de frequência: {e}", exc_info=True)
             raise
     
-    def _compute_frequency_tables(
+    def analyze_stream(
         self,
-        df: pd.DataFrame,
+        frames: Iterable[pd.DataFrame],
+        columns: List[str],
+        top_n: int = 10,
+        rare_threshold: float = 0.01
+    ) -> FrequencyAnalysisResult:
+        """
+        Analisa dados em fluxo (ex.: ``pd.read_csv(..., chunksize=...)``) com sketches.
+        
+        Args:
+            frames: Blocos de linhas
+            columns: Colunas a analisar
+            top_n: Número de valores mais frequentes a retornar
+            rare_threshold: Threshold para classificar valor como raro
+            
+        Returns:
+            Resultado aproximado, com erros em ``metadata['approximation']``
+        """
+        sketches = sketch_frames(frames, columns, **self._sketch_options())
+        return self.analyze_sketches(sketches, top_n, rare_threshold)
+    
+    def analyze_sketches(
+        self,
+        sketches: Dict[str, ColumnFrequencySketch],
+        top_n: int = 10,
+        rare_threshold: float = 0.01,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> FrequencyAnalysisResult:
+        """
+        Monta o resultado a partir de sketches (combináveis com ``merge``).
+        
+        Contagens são estimativas com limites [lower, upper]; valores distintos
+        vêm do HyperLogLog. Todo valor acima do limite de erro dos heavy hitters
+        aparece no top-k.
+        """
+        result = FrequencyAnalysisResult()
+        columns = list(sketches)
+        total = next(iter(sketches.values())).rows if sketches else 0
+        approximation = {}
+        
+        for col, sketch in sketches.items():
+            top = sketch.top(self.sketch_capacity)
+            distinct = sketch.distinct_count()
+            head = top.head(top_n)
+            
+            result.frequency_tables[col] = pd.DataFrame({
+                'Valor': head.index,
+                'Frequência': head['count'].to_numpy(),
+                'Percentual (%)': (head['count'].to_numpy() / total * 100).round(2),
+                'Erro (±)': ((head['upper'] - head['lower']) / 2).round().astype('int64').to_numpy()
+            })
+            
+            if len(top):
+                result.mode_stats[col] = {
+                    'mode_value': top.index[0],
+                    'mode_count': int(top['count'].iloc[0]),
+                    'mode_percentage': float(top['count'].iloc[0] / total * 100),
+                    'second_mode_value': top.index[1] if len(top) > 1 else None,
+                    'second_mode_count': int(top['count'].iloc[1]) if len(top) > 1 else None
+                }
+            
+            result.value_counts[col] = {
+                'unique_values': distinct,
+                'null_count': sketch.nulls,
+                'null_percentage': float(sketch.nulls / total * 100) if total else 0.0
+            }
+            
+            # Valores com frequência ≥ threshold estão todos nos heavy hitters
+            frequent = int((top['count'] / total >= rare_threshold).sum()) if total else 0
+            rare_values_count = max(distinct - frequent, 0)
+            result.rarity_analysis[col] = {
+                'unique_values': distinct,
+                'rare_values_count': rare_values_count,
+                'rare_percentage': float(rare_values_count / distinct * 100) if distinct else 0.0,
+                'concentration_top10': float(top['count'].head(10).sum() / total * 100) if total else 0.0
+            }
+            
+            approximation[col] = {
+                'distinct_relative_error': round(sketch.distinct.relative_error, 4),
+                'count_max_error': int(sketch.heavy_hitters.error),
+                'count_min_max_error': round(sketch.count_min.max_error, 1),
+                'tracked_values': len(sketch.heavy_hitters.counts)
+            }
+        
+        self._finish(result, columns, total, top_n, rare_threshold, {
+            **(metadata or {}),
+            "approximate": True,
+            "approximation": approximation
+        })
+        return result
+    
+    def _sketch_options(self) -> Dict[str, Any]:
+        return {'capacity': self.sketch_capacity, 'hll_precision': self.hll_precision}
+    
+    def _finish(
+        self,
+        result: FrequencyAnalysisResult,
         columns: List[str],
+        total: int,
+        top_n: int,
+        rare_threshold: float,
+        metadata: Dict[str, Any]
+    ) -> None:
+        """Interpretação, recomendações e metadados comuns aos dois caminhos."""
+        # Interpretação
+        result.interpretation = self._generate_interpretation(result)
+        
+        # Recomendações
+        result.recommendations = self._generate_recommendations(result)
+        
+        # Metadados
+        result.metadata = {
+            "columns_analyzed": columns,
+            "total_columns": len(columns),
+            "total_rows": total,
+            "top_n": top_n,
+            "rare_threshold": rare_threshold,
+            "approximate": False,
+            **metadata,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        self.logger.info(f"✅ Análise de frequência concluída: {len(columns)} colunas")
+    
+    @staticmethod
+    def _value_counts(series: pd.Series) -> pd.Series:
+        """value_counts sem ausentes; categorias sem ocorrência são descartadas."""
+        counts = series.value_counts()
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            counts = counts[counts > 0]
+        return counts
+    
+    def _compute_frequency_tables(
+        self,
+        counts: Dict[str, pd.Series],
+        total: int,
         top_n: int
     ) -> Dict[str, pd.DataFrame]:
         """Calcula tabelas de frequência."""
         tables = {}
         
-        for col in columns:
+        for col, col_counts in counts.items():
             # Value counts
-            value_counts = df[col].value_counts().head(top_n)
+            value_counts = col_counts.head(top_n)
             
             # Criar DataFrame
             freq_table = pd.DataFrame({
                 'Valor': value_counts.index,
                 'Frequência': value_counts.values,
-                'Percentual (%)': (value_counts.values / len(df) * 100).round(2)
+                'Percentual (%)': (value_counts.values / total * 100).round(2)
             })
             
             tables[col] = freq_table
         
         return tables
     
-    def _compute_mode_stats(self, df: pd.DataFrame, columns: List[str]) -> Dict:
+    def _compute_mode_stats(self, counts: Dict[str, pd.Series], total: int) -> Dict:
         """Calcula estatísticas de moda."""
         stats = {}
         
-        for col in columns:
-            value_counts = df[col].value_counts()
-            
+        for col, value_counts in counts.items():
             if len(value_counts) == 0:
                 continue
             
             # Valor mais frequente (moda)
             mode_value = value_counts.index[0]
             mode_count = value_counts.iloc[0]
-            mode_percentage = mode_count / len(df) * 100
+            mode_percentage = mode_count / total * 100
             
             # Segundo mais frequente (se houver)
             second_mode = None
@@ -223,35 +379,32 @@ class FrequencyAnalyzer:
         
         return stats
     
-    def _compute_value_counts(self, df: pd.DataFrame, columns: List[str]) -> Dict:
+    def _compute_value_counts(self, counts: Dict[str, pd.Series], total: int) -> Dict:
         """Calcula contagens completas de valores."""
-        counts = {}
+        result = {}
         
-        for col in columns:
-            unique_values = df[col].nunique()
-            null_count = df[col].isnull().sum()
+        for col, value_counts in counts.items():
+            # value_counts exclui ausentes: o restante das linhas são nulos
+            null_count = total - int(value_counts.sum())
             
-            counts[col] = {
-                'unique_values': int(unique_values),
+            result[col] = {
+                'unique_values': int(len(value_counts)),
                 'null_count': int(null_count),
-                'null_percentage': float(null_count / len(df) * 100)
+                'null_percentage': float(null_count / total * 100)
             }
         
-        return counts
+        return result
     
     def _compute_rarity_analysis(
         self,
-        df: pd.DataFrame,
-        columns: List[str],
+        counts: Dict[str, pd.Series],
+        total: int,
         threshold: float
     ) -> Dict:
         """Analisa valores raros vs comuns."""
         analysis = {}
         
-        for col in columns:
-            value_counts = df[col].value_counts()
-            total = len(df)
-            
+        for col, value_counts in counts.items():
             # Valores raros (frequência < threshold)
             rare_mask = (value_counts / total) < threshold
             rare_values_count = rare_mask.sum()
@@ -10,7 +10,8 @@ Versão: 3.0.0
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Union
 import pandas as pd
 import logging
 from datetime import datetime
@@ -20,6 +21,32 @@ from src.analysis.statistical_analyzer import StatisticalAnalyzer, StatisticalAn
 from src.analysis.frequency_analyzer import FrequencyAnalyzer, FrequencyAnalysisResult
 from src.analysis.temporal_analyzer import TemporalAnalyzer, TemporalAnalysisResult
 from src.analysis.clustering_analyzer import ClusteringAnalyzer, ClusteringAnalysisResult
+from src.data.memory_policy import (
+    LOAD_CHUNKED,
+    LOAD_SAMPLED,
+    LoadPlan,
+    MemoryPolicy,
+    count_csv_rows,
+    estimate_frame_bytes,
+    iter_csv_chunks,
+    peak_rss_bytes,
+    plan_csv_load,
+    read_csv_bounded,
+    sample_frame,
+)
+
+
+# Colunas que cada análise declara precisar ('numeric' ou 'all')
+INTENT_COLUMN_KINDS = {
+    AnalysisIntent.STATISTICAL: 'numeric',
+    AnalysisIntent.FREQUENCY: 'all',
+    AnalysisIntent.TEMPORAL: 'all',
+    AnalysisIntent.CLUSTERING: 'numeric',
+    AnalysisIntent.GENERAL: 'numeric',
+}
+
+# Análises que agregam em blocos de linhas com memória constante
+STREAMING_INTENTS = {AnalysisIntent.STATISTICAL, AnalysisIntent.FREQUENCY, AnalysisIntent.GENERAL}
 
 
 @dataclass
@@ -90,16 +117,23 @@ class AnalysisOrchestrator:
         >>> print(result.to_markdown())
     """
     
-    def __init__(self, llm, logger: Optional[logging.Logger] = None):
+    def __init__(
+        self,
+        llm,
+        logger: Optional[logging.Logger] = None,
+        memory_policy: Optional[MemoryPolicy] = None
+    ):
         """
         Inicializa orquestrador.
         
         Args:
             llm: Instância de LLM para classificação de intenção
             logger: Logger opcional
+            memory_policy: Orçamento de memória por requisição (padrão: settings)
         """
         self.llm = llm
         self.logger = logger or logging.getLogger(__name__)
+        self.memory_policy = memory_policy or MemoryPolicy()
         
         # Inicializar classificador e analisadores
         self.intent_classifier = IntentClassifier(llm, logger)
@@ -168,32 +202,13 @@ class AnalysisOrchestrator:
             # 3. EXECUTAR ANÁLISES
             # ═══════════════════════════════════════════════════════════
             result = OrchestrationResult(intent_classification=intent_result)
-            
-            for intent in intents_to_execute:
-                analyzer_func = self._intent_to_analyzer.get(intent)
-                
-                if analyzer_func:
-                    try:
-                        self.logger.info(f"Executando análise: {intent.value}")
-                        
-                        analysis_result = analyzer_func(df, query, context)
-                        
-                        if analysis_result:
-                            analyzer_name = intent.value
-                            result.analysis_results[analyzer_name] = analysis_result
-                            result.execution_order.append(analyzer_name)
-                            
-                            self.logger.info(f"✅ Análise {intent.value} concluída")
-                    
-                    except Exception as e:
-                        self.logger.error(f"Erro na análise {intent.value}: {e}", exc_info=True)
-                        # Continua para próximas análises
+            memory = self._execute_intents(intents_to_execute, df, query, context, result)
             
             # ═══════════════════════════════════════════════════════════
             # 4. COMBINAR RESULTADOS E GERAR INTERPRETAÇÃO INTEGRADA
             # ═══════════════════════════════════════════════════════════
-            result.combined_interpretation = self._generate_combined_interpretation(
-                query, result
+            result.combined_interpretation = self._with_sampling_note(
+                self._generate_combined_interpretation(query, result), memory
             )
             
             # ═══════════════════════════════════════════════════════════
@@ -205,7 +220,8 @@ class AnalysisOrchestrator:
                 "total_time_ms": total_time,
                 "modules_executed": len(result.execution_order),
                 "timestamp": datetime.now().isoformat(),
-                "dataframe_shape": df.shape
+                "dataframe_shape": df.shape,
+                "memory": memory
             }
             
             self.logger.info(
@@ -219,6 +235,190 @@ class AnalysisOrchestrator:
             self.logger.error(f"Erro na orquestração: {e}", exc_info=True)
             raise
     
+    def orchestrate_csv(
+        self,
+        query: str,
+        csv_path: Union[str, Path],
+        context: Optional[Dict[str, Any]] = None,
+        encoding: str = 'utf-8'
+    ) -> OrchestrationResult:
+        """
+        Orquestra a análise carregando do CSV só o que as análises precisam.
+        
+        A intenção é classificada antes da leitura; o arquivo é lido apenas
+        nas colunas declaradas em ``INTENT_COLUMN_KINDS``, com tipos
+        reduzidos, e dentro de ``memory_policy.budget_bytes``. Acima do
+        orçamento, análises que agregam em blocos (``STREAMING_INTENTS``)
+        percorrem o arquivo em blocos; as demais usam uma amostra sistemática.
+        
+        Args:
+            query: Query do usuário
+            csv_path: Caminho do CSV
+            context: Contexto adicional
+            encoding: Encoding do arquivo
+            
+        Returns:
+            Resultado consolidado, com o plano de carga em ``metadata['memory']``
+        """
+        start_time = datetime.now()
+        intent_result = self.intent_classifier.classify(query, context)
+        intents = [intent_result.primary_intent, *intent_result.secondary_intents]
+        
+        header = pd.read_csv(csv_path, encoding=encoding, nrows=1000, low_memory=False)
+        columns = self.required_columns(intents, header)
+        plan = plan_csv_load(
+            csv_path, columns, self.memory_policy, encoding,
+            streaming=all(intent in STREAMING_INTENTS for intent in intents)
+        )
+        
+        result = OrchestrationResult(intent_classification=intent_result)
+        shape = None
+        if plan.mode == LOAD_CHUNKED:
+            memory = self._execute_streaming(intents, csv_path, plan, result)
+        else:
+            df = read_csv_bounded(csv_path, plan)
+            shape = df.shape
+            memory = self._execute_intents(intents, df, query, context, result)
+            memory['sampling'] = plan.sampling(
+                len(df), count_csv_rows(csv_path) if plan.mode == LOAD_SAMPLED else None
+            )
+        memory.update({'load_mode': plan.mode, 'columns': plan.columns,
+                       'estimated_bytes': plan.estimated_bytes, 'peak_rss_bytes': peak_rss_bytes()})
+        
+        result.combined_interpretation = self._with_sampling_note(
+            self._generate_combined_interpretation(query, result), memory
+        )
+        total_time = (datetime.now() - start_time).total_seconds() * 1000
+        result.metadata = {
+            "total_time_ms": total_time,
+            "modules_executed": len(result.execution_order),
+            "timestamp": datetime.now().isoformat(),
+            "dataframe_shape": shape,
+            "memory": memory
+        }
+        return result
+    
+    @staticmethod
+    def required_columns(intents: List[AnalysisIntent], df: pd.DataFrame) -> Optional[List[str]]:
+        """
+        União das colunas declaradas pelas análises (None = todas).
+        
+        Args:
+            intents: Análises a executar
+            df: DataFrame ou amostra com o esquema dos dados
+        """
+        kinds = {INTENT_COLUMN_KINDS.get(intent, 'all') for intent in intents}
+        if 'all' in kinds:
+            return None
+        return df.select_dtypes(include='number').columns.tolist()
+    
+    def _execute_intents(
+        self,
+        intents: List[AnalysisIntent],
+        df: pd.DataFrame,
+        query: str,
+        context: Optional[Dict[str, Any]],
+        result: OrchestrationResult
+    ) -> Dict[str, Any]:
+        """Executa as análises sobre o DataFrame e devolve o relatório de memória."""
+        frame_bytes = estimate_frame_bytes(df)
+        sampled: Dict[str, int] = {}
+        for intent in intents:
+            analyzer_func = self._intent_to_analyzer.get(intent)
+            
+            if analyzer_func:
+                try:
+                    self.logger.info(f"Executando análise: {intent.value}")
+                    
+                    analysis_result = analyzer_func(self._bounded_frame(intent, df, frame_bytes, sampled),
+                                                    query, context)
+                    
+                    if analysis_result:
+                        analyzer_name = intent.value
+                        result.analysis_results[analyzer_name] = analysis_result
+                        result.execution_order.append(analyzer_name)
+                        
+                        self.logger.info(f"✅ Análise {intent.value} concluída")
+                
+                except Exception as e:
+                    self.logger.error(f"Erro na análise {intent.value}: {e}", exc_info=True)
+                    # Continua para próximas análises
+        return {'frame_bytes': frame_bytes, 'budget_bytes': self.memory_policy.budget_bytes,
+                'rows': len(df), 'sampled_intents': sampled}
+    
+    def _bounded_frame(
+        self,
+        intent: AnalysisIntent,
+        df: pd.DataFrame,
+        frame_bytes: int,
+        sampled: Dict[str, int]
+    ) -> pd.DataFrame:
+        """
+        Amostra sistemática para análises que copiam os dados (clustering,
+        temporal) quando o DataFrame excede o orçamento; as que agregam em
+        blocos recebem o DataFrame inteiro. ``sampled`` recebe análise ->
+        linhas da amostra usada.
+        """
+        if intent in STREAMING_INTENTS or frame_bytes <= self.memory_policy.budget_bytes:
+            return df
+        max_rows = max(int(len(df) * self.memory_policy.budget_bytes / frame_bytes), 1)
+        bounded = sample_frame(df, max_rows)
+        sampled[intent.value] = len(bounded)
+        self.logger.warning(
+            f"⚠️ {intent.value}: DataFrame de {frame_bytes / 1024 ** 2:.0f} MB acima do orçamento; "
+            f"usando amostra de {len(bounded):,} linhas"
+        )
+        return bounded
+    
+    @staticmethod
+    def sampling_note(memory: Dict[str, Any]) -> Optional[str]:
+        """
+        Aviso de que os resultados vieram de amostra (None se usaram todos os dados).
+        
+        Args:
+            memory: Relatório de memória da orquestração (``metadata['memory']``)
+        """
+        parts = []
+        sampling = memory.get('sampling') or {}
+        if sampling.get('sampled'):
+            parts.append(
+                f"dados carregados como amostra sistemática de {sampling['loaded_rows']:,} de "
+                f"{sampling['original_rows']:,} linhas (1 a cada {sampling['sample_step']})"
+            )
+        for name, rows in (memory.get('sampled_intents') or {}).items():
+            parts.append(f"{name} calculada sobre {rows:,} de {memory.get('rows', rows):,} linhas")
+        if not parts:
+            return None
+        return "⚠️ Resultados aproximados: " + "; ".join(parts) + "."
+    
+    def _with_sampling_note(self, interpretation: str, memory: Dict[str, Any]) -> str:
+        note = self.sampling_note(memory)
+        return f"{note}\n\n{interpretation}" if note else interpretation
+    
+    def _execute_streaming(
+        self,
+        intents: List[AnalysisIntent],
+        csv_path: Union[str, Path],
+        plan: LoadPlan,
+        result: OrchestrationResult
+    ) -> Dict[str, Any]:
+        """Executa análises agregáveis percorrendo o CSV em blocos (uma passada por análise)."""
+        for intent in dict.fromkeys(intents):
+            try:
+                if intent == AnalysisIntent.FREQUENCY:
+                    columns = plan.columns or pd.read_csv(csv_path, encoding=plan.encoding, nrows=0).columns.tolist()
+                    analysis_result = self.frequency_analyzer.analyze_stream(iter_csv_chunks(csv_path, plan), columns)
+                else:
+                    state = None
+                    for chunk in iter_csv_chunks(csv_path, plan):
+                        state = self.statistical_analyzer.accumulate(chunk, plan.columns, state)
+                    analysis_result = self.statistical_analyzer.analyze_state(state)
+                result.analysis_results[intent.value] = analysis_result
+                result.execution_order.append(intent.value)
+            except Exception as e:
+                self.logger.error(f"Erro na análise {intent.value} em blocos: {e}", exc_info=True)
+        return {'frame_bytes': None, 'budget_bytes': plan.budget_bytes, 'sampled_intents': {}}
+    
     def _run_statistical_analysis(
         self,
         df: pd.DataFrame,
@@ -381,6 +581,8 @@ Sintetize essas interpretações de forma coerente e contextual.
             
             results = {}
             execution_order = []
+            frame_bytes = estimate_frame_bytes(df)
+            sampled: Dict[str, int] = {}
             
             # Mapear strings de intenção para AnalysisIntent enum
             intent_map = {
@@ -413,7 +615,9 @@ Sintetize essas interpretações de forma coerente e contextual.
                     try:
                         self.logger.info(f"▶️ Executando análise: {analysis_type}")
                         
-                        analysis_result = analyzer_func(df, query="", context=None)
+                        analysis_result = analyzer_func(
+                            self._bounded_frame(intent_enum, df, frame_bytes, sampled), query="", context=None
+                        )
                         
                         if analysis_result:
                             analyzer_key = analysis_type.lower()
@@ -435,6 +639,12 @@ Sintetize essas interpretações de forma coerente e contextual.
             
             # Metadados
             total_time = (datetime.now() - start_time).total_seconds() * 1000
+            memory = {
+                "frame_bytes": frame_bytes,
+                "budget_bytes": self.memory_policy.budget_bytes,
+                "rows": len(df),
+                "sampled_intents": sampled
+            }
             
             response = {
                 "results": results,
@@ -443,7 +653,9 @@ Sintetize essas interpretações de forma coerente e contextual.
                     "total_time_ms": total_time,
                     "modules_executed": len(execution_order),
                     "timestamp": datetime.now().isoformat(),
-                    "dataframe_shape": list(df.shape)
+                    "dataframe_shape": list(df.shape),
+                    "memory": memory,
+                    "sampling_note": self.sampling_note(memory)
                 }
             }
             
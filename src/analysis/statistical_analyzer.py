@@ -16,6 +16,17 @@ import numpy as np
 import logging
 from datetime import datetime
 
+from .streaming_statistics import StreamingStatsState, accumulate_frames, iter_row_blocks
+
+# Quantis calculados pelos sketches (quartis)
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    """Converte para float, com NaN/infinito como None."""
+    value = float(value)
+    return None if np.isnan(value) or np.isinf(value) else value
+
 
 @dataclass
 class StatisticalAnalysisResult:
@@ -84,7 +95,8 @@ class StatisticalAnalyzer:
     Analisador modular de estatísticas descritivas.
     
     Fornece análises estatísticas robustas e interpretativas sem
-    depender de lógica hardcoded externa.
+    depender de lógica hardcoded externa. Momentos (Welford) e quantis
+    (sketch combinável) são calculados numa única passagem por blocos.
     
     Exemplo:
         >>> analyzer = StatisticalAnalyzer()
@@ -92,14 +104,27 @@ class StatisticalAnalyzer:
         >>> print(result.to_markdown())
     """
     
-    def __init__(self, logger: Optional[logging.Logger] = None):
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        block_rows: int = 65_536,
+        sketch_k: int = 1024,
+        max_distinct: int = 100_000
+    ):
         """
         Inicializa analisador estatístico.
         
         Args:
             logger: Logger opcional
+            block_rows: Linhas por bloco na passagem única sobre os dados
+            sketch_k: Capacidade por nível do sketch de quantis
+                (quantis exatos até ~k valores por coluna)
+            max_distinct: Valores distintos rastreados por coluna (moda/únicos)
         """
         self.logger = logger or logging.getLogger(__name__)
+        self.block_rows = block_rows
+        self.sketch_k = sketch_k
+        self.max_distinct = max_distinct
     
     def analyze(
         self,
@@ -112,6 +137,9 @@ class StatisticalAnalyzer:
         """
         Executa análise estatística completa.
         
+        Os dados são percorridos uma única vez, em blocos de ``block_rows``
+        linhas (ver ``accumulate``).
+        
         Args:
             df: DataFrame a analisar
             columns: Colunas específicas (None = todas numéricas)
@@ -124,7 +152,38 @@ class StatisticalAnalyzer:
         """
         try:
             self.logger.info("Iniciando análise estatística...")
+            state = self.accumulate(df, columns)
+            return self.analyze_state(
+                state,
+                include_distribution=include_distribution,
+                include_variability=include_variability,
+                include_position=include_position
+            )
+        except Exception as e:
+            self.logger.error(f"Erro na análise estatística: {e}", exc_info=True)
+            raise
+    
+    def accumulate(
+        self,
+        df: pd.DataFrame,
+        columns: Optional[List[str]] = None,
+        state: Optional[StreamingStatsState] = None
+    ) -> StreamingStatsState:
+        """
+        Acumula as linhas do DataFrame num estado combinável.
+        
+        Para dados anexados, passe o ``state`` anterior; estados de workers
+        paralelos combinam-se com ``state.merge(outro)``.
+        
+        Args:
+            df: DataFrame (ou bloco) a acumular
+            columns: Colunas específicas (None = todas numéricas, ou as do estado)
+            state: Estado existente a atualizar
             
+        Returns:
+            Estado atualizado
+        """
+        if state is None:
             # Selecionar colunas
             if columns is None:
                 columns = df.select_dtypes(include=[np.number]).columns.tolist()
@@ -134,132 +193,166 @@ class StatisticalAnalyzer:
             if not columns:
                 raise ValueError("Nenhuma coluna numérica encontrada")
             
-            result = StatisticalAnalysisResult()
-            
-            # Estatísticas gerais
-            result.summary_stats = self._compute_summary_stats(df, columns)
-            
-            # Métricas de variabilidade
-            if include_variability:
-                result.variability_stats = self._compute_variability_stats(df, columns)
-            
-            # Métricas de posição
-            if include_position:
-                result.position_stats = self._compute_position_stats(df, columns)
-            
-            # Distribuição
-            if include_distribution:
-                result.distribution_stats = self._compute_distribution_stats(df, columns)
-            
-            # Interpretação
-            result.interpretation = self._generate_interpretation(result)
-            
-            # Recomendações
-            result.recommendations = self._generate_recommendations(result)
+            state = StreamingStatsState(
+                columns=columns,
+                max_distinct=self.max_distinct,
+                sketch_k=self.sketch_k
+            )
+        
+        return accumulate_frames(iter_row_blocks(df, self.block_rows), state.columns, state)
+    
+    def analyze_state(
+        self,
+        state: StreamingStatsState,
+        include_distribution: bool = True,
+        include_variability: bool = True,
+        include_position: bool = True
+    ) -> StatisticalAnalysisResult:
+        """
+        Monta o resultado a partir de um estado acumulado (sem reler os dados).
+        
+        Args:
+            state: Estado retornado por ``accumulate`` (ou combinação de estados)
+            include_distribution: Incluir análise de distribuição
+            include_variability: Incluir métricas de variabilidade
+            include_position: Incluir métricas de posição
             
-            # Metadados
-            result.metadata = {
-                "columns_analyzed": columns,
-                "total_columns": len(columns),
-                "total_rows": len(df),
-                "timestamp": datetime.now().isoformat()
+        Returns:
+            Resultado completo da análise
+        """
+        result = StatisticalAnalysisResult()
+        quantiles = self._compute_quantiles(state)
+        
+        # Estatísticas gerais
+        result.summary_stats = self._compute_summary_stats(state, quantiles)
+        
+        # Métricas de variabilidade
+        if include_variability:
+            result.variability_stats = self._compute_variability_stats(state, quantiles)
+        
+        # Métricas de posição
+        if include_position:
+            result.position_stats = self._compute_position_stats(state, quantiles)
+        
+        # Distribuição
+        if include_distribution:
+            result.distribution_stats = self._compute_distribution_stats(state)
+        
+        # Interpretação
+        result.interpretation = self._generate_interpretation(result)
+        
+        # Recomendações
+        result.recommendations = self._generate_recommendations(result)
+        
+        # Metadados
+        result.metadata = {
+            "columns_analyzed": state.columns,
+            "total_columns": len(state.columns),
+            "total_rows": state.rows,
+            "timestamp": datetime.now().isoformat(),
+            "quantiles_exact": all(sketch.exact for sketch in state.sketches),
+            "quantile_error_bounds": {
+                col: {
+                    "rank_error": round(sketch.rank_error(), 2),
+                    "rank_error_%": round(sketch.rank_error() / sketch.n * 100, 4) if sketch.n else 0.0,
+                    "bounds": {
+                        str(q): [_to_float(lo), _to_float(hi)]
+                        for q, (lo, hi) in zip(QUANTILES, sketch.quantile_bounds(QUANTILES))
+                    }
+                }
+                for col, sketch in zip(state.columns, state.sketches)
             }
-            
-            self.logger.info(f"✅ Análise estatística concluída: {len(columns)} colunas")
-            
-            return result
-            
-        except Exception as e:
-            self.logger.error(f"Erro na análise estatística: {e}", exc_info=True)
-            raise
+        }
+        
+        self.logger.info(f"✅ Análise estatística concluída: {len(state.columns)} colunas")
+        
+        return result
     
-    def _compute_summary_stats(self, df: pd.DataFrame, columns: List[str]) -> Dict:
+    def _compute_quantiles(self, state: StreamingStatsState) -> Dict[str, Dict[float, float]]:
+        """Quartis de cada coluna a partir dos sketches."""
+        return {
+            col: dict(zip(QUANTILES, sketch.quantiles(QUANTILES)))
+            for col, sketch in zip(state.columns, state.sketches)
+        }
+    
+    def _compute_summary_stats(self, state: StreamingStatsState, quantiles: Dict) -> Dict:
         """Calcula estatísticas descritivas gerais."""
         stats = {}
+        moments = state.moments
+        std = np.sqrt(moments.variance())
         
-        for col in columns:
-            series = df[col].dropna()
-            
+        for i, col in enumerate(state.columns):
             stats[col] = {
-                'count': int(series.count()),
-                'mean': float(series.mean()),
-                'median': float(series.median()),
-                'std': float(series.std()),
-                'min': float(series.min()),
-                'max': float(series.max())
+                'count': int(moments.count[i]),
+                'mean': float(moments.mean[i]) if moments.count[i] else np.nan,
+                'median': float(quantiles[col][0.5]),
+                'std': float(std[i]),
+                'min': float(moments.min[i]) if moments.count[i] else np.nan,
+                'max': float(moments.max[i]) if moments.count[i] else np.nan
             }
         
         return stats
     
-    def _compute_variability_stats(self, df: pd.DataFrame, columns: List[str]) -> Dict:
+    def _compute_variability_stats(self, state: StreamingStatsState, quantiles: Dict) -> Dict:
         """Calcula métricas de variabilidade."""
         stats = {}
+        moments = state.moments
+        variance = moments.variance()
         
-        for col in columns:
-            series = df[col].dropna()
-            mean_val = series.mean()
-            std_val = series.std()
+        for i, col in enumerate(state.columns):
+            mean_val = moments.mean[i]
+            std_val = np.sqrt(variance[i])
             
             # Coeficiente de variação (CV)
             cv = (std_val / mean_val * 100) if mean_val != 0 else np.inf
             
             # Intervalo interquartil (IQR)
-            q1 = series.quantile(0.25)
-            q3 = series.quantile(0.75)
-            iqr = q3 - q1
-            
-            # Range
-            range_val = series.max() - series.min()
+            iqr = quantiles[col][0.75] - quantiles[col][0.25]
             
             stats[col] = {
                 'std_dev': float(std_val),
-                'variance': float(series.var()),
+                'variance': float(variance[i]),
                 'coef_variation_%': float(cv) if not np.isinf(cv) else None,
                 'iqr': float(iqr),
-                'range': float(range_val)
+                'range': float(moments.max[i] - moments.min[i]) if moments.count[i] else np.nan
             }
         
         return stats
     
-    def _compute_position_stats(self, df: pd.DataFrame, columns: List[str]) -> Dict:
+    def _compute_position_stats(self, state: StreamingStatsState, quantiles: Dict) -> Dict:
         """Calcula métricas de posição."""
         stats = {}
         
-        for col in columns:
-            series = df[col].dropna()
-            
+        for i, col in enumerate(state.columns):
             stats[col] = {
-                'q1_25%': float(series.quantile(0.25)),
-                'q2_50%_median': float(series.quantile(0.50)),
-                'q3_75%': float(series.quantile(0.75)),
-                'mode': float(series.mode().iloc[0]) if len(series.mode()) > 0 else None
+                'q1_25%': float(quantiles[col][0.25]),
+                'q2_50%_median': float(quantiles[col][0.5]),
+                'q3_75%': float(quantiles[col][0.75]),
+                'mode': state.mode(i)
             }
         
         return stats
     
-    def _compute_distribution_stats(self, df: pd.DataFrame, columns: List[str]) -> Dict:
+    def _compute_distribution_stats(self, state: StreamingStatsState) -> Dict:
         """Calcula características de distribuição."""
         stats = {}
+        moments = state.moments
+        skewness = moments.skewness()
+        kurtosis = moments.kurtosis()
         
-        for col in columns:
-            series = df[col].dropna()
-            
-            # Skewness e Kurtosis
-            from scipy import stats as scipy_stats
-            
-            try:
-                skew = scipy_stats.skew(series)
-                kurt = scipy_stats.kurtosis(series)
-            except:
-                skew = None
-                kurt = None
+        for i, col in enumerate(state.columns):
+            unique, exact = state.distinct(i)
+            count = moments.count[i]
             
             stats[col] = {
-                'skewness': float(skew) if skew is not None else None,
-                'kurtosis': float(kurt) if kurt is not None else None,
-                'unique_values': int(series.nunique()),
-                'unique_ratio_%': float(series.nunique() / len(series) * 100)
+                'skewness': float(skewness[i]),
+                'kurtosis': float(kurtosis[i]),
+                'unique_values': unique,
+                'unique_ratio_%': float(unique / count * 100) if count and exact else None
             }
+            if not exact:
+                # Contador descartado: unique_values é só o limite inferior
+                stats[col]['unique_values_exact'] = False
         
         return stats
     
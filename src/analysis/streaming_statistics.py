@@ -0,0 +1,313 @@
+"""
+Estatísticas em Passagem Única - Momentos de Welford e Sketch de Quantis
+
+Acumuladores que calculam contagem, média, M2, M3, M4, mínimo e máximo
+(atualização de Welford generalizada por blocos, fórmulas de Pébay) e
+quantis aproximados com um sketch compactador no estilo KLL, percorrendo os
+dados uma única vez em blocos de linhas.
+
+Os estados são combináveis (``merge``): resultados de workers paralelos ou
+de dados anexados depois somam-se ao estado existente sem reler nada.
+
+Limite de erro dos quantis: cada compactação no nível h desloca o rank de
+qualquer consulta em no máximo 2^h, com média zero (offset aleatório). A
+variância acumulada dá um limite de erro de rank com ~99% de confiança;
+enquanto nenhuma compactação ocorre, os quantis são exatos.
+
+Autor: EDA AI Minds Team
+Data: 2025-10-19
+Versão: 3.0.0
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+
+# Valor z para o limite de erro de rank dos quantis (~99% de confiança)
+QUANTILE_ERROR_Z = 2.576
+
+
+class MomentAccumulator:
+    """
+    Momentos centrais de várias colunas, atualizados por blocos.
+
+    Cada bloco tem seus momentos calculados de forma vetorizada e é
+    combinado ao estado com as fórmulas paralelas de Welford/Pébay, o que
+    mantém a estabilidade numérica de uma atualização linha a linha.
+    """
+
+    def __init__(self, n_columns: int):
+        self.count = np.zeros(n_columns)
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+        self.m3 = np.zeros(n_columns)
+        self.m4 = np.zeros(n_columns)
+        self.min = np.full(n_columns, np.inf)
+        self.max = np.full(n_columns, -np.inf)
+
+    def update(self, block: np.ndarray) -> None:
+        """Acumula um bloco (linhas x colunas, NaN = ausente)."""
+        mask = ~np.isnan(block)
+        nb = mask.sum(axis=0).astype(float)
+        if not nb.any():
+            return
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mb = np.where(nb > 0, np.nansum(block, axis=0) / nb, 0.0)
+            delta = np.where(mask, block - mb, 0.0)
+            d2 = delta * delta
+            other = MomentAccumulator(block.shape[1])
+            other.count = nb
+            other.mean = mb
+            other.m2 = d2.sum(axis=0)
+            other.m3 = (d2 * delta).sum(axis=0)
+            other.m4 = (d2 * d2).sum(axis=0)
+            other.min = np.where(nb > 0, np.nanmin(np.where(mask, block, np.inf), axis=0), np.inf)
+            other.max = np.where(nb > 0, np.nanmax(np.where(mask, block, -np.inf), axis=0), -np.inf)
+        self.merge(other)
+
+    def merge(self, other: 'MomentAccumulator') -> None:
+        """Combina outro acumulador das mesmas colunas neste."""
+        na, nb = self.count, other.count
+        n = na + nb
+        with np.errstate(invalid='ignore', divide='ignore'):
+            safe_n = np.where(n > 0, n, 1.0)
+            delta = other.mean - self.mean
+            d2 = delta * delta
+            mean = self.mean + delta * nb / safe_n
+            m2 = self.m2 + other.m2 + d2 * na * nb / safe_n
+            m3 = (self.m3 + other.m3
+                  + d2 * delta * na * nb * (na - nb) / safe_n ** 2
+                  + 3.0 * delta * (na * other.m2 - nb * self.m2) / safe_n)
+            m4 = (self.m4 + other.m4
+                  + d2 * d2 * na * nb * (na * na - na * nb + nb * nb) / safe_n ** 3
+                  + 6.0 * d2 * (na * na * other.m2 + nb * nb * self.m2) / safe_n ** 2
+                  + 4.0 * delta * (na * other.m3 - nb * self.m3) / safe_n)
+        self.count = n
+        self.mean = np.where(n > 0, mean, 0.0)
+        self.m2 = np.where(n > 0, m2, 0.0)
+        self.m3 = np.where(n > 0, m3, 0.0)
+        self.m4 = np.where(n > 0, m4, 0.0)
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+
+    def variance(self, ddof: int = 1) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > ddof, self.m2 / (self.count - ddof), np.nan)
+
+    def skewness(self) -> np.ndarray:
+        """Assimetria populacional (equivale a ``scipy.stats.skew`` com bias=True)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.sqrt(self.count) * self.m3 / self.m2 ** 1.5
+
+    def kurtosis(self) -> np.ndarray:
+        """Curtose de Fisher (equivale a ``scipy.stats.kurtosis`` com bias=True)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.count * self.m4 / (self.m2 * self.m2) - 3.0
+
+
+class QuantileSketch:
+    """
+    Sketch de quantis combinável (compactadores no estilo KLL).
+
+    Cada nível guarda até ``k`` itens de peso 2^h; ao exceder, o nível é
+    ordenado e metade dos itens (posições pares ou ímpares, ao acaso) sobe
+    para o nível seguinte com o dobro do peso.
+
+    Args:
+        k: Capacidade por nível (maior = mais preciso e mais memória)
+        seed: Semente do gerador de offsets (reprodutibilidade)
+    """
+
+    def __init__(self, k: int = 1024, seed: Optional[int] = None):
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.rank_variance = 0.0
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def exact(self) -> bool:
+        return self.rank_variance == 0.0
+
+    def update(self, values: np.ndarray) -> None:
+        """Acumula valores finitos (sem NaN)."""
+        if values.size == 0:
+            return
+        self.n += int(values.size)
+        self.levels[0] = np.concatenate([self.levels[0], values.astype(float, copy=False)])
+        self._compress()
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Combina outro sketch neste (workers paralelos ou dados anexados)."""
+        self.n += other.n
+        self.rank_variance += other.rank_variance
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self._compress()
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.k:
+                items = np.sort(items)
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                even = items[:len(items) - len(keep)]
+                promoted = even[int(self._rng.integers(2))::2]
+                self.levels[h] = keep
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                # Erro de rank desta compactação: 0 ou ±2^h com média zero
+                self.rank_variance += float(4 ** h)
+            h += 1
+
+    def _weighted_items(self) -> Tuple[np.ndarray, np.ndarray]:
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """Quantis aproximados (exatos, com interpolação linear, se não houve compactação)."""
+        qs = np.asarray(qs, dtype=float)
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        if self.exact:
+            return np.quantile(self.levels[0], qs)
+        values, cumulative = self._weighted_items()
+        return self._at_ranks(values, cumulative, qs * self.n)
+
+    @staticmethod
+    def _at_ranks(values: np.ndarray, cumulative: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+        idx = np.searchsorted(cumulative, np.clip(ranks, 1, cumulative[-1]), side='left')
+        return values[np.minimum(idx, len(values) - 1)]
+
+    def rank_error(self) -> float:
+        """Limite do erro de rank absoluto (~99% de confiança); 0 quando exato."""
+        return QUANTILE_ERROR_Z * float(np.sqrt(self.rank_variance))
+
+    def quantile_bounds(self, qs: Sequence[float]) -> np.ndarray:
+        """Intervalo [inferior, superior] de cada quantil, dado o erro de rank."""
+        qs = np.asarray(qs, dtype=float)
+        if self.n == 0:
+            return np.full((len(qs), 2), np.nan)
+        if self.exact:
+            exact = np.quantile(self.levels[0], qs)
+            return np.column_stack([exact, exact])
+        values, cumulative = self._weighted_items()
+        err = self.rank_error()
+        return np.column_stack([
+            self._at_ranks(values, cumulative, qs * self.n - err),
+            self._at_ranks(values, cumulative, qs * self.n + err),
+        ])
+
+
+@dataclass
+class StreamingStatsState:
+    """
+    Estado acumulado das estatísticas de um conjunto de colunas numéricas.
+
+    Attributes:
+        columns: Colunas acumuladas (na ordem dos arrays)
+        rows: Linhas vistas (incluindo ausentes)
+        moments: Momentos por coluna
+        sketches: Sketch de quantis por coluna
+        counters: Contagem exata de valores por coluna (moda e únicos),
+            descartada quando passa de ``max_distinct`` valores distintos
+        distinct_overflow: Distintos vistos quando o contador foi descartado
+        max_distinct: Limite de valores distintos rastreados por coluna
+        sketch_k: Capacidade por nível dos sketches de quantis
+    """
+    columns: List[str]
+    rows: int = 0
+    moments: MomentAccumulator = None
+    sketches: List[QuantileSketch] = field(default_factory=list)
+    counters: List[Optional[pd.Series]] = field(default_factory=list)
+    distinct_overflow: List[int] = field(default_factory=list)
+    max_distinct: int = 100_000
+    sketch_k: int = 1024
+
+    def __post_init__(self):
+        n = len(self.columns)
+        if self.moments is None:
+            self.moments = MomentAccumulator(n)
+        if not self.sketches:
+            self.sketches = [QuantileSketch(self.sketch_k, seed=i) for i in range(n)]
+        if not self.counters:
+            self.counters = [pd.Series(dtype=float) for _ in range(n)]
+        if not self.distinct_overflow:
+            self.distinct_overflow = [0] * n
+
+    def update(self, block: pd.DataFrame) -> 'StreamingStatsState':
+        """Acumula um bloco de linhas (as colunas do estado devem existir no bloco)."""
+        if block.empty:
+            return self
+        values = block[self.columns].to_numpy(dtype=float, na_value=np.nan)
+        self.rows += len(block)
+        self.moments.update(values)
+        for i in range(len(self.columns)):
+            column = values[:, i]
+            column = column[~np.isnan(column)]
+            self.sketches[i].update(column)
+            if self.counters[i] is not None:
+                self._count_values(i, pd.Series(column).value_counts(sort=False))
+        return self
+
+    def merge(self, other: 'StreamingStatsState') -> 'StreamingStatsState':
+        """Combina o estado de outro worker/bloco de dados anexados."""
+        if other.columns != self.columns:
+            raise ValueError("Estados com colunas diferentes não podem ser combinados")
+        self.rows += other.rows
+        self.moments.merge(other.moments)
+        for i in range(len(self.columns)):
+            self.sketches[i].merge(other.sketches[i])
+            if other.counters[i] is None:
+                self.counters[i] = None
+                self.distinct_overflow[i] = max(self.distinct_overflow[i], other.distinct_overflow[i])
+            else:
+                self._count_values(i, other.counters[i])
+        return self
+
+    def _count_values(self, i: int, counts: pd.Series) -> None:
+        if self.counters[i] is None:
+            return
+        merged = self.counters[i].add(counts, fill_value=0)
+        if len(merged) > self.max_distinct:
+            # Só o limite inferior de distintos é preservado
+            self.distinct_overflow[i] = len(merged)
+            self.counters[i] = None
+        else:
+            self.counters[i] = merged
+
+    def distinct(self, i: int) -> Tuple[int, bool]:
+        """Valores distintos da coluna i e se a contagem é exata."""
+        if self.counters[i] is None:
+            return self.distinct_overflow[i], False
+        return int(len(self.counters[i])), True
+
+    def mode(self, i: int) -> Optional[float]:
+        """Menor dos valores mais frequentes (mesmo critério de ``Series.mode().iloc[0]``)."""
+        counts = self.counters[i]
+        if counts is None or counts.empty:
+            return None
+        return float(counts[counts == counts.max()].index.min())
+
+
+def accumulate_frames(frames: Iterable[pd.DataFrame], columns: List[str],
+                      state: Optional[StreamingStatsState] = None) -> StreamingStatsState:
+    """Acumula uma sequência de blocos (ex.: ``pd.read_csv(..., chunksize=...)``) num estado."""
+    state = state or StreamingStatsState(columns=list(columns))
+    for frame in frames:
+        state.update(frame)
+    return state
+
+
+def iter_row_blocks(df: pd.DataFrame, block_rows: int) -> Iterable[pd.DataFrame]:
+    """Fatias consecutivas de ``block_rows`` linhas do DataFrame."""
+    for start in range(0, len(df), block_rows):
+        yield df.iloc[start:start + block_rows]
@@ -5,9 +5,14 @@ Este módulo fornece análises estatísticas sofisticadas de séries temporais,
 incluindo detecção de tendências, sazonalidade, anomalias e interpretação
 contextualizada dos padrões descobertos.
 
+Tendência, autocorrelação e anomalias vêm do núcleo vetorizado
+(``temporal_vectorized``): uma série isolada é tratada como matriz de uma
+coluna, e ``analyze_many``/``analyze_matrix`` resolvem centenas de séries
+(ex.: valor diário das NF-e por UF ou CFOP) em poucas operações NumPy.
+
 Autor: EDA AI Minds Team
 Data: 2025-10-16
-Versão: 2.0.0
+Versão: 3.0.0
 """
 
 from dataclasses import dataclass, field
@@ -16,8 +21,19 @@ from enum import Enum
 import pandas as pd
 import numpy as np
 import logging
+import time
 from datetime import datetime
 
+from .temporal_vectorized import (
+    detrend,
+    dominant_period,
+    fft_autocorrelation,
+    linear_trend,
+    mad_scores,
+    resample_series,
+)
+from .temporal_detection import TemporalDetectionConfig
+
 
 class TrendType(Enum):
     """Tipos de tendência detectados."""
@@ -33,9 +49,34 @@ class SeasonalityType(Enum):
     SEMANAL = "semanal"
     MENSAL = "mensal"
     ANUAL = "anual"
+    CICLICA = "cíclica"
     NENHUMA = "nenhuma"
 
 
+# Períodos de calendário (em dias) reconhecidos na sazonalidade
+SEASONAL_PERIODS_DAYS = (
+    (1.0, SeasonalityType.DIARIA),
+    (7.0, SeasonalityType.SEMANAL),
+    (30.44, SeasonalityType.MENSAL),
+    (365.25, SeasonalityType.ANUAL),
+)
+
+# Tolerância relativa para associar um período a um ciclo de calendário
+SEASONAL_PERIOD_TOLERANCE = 0.15
+
+
+def seasonality_type_for_period(period_days: float) -> SeasonalityType:
+    """Ciclo de calendário mais próximo do período (ou cíclico genérico)."""
+    if period_days <= 0:
+        return SeasonalityType.NENHUMA
+    reference, season_type = min(
+        SEASONAL_PERIODS_DAYS, key=lambda item: abs(np.log(period_days / item[0]))
+    )
+    if abs(period_days - reference) <= SEASONAL_PERIOD_TOLERANCE * reference:
+        return season_type
+    return SeasonalityType.CICLICA
+
+
 @dataclass
 class TemporalAnalysisResult:
     """
@@ -199,23 +240,88 @@ class TemporalAnalysisResult:
         return md + "\n"
 
 
+@dataclass
+class MultiSeriesTemporalResult:
+    """
+    Resultado da análise temporal de várias séries de uma vez.
+
+    Attributes:
+        series: Uma linha por série (tendência, autocorrelação, sazonalidade, anomalias)
+        anomaly_scores: Escores robustos (MAD) de cada ponto, mesmo formato da matriz
+        freq: Frequência da grade temporal (quando conhecida)
+        metadata: Metadados adicionais (dimensões, tempo de execução, parâmetros)
+    """
+    series: pd.DataFrame
+    anomaly_scores: pd.DataFrame
+    freq: Optional[str] = None
+    metadata: Dict = field(default_factory=dict)
+
+    def to_markdown(self, top: int = 10) -> str:
+        """Gera relatório resumido em Markdown (destaques entre as séries)."""
+        total = len(self.series)
+        md = "# Análise Temporal de Múltiplas Séries\n\n"
+        md += f"**Séries analisadas:** {total}\n\n"
+        md += f"**Períodos por série:** {self.metadata.get('periods', 0)}"
+        md += f" (frequência: {self.freq})\n\n" if self.freq else "\n\n"
+        if total == 0:
+            return md + "*Nenhuma série disponível*\n"
+
+        counts = self.series['trend'].value_counts()
+        md += "## Tendências\n\n"
+        for trend_type in TrendType:
+            md += f"- {trend_type.value.capitalize()}: {int(counts.get(trend_type.value, 0))}\n"
+
+        columns = ['trend', 'slope', 'r2_score', 'seasonality', 'seasonal_period', 'anomaly_count']
+        md += f"\n## Maiores Inclinações (top {top})\n\n"
+        ranked = self.series.reindex(self.series['slope'].abs().sort_values(ascending=False).index)
+        md += ranked[columns].head(top).to_markdown() + "\n"
+
+        seasonal = self.series[self.series['seasonality_detected']]
+        md += f"\n## Sazonalidade\n\n**Séries sazonais:** {len(seasonal)} de {total}\n\n"
+        if not seasonal.empty:
+            strongest = seasonal.sort_values('seasonality_strength', ascending=False)
+            md += strongest[['seasonality', 'seasonal_period', 'seasonality_strength']].head(top).to_markdown() + "\n"
+
+        md += f"\n## Anomalias (MAD, threshold={self.metadata.get('anomaly_threshold')})\n\n"
+        flagged = self.series[self.series['anomaly_count'] > 0]
+        md += f"**Séries com anomalias:** {len(flagged)} de {total}\n\n"
+        if not flagged.empty:
+            worst = flagged.sort_values('anomaly_count', ascending=False)
+            md += worst[['anomaly_count', 'anomaly_percentage']].head(top).to_markdown() + "\n"
+        return md
+
+
 class TemporalAnalyzer:
     """
     Analisador avançado de séries temporais com múltiplas técnicas estatísticas.
     
     Implementa:
-    - Análise de tendência (regressão linear, polinomial)
-    - Detecção de sazonalidade
+    - Análise de tendência (mínimos quadrados em forma fechada)
+    - Detecção de sazonalidade (período dominante da autocorrelação via FFT)
     - Autocorrelação e dependência temporal
-    - Detecção de anomalias (z-score, IQR, isolation forest)
+    - Detecção de anomalias (z-score, IQR, MAD robusto)
+    - Análise vetorizada de múltiplas séries e reamostragem de timestamps
     - Interpretação contextualizada
     
     Exemplo:
         >>> analyzer = TemporalAnalyzer()
         >>> result = analyzer.analyze(df, 'timestamp_column')
         >>> print(result.to_markdown())
+        >>> multi = analyzer.analyze_many(df_nfe, 'data_emissao', ['valor_total'], group_col='uf')
+        >>> print(multi.series.head())
     """
     
+    # Parâmetros de sensibilidade da tendência
+    SLOPE_EPSILON = 0.01            # inclinação considerada praticamente nula
+    R2_TREND_MIN = 0.20             # mínimo de qualidade para considerar tendência linear
+    R2_SIGNIFICANT_MIN = 0.50       # mínimo para marcar significância da tendência
+    SLOPE_SIGNIFICANT_MIN = 0.05
+    # Limiares de autocorrelação
+    CYCLIC_THRESHOLD = 0.3          # |autocorr lag 1| acima disso indica dependência temporal
+    SEASONALITY_THRESHOLD = 0.4     # pico da autocorrelação acima disso indica sazonalidade
+    # Threshold padrão do escore MAD (Iglewicz-Hoaglin)
+    MAD_THRESHOLD = 3.5
+    
     def __init__(self, logger: Optional[logging.Logger] = None):
         """
         Inicializa o analisador temporal.
@@ -303,6 +409,162 @@ class TemporalAnalyzer:
         
         return result
     
+    def analyze_many(
+        self,
+        df: pd.DataFrame,
+        time_col: str,
+        value_cols: Optional[List[str]] = None,
+        group_col: Optional[str] = None,
+        freq: str = 'D',
+        agg: str = 'sum',
+        enable_advanced: bool = True,
+        anomaly_threshold: Optional[float] = None,
+        anomaly_window: Optional[int] = None,
+        dayfirst: bool = TemporalDetectionConfig.dayfirst
+    ) -> MultiSeriesTemporalResult:
+        """
+        Reamostra registros com timestamps irregulares e analisa todas as séries.
+        
+        Args:
+            df: Dados brutos (ex.: uma linha por NF-e)
+            time_col: Coluna de data/hora (ex.: 'data_emissao')
+            value_cols: Colunas numéricas (padrão: todas as numéricas)
+            group_col: Coluna que separa as séries (ex.: 'uf', 'cfop')
+            freq: Frequência da grade ('D', 'W', 'MS'...)
+            agg: Agregação por período ('sum', 'mean', 'count'...)
+            enable_advanced: Ativa detecção de sazonalidade
+            anomaly_threshold: Threshold do escore MAD (padrão: MAD_THRESHOLD)
+            anomaly_window: Janela móvel do MAD em períodos (None = série inteira)
+            dayfirst: Datas ambíguas (01/02/2024) com o dia primeiro
+            
+        Returns:
+            Resultado com uma linha por série
+        """
+        matrix = resample_series(
+            df, time_col, value_cols=value_cols, freq=freq,
+            group_col=group_col, agg=agg, dayfirst=dayfirst
+        )
+        result = self.analyze_matrix(
+            matrix, freq=freq, enable_advanced=enable_advanced,
+            anomaly_threshold=anomaly_threshold, anomaly_window=anomaly_window
+        )
+        result.metadata.update({
+            'time_column': time_col,
+            'group_column': group_col,
+            'aggregation': agg,
+            'source_rows': len(df)
+        })
+        return result
+    
+    def analyze_matrix(
+        self,
+        matrix: pd.DataFrame,
+        freq: Optional[str] = None,
+        enable_advanced: bool = True,
+        anomaly_threshold: Optional[float] = None,
+        anomaly_window: Optional[int] = None
+    ) -> MultiSeriesTemporalResult:
+        """
+        Analisa uma matriz larga (linhas = períodos, colunas = séries) de uma vez.
+        
+        Tendência, autocorrelação, período dominante e escores MAD são
+        calculados para todas as colunas com operações matriciais; ausentes
+        são tolerados por série. Anomalias são pontos cujo resíduo da
+        tendência tem |escore MAD| acima do threshold.
+        
+        Args:
+            matrix: Séries alinhadas (ex.: saída de ``resample_series``)
+            freq: Frequência da grade (inferida do índice quando possível)
+            enable_advanced: Ativa detecção de sazonalidade
+            anomaly_threshold: Threshold do escore MAD (padrão: MAD_THRESHOLD)
+            anomaly_window: Janela móvel do MAD em períodos (None = série inteira)
+            
+        Returns:
+            Resultado com uma linha por série
+        """
+        started = time.perf_counter()
+        threshold = self.MAD_THRESHOLD if anomaly_threshold is None else anomaly_threshold
+        frame = matrix.select_dtypes(include='number')
+        values = frame.to_numpy(dtype=np.float64)
+        n_periods = values.shape[0]
+        
+        if freq is None and isinstance(frame.index, pd.DatetimeIndex):
+            freq = frame.index.freqstr or (pd.infer_freq(frame.index) if n_periods >= 3 else None)
+        
+        # 1. Tendência (forma fechada) e classificação
+        fit = linear_trend(values)
+        trend = self._classify_trends(fit['slope'], fit['r2_score'])
+        residual = detrend(values, fit)
+        
+        # 2. Autocorrelação lag 1 (dependência temporal)
+        acf = fft_autocorrelation(values, max_lag=1)
+        lag1 = acf[1] if len(acf) > 1 else np.zeros(values.shape[1])
+        
+        series = pd.DataFrame({
+            'observations': fit['n'],
+            'mean': frame.mean().to_numpy(),
+            'std': frame.std().to_numpy(),
+            'trend': trend['type'],
+            'slope': trend['slope'],
+            'intercept': fit['intercept'],
+            'r2_score': fit['r2_score'],
+            'is_significant': trend['is_significant'],
+            'lag1': lag1,
+            'is_cyclic': np.abs(lag1) > self.CYCLIC_THRESHOLD,
+        }, index=frame.columns)
+        series.index.name = 'serie'
+        
+        # 3. Sazonalidade: pico da autocorrelação dos resíduos via FFT
+        if enable_advanced:
+            acf_residual = fft_autocorrelation(residual, max_lag=n_periods // 2)
+            periods, strengths = dominant_period(acf_residual)
+            step_days = 1.0
+            if isinstance(frame.index, pd.DatetimeIndex) and n_periods >= 2:
+                step_days = float(np.median(np.diff(frame.index.asi8))) / 86_400e9
+            detected, types = self._seasonality_labels(periods, strengths, step_days)
+            series['seasonality_detected'] = detected
+            series['seasonality'] = types
+            series['seasonal_period'] = periods
+            series['seasonality_strength'] = strengths
+        else:
+            series['seasonality_detected'] = False
+            series['seasonality'] = SeasonalityType.NENHUMA.value
+            series['seasonal_period'] = 0
+            series['seasonality_strength'] = 0.0
+        
+        # 4. Anomalias: escore MAD dos resíduos
+        scores = mad_scores(residual, window=anomaly_window)
+        with np.errstate(invalid='ignore'):
+            anomaly_count = (np.abs(scores) > threshold).sum(axis=0)
+        series['anomaly_count'] = anomaly_count
+        series['anomaly_percentage'] = np.where(fit['n'] > 0, anomaly_count / np.maximum(fit['n'], 1) * 100, 0.0)
+        
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        result = MultiSeriesTemporalResult(
+            series=series,
+            anomaly_scores=pd.DataFrame(scores, index=frame.index, columns=frame.columns),
+            freq=freq,
+            metadata={
+                'analysis_timestamp': datetime.now().isoformat(),
+                'series': values.shape[1],
+                'periods': n_periods,
+                'anomaly_method': 'mad',
+                'anomaly_threshold': threshold,
+                'anomaly_window': anomaly_window,
+                'advanced_enabled': enable_advanced,
+                'elapsed_ms': round(elapsed_ms, 2)
+            }
+        )
+        
+        self.logger.info({
+            'event': 'temporal_multi_analysis_completed',
+            'series': values.shape[1],
+            'periods': n_periods,
+            'elapsed_ms': round(elapsed_ms, 2)
+        })
+        
+        return result
+    
     def _empty_result(self, column_name: str) -> TemporalAnalysisResult:
         """Retorna resultado vazio para colunas inválidas."""
         return TemporalAnalysisResult(
@@ -329,49 +591,54 @@ class TemporalAnalyzer:
             self.logger.error(f"Erro ao calcular estatísticas descritivas: {e}")
             return {}
     
+    def _classify_trends(self, slope: np.ndarray, r2: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Classifica as tendências de várias séries de uma vez.
+
+        Considera ESTÁVEL se a inclinação for muito pequena ou se o ajuste
+        linear explicar pouco a variância (r² baixo); nesse caso a inclinação
+        é padronizada como 0.
+        """
+        stable = (np.abs(slope) < self.SLOPE_EPSILON) | (r2 < self.R2_TREND_MIN)
+        types = np.where(
+            stable,
+            TrendType.ESTAVEL.value,
+            np.where(slope > 0, TrendType.CRESCENTE.value, TrendType.DECRESCENTE.value)
+        )
+        return {
+            'type': types,
+            'slope': np.where(stable, 0.0, slope),
+            'is_significant': (np.abs(slope) >= self.SLOPE_SIGNIFICANT_MIN) & (r2 >= self.R2_SIGNIFICANT_MIN),
+        }
+    
+    def _seasonality_labels(self, periods: np.ndarray, strengths: np.ndarray,
+                            step_days: float = 1.0) -> Tuple[np.ndarray, List[str]]:
+        """Sazonalidade detectada e tipo de cada série a partir do pico da autocorrelação."""
+        detected = (periods > 0) & (strengths > self.SEASONALITY_THRESHOLD)
+        types = [
+            seasonality_type_for_period(period * step_days).value if is_seasonal
+            else SeasonalityType.NENHUMA.value
+            for period, is_seasonal in zip(periods, detected)
+        ]
+        return detected, types
+    
     def _analyze_trend(self, serie: pd.Series) -> Dict:
         """
-        Analisa tendência usando regressão linear.
+        Analisa tendência usando regressão linear (forma fechada).
         
         Returns:
             Dicionário com tipo de tendência, slope, R² score
         """
         try:
-            from sklearn.linear_model import LinearRegression
-            from sklearn.metrics import r2_score
-            
-            X = np.arange(len(serie)).reshape(-1, 1)
-            y = serie.values.reshape(-1, 1)
-            
-            model = LinearRegression().fit(X, y)
-            slope = float(model.coef_[0][0])
-            y_pred = model.predict(X)
-            r2 = float(r2_score(y, y_pred))
-            
-            # Parâmetros de sensibilidade
-            slope_epsilon = 0.01  # inclinação considerada praticamente nula
-            r2_trend_min = 0.20   # mínimo de qualidade para considerar tendência linear
-            r2_significant_min = 0.50  # mínimo para marcar significância da tendência
-            slope_significant_min = 0.05
-
-            # Classificar tendência: considerar ESTÁVEL se a inclinação for muito pequena
-            # ou se o ajuste linear explicar pouco a variância (r² baixo)
-            if abs(slope) < slope_epsilon or r2 < r2_trend_min:
-                trend_type = TrendType.ESTAVEL
-                slope_out = 0.0  # padroniza como 0 para séries estáveis
-            elif slope > 0:
-                trend_type = TrendType.CRESCENTE
-                slope_out = slope
-            else:
-                trend_type = TrendType.DECRESCENTE
-                slope_out = slope
+            fit = linear_trend(serie.to_numpy(dtype=np.float64))
+            trend = self._classify_trends(fit['slope'], fit['r2_score'])
             
             return {
-                'type': trend_type.value,
-                'slope': slope_out if 'slope_out' in locals() else slope,
-                'intercept': float(model.intercept_[0]),
-                'r2_score': r2,
-                'is_significant': (abs(slope) >= slope_significant_min) and (r2 >= r2_significant_min)
+                'type': str(trend['type'][0]),
+                'slope': float(trend['slope'][0]),
+                'intercept': float(fit['intercept'][0]),
+                'r2_score': float(fit['r2_score'][0]),
+                'is_significant': bool(trend['is_significant'][0])
             }
         except Exception as e:
             self.logger.error(f"Erro na análise de tendência: {e}")
@@ -385,13 +652,14 @@ class TemporalAnalyzer:
             Dicionário com autocorrelação lag1 e flag de ciclo
         """
         try:
-            autocorr_lag1 = float(serie.autocorr(lag=1))
-            is_cyclic = abs(autocorr_lag1) > 0.3
+            acf = fft_autocorrelation(serie.to_numpy(dtype=np.float64), max_lag=1)
+            autocorr_lag1 = float(acf[1, 0]) if len(acf) > 1 else 0.0
+            is_cyclic = abs(autocorr_lag1) > self.CYCLIC_THRESHOLD
             
             return {
                 'lag1': autocorr_lag1,
                 'is_cyclic': is_cyclic,
-                'threshold': 0.3
+                'threshold': self.CYCLIC_THRESHOLD
             }
         except Exception as e:
             self.logger.error(f"Erro na análise de autocorrelação: {e}")
@@ -399,41 +667,29 @@ class TemporalAnalyzer:
     
     def _detect_seasonality(self, serie: pd.Series) -> Dict:
         """
-        Detecta sazonalidade usando análise espectral ou decomposição.
+        Detecta sazonalidade pelo período dominante da autocorrelação.
         
-        NOTA: Implementação simplificada. Para produção, usar statsmodels.seasonal_decompose
+        A série é descontada da tendência linear (senão a própria tendência
+        gera autocorrelação alta em qualquer defasagem) e a autocorrelação de
+        todas as defasagens até metade da série é calculada via FFT; o maior
+        pico local define o período, associado ao ciclo de calendário mais
+        próximo (um ponto por dia).
         
         Returns:
-            Dicionário com tipo e força da sazonalidade
+            Dicionário com tipo, força e período da sazonalidade
         """
         try:
-            # Implementação simplificada: verificar periodicidade via autocorrelação
-            # Para análise completa, usar: from statsmodels.tsa.seasonal import seasonal_decompose
-            
-            # Testar autocorrelação em múltiplos lags comuns
-            lags_to_test = {
-                7: SeasonalityType.SEMANAL,
-                30: SeasonalityType.MENSAL,
-                365: SeasonalityType.ANUAL
-            }
-            
-            max_autocorr = 0
-            detected_type = SeasonalityType.NENHUMA
-            
-            for lag, season_type in lags_to_test.items():
-                if len(serie) > lag * 2:  # Precisa de dados suficientes
-                    autocorr = abs(serie.autocorr(lag=lag))
-                    if autocorr > max_autocorr:
-                        max_autocorr = autocorr
-                        detected_type = season_type
-            
-            is_seasonal = max_autocorr > 0.4
+            values = serie.to_numpy(dtype=np.float64)
+            acf = fft_autocorrelation(detrend(values), max_lag=len(values) // 2)
+            periods, strengths = dominant_period(acf)
+            detected, types = self._seasonality_labels(periods, strengths)
             
             return {
-                'detected': is_seasonal,
-                'type': detected_type.value if is_seasonal else SeasonalityType.NENHUMA.value,
-                'strength': max_autocorr,
-                'threshold': 0.4
+                'detected': bool(detected[0]),
+                'type': types[0],
+                'strength': float(strengths[0]),
+                'period': int(periods[0]),
+                'threshold': self.SEASONALITY_THRESHOLD
             }
         except Exception as e:
             self.logger.error(f"Erro na detecção de sazonalidade: {e}")
@@ -445,7 +701,7 @@ class TemporalAnalyzer:
         
         Args:
             serie: Série temporal a analisar
-            method: Método de detecção ('z-score', 'iqr')
+            method: Método de detecção ('z-score', 'mad', 'iqr')
             threshold: Threshold para classificação (padrão: 3 para z-score)
             
         Returns:
@@ -465,6 +721,11 @@ class TemporalAnalyzer:
                 
                 anomaly_indices = np.where(np.abs(zscore) > threshold)[0]
                 
+            elif method == 'mad':
+                # Escore robusto (mediana/MAD) sobre os próprios valores
+                scores = mad_scores(serie.to_numpy(dtype=np.float64))[:, 0]
+                anomaly_indices = np.where(np.abs(scores) > threshold)[0]
+                
             elif method == 'iqr':
                 # Método IQR (Interquartile Range)
                 Q1 = serie.quantile(0.25)
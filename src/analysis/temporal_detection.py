@@ -5,20 +5,225 @@ Este módulo implementa heurísticas flexíveis e extensíveis para identificar
 colunas que representam dimensões temporais, suportando múltiplos formatos,
 tipos de dados e convenções de nomenclatura.
 
+Colunas texto são avaliadas numa amostra determinística (posições
+igualmente espaçadas): uma impressão digital por regex identifica o formato
+(ISO 8601, dd/mm/aaaa, aaaammdd...) e encerra cedo colunas que não parecem
+datas, sem chamar ``pd.to_datetime``. O formato detectado é reaproveitado
+em ``parse_column`` numa única conversão vetorizada com ``format=``
+explícito, e os resultados ficam em cache por (impressão do dataset, coluna).
+
 Autor: EDA AI Minds Team
 Data: 2025-10-16
-Versão: 2.0.0
+Versão: 3.0.0
 """
 
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Set, Tuple
+from typing import Hashable, List, Dict, Optional, Set, Tuple
 from enum import Enum
+import copy
+import hashlib
+import re
+import threading
+import warnings
 import pandas as pd
 import numpy as np
 import logging
 from datetime import datetime
 
 
+# Sufixos de hora aceitos nos formatos numéricos: (regex, diretivas)
+_TIME_VARIANTS = (
+    (r'', ''),
+    (r' \d{1,2}:\d{2}', ' %H:%M'),
+    (r' \d{1,2}:\d{2}:\d{2}', ' %H:%M:%S'),
+)
+# ISO 8601 (data, data e hora com ' ' ou 'T', fração de segundo e fuso)
+_ISO_PATTERN = r'\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?(?:Z|[+-]\d{2}:?\d{2})?'
+
+# Padrão frouxo: valores que um parser genérico ainda poderia reconhecer como data
+_LOOSE_DATE_PATTERN = re.compile(
+    r'\d{1,4}[-/.]\d{1,2}|\d{1,2}:\d{2}|^\d{8}$|[A-Za-z]{3,}\.?,?\s+\d|\d\s+[A-Za-z]{3,}'
+)
+
+# Campos de data/hora de largura fixa: diretiva -> (componente, dígitos)
+_FIELD_WIDTHS = {
+    '%Y': ('year', 4), '%m': ('month', 2), '%d': ('day', 2),
+    '%H': ('hour', 2), '%M': ('minute', 2), '%S': ('second', 2),
+}
+
+# Valores não nulos da amostra inspecionados pela impressão digital antes de decidir o formato
+FINGERPRINT_PROBE_VALUES = 64
+
+
+def _format_candidates() -> List[Tuple[re.Pattern, str]]:
+    """Candidatos (regex do valor inteiro, formato) na ordem em que são testados.
+
+    Formatos dd/mm/aaaa são escritos com o dia primeiro; ``_resolve_day_month``
+    troca para mês/dia quando os valores amostrados indicam isso.
+    """
+    candidates = [(re.compile(_ISO_PATTERN), 'ISO8601')]
+    for time_regex, time_format in _TIME_VARIANTS:
+        for separator in ('/', '-', '.'):
+            sep = re.escape(separator)
+            candidates.append((
+                re.compile(rf'\d{{1,2}}{sep}\d{{1,2}}{sep}\d{{4}}{time_regex}'),
+                f'%d{separator}%m{separator}%Y{time_format}'
+            ))
+        candidates.append((re.compile(rf'\d{{4}}/\d{{1,2}}/\d{{1,2}}{time_regex}'), f'%Y/%m/%d{time_format}'))
+    candidates.append((re.compile(r'\d{8}'), '%Y%m%d'))
+    return candidates
+
+
+_FORMAT_CANDIDATES = _format_candidates()
+
+
+def _fixed_width_layout(fmt: str) -> Optional[Tuple[Dict, List, int]]:
+    """Posição/largura de cada campo e literais de um formato de largura fixa (None se não for)."""
+    fields, literals, pos, i = {}, [], 0, 0
+    while i < len(fmt):
+        token = fmt[i:i + 2]
+        if token in _FIELD_WIDTHS:
+            name, width = _FIELD_WIDTHS[token]
+            fields[name] = (pos, width)
+            pos += width
+            i += 2
+        elif fmt[i] == '%':
+            return None
+        else:
+            literals.append((pos, ord(fmt[i])))
+            pos += 1
+            i += 1
+    return fields, literals, pos
+
+
+def _parse_fixed_width(series: pd.Series, fmt: str) -> Optional[pd.Series]:
+    """
+    Converte texto de largura fixa (ex.: '05/01/2024 10:22:00') sem strptime.
+
+    Os valores viram uma matriz de códigos de caractere; dígitos e
+    separadores são validados por posição e os campos montam o datetime64
+    com aritmética NumPy (dias inválidos como 31/02 viram NaT). Valores fora
+    da largura do formato (ex.: sem zero à esquerda) seguem pelo
+    ``pd.to_datetime(format=...)``. Retorna None para formatos sem dia/mês/ano
+    de largura fixa.
+    """
+    layout = _fixed_width_layout(fmt)
+    if layout is None or not {'year', 'month', 'day'} <= set(layout[0]):
+        return None
+    fields, literals, width = layout
+    present = np.flatnonzero(series.notna().to_numpy())
+    # Uma posição extra revela valores mais longos que o formato
+    codes = series.iloc[present].astype(str).to_numpy(dtype=f'U{width + 1}')
+    codes = codes.view(np.uint32).reshape(-1, width + 1).astype(np.int32)
+    ok = (codes[:, width] == 0) & (codes[:, width - 1] != 0)
+    for pos, char in literals:
+        ok &= codes[:, pos] == char
+    digits = codes - 48
+    parts = {}
+    for name, (pos, w) in fields.items():
+        block = digits[:, pos:pos + w]
+        ok &= ((block >= 0) & (block <= 9)).all(axis=1)
+        parts[name] = block @ (10 ** np.arange(w - 1, -1, -1))
+    zeros = np.zeros(len(codes), dtype=np.int64)
+    hour, minute, second = (parts.get(name, zeros) for name in ('hour', 'minute', 'second'))
+    month_index = (parts['year'] - 1970) * 12 + parts['month'] - 1
+    ok &= (parts['month'] >= 1) & (parts['month'] <= 12) & (parts['day'] >= 1)
+    ok &= (hour < 24) & (minute < 60) & (second < 60)
+    month_start = np.where(ok, month_index, 0).astype('datetime64[M]').astype('datetime64[D]')
+    month_days = ((month_start.astype('datetime64[M]') + 1).astype('datetime64[D]') - month_start).astype(np.int64)
+    ok &= parts['day'] <= month_days
+    stamps = (
+        month_start.astype('datetime64[ns]')
+        + ((parts['day'] - 1) * 86400 + hour * 3600 + minute * 60 + second) * np.timedelta64(1, 's')
+    )
+    result = np.full(len(series), np.datetime64('NaT'), dtype='datetime64[ns]')
+    result[present[ok]] = stamps[ok]
+    slow = present[~ok]
+    if slow.size:
+        result[slow] = pd.to_datetime(series.iloc[slow], format=fmt, errors='coerce').to_numpy()
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+def sample_positions(length: int, sample_size: int) -> np.ndarray:
+    """Posições igualmente espaçadas (inclui primeira e última linha); determinístico."""
+    if length <= sample_size:
+        return np.arange(length)
+    return np.unique(np.linspace(0, length - 1, sample_size).round().astype(np.int64))
+
+
+def dataset_fingerprint(df: pd.DataFrame, sample_size: int = 2000) -> str:
+    """
+    Impressão digital barata de um DataFrame: formato, colunas, dtypes e o
+    hash das linhas amostradas.
+
+    Alterações fora das linhas amostradas não mudam a impressão; quem tem
+    uma identidade mais forte (ex.: ``file_fingerprint`` do CSV de origem)
+    deve passá-la em ``detect(..., fingerprint=...)``.
+    """
+    digest = hashlib.sha1()
+    digest.update(repr((df.shape, [(str(col), str(dtype)) for col, dtype in df.dtypes.items()])).encode())
+    if len(df) and len(df.columns):
+        sample = df.iloc[sample_positions(len(df), sample_size)]
+        try:
+            digest.update(pd.util.hash_pandas_object(sample, index=True).to_numpy().tobytes())
+        except TypeError:
+            # Valores não hasheáveis (listas, dicts): usa a representação textual
+            digest.update(sample.astype(str).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class DetectionCache:
+    """
+    Cache LRU de resultados de detecção por (impressão do dataset, coluna, configuração).
+
+    Args:
+        max_entries: Número máximo de resultados guardados
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple, DetectionResult]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional['DetectionResult']:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(result)
+
+    def put(self, key: Tuple, result: 'DetectionResult') -> None:
+        with self._lock:
+            self._entries[key] = copy.deepcopy(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Cache compartilhado entre detectores (requisições repetidas sobre o mesmo dataset)
+_shared_cache = DetectionCache()
+
+
+def get_detection_cache() -> DetectionCache:
+    """Cache de detecção compartilhado pelo processo."""
+    return _shared_cache
+
+
 class DetectionMethod(Enum):
     """Métodos de detecção de colunas temporais."""
     OVERRIDE_MANUAL = "override_manual"
@@ -40,6 +245,10 @@ class TemporalDetectionConfig:
         numeric_sequence_threshold: Threshold para detectar sequências numéricas temporais
         enable_aggressive_detection: Ativa heurísticas mais agressivas de detecção
         excluded_patterns: Padrões de nomes a excluir da detecção
+        sample_size: Linhas amostradas (igualmente espaçadas) para avaliar colunas texto
+        dayfirst: Lê datas ambíguas como 01/02/2025 com o dia primeiro (padrão
+            brasileiro); False assume mês/dia. Um campo > 12 decide pelos dados
+        cache_results: Guarda resultados por (impressão do dataset, coluna)
     """
     common_names: List[str] = field(default_factory=lambda: [
         "time", "date", "datetime", "timestamp", "data", "hora",
@@ -52,6 +261,17 @@ class TemporalDetectionConfig:
     excluded_patterns: Set[str] = field(default_factory=lambda: {
         "id", "class", "label", "target", "amount", "value", "v1", "v2", "v3"
     })
+    sample_size: int = 2000
+    dayfirst: bool = True
+    cache_results: bool = True
+    
+    def cache_key(self) -> Tuple:
+        """Parâmetros que afetam o resultado da detecção (parte da chave do cache)."""
+        return (
+            tuple(self.common_names), self.conversion_threshold, self.min_unique_ratio,
+            self.numeric_sequence_threshold, self.enable_aggressive_detection,
+            tuple(sorted(self.excluded_patterns)), self.sample_size, self.dayfirst
+        )
 
 
 @dataclass
@@ -93,20 +313,27 @@ class TemporalColumnDetector:
         >>> temporal_cols = detector.get_detected_columns(results)
     """
     
-    def __init__(self, config: Optional[TemporalDetectionConfig] = None):
+    def __init__(
+        self,
+        config: Optional[TemporalDetectionConfig] = None,
+        cache: Optional[DetectionCache] = None
+    ):
         """
         Inicializa o detector com configuração customizável.
         
         Args:
             config: Configuração de detecção (usa defaults se None)
+            cache: Cache de resultados (usa o compartilhado do processo se None)
         """
         self.config = config or TemporalDetectionConfig()
+        self.cache = cache if cache is not None else get_detection_cache()
         self.logger = logging.getLogger(__name__)
         
     def detect(
         self,
         df: pd.DataFrame,
-        override_column: Optional[str] = None
+        override_column: Optional[str] = None,
+        fingerprint: Optional[Hashable] = None
     ) -> List[DetectionResult]:
         """
         Executa detecção completa de colunas temporais no DataFrame.
@@ -114,6 +341,8 @@ class TemporalColumnDetector:
         Args:
             df: DataFrame a analisar
             override_column: Coluna específica a forçar como temporal
+            fingerprint: Identidade do dataset para o cache (ex.: ``file_fingerprint``
+                do CSV); calculada a partir de uma amostra das linhas se None
             
         Returns:
             Lista de resultados de detecção para cada coluna analisada
@@ -150,8 +379,21 @@ class TemporalColumnDetector:
             return results
         
         # 2-5. Detecção automática para todas as colunas
+        use_cache = self.config.cache_results and len(df.columns) > 0
+        if use_cache and fingerprint is None:
+            fingerprint = dataset_fingerprint(df, self.config.sample_size)
+        config_key = self.config.cache_key()
+        cache_hits = 0
+        
         for col in df.columns:
-            result = self._detect_single_column(df, col)
+            key = (fingerprint, col, config_key)
+            result = self.cache.get(key) if use_cache else None
+            if result is None:
+                result = self._detect_single_column(df, col)
+                if use_cache:
+                    self.cache.put(key, result)
+            else:
+                cache_hits += 1
             results.append(result)
             
             if result.detected:
@@ -166,7 +408,8 @@ class TemporalColumnDetector:
         self.logger.info({
             'event': 'detection_completed',
             'total_columns': len(df.columns),
-            'detected': detected_count
+            'detected': detected_count,
+            'cache_hits': cache_hits
         })
         
         return results
@@ -282,19 +525,50 @@ class TemporalColumnDetector:
     
     def _try_datetime_conversion(self, series: pd.Series) -> Dict:
         """
-        Tenta converter série para datetime e retorna estatísticas.
+        Avalia se uma coluna texto é temporal usando uma amostra determinística.
+        
+        A impressão digital (regex) escolhe o formato e a amostra é convertida
+        com ``format=`` explícito. Quando nenhum valor lembra uma data, a
+        coluna é descartada sem chamar ``pd.to_datetime``; formatos fora da
+        tabela caem na inferência do pandas, também só sobre a amostra.
         
         Args:
             series: Série pandas a converter
             
         Returns:
-            Dicionário com resultado da conversão e estatísticas
+            Dicionário com resultado da conversão, formato e estatísticas
         """
         try:
-            # infer_datetime_format está deprecado; comportamento estrito é default
-            converted = pd.to_datetime(series, errors='coerce')
-            valid_ratio = converted.notna().mean()
-            unique_ratio = converted.nunique() / len(converted)
+            sample = series.iloc[sample_positions(len(series), self.config.sample_size)]
+            total = len(sample)
+            stats = {
+                'total_values': len(series),
+                'sample_size': total,
+                'sampled': total < len(series),
+                'format': None
+            }
+            text = sample.dropna().astype(str).str.strip()
+            if total == 0 or text.empty:
+                return {**stats, 'success': False, 'confidence': 0.0, 'valid_ratio': 0.0,
+                        'reason': 'no_values'}
+            
+            fmt = self._fingerprint_format(text)
+            if fmt is None:
+                # Saída antecipada: nem o padrão frouxo atinge o threshold
+                plausible = text.str.contains(_LOOSE_DATE_PATTERN).sum() / total
+                if plausible < self.config.conversion_threshold:
+                    return {**stats, 'success': False, 'confidence': 0.0, 'valid_ratio': 0.0,
+                            'reason': 'fingerprint_mismatch'}
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore', UserWarning)  # "Could not infer format"
+                    converted = pd.to_datetime(sample, errors='coerce', dayfirst=self.config.dayfirst)
+            else:
+                converted = pd.to_datetime(sample, format=fmt, errors='coerce')
+            
+            valid_ratio = float(converted.notna().mean())
+            # Distintos da coluna inteira (hash dos valores brutos): a amostra superestimaria a razão
+            unique_values = int(series.nunique()) if valid_ratio >= self.config.conversion_threshold else converted.nunique()
+            unique_ratio = unique_values / len(series)
             
             success = (
                 valid_ratio >= self.config.conversion_threshold and
@@ -305,13 +579,14 @@ class TemporalColumnDetector:
             confidence = 0.75 * valid_ratio if success else 0.0
             
             return {
+                **stats,
                 'success': success,
+                'format': fmt,
                 'valid_ratio': valid_ratio,
                 'unique_ratio': unique_ratio,
                 'confidence': confidence,
-                'total_values': len(series),
-                'valid_values': int(converted.notna().sum()),
-                'unique_values': converted.nunique()
+                'valid_values': int(round(valid_ratio * len(series))),
+                'unique_values': unique_values
             }
         except Exception as e:
             self.logger.debug(f"Conversão datetime falhou para coluna: {e}")
@@ -321,6 +596,68 @@ class TemporalColumnDetector:
                 'confidence': 0.0
             }
     
+    def _fingerprint_format(self, text: pd.Series) -> Optional[str]:
+        """
+        Formato explícito dos valores (sem nulos) pela impressão digital por regex.
+        
+        Os candidatos são testados primeiro nos ``FINGERPRINT_PROBE_VALUES``
+        valores iniciais; só o que casa com eles é confirmado no restante da
+        amostra. Retorna None se nenhum candidato cobrir o threshold.
+        """
+        probe = text.iloc[:FINGERPRINT_PROBE_VALUES]
+        for pattern, fmt in _FORMAT_CANDIDATES:
+            if probe.str.fullmatch(pattern).mean() < self.config.conversion_threshold:
+                continue
+            matches = text.str.fullmatch(pattern)
+            if matches.mean() >= self.config.conversion_threshold:
+                return self._resolve_day_month(text[matches], fmt)
+        return None
+    
+    def _resolve_day_month(self, text: pd.Series, fmt: str) -> str:
+        """Decide entre dia/mês e mês/dia: um campo > 12 só pode ser o dia."""
+        if not fmt.startswith('%d'):
+            return fmt
+        fields = text.str.extract(r'^(\d{1,2})\D(\d{1,2})\D').astype(int)
+        if (fields[0] > 12).any():
+            return fmt
+        if (fields[1] > 12).any() or not self.config.dayfirst:
+            # '%d<sep>%m<sep>...' -> '%m<sep>%d<sep>...'
+            return '%m' + fmt[2] + '%d' + fmt[5:]
+        return fmt
+    
+    def parse_column(self, series: pd.Series, result: Optional[DetectionResult] = None) -> pd.Series:
+        """
+        Converte uma coluna temporal para datetime numa única passada vetorizada.
+        
+        Reaproveita o formato detectado (``result.conversion_stats['format']``)
+        ou o detecta na amostra; valores fora do formato viram NaT. Sequências
+        numéricas são tratadas como timestamps Unix (segundos); colunas
+        detectadas só pelo nome voltam inalteradas.
+        
+        Args:
+            series: Coluna a converter
+            result: Resultado da detecção desta coluna (opcional)
+            
+        Returns:
+            Série convertida
+        """
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        if result is not None and result.method == DetectionMethod.NUMERIC_SEQUENCE:
+            return pd.to_datetime(series, unit='s', errors='coerce')
+        if pd.api.types.is_numeric_dtype(series):
+            return series
+        if result is not None and result.conversion_stats:
+            fmt = result.conversion_stats.get('format')
+        else:
+            fmt = self._try_datetime_conversion(series).get('format')
+        if fmt is not None:
+            parsed = _parse_fixed_width(series, fmt) if fmt != 'ISO8601' else None
+            return parsed if parsed is not None else pd.to_datetime(series, format=fmt, errors='coerce')
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            return pd.to_datetime(series, errors='coerce', dayfirst=self.config.dayfirst)
+    
     def _analyze_numeric_sequence(self, series: pd.Series) -> Dict:
         """
         Analisa se uma série numérica representa uma sequência temporal.
@@ -0,0 +1,351 @@
+"""
+Núcleo Vetorizado de Séries Temporais - Tendência, ACF via FFT e MAD
+
+Funções que operam sobre uma matriz larga (linhas = instantes, colunas =
+séries) e resolvem todas as séries de uma vez, sem laços Python por coluna:
+
+- ``linear_trend``: mínimos quadrados em forma fechada (inclinação,
+  intercepto e R²) com somas centradas, tolerando ausentes por série;
+- ``fft_autocorrelation``: autocorrelação completa via FFT (O(T log T) por
+  série), tolerando ausentes;
+- ``dominant_period``: primeiro pico dominante da autocorrelação;
+- ``mad_scores``: escore robusto 0,6745·(x - mediana) / MAD, global ou em
+  janela móvel;
+- ``resample_series``: agrega timestamps irregulares (ex.: ``data_emissao``
+  das NF-e) em uma grade regular, opcionalmente uma série por grupo
+  (UF, CFOP...).
+
+Autor: EDA AI Minds Team
+Data: 2025-10-19
+Versão: 3.0.0
+"""
+
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from pandas.tseries.offsets import Tick
+
+from .temporal_detection import TemporalColumnDetector, TemporalDetectionConfig
+
+
+# Constante de consistência do MAD com o desvio padrão da normal
+MAD_CONSISTENCY = 0.6745
+
+# Abaixo deste número de defasagens a autocorrelação é calculada diretamente
+DIRECT_ACF_MAX_LAG = 16
+
+# Agregações em que um período sem registros vale 0 (e não ausente)
+ZERO_FILL_AGGREGATIONS = frozenset({'sum', 'count', 'size', 'nunique'})
+
+# Agregações resolvidas por np.bincount em frequências fixas
+BINCOUNT_AGGREGATIONS = frozenset({'sum', 'count', 'mean'})
+
+
+def _as_matrix(values: Union[np.ndarray, pd.DataFrame, pd.Series]) -> np.ndarray:
+    """Converte a entrada em matriz float64 (T × N)."""
+    matrix = np.asarray(values, dtype=np.float64)
+    return matrix.reshape(-1, 1) if matrix.ndim == 1 else matrix
+
+
+def linear_trend(values: Union[np.ndarray, pd.DataFrame]) -> Dict[str, np.ndarray]:
+    """
+    Regressão linear de cada série contra a posição no tempo (forma fechada).
+
+    slope = Σ(t - t̄)(y - ȳ) / Σ(t - t̄)², R² = Sxy² / (Sxx · Syy), com as
+    médias calculadas só sobre os pontos válidos de cada série. Série
+    constante tem R² = 1 (ajuste perfeito), como no ``r2_score`` do sklearn.
+
+    Returns:
+        Dicionário com arrays ``slope``, ``intercept``, ``r2_score`` e ``n``
+    """
+    y = _as_matrix(values)
+    mask = ~np.isnan(y)
+    n = mask.sum(axis=0)
+    t = np.arange(y.shape[0], dtype=np.float64)[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t_mean = np.where(mask, t, 0.0).sum(axis=0) / n
+        y_mean = np.where(mask, y, 0.0).sum(axis=0) / n
+        dt = np.where(mask, t - t_mean, 0.0)
+        dy = np.where(mask, y - y_mean, 0.0)
+        sxx = np.einsum('ij,ij->j', dt, dt)
+        sxy = np.einsum('ij,ij->j', dt, dy)
+        syy = np.einsum('ij,ij->j', dy, dy)
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+        r2 = np.where(syy > 0, (sxy * sxy) / (sxx * syy), 1.0)
+    r2 = np.where(sxx > 0, r2, np.where(syy > 0, 0.0, 1.0))
+    intercept = y_mean - slope * t_mean
+    return {
+        'slope': slope,
+        'intercept': np.nan_to_num(intercept),
+        'r2_score': np.clip(np.nan_to_num(r2), 0.0, 1.0),
+        'n': n,
+    }
+
+
+def detrend(values: Union[np.ndarray, pd.DataFrame], trend: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+    """Resíduos de cada série em relação à sua reta de tendência (ausentes preservados)."""
+    y = _as_matrix(values)
+    trend = trend if trend is not None else linear_trend(y)
+    t = np.arange(y.shape[0], dtype=np.float64)[:, None]
+    return y - (trend['intercept'] + trend['slope'] * t)
+
+
+def fft_autocorrelation(values: Union[np.ndarray, pd.DataFrame], max_lag: Optional[int] = None) -> np.ndarray:
+    """
+    Autocorrelação de todas as defasagens 0..max_lag de cada série via FFT.
+
+    Estimador usual (viesado): a autocovariância de cada defasagem é
+    dividida pela variância, sem corrigir pelo número de pares, o que
+    atenua defasagens longas (estimadas com poucos pares). Ausentes entram
+    como zero depois de centralizar a série. Séries sem variância resultam
+    em autocorrelação zero.
+
+    Args:
+        values: Matriz T × N (ou série única)
+        max_lag: Maior defasagem (padrão: T - 1)
+
+    Returns:
+        Matriz (max_lag + 1) × N; a linha 0 vale 1 para séries com variância
+    """
+    y = _as_matrix(values)
+    length = y.shape[0]
+    max_lag = length - 1 if max_lag is None else min(max_lag, length - 1)
+    if length == 0 or max_lag < 0:
+        return np.zeros((0, y.shape[1]))
+
+    mask = ~np.isnan(y)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centered = np.where(mask, y - np.nanmean(np.where(mask, y, np.nan), axis=0), 0.0)
+
+    if max_lag < DIRECT_ACF_MAX_LAG:
+        # Poucas defasagens: produtos diretos custam O(T · lags), menos que a FFT
+        acov = np.stack([
+            np.einsum('ij,ij->j', centered[lag:], centered[:length - lag]) for lag in range(max_lag + 1)
+        ])
+    else:
+        # Séries em linhas contíguas; potência de 2 ≥ 2T - 1 evita a sobreposição circular
+        nfft = 1 << int(2 * length - 1).bit_length()
+        spectrum = np.fft.rfft(np.ascontiguousarray(centered.T), n=nfft, axis=1)
+        acov = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=nfft, axis=1)[:, :max_lag + 1].T
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        acf = acov / acov[0]
+    # Série constante: a energia centrada é só erro de arredondamento
+    energy = np.einsum('ij,ij->j', centered, centered)
+    filled = np.where(mask, y, 0.0)
+    scale = np.einsum('ij,ij->j', filled, filled)
+    acf[:, ~(energy > 1e-20 * scale)] = 0.0
+    return np.clip(np.nan_to_num(acf), -1.0, 1.0)
+
+
+def dominant_period(acf: np.ndarray, min_lag: int = 2, peak_tolerance: float = 0.8,
+                    min_prominence: float = 0.1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Período dominante de cada série: a menor defasagem cujo pico local
+    positivo alcança ``peak_tolerance`` × o maior pico.
+
+    Um pico só conta se subir ao menos ``min_prominence`` acima do menor
+    valor anterior da autocorrelação; isso descarta as oscilações de ruído
+    no decaimento lento de séries suaves, que não são ciclos.
+
+    A busca cobre todas as linhas de ``acf``; calcule-a com ``max_lag`` em
+    torno de T/2, pois acima disso há poucos pares para uma estimativa
+    confiável.
+
+    Returns:
+        (períodos, forças); período 0 e força 0 quando não há pico
+    """
+    if acf.shape[0] < min_lag + 2:
+        zeros = np.zeros(acf.shape[1])
+        return zeros.astype(np.int64), zeros
+    center = acf[min_lag:-1]
+    trough = np.minimum.accumulate(acf, axis=0)[min_lag - 1:-2]
+    peaks = (
+        (center > acf[min_lag - 1:-2]) & (center >= acf[min_lag + 1:]) & (center > 0)
+        & (center - trough >= min_prominence)
+    )
+    strongest = np.where(peaks, center, -np.inf).max(axis=0)
+    # Múltiplos do período verdadeiro têm picos quase iguais: fica o menor
+    eligible = peaks & (center >= peak_tolerance * strongest)
+    best = np.argmax(eligible, axis=0)
+    found = eligible.any(axis=0)
+    strength = center[best, np.arange(acf.shape[1])]
+    periods = np.where(found, best + min_lag, 0).astype(np.int64)
+    return periods, np.where(found, strength, 0.0)
+
+
+def _column_nanmedian(y: np.ndarray) -> np.ndarray:
+    """Mediana de cada coluna ignorando ausentes (uma ordenação, sem laço por coluna)."""
+    n = (~np.isnan(y)).sum(axis=0)
+    if y.shape[0] == 0:
+        return np.full(y.shape[1], np.nan)
+    ordered = np.sort(y, axis=0)  # ausentes ficam no fim
+    columns = np.arange(y.shape[1])
+    low = ordered[np.maximum((n - 1) // 2, 0), columns]
+    high = ordered[np.minimum(n // 2, y.shape[0] - 1), columns]
+    return np.where(n > 0, (low + high) / 2, np.nan)
+
+
+def mad_scores(values: Union[np.ndarray, pd.DataFrame], window: Optional[int] = None) -> np.ndarray:
+    """
+    Escore robusto de cada ponto: 0,6745 · (x - mediana) / MAD.
+
+    Com ``window`` a mediana e o MAD são móveis (janela centrada), o que
+    acompanha mudanças de nível; sem ela são os da série inteira. Quando o
+    MAD é zero (mais da metade dos pontos iguais), usa-se o desvio absoluto
+    médio × 1,2533 e, se também for zero, o escore é zero.
+    """
+    y = _as_matrix(values)
+    if window:
+        frame = pd.DataFrame(y)
+        rolling = dict(window=window, min_periods=max(1, window // 2), center=True)
+        median = frame.rolling(**rolling).median().to_numpy()
+        deviation = np.abs(y - median)
+        mad = pd.DataFrame(deviation).rolling(**rolling).median().to_numpy()
+        mean_ad = pd.DataFrame(deviation).rolling(**rolling).mean().to_numpy()
+    else:
+        median = _column_nanmedian(y)
+        deviation = np.abs(y - median)
+        mad = _column_nanmedian(deviation)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_ad = np.nansum(deviation, axis=0) / (~np.isnan(deviation)).sum(axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scale = np.where(mad > 0, mad / MAD_CONSISTENCY, mean_ad * 1.2533)
+        scores = np.where(scale > 0, (y - median) / scale, 0.0)
+    return np.where(np.isnan(y), np.nan, np.nan_to_num(scores, nan=0.0))
+
+
+def _series_labels(value_cols: List[str], groups: Optional[pd.Index]) -> List[str]:
+    """Nomes das colunas da matriz: 'valor', 'grupo' ou 'valor|grupo'."""
+    if groups is None:
+        return list(value_cols)
+    if len(value_cols) == 1:
+        return [str(group) for group in groups]
+    return [f"{value}|{group}" for value in value_cols for group in groups]
+
+
+def _bincount_resample(
+    df: pd.DataFrame,
+    times: pd.Series,
+    value_cols: List[str],
+    step_ns: int,
+    freq: str,
+    group_col: Optional[str],
+    agg: str
+) -> pd.DataFrame:
+    """
+    Reamostragem por ``np.bincount`` para frequências fixas (dia, hora...).
+
+    Cada registro vira um índice plano período × grupo e as somas/contagens
+    saem de um bincount por coluna, sem ordenar os registros.
+    """
+    stamps = times.to_numpy(dtype='datetime64[ns]')
+    ns = stamps.view(np.int64)
+    valid = ~np.isnat(stamps)
+    groups = None
+    codes = np.zeros(len(df), dtype=np.int64)
+    if group_col is not None:
+        codes, groups = pd.factorize(df[group_col], sort=True)
+        valid &= codes >= 0
+    n_groups = 1 if groups is None else len(groups)
+
+    bins = ns[valid] // step_ns
+    if bins.size == 0:
+        return pd.DataFrame(columns=_series_labels(value_cols, groups), dtype=np.float64)
+    first = int(bins.min())
+    n_bins = int(bins.max()) - first + 1
+    flat = (bins - first) * n_groups + codes[valid]
+
+    blocks = []
+    for col in value_cols:
+        values = df[col].to_numpy(dtype=np.float64)[valid]
+        present = ~np.isnan(values)
+        counts = np.bincount(flat[present], minlength=n_bins * n_groups).astype(np.float64)
+        if agg == 'count':
+            block = counts
+        else:
+            block = np.bincount(flat[present], weights=values[present], minlength=n_bins * n_groups)
+            if agg == 'mean':
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    block = np.where(counts > 0, block / counts, np.nan)
+        blocks.append(block.reshape(n_bins, n_groups))
+
+    index = pd.date_range(pd.Timestamp(first * step_ns), periods=n_bins, freq=freq)
+    return pd.DataFrame(np.hstack(blocks), index=index, columns=_series_labels(value_cols, groups))
+
+
+def resample_series(
+    df: pd.DataFrame,
+    time_col: str,
+    value_cols: Optional[List[str]] = None,
+    freq: str = 'D',
+    group_col: Optional[str] = None,
+    agg: str = 'sum',
+    dayfirst: bool = TemporalDetectionConfig.dayfirst
+) -> pd.DataFrame:
+    """
+    Agrega registros com timestamps irregulares em uma matriz regular.
+
+    Frequências fixas (dia, hora...) com soma, contagem ou média usam
+    ``np.bincount`` sobre o índice período × grupo; as demais, um único
+    ``groupby`` por (período, grupo). Os períodos sem registro são
+    preenchidos com 0 em agregações de contagem ou soma e ficam ausentes
+    nas demais (média, mediana...).
+
+    Args:
+        df: Dados brutos (ex.: uma linha por NF-e)
+        time_col: Coluna de data/hora (ex.: 'data_emissao')
+        value_cols: Colunas numéricas (padrão: todas as numéricas)
+        freq: Frequência pandas da grade ('D', 'W', 'MS', 'h'...)
+        group_col: Coluna que separa as séries (ex.: 'uf', 'cfop')
+        agg: Agregação por período ('sum', 'mean', 'count', 'median'...)
+        dayfirst: Datas ambíguas (01/02/2024) com o dia primeiro; o texto é
+            convertido pelo ``TemporalColumnDetector``, como na detecção
+
+    Returns:
+        DataFrame indexado pelo rótulo de cada período (como no ``resample``
+        do pandas: início para 'D'/'h'/'MS', fim para 'W'/'ME'), uma coluna por série
+        ('valor' ou 'valor|grupo' quando há grupo e várias colunas de valor)
+    """
+    if time_col not in df.columns:
+        raise ValueError(f"Coluna '{time_col}' não encontrada no DataFrame")
+
+    times = df[time_col]
+    if not pd.api.types.is_datetime64_any_dtype(times):
+        detector = TemporalColumnDetector(TemporalDetectionConfig(dayfirst=dayfirst))
+        times = detector.parse_column(times)
+        if not pd.api.types.is_datetime64_any_dtype(times):
+            times = pd.to_datetime(times, errors='coerce')
+    if value_cols is None:
+        value_cols = [
+            col for col in df.select_dtypes(include='number').columns
+            if col not in (time_col, group_col)
+        ]
+    if not value_cols:
+        raise ValueError("Nenhuma coluna numérica para compor as séries")
+
+    offset = pd.tseries.frequencies.to_offset(freq)
+    if isinstance(offset, Tick) and agg in BINCOUNT_AGGREGATIONS and times.dt.tz is None:
+        return _bincount_resample(df, times, value_cols, offset.nanos, freq, group_col, agg)
+
+    keys = [pd.Grouper(key='__periodo__', freq=freq)]
+    frame = df[value_cols].assign(__periodo__=times)
+    if group_col is not None:
+        frame[group_col] = df[group_col]
+        keys.append(group_col)
+    frame = frame[frame['__periodo__'].notna()]
+    fill_value = 0 if agg in ZERO_FILL_AGGREGATIONS else np.nan
+
+    grouped = frame.groupby(keys, observed=True, sort=True)[value_cols].agg(agg)
+    if group_col is not None:
+        grouped = grouped.unstack(group_col, fill_value=fill_value)
+        if len(value_cols) == 1:
+            grouped.columns = [str(group) for group in grouped.columns.get_level_values(1)]
+        else:
+            grouped.columns = [f"{value}|{group}" for value, group in grouped.columns]
+    if grouped.empty:
+        return grouped.astype(np.float64)
+
+    grid = pd.date_range(grouped.index.min(), grouped.index.max(), freq=grouped.index.freq or freq)
+    return grouped.reindex(grid, fill_value=fill_value).astype(np.float64)
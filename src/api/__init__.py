@@ -4,6 +4,18 @@ Módulo de APIs e clientes externos.
 Contém clientes para APIs de terceiros e serviços externos.
 """
 
-from src.api.sonar_client import send_sonar_query
+from src.api.sonar_client import (
+    SonarAPIError,
+    SonarClient,
+    asend_sonar_query,
+    get_sonar_client,
+    send_sonar_query,
+)
 
-__all__ = ["send_sonar_query"]
+__all__ = [
+    "SonarAPIError",
+    "SonarClient",
+    "asend_sonar_query",
+    "get_sonar_client",
+    "send_sonar_query",
+]
@@ -6,25 +6,51 @@ Função principal: send_sonar_query(question: str, context: dict | None = None,
 - Faz POST seguro usando requests
 - Faz logging sem expor segredos
 
+As funções usam um ``SonarClient`` compartilhado (``get_sonar_client``):
+- sessão ``requests`` com pool de conexões keep-alive (sem novo TCP+TLS por consulta)
+- semáforo limitando consultas simultâneas à API (SONAR_MAX_CONCURRENCY)
+- cache com TTL por (modelo, pergunta normalizada, hash do contexto e dos
+  parâmetros de geração); perguntas de legislação se repetem e mudam pouco
+- variante assíncrona (``asend_sonar_query``) com ``httpx.AsyncClient`` para
+  os handlers FastAPI
+
 Referência de endpoint (sujeito a mudanças):
 - POST {SONAR_API_BASE}/chat/completions
 - Headers: Authorization: Bearer <SONAR_API_KEY>, Content-Type: application/json
 """
 from __future__ import annotations
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import copy
+import hashlib
+import json
+import re
+import threading
 import time
+import unicodedata
+
+import httpx
 import requests
-from requests import Response
+from requests.adapters import HTTPAdapter
 
+from src.memory.memory_cache import TTLCache
 from src.settings import (
     SONAR_API_BASE,
     SONAR_API_KEY,
+    SONAR_CACHE_MAX_ENTRIES,
+    SONAR_CACHE_TTL,
     SONAR_DEFAULT_MODEL,
+    SONAR_MAX_CONCURRENCY,
+    SONAR_POOL_SIZE,
 )
 from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+CacheKey = Tuple[str, str, str]
+
+_SPACES_RE = re.compile(r"\s+")
+
 
 class SonarAPIError(RuntimeError):
     pass
@@ -40,6 +66,234 @@ def _build_messages(question: str, context: Optional[dict]) -> list[dict[str, st
     return messages
 
 
+def normalize_question(question: str) -> str:
+    """Pergunta sem diferenças de caixa, espaços ou pontuação final."""
+    text = unicodedata.normalize("NFKC", question).casefold()
+    return _SPACES_RE.sub(" ", text).strip().rstrip("?!. ")
+
+
+def cache_key(model: str, question: str, payload_extra: Dict[str, Any]) -> CacheKey:
+    """(modelo, pergunta normalizada, hash do contexto e dos parâmetros de geração)."""
+    digest = hashlib.sha256(
+        json.dumps(payload_extra, sort_keys=True, default=str, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()[:32]
+    return model, normalize_question(question), digest
+
+
+def _decode_response(status_code: int, resp: Any) -> dict:
+    """Valida status e JSON (``requests.Response`` ou ``httpx.Response``)."""
+    if status_code >= 400:
+        # tenta extrair corpo para diagnóstico
+        body = None
+        try:
+            body = resp.json()
+        except Exception:
+            body = resp.text[:500]
+        raise SonarAPIError(f"HTTP {status_code} ao chamar Sonar API: {body}")
+
+    try:
+        return resp.json()
+    except ValueError as e:
+        raise SonarAPIError("Resposta não é JSON válido da Sonar API") from e
+
+
+class SonarClient:
+    """Cliente Sonar com conexões reaproveitadas, limite de concorrência e cache."""
+
+    def __init__(self,
+                 api_key: Optional[str] = SONAR_API_KEY,
+                 api_base: str = SONAR_API_BASE,
+                 max_concurrency: int = SONAR_MAX_CONCURRENCY,
+                 pool_size: int = SONAR_POOL_SIZE,
+                 cache_ttl: float = SONAR_CACHE_TTL,
+                 cache_max_entries: int = SONAR_CACHE_MAX_ENTRIES):
+        self.api_key = api_key
+        self.url = f"{api_base.rstrip('/')}/chat/completions"
+        self.max_concurrency = max(1, max_concurrency)
+        self.pool_size = max(self.max_concurrency, pool_size)
+        self.cache: TTLCache[dict] = TTLCache(cache_max_entries, cache_ttl)
+        self.requests_sent = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+
+        # httpx.AsyncClient e asyncio.Semaphore pertencem ao event loop em que foram criados
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests_sent, "cache_hits": self.cache.hits,
+                "cache_misses": self.cache.misses, "cache_entries": len(self.cache)}
+
+    def _prepare(self, question: str, context: Optional[dict], model: Optional[str],
+                 max_tokens: int, temperature: float, top_p: float,
+                 extra_headers: Optional[Dict[str, str]],
+                 extra_params: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, str], CacheKey]:
+        if not self.api_key:
+            raise SonarAPIError(
+                "SONAR_API_KEY não configurada. Defina em configs/.env ou variável de ambiente."
+            )
+
+        payload: Dict[str, Any] = {
+            "model": model or SONAR_DEFAULT_MODEL,
+            "messages": _build_messages(question, context),
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "top_p": top_p,
+            "stream": False,
+        }
+        if extra_params:
+            payload.update(extra_params)
+
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        if extra_headers:
+            headers.update(extra_headers)
+
+        key_extra = {k: v for k, v in payload.items() if k not in ("model", "messages")}
+        key_extra["context"] = context
+        return payload, headers, cache_key(payload["model"], question, key_extra)
+
+    def _log_request(self, payload: Dict[str, Any]) -> None:
+        # Logging sem segredos
+        logger.info(
+            "Sonar request: url=%s model=%s max_tokens=%s temp=%.2f context=%s",
+            self.url,
+            payload["model"],
+            payload["max_tokens"],
+            payload["temperature"],
+            len(payload["messages"]) > 1,
+        )
+
+    def _cached(self, key: CacheKey, use_cache: bool) -> Optional[dict]:
+        if not use_cache:
+            return None
+        data = self.cache.get(key)
+        if data is not None:
+            logger.info("Sonar response: cache hit model=%s", key[0])
+            return copy.deepcopy(data)
+        return None
+
+    def _store(self, key: CacheKey, data: dict, use_cache: bool) -> dict:
+        if use_cache:
+            self.cache.put(key, copy.deepcopy(data))
+        return data
+
+    def _count_request(self) -> None:
+        with self._lock:
+            self.requests_sent += 1
+
+    def query(
+        self,
+        question: str,
+        context: Optional[dict] = None,
+        *,
+        model: Optional[str] = None,
+        max_tokens: int = 512,
+        temperature: float = 0.2,
+        top_p: float = 0.9,
+        timeout: float = 30,
+        extra_headers: Optional[Dict[str, str]] = None,
+        extra_params: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+    ) -> dict:
+        """Envia uma consulta (ou devolve a resposta em cache) — ver ``send_sonar_query``."""
+        payload, headers, key = self._prepare(question, context, model, max_tokens, temperature,
+                                              top_p, extra_headers, extra_params)
+        cached = self._cached(key, use_cache)
+        if cached is not None:
+            return cached
+
+        self._log_request(payload)
+        t0 = time.perf_counter()
+        with self._semaphore:
+            self._count_request()
+            try:
+                resp = self.session.post(self.url, json=payload, headers=headers, timeout=timeout)
+            except requests.RequestException as e:
+                raise SonarAPIError(f"Erro de rede ao chamar Sonar API: {e}") from e
+        dt = time.perf_counter() - t0
+
+        logger.info("Sonar response: status=%s dur=%.3fs", resp.status_code, dt)
+        return self._store(key, _decode_response(resp.status_code, resp), use_cache)
+
+    def _async_resources(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            # Loop novo (ex.: reinício do servidor ou testes): o cliente antigo
+            # não pode ser usado nem fechado a partir deste loop
+            self._async_client = httpx.AsyncClient(limits=httpx.Limits(
+                max_connections=self.pool_size, max_keepalive_connections=self.pool_size))
+            self._async_semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._async_loop = loop
+        return self._async_client, self._async_semaphore
+
+    async def aquery(
+        self,
+        question: str,
+        context: Optional[dict] = None,
+        *,
+        model: Optional[str] = None,
+        max_tokens: int = 512,
+        temperature: float = 0.2,
+        top_p: float = 0.9,
+        timeout: float = 30,
+        extra_headers: Optional[Dict[str, str]] = None,
+        extra_params: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+    ) -> dict:
+        """Versão assíncrona de ``query`` (mesmo cache, limite por event loop)."""
+        payload, headers, key = self._prepare(question, context, model, max_tokens, temperature,
+                                              top_p, extra_headers, extra_params)
+        cached = self._cached(key, use_cache)
+        if cached is not None:
+            return cached
+
+        client, semaphore = self._async_resources()
+        self._log_request(payload)
+        t0 = time.perf_counter()
+        async with semaphore:
+            self._count_request()
+            try:
+                resp = await client.post(self.url, json=payload, headers=headers, timeout=timeout)
+            except httpx.HTTPError as e:
+                raise SonarAPIError(f"Erro de rede ao chamar Sonar API: {e}") from e
+        dt = time.perf_counter() - t0
+
+        logger.info("Sonar response: status=%s dur=%.3fs", resp.status_code, dt)
+        return self._store(key, _decode_response(resp.status_code, resp), use_cache)
+
+    def close(self) -> None:
+        self.session.close()
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client, self._async_semaphore, self._async_loop = None, None, None
+
+
+_client: Optional[SonarClient] = None
+_client_lock = threading.Lock()
+
+
+def get_sonar_client() -> SonarClient:
+    """Cliente Sonar compartilhado pelo processo."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SonarClient()
+    return _client
+
+
 def send_sonar_query(
     question: str,
     context: Optional[dict] = None,
@@ -51,6 +305,7 @@ def send_sonar_query(
     timeout: int = 30,
     extra_headers: Optional[Dict[str, str]] = None,
     extra_params: Optional[Dict[str, Any]] = None,
+    use_cache: bool = True,
 ) -> dict:
     """Envia uma consulta para a Sonar Pro API e retorna o JSON de resposta.
 
@@ -62,65 +317,22 @@ def send_sonar_query(
         timeout: tempo máximo (s) para a requisição HTTP
         extra_headers: cabeçalhos adicionais
         extra_params: parâmetros extras para o payload JSON
+        use_cache: reutiliza resposta anterior para a mesma pergunta/contexto
 
     Retorno:
         dict com resposta crua da API; em caso de erro, lança SonarAPIError
     """
-    if not SONAR_API_KEY:
-        raise SonarAPIError(
-            "SONAR_API_KEY não configurada. Defina em configs/.env ou variável de ambiente."
-        )
-
-    url = f"{SONAR_API_BASE.rstrip('/')}/chat/completions"
-    payload: Dict[str, Any] = {
-        "model": model or SONAR_DEFAULT_MODEL,
-        "messages": _build_messages(question, context),
-        "temperature": temperature,
-        "max_tokens": max_tokens,
-        "top_p": top_p,
-        "stream": False,
-    }
-    if extra_params:
-        payload.update(extra_params)
-
-    headers = {
-        "Authorization": f"Bearer {SONAR_API_KEY}",
-        "Content-Type": "application/json",
-    }
-    if extra_headers:
-        headers.update(extra_headers)
-
-    # Logging sem segredos
-    logger.info(
-        "Sonar request: url=%s model=%s max_tokens=%s temp=%.2f context=%s",
-        url,
-        payload["model"],
-        payload["max_tokens"],
-        payload["temperature"],
-        bool(context),
+    return get_sonar_client().query(
+        question, context, model=model, max_tokens=max_tokens, temperature=temperature,
+        top_p=top_p, timeout=timeout, extra_headers=extra_headers, extra_params=extra_params,
+        use_cache=use_cache,
     )
 
-    t0 = time.perf_counter()
-    try:
-        resp: Response = requests.post(url, json=payload, headers=headers, timeout=timeout)
-    except requests.RequestException as e:
-        raise SonarAPIError(f"Erro de rede ao chamar Sonar API: {e}") from e
-    dt = time.perf_counter() - t0
-
-    logger.info("Sonar response: status=%s dur=%.3fs", resp.status_code, dt)
-
-    if not resp.ok:
-        # tenta extrair corpo para diagnóstico
-        body = None
-        try:
-            body = resp.json()
-        except Exception:
-            body = resp.text[:500]
-        raise SonarAPIError(f"HTTP {resp.status_code} ao chamar Sonar API: {body}")
-
-    try:
-        data = resp.json()
-    except ValueError as e:
-        raise SonarAPIError("Resposta não é JSON válido da Sonar API") from e
 
-    return data
+async def asend_sonar_query(
+    question: str,
+    context: Optional[dict] = None,
+    **kwargs: Any,
+) -> dict:
+    """Versão assíncrona de ``send_sonar_query`` para handlers FastAPI."""
+    return await get_sonar_client().aquery(question, context, **kwargs)
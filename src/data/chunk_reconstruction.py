@@ -0,0 +1,182 @@
+"""Reconstrução vetorizada do CSV original a partir dos chunks da tabela embeddings.
+
+⚠️ CONFORMIDADE: lê apenas a tabela embeddings; nenhum acesso ao CSV fonte.
+
+Os chunks CSV_ROW gravados pelo RAGAgent têm o formato::
+
+    <resumo do chunk>
+
+    === DADOS ORIGINAIS ===
+    <header>
+    <linha start_row>
+    ...
+
+com ``start_row``/``csv_rows`` nos metadados. Em vez de percorrer linha a
+linha, as cargas CSV são concatenadas (descartando as linhas repetidas pelo
+overlap entre chunks consecutivos) e lidas em uma única chamada a
+``pd.read_csv`` com um mapa de dtypes inferido uma vez sobre uma amostra.
+"""
+from __future__ import annotations
+
+import io
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.settings import EMBEDDINGS_FETCH_PAGE_SIZE
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DATA_MARKER = "=== DADOS ORIGINAIS ==="
+CSV_ROW_STRATEGY = "csv_row"
+DTYPE_SAMPLE_ROWS = 2000
+
+
+def fetch_embedding_rows(client: Any,
+                         columns: str = 'id, chunk_text, metadata',
+                         metadata_filter: Optional[Dict[str, Any]] = None,
+                         limit: Optional[int] = None,
+                         page_size: int = EMBEDDINGS_FETCH_PAGE_SIZE) -> List[Dict[str, Any]]:
+    """Busca registros da tabela embeddings com paginação keyset em ``id``.
+
+    Um ``select`` sem paginação é truncado silenciosamente pelo PostgREST
+    (max-rows, 1000 por padrão). Aqui cada página continua a partir do último
+    ``id`` visto, sem OFFSET, até uma página vazia.
+
+    Args:
+        client: Cliente Supabase
+        columns: Colunas selecionadas (evite ``embedding``: é a maior coluna)
+        metadata_filter: Filtros de igualdade por chave de metadata
+        limit: Máximo de registros (None para todos)
+        page_size: Registros por requisição
+
+    Returns:
+        Lista de registros na ordem de ``id``
+    """
+    if 'id' not in [c.strip() for c in columns.split(',')]:
+        columns = f"id, {columns}"
+
+    rows: List[Dict[str, Any]] = []
+    last_id = None
+    while limit is None or len(rows) < limit:
+        size = page_size if limit is None else min(page_size, limit - len(rows))
+        query = client.table('embeddings').select(columns)
+        if metadata_filter:
+            for key, value in metadata_filter.items():
+                query = query.eq(f'metadata->{key}', value)
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        page = query.order('id').limit(size).execute().data or []
+        if not page:
+            break
+        rows.extend(page)
+        last_id = page[-1]['id']
+    return rows
+
+
+def _split_payload(chunk_text: str) -> Tuple[str, str]:
+    """Separa (header, linhas de dados) da carga CSV de um chunk."""
+    marker = chunk_text.find(DATA_MARKER)
+    payload = chunk_text[marker + len(DATA_MARKER):] if marker >= 0 else chunk_text
+    header, _, body = payload.strip().partition('\n')
+    return header.strip(), body
+
+
+def infer_dtype_map(header: str, sample_lines: str) -> Dict[str, Any]:
+    """Infere os dtypes das colunas uma única vez, a partir de uma amostra.
+
+    Args:
+        header: Linha de cabeçalho
+        sample_lines: Primeiras linhas de dados
+
+    Returns:
+        Mapa coluna -> dtype para ``pd.read_csv``
+    """
+    sample = pd.read_csv(io.StringIO(f"{header}\n{sample_lines}"))
+    return {col: dtype for col, dtype in sample.dtypes.items()
+            if dtype.kind in 'biufO'}
+
+
+def reconstruct_dataframe_from_chunks(rows: List[Dict[str, Any]]) -> Optional[pd.DataFrame]:
+    """Reconstrói o DataFrame original a partir de chunks CSV_ROW.
+
+    Chunks são agrupados pelo header (o maior grupo é o dataset) e, dentro de
+    cada ``source``, ordenados por ``start_row``: as linhas que o chunk anterior
+    já cobriu (overlap) são descartadas pelo índice, não por comparação de
+    conteúdo, preservando linhas legitimamente repetidas no CSV.
+
+    Args:
+        rows: Registros com ``chunk_text`` e ``metadata``
+
+    Returns:
+        DataFrame reconstruído ou None se não houver chunks CSV reconhecíveis
+        (o chamador pode recorrer ao parser heurístico)
+    """
+    # header -> source -> [(start_row0, n_linhas, corpo)]
+    groups: Dict[str, Dict[str, List[Tuple[Optional[int], int, str]]]] = defaultdict(lambda: defaultdict(list))
+    for row in rows:
+        text = row.get('chunk_text')
+        metadata = row.get('metadata') or {}
+        if not isinstance(text, str):
+            continue
+        # Chunks de dados: marcador do RAGAgent ou CSV_ROW com intervalo de linhas
+        # (os chunks analíticos de metadados também usam CSV_ROW, mas sem start_row)
+        is_row_chunk = metadata.get('strategy') == CSV_ROW_STRATEGY and metadata.get('start_row') is not None
+        if not is_row_chunk and DATA_MARKER not in text:
+            continue
+        header, body = _split_payload(text)
+        if not body or ',' not in header:
+            continue
+        start_row = metadata.get('start_row')
+        start = int(start_row) - 1 if start_row is not None else None
+        n_lines = int(metadata.get('csv_rows') or body.count('\n') + 1)
+        groups[header][str(metadata.get('source', ''))].append((start, n_lines, body))
+
+    if not groups:
+        return None
+
+    header, by_source = max(groups.items(),
+                            key=lambda item: sum(n for chunks in item[1].values() for _, n, _ in chunks))
+    if len(groups) > 1:
+        logger.warning(f"{len(groups) - 1} grupo(s) de chunks com outro header ignorado(s)")
+
+    bodies: List[str] = []
+    duplicated = 0
+    for chunks in by_source.values():
+        covered = 0
+        for start, n_lines, body in sorted(chunks, key=lambda c: (c[0] is None, c[0] or 0)):
+            if start is None:
+                bodies.append(body)
+                continue
+            skip = max(0, covered - start)
+            if skip >= n_lines:
+                duplicated += n_lines
+                continue
+            if skip:
+                body = body.split('\n', skip)[-1]
+                duplicated += skip
+            bodies.append(body)
+            covered = max(covered, start + n_lines)
+
+    bodies = [b.strip('\n') for b in bodies]
+    sample_bodies, sample_rows = [], 0
+    for body in bodies:
+        if sample_rows >= DTYPE_SAMPLE_ROWS:
+            break
+        sample_bodies.append(body)
+        sample_rows += body.count('\n') + 1
+    sample = '\n'.join(sample_bodies)
+    data = '\n'.join(bodies)
+    try:
+        dtype_map = infer_dtype_map(header, sample)
+        df = pd.read_csv(io.StringIO(f"{header}\n{data}"), dtype=dtype_map)
+    except (ValueError, TypeError) as e:
+        # A amostra não representou a coluna inteira (ex.: NaN numa coluna de inteiros)
+        logger.debug(f"Mapa de dtypes da amostra falhou ({e}); inferindo sobre todas as linhas")
+        df = pd.read_csv(io.StringIO(f"{header}\n{data}"), low_memory=False)
+
+    logger.info(f"✅ DataFrame reconstruído de {sum(len(c) for c in by_source.values())} chunks: "
+                f"{len(df)} linhas, {len(df.columns)} colunas ({duplicated} linhas de overlap descartadas)")
+    return df
@@ -51,6 +51,10 @@ class CSVFileManager:
             destination = EDA_DATA_DIR_HISTORICO / new_name
             shutil.move(str(latest), str(destination))
             logger.info(f"Arquivo arquivado: {latest.name} -> {destination}")
+            # Parquets do CSV arquivado (src/data/csv_frame_cache.py) ficariam órfãos
+            from src.data.csv_frame_cache import sidecar_pattern
+            for sidecar in latest.parent.glob(sidecar_pattern(latest)):
+                sidecar.unlink(missing_ok=True)
             return True
         except Exception as e:
             logger.error(f"Erro ao arquivar arquivo: {e}")
@@ -0,0 +1,206 @@
+"""Leitura de CSVs processados com cache de DataFrames e Parquet compartilhados.
+
+O RAGDataAgent lia o CSV mais recente de ``data/processado`` com
+``pd.read_csv`` a cada pergunta, tentando utf-8 → latin-1 → cp1252 em caso
+de erro de encoding. Este módulo:
+
+- detecta o encoding uma única vez (amostra + chardet);
+- guarda o DataFrame no serviço de snapshots (src/data/dataset_snapshot.py)
+  sob ``csv_snapshot_key`` (nome + mtime + tamanho): mesmo LRU e mesmo
+  limite de bytes dos snapshots por ingestão, e nenhuma segunda cópia quando
+  o CSV é o que a ingestão acabou de publicar; um CSV alterado gera outra
+  chave, nunca um frame desatualizado;
+- grava o Parquet do snapshot para CSVs em ``data/processado``, lido pelos
+  outros workers com memory-map e só nas colunas pedidas (``columns=``).
+
+O Parquet é criado na ingestão (``prepare``) ou na primeira leitura; CSVs
+fora de ``data/processado`` ficam só em memória.
+"""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import chardet
+import pandas as pd
+
+from src.data.dataset_snapshot import (
+    SNAPSHOT_SUFFIX,
+    DatasetSnapshotService,
+    csv_snapshot_key,
+    get_dataset_snapshot_service,
+)
+from src.settings import CSV_SIDECAR_ENABLED
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+ENCODING_SAMPLE_BYTES = 64 * 1024
+FALLBACK_ENCODINGS = ('utf-8', 'latin-1', 'cp1252')
+
+Fingerprint = Tuple[str, int, int]
+
+
+def file_fingerprint(path: Union[str, Path]) -> Fingerprint:
+    """Identidade do arquivo: caminho absoluto, mtime (ns) e tamanho."""
+    resolved = Path(path).resolve()
+    stat = resolved.stat()
+    return str(resolved), stat.st_mtime_ns, stat.st_size
+
+
+def sidecar_pattern(csv_path: Union[str, Path]) -> str:
+    """Padrão (glob) dos Parquets de snapshot de um CSV, na pasta do serviço."""
+    return f"{Path(csv_path).stem}.csv-*{SNAPSHOT_SUFFIX}"
+
+
+def sniff_encoding(path: Union[str, Path]) -> str:
+    """Detecta o encoding a partir de uma amostra do início do arquivo.
+
+    utf-8 é preferido quando a amostra decodifica sem erro (ASCII incluso);
+    senão vale o palpite do chardet, com latin-1 como último recurso.
+    """
+    with open(path, 'rb') as f:
+        sample = f.read(ENCODING_SAMPLE_BYTES)
+    try:
+        sample.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        if e.start >= len(sample) - 3 and len(sample) == ENCODING_SAMPLE_BYTES:
+            return 'utf-8'  # amostra cortou um caractere multibyte no meio
+    detected = (chardet.detect(sample).get('encoding') or '').lower()
+    if not detected or detected == 'ascii':
+        return 'latin-1'
+    return detected
+
+
+class CSVFrameCache:
+    """Carrega CSVs pela via mais barata: memória do serviço de snapshots, Parquet ou CSV."""
+
+    def __init__(self, snapshots: Optional[DatasetSnapshotService] = None,
+                 sidecar_enabled: bool = CSV_SIDECAR_ENABLED):
+        self.snapshots = snapshots or get_dataset_snapshot_service()
+        self.sidecar_enabled = sidecar_enabled and self.snapshots.persist
+        self._encodings: Dict[Fingerprint, str] = {}
+        self._load_lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "sidecar_reads": 0, "csv_reads": 0}
+
+    # ========================================================================
+    # API
+    # ========================================================================
+
+    def load(self, path: Union[str, Path], columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Carrega o CSV como DataFrame, pela via mais barata disponível.
+
+        Args:
+            path: Caminho do CSV
+            columns: Colunas necessárias (None para todas); lidas do Parquet
+                sem materializar as demais
+
+        Returns:
+            DataFrame somente leitura (veja ``DatasetSnapshotService.get``)
+        """
+        key = csv_snapshot_key(path)
+        projection = list(columns) if columns else None
+
+        df = self._from_memory(key, projection)
+        if df is not None:
+            return df
+
+        with self._load_lock:
+            df = self._from_memory(key, projection)
+            if df is not None:
+                return df
+
+            sidecar = self.snapshots.find_parquet(key) if self.sidecar_enabled else None
+            if sidecar is not None:
+                try:
+                    df = pd.read_parquet(sidecar, columns=projection, memory_map=True)
+                    self.stats["sidecar_reads"] += 1
+                    if projection is None:
+                        return self.snapshots.put(key, df, Path(path).stem, persist=False)
+                    return df
+                except Exception as e:
+                    logger.warning(f"⚠️ Parquet {sidecar.name} ilegível ({e}); relendo o CSV")
+
+            df = self.snapshots.put(key, self._read_csv(path), Path(path).stem, persist=self._persists(path))
+        return df[projection] if projection else df
+
+    def prepare(self, path: Union[str, Path]) -> Optional[Path]:
+        """Garante o Parquet do CSV (chamado na ingestão).
+
+        Returns:
+            Caminho do Parquet ou None se desabilitado/falhou
+        """
+        if not self._persists(path):
+            return None
+        key = csv_snapshot_key(path)
+        if self.snapshots.find_parquet(key) is None:
+            self.snapshots.put(key, self._read_csv(path), Path(path).stem)
+        return self.snapshots.find_parquet(key)
+
+    def columns(self, path: Union[str, Path]) -> List[str]:
+        """Nomes das colunas, sem carregar os dados quando há Parquet."""
+        key = csv_snapshot_key(path)
+        df = self.snapshots.peek(key)
+        if df is not None:
+            return list(df.columns)
+        sidecar = self.snapshots.find_parquet(key) if self.sidecar_enabled else None
+        if sidecar is not None:
+            import pyarrow.parquet as pq
+            return list(pq.read_schema(sidecar).names)
+        encoding = self._encoding(file_fingerprint(path))
+        return list(pd.read_csv(path, encoding=encoding, nrows=0).columns)
+
+    # ========================================================================
+    # INTERNOS
+    # ========================================================================
+
+    def _persists(self, path: Union[str, Path]) -> bool:
+        return self.sidecar_enabled and Path(path).resolve().parent == self.snapshots.snapshot_dir.resolve()
+
+    def _from_memory(self, key: str, projection: Optional[List[str]]) -> Optional[pd.DataFrame]:
+        df = self.snapshots.peek(key)
+        if df is None:
+            return None
+        self.stats["memory_hits"] += 1
+        return df[projection] if projection else df
+
+    def _encoding(self, fingerprint: Fingerprint) -> str:
+        encoding = self._encodings.get(fingerprint)
+        if encoding is None:
+            encoding = sniff_encoding(fingerprint[0])
+            self._encodings[fingerprint] = encoding
+        return encoding
+
+    def _read_csv(self, path: Union[str, Path]) -> pd.DataFrame:
+        fingerprint = file_fingerprint(path)
+        encoding = self._encoding(fingerprint)
+        candidates = [encoding] + [e for e in FALLBACK_ENCODINGS if e != encoding]
+        last_error: Optional[Exception] = None
+        for candidate in candidates:
+            try:
+                df = pd.read_csv(fingerprint[0], encoding=candidate, low_memory=False)
+                self._encodings[fingerprint] = candidate
+                self.stats["csv_reads"] += 1
+                logger.info(f"📂 CSV lido ({candidate}): {Path(fingerprint[0]).name} "
+                            f"{df.shape[0]:,} linhas × {df.shape[1]} colunas")
+                return df
+            except (UnicodeDecodeError, LookupError) as e:
+                # Bytes fora da amostra usada na detecção: tenta o próximo
+                last_error = e
+        raise ValueError(f"Não foi possível ler o CSV com nenhum encoding ({', '.join(candidates)}): {last_error}")
+
+
+_cache: Optional[CSVFrameCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_csv_frame_cache() -> CSVFrameCache:
+    """Instância única do cache de CSVs no processo."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CSVFrameCache()
+    return _cache
@@ -149,7 +149,7 @@ class DataLoader:
             # Detectar encoding se não especificado
             encoding = pandas_kwargs.get('encoding')
             if not encoding:
-                encoding = self._detect_encoding(file_path)
+                encoding = self.detect_encoding(file_path)
                 pandas_kwargs['encoding'] = encoding
             
             # Configurações padrão
@@ -430,7 +430,7 @@ class DataLoader:
         """Retorna informações do último carregamento realizado."""
         return self._last_loaded_info
     
-    def _detect_encoding(self, file_path: Path) -> str:
+    def detect_encoding(self, file_path: Path) -> str:
         """Detecta encoding de arquivo automaticamente."""
         try:
             # Ler amostra do arquivo
@@ -19,6 +19,9 @@ import pandas as pd
 
 from src.data.data_loader import DataLoader, DataLoaderError  
 from src.data.data_validator import DataValidator, DataValidationError
+from src.data.memory_policy import (
+    LOAD_SAMPLED, MemoryPolicy, count_csv_rows, optimize_dtypes, plan_csv_load, read_csv_kwargs
+)
 # Removido: agente obsoleto csv_analysis_agent.py
 from src.utils.logging_config import get_logger
 
@@ -35,13 +38,14 @@ class DataProcessor:
     """
     
     def __init__(self, auto_validate: bool = True, auto_clean: bool = True, 
-                 caller_agent: Optional[str] = None):
+                 caller_agent: Optional[str] = None, memory_policy: Optional[MemoryPolicy] = None):
         """Inicializa o processador de dados.
         
         Args:
             auto_validate: Se True, valida automaticamente dados carregados
             auto_clean: Se True, limpa automaticamente problemas detectados
             caller_agent: Nome do agente que está chamando (para validação)
+            memory_policy: Orçamento de memória e política de tipos (padrão: settings)
         """
         self.logger = get_logger(__name__)
         
@@ -58,6 +62,7 @@ class DataProcessor:
         # Configurações
         self.auto_validate = auto_validate
         self.auto_clean = auto_clean
+        self.memory_policy = memory_policy or MemoryPolicy()
         
         # Estado atual
         self.current_df: Optional[pd.DataFrame] = None
@@ -114,13 +119,20 @@ class DataProcessor:
         
         self.logger.info(f"✅ Acesso autorizado para agente: {self.caller_agent}")
     
-    def load_from_file(self, file_path: str, **kwargs) -> Dict[str, Any]:
+    def load_from_file(self, file_path: str, columns: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
         """Carrega dados de arquivo local.
         
         ⚠️ CONFORMIDADE: Apenas agente de ingestão autorizado.
         
+        A leitura segue a política de memória: só as ``columns`` pedidas,
+        texto de baixa cardinalidade direto como ``category`` e, se o
+        DataFrame estimado exceder o orçamento, uma amostra sistemática —
+        indicada em ``load_info['sampling']`` (``sampled``, ``sample_step``,
+        ``original_rows``) e na mensagem do resultado.
+        
         Args:
             file_path: Caminho para o arquivo CSV
+            columns: Colunas necessárias (None = todas)
             **kwargs: Argumentos para pd.read_csv()
             
         Returns:
@@ -131,8 +143,27 @@ class DataProcessor:
         try:
             self.logger.warning(f"🚨 ACESSO CSV DETECTADO por {self.caller_agent}: {file_path}")
             
+            # Planejar a carga (projeção, tipos e orçamento) a partir de uma amostra;
+            # com argumentos de leitura explícitos (sep, dtype...) a amostra não seria representativa
+            plan = None
+            if not kwargs:
+                encoding = self.loader.detect_encoding(Path(file_path))
+                plan = plan_csv_load(file_path, columns, self.memory_policy, encoding)
+                kwargs = read_csv_kwargs(plan)
+            elif columns:
+                kwargs['usecols'] = columns
+            
             # Carregar dados
             df, load_info = self.loader.load_from_file(file_path, **kwargs)
+            if plan is not None:
+                load_info['memory_plan'] = {k: v for k, v in plan.to_dict().items() if k != 'metadata'}
+                if plan.mode == LOAD_SAMPLED:
+                    load_info['sampling'] = plan.sampling(len(df), count_csv_rows(file_path))
+                    self.logger.warning(
+                        f"⚠️ {Path(file_path).name}: ~{plan.estimated_bytes / 1024 ** 2:.0f} MB acima do orçamento; "
+                        f"carregada amostra de {len(df):,} de {load_info['sampling']['original_rows']:,} linhas "
+                        f"(1 a cada {plan.sample_step})"
+                    )
             
             # Processar dados carregados
             return self._process_loaded_data(df, load_info)
@@ -390,6 +421,11 @@ class DataProcessor:
             'load_info': load_info,
             'message': f"Dados carregados com sucesso: {load_info['rows']} linhas, {load_info['columns']} colunas"
         }
+        sampling = load_info.get('sampling')
+        if sampling and sampling['sampled']:
+            result['sampling'] = sampling
+            result['message'] += (f" (amostra sistemática de {sampling['original_rows']:,} linhas, "
+                                  f"1 a cada {sampling['sample_step']})")
         
         # Validação automática
         if self.auto_validate:
@@ -427,6 +463,15 @@ class DataProcessor:
                 self.logger.warning(f"Falha na limpeza automática: {str(e)}")
                 result['cleaning'] = {"error": str(e)}
         
+        # Tipos reduzidos no DataFrame mantido em memória (após validar/limpar o original)
+        self.current_df, memory_report = optimize_dtypes(self.current_df, self.memory_policy)
+        result['memory'] = {
+            'bytes_before': memory_report['bytes_before'],
+            'bytes_after': memory_report['bytes_after'],
+            'categorical_columns': memory_report['categorical'],
+            'downcast_columns': len(memory_report['downcast'])
+        }
+        
         # Conectar com EmbeddingsAnalysisAgent
         try:
             # ⚠️ CONFORMIDADE: Este processador é restrito ao agente de ingestão
@@ -268,8 +268,13 @@ class DataValidator:
             if col_analysis['unique_values'] < self.min_unique_values and len(df) > 10:
                 warnings.append(f"Coluna '{col}' tem apenas {col_analysis['unique_values']} valores únicos")
             
-            # Verificar valores suspeitos
-            if df[col].dtype == 'object':
+            # Verificar valores suspeitos (em categóricas basta olhar o dicionário de valores)
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                suspicious = self._find_suspicious_values(pd.Series(df[col].cat.categories))
+                if suspicious:
+                    col_analysis['suspicious_values'] = suspicious
+                    warnings.append(f"Coluna '{col}' contém {len(suspicious)} valores suspeitos")
+            elif df[col].dtype == 'object':
                 suspicious = self._find_suspicious_values(df[col])
                 if suspicious:
                     col_analysis['suspicious_values'] = suspicious
@@ -392,13 +397,15 @@ class DataValidator:
                 actions.append(f"Preenchida coluna '{col}' com mediana ({median_val:.2f})")
         
         # Para colunas categóricas, preencher com moda ou 'Unknown'
-        categorical_cols = df.select_dtypes(include=['object']).columns
+        categorical_cols = df.select_dtypes(include=['object', 'category']).columns
         for col in categorical_cols:
             if df[col].isnull().any():
                 if df[col].mode().empty:
                     fill_value = 'Unknown'
                 else:
                     fill_value = df[col].mode().iloc[0]
+                if isinstance(df[col].dtype, pd.CategoricalDtype) and fill_value not in df[col].cat.categories:
+                    df[col] = df[col].cat.add_categories([fill_value])
                 df[col].fillna(fill_value, inplace=True)
                 actions.append(f"Preenchida coluna '{col}' com '{fill_value}'")
         
@@ -410,7 +417,7 @@ class DataValidator:
         
         for col in df.columns:
             # Tentar converter strings numéricas
-            if df[col].dtype == 'object':
+            if df[col].dtype == 'object' or isinstance(df[col].dtype, pd.CategoricalDtype):
                 # Verificar se pode ser numérico
                 try:
                     # Remover espaços e caracteres comuns
@@ -453,7 +460,7 @@ class DataValidator:
         """Limpa valores suspeitos."""
         actions = []
         
-        for col in df.select_dtypes(include=['object']).columns:
+        for col in df.select_dtypes(include=['object', 'category']).columns:
             for pattern in self.suspicious_patterns:
                 mask = df[col].astype(str).str.match(pattern, na=False)
                 if mask.any():
@@ -0,0 +1,367 @@
+"""Perfil do dataset calculado uma vez na ingestão e servido por ingestion_id.
+
+Perguntas como "tipos de dados", "intervalo de cada variável",
+"média/mediana", "valores nulos" e "correlações" recalculavam ``describe()``,
+``select_dtypes``, ``corr()`` e ``value_counts`` sobre os dados completos a
+cada pergunta. O pipeline de ingestão agora chama ``build_dataset_profile``
+uma única vez e grava o resultado no ``DatasetProfileStore``:
+
+- memória do processo;
+- arquivo JSON local (``DATASET_PROFILE_DIR/<ingestion_id>.json``);
+- tabela ``dataset_profiles`` no Supabase (jsonb, migration 0013), para que
+  outros workers/hosts encontrem o perfil.
+
+Os handlers consultam o perfil e só voltam aos dados brutos para perguntas
+ad-hoc que ele não cobre.
+"""
+from __future__ import annotations
+
+import json
+import math
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.settings import (
+    DATASET_PROFILE_DIR,
+    DATASET_PROFILE_HISTOGRAM_BINS,
+    DATASET_PROFILE_MAX_CORR_COLUMNS,
+    DATASET_PROFILE_TOP_K,
+)
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_VERSION = 1
+PROFILE_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+def _json_value(value: Any) -> Any:
+    """Converte escalares numpy/pandas em tipos JSON (NaN/NaT -> None)."""
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, (np.bool_, bool)):
+        return bool(value)
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        return None if math.isnan(value) or math.isinf(value) else float(value)
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat()
+    if isinstance(value, (str, int)):
+        return value
+    return str(value)
+
+
+def _column_kind(series: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(series):
+        return 'boolean'
+    if pd.api.types.is_numeric_dtype(series):
+        return 'numeric'
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'datetime'
+    return 'categorical'
+
+
+@dataclass
+class DatasetProfile:
+    """Perfil completo de um dataset ingerido (serializável em JSON)."""
+    ingestion_id: str
+    source: Optional[str]
+    n_rows: int
+    n_columns: int
+    columns: Dict[str, Dict[str, Any]]
+    correlation: Dict[str, Any] = field(default_factory=dict)
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    compute_ms: float = 0.0
+    version: int = PROFILE_VERSION
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DatasetProfile':
+        fields = {k: data[k] for k in cls.__dataclass_fields__ if k in data}
+        return cls(**fields)
+
+    def columns_of_kind(self, *kinds: str) -> List[str]:
+        return [name for name, col in self.columns.items() if col.get('kind') in kinds]
+
+    def numeric_columns(self) -> List[str]:
+        return self.columns_of_kind('numeric')
+
+    def numeric_stats(self) -> pd.DataFrame:
+        """Tabela coluna x estatística (min, max, mean, median, std, var, mode, ...) das colunas numéricas."""
+        rows = {}
+        for name in self.numeric_columns():
+            col = self.columns[name]
+            quantiles = col.get('quantiles') or {}
+            rows[name] = {
+                'count': col.get('count'),
+                'nulls': col.get('nulls'),
+                'min': col.get('min'),
+                'max': col.get('max'),
+                'mean': col.get('mean'),
+                'median': quantiles.get('0.5'),
+                'std': col.get('std'),
+                'var': col.get('var'),
+                'mode': col.get('mode'),
+                'q25': quantiles.get('0.25'),
+                'q75': quantiles.get('0.75'),
+            }
+        return pd.DataFrame.from_dict(rows, orient='index', dtype=float)
+
+    def correlation_frame(self) -> Optional[pd.DataFrame]:
+        if not self.correlation.get('columns'):
+            return None
+        cols = self.correlation['columns']
+        return pd.DataFrame(self.correlation['matrix'], index=cols, columns=cols, dtype=float)
+
+
+def _profile_column(series: pd.Series, top_k: int, bins: int) -> Dict[str, Any]:
+    kind = _column_kind(series)
+    count = int(series.count())
+    nulls = int(len(series) - count)
+    counts = series.value_counts(dropna=True)
+    profile: Dict[str, Any] = {
+        'dtype': str(series.dtype),
+        'kind': kind,
+        'count': count,
+        'nulls': nulls,
+        'null_pct': round(nulls / len(series) * 100, 4) if len(series) else 0.0,
+        'unique': int(len(counts)),
+        'top_k': [[_json_value(v), int(c)] for v, c in counts.head(top_k).items()],
+    }
+
+    if kind == 'categorical':
+        # Números gravados como texto: tratados como numéricos nos relatórios de tipo
+        profile['numeric_like'] = False
+        if series.dtype == object:
+            try:
+                pd.to_numeric(series.dropna().head(100))
+                profile['numeric_like'] = True
+            except (ValueError, TypeError):
+                pass
+        return profile
+
+    if kind == 'datetime':
+        profile['min'] = _json_value(series.min())
+        profile['max'] = _json_value(series.max())
+        return profile
+
+    values = series.dropna().to_numpy(dtype=float)
+    if kind == 'boolean' or values.size == 0:
+        return profile
+
+    mode = series.mode()
+    quantiles = np.quantile(values, PROFILE_QUANTILES)
+    finite = values[np.isfinite(values)]
+    hist_counts, hist_edges = np.histogram(finite, bins=bins) if finite.size else (np.array([]), np.array([]))
+    profile.update({
+        'min': _json_value(values.min()),
+        'max': _json_value(values.max()),
+        'sum': _json_value(values.sum()),
+        'mean': _json_value(values.mean()),
+        'std': _json_value(series.std()),
+        'var': _json_value(series.var()),
+        'skew': _json_value(series.skew()),
+        'kurtosis': _json_value(series.kurt()),
+        'mode': _json_value(mode.iloc[0]) if len(mode) else None,
+        'quantiles': {str(q): _json_value(v) for q, v in zip(PROFILE_QUANTILES, quantiles)},
+        'histogram': {
+            'edges': [_json_value(e) for e in hist_edges],
+            'counts': [int(c) for c in hist_counts],
+        },
+    })
+    return profile
+
+
+def _correlation_columns(numeric: List[Any], columns: Dict[str, Dict[str, Any]], limit: int) -> List[Any]:
+    """Escolhe até ``limit`` colunas numéricas para a matriz de correlação.
+
+    Acima do limite, ficam as de maior variância (constantes e vazias não têm
+    correlação definida), mantida a ordem original das colunas.
+    """
+    if len(numeric) <= limit:
+        return list(numeric)
+    variance = {name: columns[str(name)].get('var') for name in numeric}
+    ranked = sorted(numeric, key=lambda name: -(variance[name] or 0.0))[:limit]
+    keep = set(map(str, ranked))
+    return [name for name in numeric if str(name) in keep]
+
+
+def build_dataset_profile(df: pd.DataFrame, ingestion_id: str, source: Optional[str] = None,
+                          top_k: int = DATASET_PROFILE_TOP_K,
+                          bins: int = DATASET_PROFILE_HISTOGRAM_BINS,
+                          max_corr_columns: int = DATASET_PROFILE_MAX_CORR_COLUMNS) -> DatasetProfile:
+    """Calcula o perfil completo do DataFrame (executado uma vez, na ingestão).
+
+    Args:
+        df: Dados completos do dataset
+        ingestion_id: Chave da ingestão
+        source: Nome do arquivo/fonte
+        top_k: Valores mais frequentes guardados por coluna
+        bins: Número de bins dos histogramas numéricos
+        max_corr_columns: Limite de colunas da matriz de correlação (as de maior
+            variância; ``correlation['truncated']`` indica se houve corte)
+
+    Returns:
+        DatasetProfile
+    """
+    started = time.perf_counter()
+    columns = {str(name): _profile_column(df[name], top_k, bins) for name in df.columns}
+
+    correlation: Dict[str, Any] = {}
+    numeric = [name for name in df.columns if columns[str(name)]['kind'] == 'numeric']
+    if len(numeric) >= 2:
+        selected = _correlation_columns(numeric, columns, max_corr_columns)
+        matrix = df[selected].corr().to_numpy()
+        correlation = {
+            'method': 'pearson',
+            'columns': [str(c) for c in selected],
+            'matrix': [[_json_value(round(v, 6)) for v in row] for row in matrix],
+            'total_numeric': len(numeric),
+            'truncated': len(selected) < len(numeric),
+        }
+
+    profile = DatasetProfile(
+        ingestion_id=str(ingestion_id),
+        source=source,
+        n_rows=int(len(df)),
+        n_columns=int(len(df.columns)),
+        columns=columns,
+        correlation=correlation,
+        compute_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+    logger.info(f"📐 Perfil do dataset {source or ''} ({ingestion_id}) calculado em {profile.compute_ms:.0f} ms: "
+                f"{profile.n_rows:,} linhas × {profile.n_columns} colunas")
+    return profile
+
+
+class DatasetProfileStore:
+    """Armazena perfis por ingestion_id: memória → arquivo local → tabela dataset_profiles."""
+
+    TABLE = 'dataset_profiles'
+
+    def __init__(self, local_dir: Union[str, Path] = DATASET_PROFILE_DIR, client: Any = None):
+        self.local_dir = Path(local_dir)
+        self._client = client
+        self._profiles: Dict[str, DatasetProfile] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            try:
+                from src.vectorstore.supabase_client import supabase
+                self._client = supabase
+            except Exception as e:
+                logger.debug(f"Supabase indisponível para perfis de dataset: {e}")
+        return self._client
+
+    def _path(self, ingestion_id: str) -> Path:
+        return self.local_dir / f"{re.sub(r'[^A-Za-z0-9_-]', '_', str(ingestion_id))}.json"
+
+    def save(self, profile: DatasetProfile) -> None:
+        """Grava o perfil em memória, em arquivo local e (se disponível) no Supabase."""
+        with self._lock:
+            self._profiles[profile.ingestion_id] = profile
+        data = profile.to_dict()
+
+        try:
+            self.local_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(profile.ingestion_id)
+            tmp_path = path.with_name(path.name + '.tmp')
+            tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"⚠️ Não foi possível gravar o perfil {profile.ingestion_id} em disco: {e}")
+
+        client = self.client
+        if client is None:
+            return
+        try:
+            client.table(self.TABLE).upsert({
+                'ingestion_id': profile.ingestion_id,
+                'source': profile.source,
+                'n_rows': profile.n_rows,
+                'n_columns': profile.n_columns,
+                'profile': data,
+            }, on_conflict='ingestion_id').execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Perfil {profile.ingestion_id} não gravado no Supabase (migration 0013 aplicada?): {e}")
+
+    def get(self, ingestion_id: Optional[str]) -> Optional[DatasetProfile]:
+        """Retorna o perfil da ingestão ou None se ele não foi calculado."""
+        if not ingestion_id:
+            return None
+        with self._lock:
+            profile = self._profiles.get(ingestion_id)
+        if profile is not None:
+            return profile
+
+        path = self._path(ingestion_id)
+        data = None
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Perfil local {path.name} ilegível: {e}")
+        if data is None and self.client is not None:
+            try:
+                result = (self.client.table(self.TABLE).select('profile')
+                          .eq('ingestion_id', ingestion_id).limit(1).execute())
+                if result.data:
+                    data = result.data[0]['profile']
+            except Exception as e:
+                logger.debug(f"Perfil {ingestion_id} não encontrado no Supabase: {e}")
+        if data is None or data.get('version') != PROFILE_VERSION:
+            return None
+
+        profile = DatasetProfile.from_dict(data)
+        with self._lock:
+            self._profiles[ingestion_id] = profile
+        return profile
+
+    def invalidate(self, keep: Optional[str] = None) -> None:
+        """Remove perfis em memória de outras ingestões."""
+        with self._lock:
+            for key in [k for k in self._profiles if k != keep]:
+                del self._profiles[key]
+
+
+_store: Optional[DatasetProfileStore] = None
+_store_lock = threading.Lock()
+
+
+def get_dataset_profile_store() -> DatasetProfileStore:
+    """Instância única do armazenamento de perfis no processo."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DatasetProfileStore()
+    return _store
+
+
+def profile_ingestion(df: pd.DataFrame, ingestion_id: str, source: Optional[str] = None) -> Optional[DatasetProfile]:
+    """Etapa de perfilamento do pipeline de ingestão: calcula e grava o perfil.
+
+    Falhas são registradas e não interrompem a ingestão.
+    """
+    try:
+        profile = build_dataset_profile(df, ingestion_id, source)
+        store = get_dataset_profile_store()
+        store.invalidate(keep=profile.ingestion_id)
+        store.save(profile)
+        return profile
+    except Exception as e:
+        logger.warning(f"⚠️ Falha ao calcular o perfil da ingestão {ingestion_id}: {e}")
+        return None
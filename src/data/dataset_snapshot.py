@@ -0,0 +1,417 @@
+"""Snapshot compartilhado do dataset por ingestion_id.
+
+Os handlers de análise reconstruíam o DataFrame a partir de todos os chunks
+da tabela embeddings a cada pergunta. Este módulo mantém uma única cópia por
+ingestão, procurada nesta ordem:
+
+1. memória do processo (LRU limitado por ``DATASET_SNAPSHOT_MAX_BYTES``);
+2. Parquet em ``data/processado`` (``<nome>.<chave>.snapshot.parquet``), lido
+   com memory-map por qualquer worker;
+3. reconstrução a partir dos chunks (caminho de conformidade), executada uma
+   única vez por chave mesmo com perguntas concorrentes.
+
+A ingestão (agente autorizado) publica o snapshot a partir do CSV fonte com
+``publish()``, o que invalida os snapshots anteriores. Agentes de resposta
+apenas leem via ``get()`` e nunca tocam no CSV.
+
+Os CSVs processados lidos pelo RAGDataAgent (src/data/csv_frame_cache.py)
+usam o mesmo LRU e o mesmo formato de Parquet, sob a chave
+``csv_snapshot_key(caminho)``: há um único limite de memória no processo, e o
+CSV publicado na ingestão aponta para o snapshot já gravado (alias + hard
+link) em vez de gerar uma segunda cópia.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Set, Union
+
+import numpy as np
+import pandas as pd
+
+from src.settings import (
+    DATASET_SNAPSHOT_KEY_TTL,
+    DATASET_SNAPSHOT_MAX_BYTES,
+    DATASET_SNAPSHOT_PERSIST,
+    EDA_DATA_DIR_PROCESSADO,
+)
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_SUFFIX = ".snapshot.parquet"
+
+
+@dataclass
+class SnapshotEntry:
+    """DataFrame mantido em memória e seu tamanho estimado."""
+    frame: pd.DataFrame
+    nbytes: int
+    source: str  # 'csv', 'chunks' ou 'parquet'
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Tamanho em memória do DataFrame (inclui strings de colunas object)."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def freeze_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """DataFrame com os mesmos dados (sem cópia) em arrays somente leitura.
+
+    Escritas in-place (``df.loc[...] = ...``, ``fillna(inplace=True)``) numa
+    cópia rasa do resultado levantam ``ValueError`` em vez de alterar o
+    frame compartilhado; criar/substituir colunas continua permitido.
+    Colunas de extensão (category, string etc.) não têm essa proteção.
+    """
+    columns = {}
+    for position in range(df.shape[1]):
+        values = df.iloc[:, position]
+        if isinstance(values.dtype, np.dtype):
+            array = values.to_numpy()
+            array.flags.writeable = False
+            columns[position] = array
+        else:
+            columns[position] = values.array
+    frozen = pd.DataFrame(columns, index=df.index, copy=False)
+    frozen.columns = df.columns
+    return frozen
+
+
+def readonly_copy(frame: pd.DataFrame) -> pd.DataFrame:
+    """Cópia rasa de um frame congelado; colunas de extensão são copiadas de fato."""
+    out = frame.copy(deep=False)
+    for position, dtype in enumerate(frame.dtypes):
+        if not isinstance(dtype, np.dtype):
+            out.isetitem(position, frame.iloc[:, position].copy())
+    return out
+
+
+def csv_snapshot_key(path: Union[str, Path]) -> str:
+    """Chave do snapshot de um arquivo CSV: nome, mtime (ns) e tamanho.
+
+    Não depende da pasta, então o CSV publicado em ``processando`` mantém a
+    chave ao ser movido para ``processado``; um CSV alterado gera outra chave.
+    """
+    path = Path(path)
+    stat = path.stat()
+    digest = hashlib.sha1(f"{path.name}|{stat.st_mtime_ns}|{stat.st_size}".encode()).hexdigest()[:16]
+    return f"csv-{digest}"
+
+
+def resolve_snapshot_key(client: Any) -> Optional[str]:
+    """Identifica a ingestão ativa a partir do registro mais recente de embeddings.
+
+    Usa ``metadata.ingestion_id`` quando presente (fluxo atômico); senão o id
+    do último chunk gravado, que muda a cada nova ingestão do RAGAgent.
+
+    Args:
+        client: Cliente Supabase
+
+    Returns:
+        Chave da ingestão ativa ou None se a tabela estiver vazia
+    """
+    result = (
+        client.table('embeddings')
+        .select('id, metadata')
+        .order('created_at', desc=True)
+        .limit(1)
+        .execute()
+    )
+    if not result.data:
+        return None
+    row = result.data[0]
+    ingestion_id = (row.get('metadata') or {}).get('ingestion_id')
+    return str(ingestion_id) if ingestion_id else f"latest-{row['id']}"
+
+
+class DatasetSnapshotService:
+    """Cache de DataFrames por ingestão, compartilhado pelos handlers de análise."""
+
+    def __init__(self,
+                 max_bytes: int = DATASET_SNAPSHOT_MAX_BYTES,
+                 snapshot_dir: Union[str, Path] = EDA_DATA_DIR_PROCESSADO,
+                 persist: bool = DATASET_SNAPSHOT_PERSIST,
+                 key_ttl: float = DATASET_SNAPSHOT_KEY_TTL):
+        self.max_bytes = max_bytes
+        self.snapshot_dir = Path(snapshot_dir)
+        self.persist = persist
+        self.key_ttl = key_ttl
+        self._entries: "OrderedDict[str, SnapshotEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._aliases: Dict[str, str] = {}  # chave de CSV -> chave da ingestão publicada a partir dele
+        self._active_key: Optional[str] = None
+        self._active_checked_at = 0.0
+        self.stats = {"hits": 0, "parquet_loads": 0, "builds": 0, "evictions": 0}
+
+    # ========================================================================
+    # LEITURA
+    # ========================================================================
+
+    def active_key(self, resolver: Callable[[], Optional[str]]) -> Optional[str]:
+        """Retorna a chave da ingestão ativa, consultando o resolver no máximo a cada ``key_ttl`` s."""
+        with self._lock:
+            if self._active_key and time.monotonic() - self._active_checked_at < self.key_ttl:
+                return self._active_key
+        key = resolver()
+        with self._lock:
+            if key != self._active_key and self._active_key is not None:
+                logger.info(f"📦 Nova ingestão ativa detectada: {self._active_key} -> {key}")
+                self._drop_locked(self._active_key)
+            self._active_key = key
+            self._active_checked_at = time.monotonic()
+        return key
+
+    def get(self, key: str, builder: Callable[[], Optional[pd.DataFrame]]) -> Optional[pd.DataFrame]:
+        """Retorna o snapshot da ingestão ``key``, construindo-o uma única vez.
+
+        Args:
+            key: ingestion_id (ou chave equivalente) do dataset
+            builder: Função que reconstrói o DataFrame quando não há memória nem Parquet
+
+        Returns:
+            Cópia rasa do DataFrame ou None se o builder não conseguir montar
+            os dados. Os dados são compartilhados e somente leitura: adicionar,
+            remover ou substituir colunas não afeta o cache, mas escrita
+            in-place levanta ``ValueError`` (use ``.copy()`` antes de alterar)
+        """
+        entry = self._lookup(key)
+        if entry is None:
+            with self._build_lock(key):
+                entry = self._lookup(key)
+                if entry is None:
+                    entry = self._load_or_build(key, builder)
+                    if entry is None:
+                        return None
+        return readonly_copy(entry.frame)
+
+    def peek(self, key: str) -> Optional[pd.DataFrame]:
+        """Snapshot em memória (cópia somente leitura) ou None, sem ler disco nem construir."""
+        entry = self._lookup(key)
+        return readonly_copy(entry.frame) if entry is not None else None
+
+    def put(self, key: str, df: pd.DataFrame, name: str, persist: bool = True) -> pd.DataFrame:
+        """Guarda um DataFrame já carregado (memória e, se ``persist``, Parquet).
+
+        Returns:
+            O frame como ``get()`` o devolveria; ``df`` passa a compartilhar os
+            dados com o cache e não deve mais ser alterado in-place
+        """
+        if persist:
+            self._write_parquet(key, df, name)
+        return readonly_copy(self._remember(key, df, 'csv').frame)
+
+    def _lookup(self, key: str) -> Optional[SnapshotEntry]:
+        with self._lock:
+            key = self._aliases.get(key, key)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+            return entry
+
+    def _build_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._build_locks.setdefault(key, threading.Lock())
+
+    def _load_or_build(self, key: str, builder: Callable[[], Optional[pd.DataFrame]]) -> Optional[SnapshotEntry]:
+        path = self.find_parquet(key)
+        if path is not None:
+            try:
+                df = pd.read_parquet(path, memory_map=True)
+                self.stats["parquet_loads"] += 1
+                logger.info(f"📦 Snapshot {key} carregado de {path.name}: {len(df)} linhas")
+                return self._remember(key, df, 'parquet')
+            except Exception as e:
+                logger.warning(f"⚠️ Falha ao ler snapshot {path}: {e}; reconstruindo")
+
+        started = time.perf_counter()
+        df = builder()
+        if df is None:
+            return None
+        self.stats["builds"] += 1
+        logger.info(f"📦 Snapshot {key} reconstruído dos chunks em "
+                    f"{time.perf_counter() - started:.2f}s: {len(df)} linhas")
+        self._write_parquet(key, df, 'embeddings')
+        return self._remember(key, df, 'chunks')
+
+    # ========================================================================
+    # PUBLICAÇÃO / INVALIDAÇÃO
+    # ========================================================================
+
+    def publish(self, key: str, df: Optional[pd.DataFrame] = None,
+                csv_path: Union[str, Path, None] = None,
+                name: Optional[str] = None) -> Optional[Path]:
+        """Publica o snapshot de uma ingestão recém-confirmada e invalida os anteriores.
+
+        ⚠️ CONFORMIDADE: só deve ser chamado pelo fluxo de ingestão (agente
+        autorizado a ler o CSV fonte).
+
+        Args:
+            key: ingestion_id da nova ingestão
+            df: DataFrame já carregado (evita reler o CSV); passa a
+                compartilhar os dados com o cache, não altere in-place depois
+            csv_path: CSV fonte, lido quando ``df`` não é informado; leituras
+                posteriores desse CSV pelo cache de frames usam este snapshot
+            name: Prefixo do arquivo Parquet (padrão: nome do CSV)
+
+        Returns:
+            Caminho do Parquet gravado ou None se não foi persistido
+        """
+        if df is None:
+            if csv_path is None:
+                raise ValueError("publish() requer df ou csv_path")
+            df = pd.read_csv(csv_path, low_memory=False)
+        prefix = name or (Path(csv_path).stem if csv_path is not None else 'dataset')
+
+        alias = csv_snapshot_key(csv_path) if csv_path is not None else None
+
+        self.invalidate(keep=key)
+        path = self._write_parquet(key, df, prefix)
+        with self._lock:
+            self._remember(key, df, 'csv')
+            self._active_key = key
+            self._active_checked_at = time.monotonic()
+            if alias is not None:
+                self._drop_locked(alias)
+                self._aliases[alias] = key
+        if alias is not None and path is not None:
+            self._link_parquet(path, alias, prefix)
+        logger.info(f"📦 Snapshot publicado para ingestão {key}: {len(df)} linhas, {len(df.columns)} colunas")
+        return path
+
+    def invalidate(self, key: Optional[str] = None, keep: Optional[str] = None) -> int:
+        """Descarta snapshots em memória e em disco.
+
+        Args:
+            key: Snapshot específico; None descarta todos
+            keep: Chave preservada quando ``key`` é None (a ingestão nova)
+
+        Returns:
+            Número de snapshots em memória descartados
+        """
+        with self._lock:
+            if key is not None:
+                targets = [key] if key in self._entries else []
+            else:
+                targets = [k for k in self._entries if k != keep]
+            for target in targets:
+                self._drop_locked(target)
+            if (key is None and keep is None) or (key is not None and key == self._active_key):
+                self._active_key = None
+            kept = {keep} | {alias for alias, target in self._aliases.items() if target == keep}
+        self._remove_parquet(key, kept if keep is not None else None)
+        return len(targets)
+
+    def _drop_locked(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+        self._build_locks.pop(key, None)
+        for alias in [a for a, target in self._aliases.items() if key in (a, target)]:
+            del self._aliases[alias]
+
+    # ========================================================================
+    # MEMÓRIA E DISCO
+    # ========================================================================
+
+    def _remember(self, key: str, df: pd.DataFrame, source: str) -> SnapshotEntry:
+        entry = SnapshotEntry(frame=freeze_frame(df), nbytes=frame_nbytes(df), source=source)
+        if entry.nbytes > self.max_bytes:
+            # Maior que o limite: serve esta chamada, mas fica só no Parquet
+            logger.warning(f"⚠️ Snapshot {key} ({entry.nbytes:,} bytes) excede o limite em memória "
+                           f"({self.max_bytes:,}); mantido apenas em disco")
+            return entry
+        with self._lock:
+            self._drop_locked(key)
+            self._entries[key] = entry
+            self._bytes += entry.nbytes
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                oldest, _ = next(iter(self._entries.items()))
+                self._drop_locked(oldest)
+                self.stats["evictions"] += 1
+        return entry
+
+    @staticmethod
+    def _safe_key(key: str) -> str:
+        return re.sub(r'[^A-Za-z0-9_-]', '_', str(key))
+
+    def find_parquet(self, key: str) -> Optional[Path]:
+        """Localiza o Parquet do snapshot ``key`` (gravado por qualquer worker)."""
+        if not self.persist or not self.snapshot_dir.exists():
+            return None
+        for candidate in dict.fromkeys((key, self._aliases.get(key, key))):
+            matches = sorted(self.snapshot_dir.glob(f"*.{self._safe_key(candidate)}{SNAPSHOT_SUFFIX}"))
+            if matches:
+                return matches[-1]
+        return None
+
+    def _link_parquet(self, path: Path, alias: str, prefix: str) -> None:
+        """Torna o Parquet de ``path`` visível sob ``alias`` para os outros workers, sem copiar."""
+        link = self.snapshot_dir / f"{prefix}.{self._safe_key(alias)}{SNAPSHOT_SUFFIX}"
+        try:
+            link.unlink(missing_ok=True)
+            os.link(path, link)
+        except OSError as e:
+            logger.debug(f"Hard link {link.name} não criado ({e}); o CSV terá Parquet próprio")
+
+    def _write_parquet(self, key: str, df: pd.DataFrame, prefix: str) -> Optional[Path]:
+        if not self.persist:
+            return None
+        path = self.snapshot_dir / f"{prefix}.{self._safe_key(key)}{SNAPSHOT_SUFFIX}"
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(tmp_path, index=False)
+            tmp_path.replace(path)  # rename atômico: outros workers nunca veem arquivo parcial
+            return path
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível persistir snapshot {key} em Parquet: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return None
+
+    def _remove_parquet(self, key: Optional[str], keep: Optional[Set[str]]) -> None:
+        if not self.persist or not self.snapshot_dir.exists():
+            return
+        pattern = f"*.{self._safe_key(key)}{SNAPSHOT_SUFFIX}" if key is not None else f"*{SNAPSHOT_SUFFIX}"
+        keep_suffixes = tuple(f".{self._safe_key(k)}{SNAPSHOT_SUFFIX}" for k in keep or ())
+        for path in self.snapshot_dir.glob(pattern):
+            if keep_suffixes and path.name.endswith(keep_suffixes):
+                continue
+            try:
+                path.unlink()
+            except OSError as e:
+                logger.debug(f"Snapshot {path} não removido: {e}")
+
+    def info(self) -> Dict[str, Any]:
+        """Estado atual do cache (para logs e diagnóstico)."""
+        with self._lock:
+            return {
+                "active_key": self._active_key,
+                "entries": {k: {"rows": len(e.frame), "bytes": e.nbytes, "source": e.source}
+                            for k, e in self._entries.items()},
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                **self.stats,
+            }
+
+
+_service: Optional[DatasetSnapshotService] = None
+_service_lock = threading.Lock()
+
+
+def get_dataset_snapshot_service() -> DatasetSnapshotService:
+    """Instância única do serviço de snapshots no processo."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = DatasetSnapshotService()
+    return _service
@@ -0,0 +1,319 @@
+"""Política de carregamento com memória limitada por requisição.
+
+CSVs inteiros eram carregados com os tipos padrão do pandas (float64/int64 e
+strings em ``object``) e o mesmo DataFrame acabava copiado por analisadores e
+pelo armazenamento de uploads; com 4 workers, duas análises grandes
+simultâneas bastavam para o OOM killer. Este módulo concentra a política:
+
+- ``optimize_dtypes``: inteiros e floats no menor tipo sem perda (float32
+  opcional, com perda) e texto de baixa cardinalidade como ``category``;
+- ``plan_csv_load``: lê só uma amostra do arquivo para decidir os tipos das
+  colunas pedidas (projeção) e estimar o tamanho final em memória;
+- acima do orçamento (``ANALYSIS_MEMORY_BUDGET_BYTES``) o plano cai para
+  execução em blocos (``iter_csv_chunks``) quando o consumidor agrega em
+  streaming, ou para uma amostra sistemática determinística
+  (``read_csv_bounded``) quando precisa do DataFrame inteiro, descrita por
+  ``LoadPlan.sampling`` para que os resultados informem que vieram de amostra;
+- ``peak_rss_bytes``: pico de memória residente do processo, para relatórios.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.data.dataset_snapshot import frame_nbytes
+from src.settings import (
+    ANALYSIS_CATEGORICAL_MAX_RATIO,
+    ANALYSIS_DOWNCAST_FLOAT32,
+    ANALYSIS_MEMORY_BUDGET_BYTES,
+)
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+LOAD_FULL = 'full'
+LOAD_CHUNKED = 'chunked'
+LOAD_SAMPLED = 'sampled'
+
+# Bytes lidos do início do arquivo para estimar o tamanho médio de uma linha
+LINE_SAMPLE_BYTES = 1024 * 1024
+
+
+@dataclass
+class MemoryPolicy:
+    """Parâmetros da política de memória de uma requisição de análise.
+
+    Attributes:
+        budget_bytes: Memória máxima do DataFrame carregado
+        categorical_max_ratio: Texto vira ``category`` se distintos / linhas ≤ este valor
+        float32: Permite float64 → float32 com perda de precisão
+        sample_rows: Linhas da amostra sistemática quando o orçamento estoura
+        chunk_rows: Linhas por bloco na execução em blocos
+        schema_sample_rows: Linhas lidas para inferir tipos e estimar o tamanho
+    """
+    budget_bytes: int = ANALYSIS_MEMORY_BUDGET_BYTES
+    categorical_max_ratio: float = ANALYSIS_CATEGORICAL_MAX_RATIO
+    float32: bool = ANALYSIS_DOWNCAST_FLOAT32
+    sample_rows: int = 200_000
+    chunk_rows: int = 100_000
+    schema_sample_rows: int = 20_000
+
+
+@dataclass
+class LoadPlan:
+    """Decisão de carregamento de um CSV sob a política de memória."""
+    mode: str  # LOAD_FULL, LOAD_CHUNKED ou LOAD_SAMPLED
+    columns: Optional[List[str]]
+    read_dtypes: Dict[str, str]
+    estimated_rows: int
+    estimated_bytes: int
+    budget_bytes: int
+    encoding: str = 'utf-8'
+    sample_step: int = 1
+    chunk_rows: int = 100_000
+    float32: bool = False
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def sampling(self, loaded_rows: int, original_rows: Optional[int] = None) -> Dict[str, Any]:
+        """Descrição da amostragem aplicada, para mostrar a quem consome o DataFrame.
+
+        Args:
+            loaded_rows: Linhas efetivamente carregadas
+            original_rows: Linhas do arquivo (padrão: estimativa do plano)
+        """
+        sampled = self.mode == LOAD_SAMPLED and self.sample_step > 1
+        return {
+            'sampled': sampled,
+            'sample_step': self.sample_step if sampled else 1,
+            'loaded_rows': int(loaded_rows),
+            'original_rows': int(original_rows if original_rows is not None
+                                 else (self.estimated_rows if sampled else loaded_rows)),
+        }
+
+
+def estimate_frame_bytes(df: pd.DataFrame, sample_rows: int = 10_000) -> int:
+    """``frame_nbytes`` aproximado: strings de colunas object medidas numa amostra sistemática."""
+    if len(df) <= sample_rows:
+        return frame_nbytes(df)
+    shallow = df.memory_usage(deep=False)
+    text_cols = [col for col in df.columns if df[col].dtype == object]
+    if not text_cols:
+        return int(shallow.sum())
+    sample = df[text_cols].iloc[::math.ceil(len(df) / sample_rows)]
+    text_bytes = sample.memory_usage(deep=True, index=False).sum() * len(df) / len(sample)
+    return int(shallow.drop(text_cols).sum() + text_bytes)
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Pico de memória residente do processo (None onde ``resource`` não existe)."""
+    try:
+        import resource
+        import sys
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak if sys.platform == 'darwin' else peak * 1024)
+
+
+def downcast_numeric(series: pd.Series, float32: bool = False) -> pd.Series:
+    """Menor tipo numérico que representa a série sem perda.
+
+    Inteiros (inclusive com sinal) vão para int8/16/32 ou uint conforme o
+    intervalo; floats só viram float32 se todos os valores sobrevivem à ida e
+    volta, a menos que ``float32`` aceite a perda.
+    """
+    if pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        if series.dtype.itemsize == 1:
+            return series
+        downcast = 'unsigned' if len(series) and series.min() >= 0 else 'integer'
+        return pd.to_numeric(series, downcast=downcast)
+    if series.dtype == np.float64:
+        values = series.to_numpy()
+        narrowed = values.astype(np.float32)
+        if float32 or np.array_equal(narrowed.astype(np.float64), values, equal_nan=True):
+            return pd.Series(narrowed, index=series.index, name=series.name)
+    return series
+
+
+def optimize_dtypes(
+    df: pd.DataFrame,
+    policy: Optional[MemoryPolicy] = None,
+    categorical: bool = True
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Aplica a política de tipos a um DataFrame já carregado.
+
+    Args:
+        df: DataFrame original (não é alterado)
+        policy: Política (padrão: valores de ``src.settings``)
+        categorical: Converte texto de baixa cardinalidade para ``category``
+
+    Returns:
+        DataFrame otimizado (cópia rasa; colunas intocadas são compartilhadas)
+        e relatório com bytes antes/depois e colunas convertidas
+    """
+    policy = policy or MemoryPolicy()
+    optimized = df.copy(deep=False)
+    report: Dict[str, Any] = {'bytes_before': frame_nbytes(df), 'downcast': {}, 'categorical': []}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series):
+            narrowed = downcast_numeric(series, policy.float32)
+            if narrowed.dtype != series.dtype:
+                optimized[col] = narrowed
+                report['downcast'][col] = f"{series.dtype}->{narrowed.dtype}"
+        elif categorical and not isinstance(series.dtype, pd.CategoricalDtype) and (
+                pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+            if len(series) and series.nunique(dropna=True) / len(series) <= policy.categorical_max_ratio:
+                optimized[col] = series.astype('category')
+                report['categorical'].append(col)
+    report['bytes_after'] = frame_nbytes(optimized)
+    return optimized, report
+
+
+def count_csv_rows(path: Union[str, Path], block_bytes: int = 8 * 1024 * 1024) -> int:
+    """Linhas de dados do CSV (sem o cabeçalho), contando quebras de linha em blocos.
+
+    Não interpreta aspas: campos com quebra de linha contam como linhas extras.
+    """
+    lines, last = 0, b'\n'
+    with open(path, 'rb') as f:
+        while block := f.read(block_bytes):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def estimate_csv_rows(path: Union[str, Path]) -> int:
+    """Estima as linhas de dados pelo tamanho médio das linhas do início do arquivo."""
+    size = Path(path).stat().st_size
+    with open(path, 'rb') as f:
+        head = f.read(LINE_SAMPLE_BYTES)
+    lines = head.count(b'\n')
+    if len(head) >= size:
+        return max(lines - 1 + (0 if head.endswith(b'\n') else 1), 0)
+    if lines <= 1:
+        return 1
+    return max(int(size / (len(head) / lines)) - 1, 1)
+
+
+def plan_csv_load(
+    path: Union[str, Path],
+    columns: Optional[Sequence[str]] = None,
+    policy: Optional[MemoryPolicy] = None,
+    encoding: str = 'utf-8',
+    streaming: bool = False
+) -> LoadPlan:
+    """Decide como carregar o CSV dentro do orçamento de memória.
+
+    Lê ``schema_sample_rows`` linhas (só as colunas pedidas), aplica
+    ``optimize_dtypes`` e extrapola bytes/linha para o arquivo inteiro.
+
+    Args:
+        path: Caminho do CSV
+        columns: Colunas declaradas pela análise (None = todas)
+        policy: Política de memória
+        encoding: Encoding do arquivo
+        streaming: O consumidor agrega em blocos (usa LOAD_CHUNKED acima do
+            orçamento); senão usa LOAD_SAMPLED
+
+    Returns:
+        Plano de carregamento
+    """
+    policy = policy or MemoryPolicy()
+    usecols = list(columns) if columns else None
+    sample = pd.read_csv(path, encoding=encoding, usecols=usecols, nrows=policy.schema_sample_rows,
+                         low_memory=False)
+    optimized, report = optimize_dtypes(sample, policy)
+    read_dtypes = {col: 'category' for col in report['categorical']}
+
+    estimated_rows = len(sample) if len(sample) < policy.schema_sample_rows else estimate_csv_rows(path)
+    bytes_per_row = report['bytes_after'] / len(sample) if len(sample) else 0.0
+    estimated_bytes = int(bytes_per_row * estimated_rows)
+
+    mode = LOAD_FULL
+    sample_step = 1
+    if estimated_bytes > policy.budget_bytes:
+        if streaming:
+            mode = LOAD_CHUNKED
+        else:
+            mode = LOAD_SAMPLED
+            affordable = max(int(policy.budget_bytes / bytes_per_row), 1) if bytes_per_row else policy.sample_rows
+            sample_step = math.ceil(estimated_rows / min(policy.sample_rows, affordable))
+
+    plan = LoadPlan(
+        mode=mode,
+        columns=usecols,
+        read_dtypes=read_dtypes,
+        estimated_rows=estimated_rows,
+        estimated_bytes=estimated_bytes,
+        budget_bytes=policy.budget_bytes,
+        encoding=encoding,
+        sample_step=sample_step,
+        chunk_rows=policy.chunk_rows,
+        float32=policy.float32,
+        metadata={'sample_bytes_before': report['bytes_before'], 'sample_bytes_after': report['bytes_after']}
+    )
+    logger.info(f"🧮 Plano de carga {Path(path).name}: {mode}, ~{estimated_rows:,} linhas, "
+                f"~{estimated_bytes / 1024 ** 2:.0f} MB (orçamento {policy.budget_bytes / 1024 ** 2:.0f} MB)")
+    return plan
+
+
+def read_csv_kwargs(plan: LoadPlan) -> Dict[str, Any]:
+    """Argumentos de ``pd.read_csv`` que aplicam projeção, tipos e amostragem do plano."""
+    # low_memory padrão (True): o parser tokeniza em blocos; False manteria o arquivo inteiro tokenizado
+    kwargs: Dict[str, Any] = {'encoding': plan.encoding}
+    if plan.columns:
+        kwargs['usecols'] = plan.columns
+    if plan.read_dtypes:
+        kwargs['dtype'] = dict(plan.read_dtypes)
+    if plan.mode == LOAD_SAMPLED and plan.sample_step > 1:
+        step = plan.sample_step
+        kwargs['skiprows'] = lambda i: i > 0 and (i - 1) % step != 0  # linha 0 = cabeçalho
+    return kwargs
+
+
+def read_csv_bounded(path: Union[str, Path], plan: LoadPlan) -> pd.DataFrame:
+    """Carrega o CSV conforme o plano (completo ou amostra sistemática) com tipos otimizados.
+
+    Raises:
+        ValueError: Se o plano for de execução em blocos (use ``iter_csv_chunks``)
+    """
+    if plan.mode == LOAD_CHUNKED:
+        raise ValueError("Plano em blocos: use iter_csv_chunks()")
+    df = pd.read_csv(path, **read_csv_kwargs(plan))
+    return _downcast_frame(df, plan.float32)
+
+
+def iter_csv_chunks(path: Union[str, Path], plan: LoadPlan) -> Iterator[pd.DataFrame]:
+    """Percorre o CSV em blocos de ``plan.chunk_rows`` linhas com tipos otimizados."""
+    kwargs = read_csv_kwargs(plan)
+    kwargs.pop('skiprows', None)
+    with pd.read_csv(path, chunksize=plan.chunk_rows, **kwargs) as reader:
+        for chunk in reader:
+            yield _downcast_frame(chunk, plan.float32)
+
+
+def sample_frame(df: pd.DataFrame, max_rows: int) -> pd.DataFrame:
+    """Amostra sistemática determinística (cada k-ésima linha) com no máximo ``max_rows`` linhas."""
+    if len(df) <= max_rows:
+        return df
+    return df.iloc[::math.ceil(len(df) / max_rows)]
+
+
+def _downcast_frame(df: pd.DataFrame, float32: bool) -> pd.DataFrame:
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = downcast_numeric(df[col], float32)
+    return df
@@ -308,6 +308,25 @@ class EmbeddingGenerator:
         resized = np.interp(target_indexes, np.arange(current_dim, dtype=np.float32), vector)
         return resized.astype(np.float32).tolist()
     
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Gera embeddings de vários textos curtos (ex.: variações de uma pergunta).
+        
+        Com Sentence Transformers o lote inteiro vai num único ``encode``; os
+        demais provedores recorrem a ``generate_embedding`` por texto.
+        
+        Args:
+            texts: Textos a codificar
+        
+        Returns:
+            Embeddings na ordem dos textos
+        """
+        if not texts:
+            return []
+        if self.provider == EmbeddingProvider.SENTENCE_TRANSFORMER:
+            vectors = self._client.encode(list(texts), normalize_embeddings=True)
+            return [self._ensure_target_dimensions(vector.tolist()) for vector in vectors]
+        return [self.generate_embedding(text).embedding for text in texts]
+    
     def generate_embeddings_batch(self, 
                                   chunks: List[TextChunk], 
                                   batch_size: int = 30) -> List[EmbeddingResult]:
@@ -11,7 +11,9 @@ from __future__ import annotations
 import uuid
 import json
 import ast
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
@@ -19,12 +21,30 @@ import os
 from src.embeddings.chunker import TextChunk, ChunkMetadata
 from src.embeddings.generator import EmbeddingResult
 from src.vectorstore.supabase_client import supabase
+from src.settings import VECTOR_SEARCH_MAX_WORKERS
 from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 VECTOR_DIMENSIONS = int(os.getenv("VECTOR_DIMENSIONS", "384"))
 
+# Pool compartilhado para buscas concorrentes (o cliente supabase-py é síncrono)
+_search_executor: Optional[ThreadPoolExecutor] = None
+_search_executor_lock = threading.Lock()
+
+
+def get_vector_search_executor() -> ThreadPoolExecutor:
+    """Retorna (criando sob demanda) o pool de buscas vetoriais concorrentes."""
+    global _search_executor
+    if _search_executor is None:
+        with _search_executor_lock:
+            if _search_executor is None:
+                _search_executor = ThreadPoolExecutor(
+                    max_workers=VECTOR_SEARCH_MAX_WORKERS,
+                    thread_name_prefix="vector-search"
+                )
+    return _search_executor
+
 
 def parse_embedding_from_api(embedding: Any, expected_dim: int = VECTOR_DIMENSIONS) -> List[float]:
     """Converte embedding da API Supabase para lista de floats.
@@ -397,6 +417,56 @@ class VectorStore:
             self.logger.error(f"Fallback search também falhou: {str(e)}")
             return []
     
+    def search_similar_many(self,
+                            query_embeddings: List[List[float]],
+                            similarity_threshold: float = 0.7,
+                            limit: int = 5,
+                            filters: Optional[Dict[str, Any]] = None,
+                            stop_when: Optional[Callable[[List[VectorSearchResult]], bool]] = None
+                            ) -> List[List[VectorSearchResult]]:
+        """Executa várias buscas vetoriais concorrentemente.
+        
+        Cada vetor vira uma chamada ``search_similar`` no pool compartilhado;
+        o tempo total passa a ser o da busca mais lenta, não a soma.
+        
+        Args:
+            query_embeddings: Embeddings das consultas
+            similarity_threshold: Threshold mínimo de similaridade
+            limit: Número máximo de resultados por consulta
+            filters: Filtros adicionais para metadados
+            stop_when: Recebe os resultados acumulados na ordem de chegada;
+                se retornar True, buscas ainda não iniciadas são canceladas
+        
+        Returns:
+            Uma lista de resultados por embedding, na ordem de entrada
+            (vazia para buscas canceladas ou com erro)
+        """
+        results: List[List[VectorSearchResult]] = [[] for _ in query_embeddings]
+        if not query_embeddings:
+            return results
+        
+        executor = get_vector_search_executor()
+        futures = {
+            executor.submit(self.search_similar, embedding, similarity_threshold, limit, filters): index
+            for index, embedding in enumerate(query_embeddings)
+        }
+        arrived: List[VectorSearchResult] = []
+        try:
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    self.logger.warning(f"Busca vetorial concorrente falhou: {str(e)}")
+                    continue
+                arrived.extend(results[futures[future]])
+                if stop_when is not None and stop_when(arrived):
+                    break
+        finally:
+            cancelled = sum(future.cancel() for future in futures)
+            if cancelled:
+                self.logger.debug(f"{cancelled} buscas canceladas após parada antecipada")
+        return results
+    
     def get_embedding_by_id(self, embedding_id: str) -> Optional[StoredEmbedding]:
         """Recupera um embedding específico pelo ID."""
         try:
@@ -26,6 +26,7 @@ sys.path.insert(0, str(root_dir))
 
 from src.utils.logging_config import get_logger
 from src.settings import GROQ_API_KEY, OPENAI_API_KEY, GOOGLE_API_KEY
+from src.prompts.manager import prompt_metrics
 
 logger = get_logger(__name__)
 
@@ -47,6 +48,8 @@ class LLMResponse:
     processing_time: float = 0.0
     error: Optional[str] = None
     success: bool = True
+    prompt_tokens: Optional[int] = None
+    cached_tokens: Optional[int] = None  # Tokens do prompt servidos pelo cache do provedor
 
 
 @dataclass
@@ -56,6 +59,17 @@ class LLMConfig:
     max_tokens: int = 1024
     top_p: float = 0.9
     model: Optional[str] = None  # Se None, usa modelo padrão do provedor
+    prompt_cache_key: Optional[str] = None  # Hash do prefixo fixo (RenderedPrompt.prefix_hash)
+
+
+def _usage_tokens(response: Any) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """Extrai (total, prompt, cacheados) do ``usage`` de respostas no formato OpenAI."""
+    usage = getattr(response, 'usage', None)
+    if not usage:
+        return None, None, None
+    details = getattr(usage, 'prompt_tokens_details', None)
+    cached = getattr(details, 'cached_tokens', None) if details else None
+    return getattr(usage, 'total_tokens', None), getattr(usage, 'prompt_tokens', None), cached
 
 
 class LLMManager:
@@ -211,16 +225,16 @@ class LLMManager:
         content = response.choices[0].message.content
         
         # Extrair tokens de forma segura
-        tokens_used = None
-        if hasattr(response, 'usage') and response.usage:
-            tokens_used = getattr(response.usage, 'total_tokens', None)
+        tokens_used, prompt_tokens, cached_tokens = _usage_tokens(response)
         
         return LLMResponse(
             content=content,
             provider=LLMProvider.GROQ,
             model=model,
             tokens_used=tokens_used,
-            processing_time=processing_time
+            processing_time=processing_time,
+            prompt_tokens=prompt_tokens,
+            cached_tokens=cached_tokens
         )
     
     def _call_google(self, prompt: str, config: LLMConfig, system_prompt: Optional[str] = None) -> LLMResponse:
@@ -265,24 +279,30 @@ class LLMManager:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
         
+        # A chave agrupa no mesmo servidor as requisições com o mesmo prefixo (prompt caching)
+        extra_body = {"prompt_cache_key": config.prompt_cache_key} if config.prompt_cache_key else None
+        
         response = client.chat.completions.create(
             model=model,
             messages=messages,
             temperature=config.temperature,
             max_tokens=config.max_tokens,
-            top_p=config.top_p
+            top_p=config.top_p,
+            extra_body=extra_body
         )
         
         processing_time = time.time() - start_time
         content = response.choices[0].message.content
-        tokens_used = response.usage.total_tokens
+        tokens_used, prompt_tokens, cached_tokens = _usage_tokens(response)
         
         return LLMResponse(
             content=content,
             provider=LLMProvider.OPENAI,
             model=model,
             tokens_used=tokens_used,
-            processing_time=processing_time
+            processing_time=processing_time,
+            prompt_tokens=prompt_tokens,
+            cached_tokens=cached_tokens
         )
     
     def chat(self, 
@@ -342,6 +362,7 @@ class LLMManager:
                     self.active_provider = provider
                 
                 self.logger.debug(f"✅ Resposta obtida via {provider.value} em {response.processing_time:.2f}s")
+                prompt_metrics.record_usage(config.prompt_cache_key, response.prompt_tokens, response.cached_tokens)
                 return response
                 
             except Exception as e:
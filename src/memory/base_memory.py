@@ -79,6 +79,29 @@ class BaseMemoryManager(ABC):
         """Salva uma mensagem de conversação."""
         pass
     
+    async def save_conversation_batch(self, session_id: str,
+                                      messages: List[Dict[str, Any]]) -> List[ConversationMessage]:
+        """
+        Salva várias mensagens de conversação.
+        
+        Implementação padrão: uma chamada de save_conversation por mensagem.
+        Backends com suporte a gravação em lote devem sobrescrever.
+        
+        Args:
+            session_id: ID da sessão
+            messages: Lista de dicts com 'message_type', 'content' e campos opcionais
+            
+        Returns:
+            Mensagens salvas, na mesma ordem recebida
+        """
+        saved = []
+        for message in messages:
+            fields = dict(message)
+            saved.append(await self.save_conversation(
+                session_id, fields.pop('message_type'), fields.pop('content'), **fields
+            ))
+        return saved
+    
     @abstractmethod
     async def get_conversation_history(self, session_id: str, 
                                      limit: Optional[int] = None,
@@ -93,6 +116,39 @@ class BaseMemoryManager(ABC):
         """Salva contexto do agente."""
         pass
     
+    async def save_context_batch(self, session_id: str,
+                                 contexts: List[Dict[str, Any]]) -> List[AgentContext]:
+        """
+        Salva vários contextos da sessão.
+        
+        Implementação padrão: uma chamada de save_context por item.
+        
+        Args:
+            session_id: ID da sessão
+            contexts: Lista de dicts com 'context_type', 'context_key',
+                'context_data' e campos opcionais
+            
+        Returns:
+            Contextos salvos
+        """
+        saved = []
+        for ctx in contexts:
+            fields = dict(ctx)
+            saved.append(await self.save_context(
+                session_id, ContextType(fields.pop('context_type')),
+                fields.pop('context_key'), fields.pop('context_data'), **fields
+            ))
+        return saved
+    
+    async def increment_context_access(self, access_counts: Dict[str, int]) -> None:
+        """
+        Aplica contadores de acesso acumulados (context_id -> nº de acessos).
+        
+        Implementação padrão não faz nada; backends que rastreiam acesso
+        devem sobrescrever.
+        """
+        return None
+    
     @abstractmethod
     async def get_context(self, session_id: str, context_type: ContextType,
                         context_key: str) -> Optional[AgentContext]:
@@ -217,6 +273,42 @@ class BaseMemoryManager(ABC):
             metadata=metadata or {}
         )
     
+    async def add_interaction(self, query: str, response: str, session_id: str,
+                            processing_time_ms: Optional[int] = None,
+                            confidence_score: Optional[float] = None,
+                            model_used: Optional[str] = None,
+                            metadata: Optional[Dict[str, Any]] = None) -> List[ConversationMessage]:
+        """
+        Adiciona uma troca completa (consulta + resposta) em uma única gravação.
+        
+        Args:
+            query: Consulta do usuário
+            response: Resposta do agente
+            session_id: ID da sessão
+            processing_time_ms: Tempo de processamento da resposta
+            confidence_score: Score de confiança da resposta
+            model_used: Modelo LLM utilizado
+            metadata: Metadados adicionais (aplicados às duas mensagens)
+            
+        Returns:
+            Mensagens salvas [consulta, resposta]
+        """
+        return await self.save_conversation_batch(session_id, [
+            {
+                'message_type': MessageType.QUERY,
+                'content': query,
+                'metadata': metadata or {}
+            },
+            {
+                'message_type': MessageType.RESPONSE,
+                'content': response,
+                'processing_time_ms': processing_time_ms,
+                'confidence_score': confidence_score,
+                'model_used': model_used,
+                'metadata': metadata or {}
+            }
+        ])
+    
     async def store_data_context(self, session_id: str, data_info: Dict[str, Any],
                                context_key: str = "current_data") -> AgentContext:
         """
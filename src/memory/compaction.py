@@ -0,0 +1,508 @@
+"""
+Compactação da memória de conversação dos agentes.
+
+agent_conversations e agent_memory_embeddings crescem sem limite por sessão,
+e o recall (get_conversation_history/recall_conversation_context) lê
+históricos cada vez mais longos. O MemoryCompactor, por sessão:
+
+1. Mantém os últimos N turnos (e tudo mais novo que a idade máxima) e
+   substitui os turnos antigos por UM registro de resumo (message_type
+   'system', metadata.compacted=True). O resumo é cumulativo: se já existe um
+   resumo entre os turnos antigos, ele é incorporado ao novo (rolling summary).
+2. Reduz os embeddings antigos da sessão a um pequeno conjunto
+   representativo (medoides de um k-means em numpy); os demais são removidos.
+3. Aplica a cota de bytes por sessão: se ainda estiver acima dela, compacta
+   mais turnos (até o mínimo configurado).
+
+Executável como tarefa de fundo (start_compaction_task) ou via CLI
+(scripts/compact_memory.py). O relatório informa linhas e bytes recuperados
+e a latência do recall antes/depois.
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..settings import (
+    MEMORY_COMPACTION_INTERVAL_HOURS,
+    MEMORY_COMPACTION_KEEP_TURNS,
+    MEMORY_COMPACTION_MAX_AGE_HOURS,
+    MEMORY_COMPACTION_MAX_EMBEDDINGS,
+    MEMORY_COMPACTION_MIN_KEEP_TURNS,
+    MEMORY_SESSION_QUOTA_BYTES
+)
+from ..utils.logging_config import get_logger
+from . import supabase_memory
+from .memory_types import ConversationMessage, MemoryConfig, MessageType
+from .memory_utils import truncate_content
+
+logger = get_logger(__name__)
+
+# Bytes por dimensão de um vector(1536) no pgvector (float4)
+_VECTOR_BYTES_PER_DIM = 4
+# Tamanho máximo de IN (...) por DELETE, para não estourar a URL do PostgREST
+_DELETE_CHUNK = 200
+_PAGE_SIZE = 500
+
+Summarizer = Callable[[Optional[str], List[ConversationMessage]], str]
+
+
+@dataclass
+class CompactionPolicy:
+    """Parâmetros da compactação (padrões em src/settings.py)."""
+    keep_recent_turns: int = MEMORY_COMPACTION_KEEP_TURNS
+    max_age_hours: float = MEMORY_COMPACTION_MAX_AGE_HOURS
+    max_session_bytes: int = MEMORY_SESSION_QUOTA_BYTES
+    max_embeddings: int = MEMORY_COMPACTION_MAX_EMBEDDINGS
+    min_keep_turns: int = MEMORY_COMPACTION_MIN_KEEP_TURNS
+    summary_max_chars: int = 4000
+
+
+@dataclass
+class CompactionReport:
+    """Resultado de uma execução de compactação."""
+    sessions_scanned: int = 0
+    sessions_compacted: int = 0
+    conversation_rows_deleted: int = 0
+    embedding_rows_deleted: int = 0
+    summary_rows_written: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    quota_violations: int = 0
+    recall_ms_before: Optional[float] = None
+    recall_ms_after: Optional[float] = None
+    duration_s: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rows_reclaimed(self) -> int:
+        return self.conversation_rows_deleted + self.embedding_rows_deleted - self.summary_rows_written
+
+    @property
+    def bytes_reclaimed(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    def merge(self, other: "CompactionReport") -> None:
+        for name in ('sessions_scanned', 'sessions_compacted', 'conversation_rows_deleted',
+                     'embedding_rows_deleted', 'summary_rows_written', 'bytes_before',
+                     'bytes_after', 'quota_violations'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.errors.extend(other.errors)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['rows_reclaimed'] = self.rows_reclaimed
+        data['bytes_reclaimed'] = self.bytes_reclaimed
+        return data
+
+
+# ============================================================================
+# FUNÇÕES AUXILIARES
+# ============================================================================
+
+def _conversation_bytes(row: Dict[str, Any]) -> int:
+    return len((row.get('content') or '').encode('utf-8')) + len(json.dumps(row.get('metadata') or {}))
+
+
+def _embedding_bytes(row: Dict[str, Any], dimension: int) -> int:
+    return (len((row.get('source_text') or '').encode('utf-8'))
+            + dimension * _VECTOR_BYTES_PER_DIM
+            + len(json.dumps(row.get('metadata') or {})))
+
+
+def _parse_vector(value: Any) -> Optional[np.ndarray]:
+    """PostgREST devolve vector como string '[0.1,...]'."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    return np.asarray(value, dtype=np.float32)
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    # Comparações com datetime.now() locais
+    return parsed.replace(tzinfo=None) if parsed.tzinfo is None else parsed.astimezone().replace(tzinfo=None)
+
+
+def select_representatives(vectors: np.ndarray, k: int, iterations: int = 10,
+                           seed: int = 0) -> List[Tuple[int, int]]:
+    """
+    Escolhe k embeddings representativos (medoides de um k-means).
+
+    Args:
+        vectors: Matriz (n, d)
+        k: Quantidade de representantes
+        iterations: Iterações de Lloyd
+        seed: Semente do k-means++
+
+    Returns:
+        Lista de (índice do representante, nº de vetores que ele representa)
+    """
+    n = len(vectors)
+    if n <= k:
+        return [(i, 1) for i in range(n)]
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.where(norms == 0, 1, norms)
+    rng = np.random.default_rng(seed)
+
+    # k-means++ em distância cosseno
+    centroids = [unit[rng.integers(n)]]
+    for _ in range(1, k):
+        dist = 1 - np.max(unit @ np.stack(centroids).T, axis=1)
+        dist = np.clip(dist, 0, None)
+        total = dist.sum()
+        probs = dist / total if total > 0 else None
+        centroids.append(unit[rng.choice(n, p=probs)])
+    centroids = np.stack(centroids)
+
+    for _ in range(iterations):
+        labels = np.argmax(unit @ centroids.T, axis=1)
+        updated = np.stack([
+            unit[labels == c].mean(axis=0) if np.any(labels == c) else centroids[c]
+            for c in range(k)
+        ])
+        if np.allclose(updated, centroids):
+            break
+        centroids = updated
+
+    labels = np.argmax(unit @ centroids.T, axis=1)
+    representatives = []
+    for c in range(k):
+        members = np.flatnonzero(labels == c)
+        if len(members) == 0:
+            continue
+        medoid = members[np.argmax(unit[members] @ centroids[c])]
+        representatives.append((int(medoid), len(members)))
+    return representatives
+
+
+def extractive_summary(previous_summary: Optional[str], messages: List[ConversationMessage],
+                       max_chars: int = 4000) -> str:
+    """
+    Resumo extrativo padrão: perguntas do usuário e início das respostas.
+
+    O resumo anterior é mantido no topo; se o total exceder max_chars, as
+    linhas mais antigas são descartadas primeiro.
+    """
+    if not messages:
+        return previous_summary or ""
+
+    header = (f"[RESUMO] {len(messages)} mensagens compactadas "
+              f"(turnos {messages[0].conversation_turn}-{messages[-1].conversation_turn}, "
+              f"{messages[0].timestamp:%Y-%m-%d %H:%M} a {messages[-1].timestamp:%Y-%m-%d %H:%M})")
+    lines = []
+    for msg in messages:
+        if msg.message_type == MessageType.QUERY:
+            lines.append(f"- Pergunta: {truncate_content(msg.content.strip(), 200)}")
+        elif msg.message_type == MessageType.RESPONSE:
+            lines.append(f"  Resposta: {truncate_content(msg.content.strip(), 160)}")
+
+    previous_lines = previous_summary.splitlines() if previous_summary else []
+    all_lines = previous_lines + [header] + lines
+    while len(all_lines) > 1 and sum(len(l) + 1 for l in all_lines) > max_chars:
+        all_lines.pop(0)
+    return "\n".join(all_lines)
+
+
+# ============================================================================
+# COMPACTADOR
+# ============================================================================
+
+class MemoryCompactor:
+    """Compacta histórico e embeddings de sessões no Supabase."""
+
+    def __init__(self, policy: Optional[CompactionPolicy] = None,
+                 summarizer: Optional[Summarizer] = None,
+                 dry_run: bool = False):
+        """
+        Args:
+            policy: Parâmetros de compactação
+            summarizer: Função (resumo_anterior, mensagens) -> novo resumo;
+                padrão é o resumo extrativo (sem LLM)
+            dry_run: Apenas calcula o relatório, sem alterar o banco
+        """
+        self.policy = policy or CompactionPolicy()
+        self.summarizer = summarizer or (
+            lambda prev, msgs: extractive_summary(prev, msgs, self.policy.summary_max_chars)
+        )
+        self.dry_run = dry_run
+        # Usado para converter linhas e medir o recall (não faz I/O na criação)
+        self._manager = supabase_memory.SupabaseMemoryManager('memory_compactor')
+
+    async def _execute(self, query: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(supabase_memory.get_memory_io_executor(), query.execute)
+
+    @property
+    def _db(self):
+        return supabase_memory.supabase
+
+    # ------------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------------
+
+    async def run(self, session_ids: Optional[List[str]] = None,
+                  measure_recall: bool = False) -> CompactionReport:
+        """
+        Compacta as sessões indicadas (ou todas).
+
+        Args:
+            session_ids: session_ids a compactar; None percorre agent_sessions
+            measure_recall: Mede a latência de get_conversation_history antes
+                e depois nas sessões compactadas
+
+        Returns:
+            Relatório agregado
+        """
+        started = time.perf_counter()
+        report = CompactionReport()
+        recall_before: List[float] = []
+        recall_after: List[float] = []
+
+        async for session in self._iter_sessions(session_ids):
+            try:
+                before = await self._measure_recall(session['session_id']) if measure_recall else None
+                session_report = await self.compact_session(session['id'])
+                report.merge(session_report)
+                if before is not None and session_report.sessions_compacted and not self.dry_run:
+                    recall_before.append(before)
+                    recall_after.append(await self._measure_recall(session['session_id']))
+            except Exception as e:
+                logger.error(f"Erro ao compactar sessão {session.get('session_id')}: {e}")
+                report.sessions_scanned += 1
+                report.errors.append(f"{session.get('session_id')}: {e}")
+
+        if recall_before:
+            report.recall_ms_before = sum(recall_before) / len(recall_before)
+        if recall_after:
+            report.recall_ms_after = sum(recall_after) / len(recall_after)
+        report.duration_s = time.perf_counter() - started
+        logger.info(f"Compactação de memória concluída: {report.to_dict()}")
+        return report
+
+    async def compact_session(self, session_uuid: str) -> CompactionReport:
+        """Compacta uma sessão (pelo UUID de agent_sessions.id)."""
+        report = CompactionReport(sessions_scanned=1)
+        policy = self.policy
+
+        conversations = await self._fetch_all(
+            lambda: self._db.table('agent_conversations').select('*')
+            .eq('session_id', session_uuid).order('conversation_turn')
+        )
+        embeddings = await self._fetch_all(
+            lambda: self._db.table('agent_memory_embeddings')
+            .select('id, source_text, embedding, embedding_type, metadata, created_at')
+            .eq('session_id', session_uuid).order('created_at')
+        )
+        dimension = next(
+            (len(v) for v in (_parse_vector(e.get('embedding')) for e in embeddings[:1]) if v is not None),
+            MemoryConfig.EMBEDDING_DIMENSION
+        )
+
+        conv_bytes = {row['id']: _conversation_bytes(row) for row in conversations}
+        emb_bytes = {row['id']: _embedding_bytes(row, dimension) for row in embeddings}
+        report.bytes_before = sum(conv_bytes.values()) + sum(emb_bytes.values())
+
+        # 1. Turnos a compactar: além dos N mais recentes e mais velhos que a idade máxima
+        cutoff = datetime.now() - timedelta(hours=policy.max_age_hours)
+        split = self._split_index(conversations, policy.keep_recent_turns, cutoff)
+
+        # 2. Embeddings antigos -> representantes
+        candidates = [e for e in embeddings
+                      if (_parse_timestamp(e.get('created_at')) or datetime.now()) < cutoff]
+        keep_embeddings, drop_embeddings = self._reduce_embeddings(candidates, policy.max_embeddings)
+
+        # 3. Cota: compacta mais turnos (até o mínimo) e, se preciso, todos os embeddings
+        projected = self._projected_bytes(conversations, split, conv_bytes, emb_bytes, drop_embeddings)
+        if projected > policy.max_session_bytes:
+            report.quota_violations = 1
+            max_split = max(len(conversations) - policy.min_keep_turns, 0)
+            while split < max_split and projected > policy.max_session_bytes:
+                split += 1
+                projected = self._projected_bytes(conversations, split, conv_bytes, emb_bytes, drop_embeddings)
+            if projected > policy.max_session_bytes:
+                candidates = embeddings
+                keep_embeddings, drop_embeddings = self._reduce_embeddings(candidates, policy.max_embeddings)
+
+        to_compact = conversations[:split]
+        if len(to_compact) <= 1 and not drop_embeddings:
+            report.bytes_after = report.bytes_before
+            return report
+
+        summary_row = None
+        if len(to_compact) > 1:
+            summary_row = self._build_summary_row(session_uuid, to_compact)
+
+        report.sessions_compacted = 1
+        report.conversation_rows_deleted = len(to_compact) if summary_row else 0
+        report.summary_rows_written = 1 if summary_row else 0
+        report.embedding_rows_deleted = len(drop_embeddings)
+        removed = (sum(conv_bytes[r['id']] for r in to_compact) if summary_row else 0) \
+            + sum(emb_bytes[e['id']] for e in drop_embeddings)
+        added = _conversation_bytes(summary_row) if summary_row else 0
+        report.bytes_after = report.bytes_before - removed + added
+
+        if self.dry_run:
+            return report
+
+        # Grava o resumo antes de remover os turnos: uma falha no meio deixa
+        # dados duplicados (recuperáveis), nunca perdidos
+        if summary_row:
+            await self._execute(self._db.table('agent_conversations').insert(summary_row))
+            await self._delete_ids('agent_conversations', [r['id'] for r in to_compact])
+        for index, represented in keep_embeddings:
+            row = candidates[index]
+            metadata = {**(row.get('metadata') or {}), 'compacted': True, 'represents': represented}
+            await self._execute(self._db.table('agent_memory_embeddings').update({'metadata': metadata}).eq('id', row['id']))
+        await self._delete_ids('agent_memory_embeddings', [e['id'] for e in drop_embeddings])
+
+        logger.info(
+            f"Sessão {session_uuid} compactada: {report.conversation_rows_deleted} turnos -> 1 resumo, "
+            f"{report.embedding_rows_deleted} embeddings removidos, {report.bytes_reclaimed} bytes"
+        )
+        return report
+
+    # ------------------------------------------------------------------------
+    # Planejamento
+    # ------------------------------------------------------------------------
+
+    @staticmethod
+    def _split_index(conversations: List[Dict[str, Any]], keep_recent: int, cutoff: datetime) -> int:
+        """Quantidade de turnos iniciais elegíveis (antigos E fora da janela recente)."""
+        eligible = max(len(conversations) - keep_recent, 0)
+        split = 0
+        while split < eligible:
+            timestamp = _parse_timestamp(conversations[split].get('timestamp'))
+            if timestamp and timestamp >= cutoff:
+                break
+            split += 1
+        return split
+
+    def _reduce_embeddings(self, embeddings: List[Dict[str, Any]],
+                           max_embeddings: int) -> Tuple[List[Tuple[int, int]], List[Dict[str, Any]]]:
+        if len(embeddings) <= max_embeddings:
+            return [], []
+        vectors = [_parse_vector(e.get('embedding')) for e in embeddings]
+        valid = [i for i, v in enumerate(vectors) if v is not None]
+        if not valid:
+            return [], []
+        matrix = np.stack([vectors[i] for i in valid])
+        chosen = [(valid[i], count) for i, count in select_representatives(matrix, max_embeddings)]
+        keep = {index for index, _ in chosen}
+        drop = [e for i, e in enumerate(embeddings) if i not in keep]
+        return chosen, drop
+
+    @staticmethod
+    def _projected_bytes(conversations, split, conv_bytes, emb_bytes, drop_embeddings) -> int:
+        dropped = {e['id'] for e in drop_embeddings}
+        kept_conv = sum(conv_bytes[r['id']] for r in conversations[split:])
+        # O resumo é limitado por summary_max_chars; estimativa conservadora
+        summary = 4096 if split > 1 else sum(conv_bytes[r['id']] for r in conversations[:split])
+        return kept_conv + summary + sum(b for i, b in emb_bytes.items() if i not in dropped)
+
+    def _build_summary_row(self, session_uuid: str, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        messages = [self._manager._parse_conversation_data(row) for row in rows]
+        previous = [m for m in messages if m.metadata.get('compacted')]
+        previous_summary = "\n".join(m.content for m in previous) or None
+        fresh = [m for m in messages if not m.metadata.get('compacted')]
+        original_count = len(fresh) + sum(m.metadata.get('original_count', 0) for m in previous)
+
+        return {
+            'session_id': session_uuid,
+            'agent_name': rows[-1]['agent_name'],
+            # Ocupa a posição do primeiro turno compactado: o histórico continua ordenado
+            'conversation_turn': rows[0]['conversation_turn'],
+            'message_type': MessageType.SYSTEM.value,
+            'content': self.summarizer(previous_summary, fresh),
+            'content_format': 'text',
+            'metadata': {
+                'compacted': True,
+                'original_count': original_count,
+                'turn_range': [rows[0]['conversation_turn'], rows[-1]['conversation_turn']],
+                'compacted_at': datetime.now().isoformat()
+            },
+            'timestamp': rows[-1]['timestamp']
+        }
+
+    # ------------------------------------------------------------------------
+    # I/O
+    # ------------------------------------------------------------------------
+
+    async def _iter_sessions(self, session_ids: Optional[List[str]]):
+        if session_ids:
+            for session_id in session_ids:
+                result = await self._execute(
+                    self._db.table('agent_sessions').select('id, session_id').eq('session_id', session_id)
+                )
+                for row in result.data:
+                    yield row
+            return
+
+        # Paginação por chave (id) para não carregar todas as sessões de uma vez
+        last_id = None
+        while True:
+            query = self._db.table('agent_sessions').select('id, session_id').order('id').limit(_PAGE_SIZE)
+            if last_id:
+                query = query.gt('id', last_id)
+            result = await self._execute(query)
+            for row in result.data:
+                yield row
+            if len(result.data) < _PAGE_SIZE:
+                return
+            last_id = result.data[-1]['id']
+
+    async def _fetch_all(self, build_query: Callable[[], Any]) -> List[Dict[str, Any]]:
+        """Lê todas as linhas em páginas (o PostgREST corta cada resposta em max-rows)."""
+        rows: List[Dict[str, Any]] = []
+        while True:
+            result = await self._execute(build_query().range(len(rows), len(rows) + _PAGE_SIZE - 1))
+            page = result.data or []
+            rows.extend(page)
+            if len(page) < _PAGE_SIZE:
+                return rows
+
+    async def _delete_ids(self, table: str, ids: List[str]) -> None:
+        for start in range(0, len(ids), _DELETE_CHUNK):
+            chunk = ids[start:start + _DELETE_CHUNK]
+            await self._execute(self._db.table(table).delete().in_('id', chunk))
+
+    async def _measure_recall(self, session_id: str) -> float:
+        """Latência (ms) de um recall completo do histórico, como no /chat."""
+        start = time.perf_counter()
+        await self._manager.get_conversation_history(session_id)
+        return (time.perf_counter() - start) * 1000
+
+
+# ============================================================================
+# TAREFA DE FUNDO
+# ============================================================================
+
+async def run_periodic_compaction(interval_hours: float = MEMORY_COMPACTION_INTERVAL_HOURS,
+                                  compactor: Optional[MemoryCompactor] = None,
+                                  stop_event: Optional[asyncio.Event] = None) -> None:
+    """Executa a compactação a cada interval_hours até stop_event ser sinalizado."""
+    compactor = compactor or MemoryCompactor()
+    stop_event = stop_event or asyncio.Event()
+    while not stop_event.is_set():
+        try:
+            await compactor.run()
+        except Exception as e:
+            logger.error(f"Falha na compactação periódica da memória: {e}")
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval_hours * 3600)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_compaction_task(interval_hours: float = MEMORY_COMPACTION_INTERVAL_HOURS) -> "asyncio.Task":
+    """Agenda a compactação periódica no event loop atual (ex.: startup da API)."""
+    return asyncio.create_task(run_periodic_compaction(interval_hours))
@@ -0,0 +1,308 @@
+"""
+Cache em processo da camada de memória.
+
+Um /chat resolve o mesmo session_id várias vezes (recall, contexto de dados,
+registro da interação) e relê os mesmos contextos a cada requisição. Este
+módulo mantém, por processo:
+
+- session_id -> UUID da sessão (TTL limitado ao expires_at da sessão)
+- contextos "quentes" por (sessão, agente, tipo, chave), com TTL e LRU
+- contadores de acesso a contextos, agregados em memória e enviados
+  periodicamente em uma única chamada de incremento
+
+Entradas de sessão nunca sobrevivem ao expires_at da sessão: depois dele a
+leitura volta ao banco, exatamente como sem cache, e cleanup_expired_sessions
+(que só marca/remove sessões já expiradas) não encontra nada cacheado. As
+invalidações explícitas cobrem as mudanças feitas por este processo
+(update_session, delete_context, cleanup_expired).
+"""
+
+import atexit
+import copy
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+from uuid import UUID
+
+from ..settings import (
+    MEMORY_ACCESS_FLUSH_INTERVAL,
+    MEMORY_CACHE_ENABLED,
+    MEMORY_CONTEXT_CACHE_MAX_ENTRIES,
+    MEMORY_CONTEXT_CACHE_TTL,
+    MEMORY_SESSION_CACHE_MAX_ENTRIES,
+    MEMORY_SESSION_CACHE_TTL
+)
+from ..utils.logging_config import get_logger
+from .memory_types import AgentContext
+
+logger = get_logger(__name__)
+
+V = TypeVar("V")
+
+ContextCacheKey = Tuple[UUID, str, str, str]
+
+
+def _is_past(moment: Optional[datetime]) -> bool:
+    remaining = _seconds_until(moment)
+    return remaining is not None and remaining <= 0
+
+
+def _seconds_until(moment: Optional[datetime]) -> Optional[float]:
+    """Segundos até um instante (negativo se já passou); None se sem prazo."""
+    if moment is None:
+        return None
+    now = datetime.now(moment.tzinfo) if moment.tzinfo else datetime.now()
+    return (moment - now).total_seconds()
+
+
+class TTLCache(Generic[V]):
+    """Mapa LRU thread-safe com TTL por entrada e número máximo de itens."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            deadline, value = item
+            if deadline <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: V, ttl_seconds: Optional[float] = None) -> None:
+        """Armazena um valor; ttl_seconds menor que o padrão encurta a entrada."""
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0 or self.max_entries <= 0:
+            self.pop(key)
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            item = self._data.pop(key, None)
+            return item[1] if item else None
+
+    def discard_where(self, predicate: Callable[[Hashable, V], bool]) -> int:
+        """Remove as entradas que atendem ao filtro."""
+        with self._lock:
+            keys = [k for k, (_, v) in self._data.items() if predicate(k, v)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class AccessCounterBuffer:
+    """
+    Agrega acessos a contextos e os envia periodicamente em lote.
+
+    Substitui o read-modify-write por leitura de contexto: cada acesso só
+    incrementa um Counter em memória; uma thread de fundo chama flush_fn com
+    {context_id: n} a cada intervalo. Em caso de falha os contadores voltam
+    ao buffer e são somados aos do próximo ciclo.
+    """
+
+    def __init__(self, flush_fn: Callable[[Dict[str, int]], None],
+                 flush_interval: float = MEMORY_ACCESS_FLUSH_INTERVAL):
+        self._flush_fn = flush_fn
+        self.flush_interval = flush_interval
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, context_id: Any, count: int = 1) -> None:
+        with self._lock:
+            self._counts[str(context_id)] += count
+            if self._thread is None:
+                self._start()
+
+    def discard(self, context_ids) -> None:
+        """Esquece acessos pendentes de contextos removidos."""
+        with self._lock:
+            for context_id in context_ids:
+                self._counts.pop(str(context_id), None)
+
+    @property
+    def pending(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def flush(self) -> int:
+        """
+        Envia os contadores acumulados.
+
+        Returns:
+            Número de contextos atualizados
+        """
+        with self._flush_lock:
+            with self._lock:
+                counts, self._counts = dict(self._counts), Counter()
+            if not counts:
+                return 0
+            try:
+                self._flush_fn(counts)
+                return len(counts)
+            except Exception as e:
+                logger.debug(f"Falha ao enviar contadores de acesso ({len(counts)} contextos): {e}")
+                with self._lock:
+                    self._counts.update(counts)
+                return 0
+
+    def close(self) -> None:
+        self._stop.set()
+        self.flush()
+
+    def _start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="memory-access-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+
+class MemoryCache:
+    """Caches de sessão e de contexto compartilhados pelos gerenciadores do processo."""
+
+    def __init__(self, enabled: bool = MEMORY_CACHE_ENABLED,
+                 session_ttl: float = MEMORY_SESSION_CACHE_TTL,
+                 session_max_entries: int = MEMORY_SESSION_CACHE_MAX_ENTRIES,
+                 context_ttl: float = MEMORY_CONTEXT_CACHE_TTL,
+                 context_max_entries: int = MEMORY_CONTEXT_CACHE_MAX_ENTRIES):
+        self.enabled = enabled
+        # session_id -> (UUID, expires_at)
+        self.sessions: TTLCache[Tuple[UUID, Optional[datetime]]] = TTLCache(session_max_entries, session_ttl)
+        self.contexts: TTLCache[AgentContext] = TTLCache(context_max_entries, context_ttl)
+
+    # ------------------------------------------------------------------------
+    # Sessões
+    # ------------------------------------------------------------------------
+
+    def get_session_uuid(self, session_id: str) -> Optional[UUID]:
+        if not self.enabled:
+            return None
+        entry = self.sessions.get(session_id)
+        return entry[0] if entry else None
+
+    def put_session(self, session_id: str, session_uuid: UUID,
+                    expires_at: Optional[datetime] = None) -> None:
+        """Cacheia a sessão até o menor entre o TTL e o seu expires_at."""
+        if self.enabled:
+            self.sessions.put(session_id, (session_uuid, expires_at), _seconds_until(expires_at))
+
+    def invalidate_session(self, session_id: str) -> None:
+        """Remove a sessão e todos os contextos dela."""
+        entry = self.sessions.pop(session_id)
+        if entry:
+            session_uuid = entry[0]
+            self.contexts.discard_where(lambda key, _: key[0] == session_uuid)
+
+    def invalidate_expired(self) -> int:
+        """
+        Remove sessões com expires_at vencido e contextos expirados ou
+        pertencentes a essas sessões (espelha cleanup_expired_sessions).
+
+        Returns:
+            Número de sessões removidas
+        """
+        expired_uuids = set()
+
+        def _session_expired(_key, entry):
+            if _is_past(entry[1]):
+                expired_uuids.add(entry[0])
+                return True
+            return False
+
+        removed = self.sessions.discard_where(_session_expired)
+        self.contexts.discard_where(
+            lambda key, ctx: key[0] in expired_uuids or _is_past(ctx.expires_at)
+        )
+        return removed
+
+    # ------------------------------------------------------------------------
+    # Contextos
+    # ------------------------------------------------------------------------
+
+    @staticmethod
+    def context_key(session_uuid: UUID, agent_name: str, context_type: str,
+                    context_key: str) -> ContextCacheKey:
+        return (session_uuid, agent_name, context_type, context_key)
+
+    def get_context(self, key: ContextCacheKey) -> Optional[AgentContext]:
+        if not self.enabled:
+            return None
+        context = self.contexts.get(key)
+        if context is None:
+            return None
+        if _is_past(context.expires_at):
+            self.contexts.pop(key)
+            return None
+        # Cópia: quem chama pode alterar context_data sem afetar o cache
+        return copy.deepcopy(context)
+
+    def put_context(self, context: AgentContext) -> None:
+        if not self.enabled:
+            return
+        key = self.context_key(context.session_id, context.agent_name,
+                               context.context_type.value, context.context_key)
+        self.contexts.put(key, copy.deepcopy(context), _seconds_until(context.expires_at))
+
+    def invalidate_context(self, key: ContextCacheKey) -> None:
+        self.contexts.pop(key)
+
+    def clear(self) -> None:
+        self.sessions.clear()
+        self.contexts.clear()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            'session_entries': len(self.sessions),
+            'session_hits': self.sessions.hits,
+            'session_misses': self.sessions.misses,
+            'context_entries': len(self.contexts),
+            'context_hits': self.contexts.hits,
+            'context_misses': self.contexts.misses,
+        }
+
+
+_memory_cache: Optional[MemoryCache] = None
+_memory_cache_lock = threading.Lock()
+
+
+def get_memory_cache() -> MemoryCache:
+    """Retorna o cache de memória do processo."""
+    global _memory_cache
+    if _memory_cache is None:
+        with _memory_cache_lock:
+            if _memory_cache is None:
+                _memory_cache = MemoryCache()
+    return _memory_cache
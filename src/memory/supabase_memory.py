@@ -44,14 +44,17 @@ persistente da memória dos agentes multiagente.
 """
 
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from uuid import UUID, uuid4
 
-from ..settings import SUPABASE_URL, SUPABASE_KEY
+from ..settings import SUPABASE_URL, SUPABASE_KEY, MEMORY_IO_MAX_WORKERS
 from ..utils.logging_config import get_logger
 from ..vectorstore.supabase_client import supabase
 from .base_memory import BaseMemoryManager
+from .memory_cache import AccessCounterBuffer, get_memory_cache
 from .memory_types import (
     AgentContext,
     ContextType,
@@ -74,6 +77,84 @@ from .memory_utils import (
 )
 
 
+# Pool de threads compartilhado por todos os gerenciadores do processo.
+# O cliente supabase-py é síncrono: cada .execute() bloqueia até a resposta
+# HTTP do PostgREST. Executá-lo neste pool libera o event loop do uvicorn, e o
+# limite de workers impede que picos de /chat abram conexões sem controle.
+_io_executor: Optional[ThreadPoolExecutor] = None
+_io_executor_lock = threading.Lock()
+
+
+def get_memory_io_executor() -> ThreadPoolExecutor:
+    """Retorna (criando sob demanda) o pool de I/O da camada de memória."""
+    global _io_executor
+    if _io_executor is None:
+        with _io_executor_lock:
+            if _io_executor is None:
+                _io_executor = ThreadPoolExecutor(
+                    max_workers=MEMORY_IO_MAX_WORKERS,
+                    thread_name_prefix="memory-io"
+                )
+    return _io_executor
+
+
+def shutdown_memory_io_executor(wait: bool = True) -> None:
+    """Encerra o pool de I/O (ex.: no shutdown da API)."""
+    global _io_executor
+    with _io_executor_lock:
+        if _io_executor is not None:
+            _io_executor.shutdown(wait=wait)
+            _io_executor = None
+
+
+# Contadores de acesso a contextos: agregados em memória e aplicados em lote
+# pela RPC increment_context_access (migration 0012), um UPDATE por ciclo.
+_increment_rpc_available = True
+_access_buffer: Optional[AccessCounterBuffer] = None
+_access_buffer_lock = threading.Lock()
+
+
+def increment_context_access_sync(access_counts: Dict[str, int]) -> None:
+    """Soma acessos (context_id -> n) e atualiza last_accessed_at (bloqueante)."""
+    global _increment_rpc_available
+    if not access_counts:
+        return
+    if _increment_rpc_available:
+        try:
+            supabase.rpc('increment_context_access', {
+                'p_counts': {str(k): int(v) for k, v in access_counts.items()}
+            }).execute()
+            return
+        except Exception as e:
+            if getattr(e, 'code', None) not in ('PGRST202', '42883'):
+                raise
+            get_logger(__name__).warning(
+                "RPC increment_context_access indisponível (aplique a migration 0012); "
+                "atualizando contadores linha a linha"
+            )
+            _increment_rpc_available = False
+
+    now = datetime.now().isoformat()
+    for context_id, count in access_counts.items():
+        current = supabase.table('agent_context').select('access_count').eq('id', str(context_id)).execute()
+        if not current.data:
+            continue
+        supabase.table('agent_context').update({
+            'last_accessed_at': now,
+            'access_count': current.data[0]['access_count'] + count
+        }).eq('id', str(context_id)).execute()
+
+
+def get_access_counter_buffer() -> AccessCounterBuffer:
+    """Retorna o buffer de contadores de acesso do processo."""
+    global _access_buffer
+    if _access_buffer is None:
+        with _access_buffer_lock:
+            if _access_buffer is None:
+                _access_buffer = AccessCounterBuffer(increment_context_access_sync)
+    return _access_buffer
+
+
 class SupabaseMemoryManager(BaseMemoryManager):
     """
     Gerenciador de memória usando Supabase como backend.
@@ -92,6 +173,16 @@ class SupabaseMemoryManager(BaseMemoryManager):
         super().__init__(agent_name)
         self.logger = get_logger(f"memory.supabase.{self.agent_name}")
         
+        # Desligado na primeira chamada se a migration 0010 não estiver aplicada
+        self._atomic_append_available = True
+        
+        # Quando definido (write-behind), os acessos vão para a fila do writer
+        # em vez do buffer de contadores do processo
+        self._access_recorder: Optional[Callable[[UUID], None]] = None
+        
+        # Cache de sessões e contextos compartilhado pelo processo
+        self._cache = get_memory_cache()
+        
         # Verifica conexão Supabase
         if not SUPABASE_URL or not SUPABASE_KEY:
             self.logger.warning("Credenciais Supabase não configuradas")
@@ -131,10 +222,11 @@ class SupabaseMemoryManager(BaseMemoryManager):
         }
         
         try:
-            result = supabase.table('agent_sessions').insert(session_data).execute()
+            result = await self._execute(supabase.table('agent_sessions').insert(session_data))
             
             if result.data:
                 session_info = self._parse_session_data(result.data[0])
+                self._cache.put_session(session_id, session_info.id, session_info.expires_at)
                 self.logger.info(f"Sessão criada: {session_id}")
                 return session_info
             else:
@@ -155,11 +247,14 @@ class SupabaseMemoryManager(BaseMemoryManager):
             Informações da sessão ou None
         """
         try:
-            result = supabase.table('agent_sessions').select('*').eq('session_id', session_id).execute()
+            result = await self._execute(supabase.table('agent_sessions').select('*').eq('session_id', session_id))
             
             if result.data:
-                return self._parse_session_data(result.data[0])
+                session_info = self._parse_session_data(result.data[0])
+                self._cache.put_session(session_id, session_info.id, session_info.expires_at)
+                return session_info
             else:
+                self._cache.invalidate_session(session_id)
                 self.logger.debug(f"Sessão não encontrada: {session_id}")
                 return None
                 
@@ -196,8 +291,11 @@ class SupabaseMemoryManager(BaseMemoryManager):
                 else:
                     update_data[field_mapping[key]] = value
         
+        # Status/expiração podem mudar: a próxima leitura vai ao banco
+        self._cache.invalidate_session(session_id)
+        
         try:
-            result = supabase.table('agent_sessions').update(update_data).eq('session_id', session_id).execute()
+            result = await self._execute(supabase.table('agent_sessions').update(update_data).eq('session_id', session_id))
             
             success = bool(result.data)
             if success:
@@ -225,37 +323,86 @@ class SupabaseMemoryManager(BaseMemoryManager):
         Returns:
             Mensagem salva
         """
-        # Busca o UUID da sessão
+        messages = await self.save_conversation_batch(session_id, [
+            {'message_type': message_type, 'content': content, **kwargs}
+        ])
+        if not messages:
+            raise Exception("Falha ao salvar mensagem - sem dados retornados")
+        return messages[0]
+    
+    async def save_conversation_batch(self, session_id: str,
+                                      messages: List[Dict[str, Any]]) -> List[ConversationMessage]:
+        """
+        Salva várias mensagens de conversação em um único round-trip.
+        
+        Usa a RPC append_conversation_messages (migration 0010), que resolve
+        a sessão, reserva os turnos de forma atômica e insere todas as
+        mensagens na mesma transação. Se a função ainda não existir no banco,
+        cai para o fluxo legado (lookup + MAX(turn) + INSERT multi-linha).
+        
+        Args:
+            session_id: ID da sessão
+            messages: Lista de dicts com 'message_type', 'content' e campos
+                opcionais (processing_time_ms, model_used, metadata, ...)
+            
+        Returns:
+            Mensagens salvas, na mesma ordem recebida (ids já gravados são
+            ignorados pela RPC, o que torna o replay do write-behind idempotente)
+        """
+        if not messages:
+            return []
+        
+        records = [self._build_message_record(**message) for message in messages]
+        
+        if self._atomic_append_available:
+            try:
+                result = await self._execute(supabase.rpc('append_conversation_messages', {
+                    'p_session_id': session_id,
+                    'p_agent_name': self.agent_name,
+                    'p_messages': records
+                }))
+                
+                # Lista vazia: todos os ids já existiam (replay idempotente)
+                saved = [self._parse_conversation_data(data) for data in result.data or []]
+                if saved:
+                    self.logger.debug(
+                        f"{len(saved)} mensagem(ns) salva(s) - turns "
+                        f"{saved[0].conversation_turn}..{saved[-1].conversation_turn}"
+                    )
+                return saved
+                
+            except Exception as e:
+                error_code = getattr(e, 'code', None)
+                if error_code == 'P0002':
+                    raise ValueError(f"Sessão não encontrada: {session_id}") from e
+                if error_code not in ('PGRST202', '42883'):
+                    self.logger.error(f"Erro ao salvar mensagens: {e}")
+                    raise
+                self.logger.warning(
+                    "RPC append_conversation_messages indisponível (aplique a migration 0010); "
+                    "usando fluxo legado de gravação"
+                )
+                self._atomic_append_available = False
+        
+        return await self._save_conversation_batch_legacy(session_id, records)
+    
+    async def _save_conversation_batch_legacy(self, session_id: str,
+                                              records: List[Dict[str, Any]]) -> List[ConversationMessage]:
+        """Fluxo anterior à migration 0010 (turnos não atômicos entre requisições)."""
         session_uuid = await self._get_session_uuid(session_id)
         if not session_uuid:
             raise ValueError(f"Sessão não encontrada: {session_id}")
         
-        # Busca próximo turn number
-        conversation_turn = await self._get_next_conversation_turn(session_uuid)
-        
-        # Prepara dados da mensagem
-        message_data = {
-            'session_id': str(session_uuid),
-            'agent_name': self.agent_name,
-            'conversation_turn': conversation_turn,
-            'message_type': message_type.value,
-            'content': content,
-            'content_format': kwargs.get('content_format', ContentFormat.TEXT.value),
-            'processing_time_ms': kwargs.get('processing_time_ms'),
-            'token_count': kwargs.get('token_count'),
-            'model_used': kwargs.get('model_used'),
-            'confidence_score': kwargs.get('confidence_score'),
-            'metadata': kwargs.get('metadata', {}),
-            'timestamp': datetime.now().isoformat()
-        }
+        first_turn = await self._get_next_conversation_turn(session_uuid)
+        for offset, record in enumerate(records):
+            record['session_id'] = str(session_uuid)
+            record['conversation_turn'] = first_turn + offset
         
         try:
-            result = supabase.table('agent_conversations').insert(message_data).execute()
+            result = await self._execute(supabase.table('agent_conversations').insert(records))
             
             if result.data:
-                message = self._parse_conversation_data(result.data[0])
-                self.logger.debug(f"Mensagem salva: {message_type.value} - turn {conversation_turn}")
-                return message
+                return [self._parse_conversation_data(data) for data in result.data]
             else:
                 raise Exception("Falha ao salvar mensagem - sem dados retornados")
                 
@@ -290,7 +437,7 @@ class SupabaseMemoryManager(BaseMemoryManager):
             if limit:
                 query = query.limit(limit)
             
-            result = query.execute()
+            result = await self._execute(query)
             
             messages = [self._parse_conversation_data(data) for data in result.data]
             self.logger.debug(f"Recuperadas {len(messages)} mensagens para sessão {session_id}")
@@ -346,7 +493,7 @@ class SupabaseMemoryManager(BaseMemoryManager):
         }
         
         try:
-            # Tenta atualizar se já existe
+            # Tenta atualizar se já existe (get_context já contabiliza o acesso)
             existing = await self.get_context(session_id, context_type, context_key)
             
             if existing:
@@ -354,8 +501,7 @@ class SupabaseMemoryManager(BaseMemoryManager):
                 update_data = {
                     'context_data': context_data,
                     'data_size_bytes': data_size,
-                    'updated_at': datetime.now().isoformat(),
-                    'access_count': existing.access_count + 1
+                    'updated_at': datetime.now().isoformat()
                 }
                 
                 if 'priority' in kwargs:
@@ -365,18 +511,20 @@ class SupabaseMemoryManager(BaseMemoryManager):
                 if 'metadata' in kwargs:
                     update_data['metadata'] = kwargs['metadata']
                 
-                result = supabase.table('agent_context').update(update_data).eq('id', str(existing.id)).execute()
+                result = await self._execute(supabase.table('agent_context').update(update_data).eq('id', str(existing.id)))
                 
                 if result.data:
                     context = self._parse_context_data(result.data[0])
+                    self._cache.put_context(context)
                     self.logger.debug(f"Contexto atualizado: {context_type.value}/{context_key}")
                     return context
             else:
                 # Insere novo contexto
-                result = supabase.table('agent_context').insert(context_record).execute()
+                result = await self._execute(supabase.table('agent_context').insert(context_record))
                 
                 if result.data:
                     context = self._parse_context_data(result.data[0])
+                    self._cache.put_context(context)
                     self.logger.debug(f"Contexto criado: {context_type.value}/{context_key}")
                     return context
             
@@ -386,6 +534,68 @@ class SupabaseMemoryManager(BaseMemoryManager):
             self.logger.error(f"Erro ao salvar contexto {context_type.value}/{context_key}: {e}")
             raise
     
+    async def save_context_batch(self, session_id: str,
+                                 contexts: List[Dict[str, Any]]) -> List[AgentContext]:
+        """
+        Salva vários contextos da sessão com um único upsert multi-linha.
+        
+        Usa a constraint UNIQUE(session_id, agent_name, context_type,
+        context_key) de agent_context: chaves existentes são atualizadas e as
+        novas inseridas, sem o SELECT prévio feito por save_context.
+        
+        Args:
+            session_id: ID da sessão
+            contexts: Lista de dicts com 'context_type', 'context_key',
+                'context_data' e opcionais (priority, expires_at, metadata)
+            
+        Returns:
+            Contextos salvos
+        """
+        if not contexts:
+            return []
+        
+        session_uuid = await self._get_session_uuid(session_id)
+        if not session_uuid:
+            raise ValueError(f"Sessão não encontrada: {session_id}")
+        
+        now = datetime.now().isoformat()
+        records = []
+        for ctx in contexts:
+            is_valid, error_msg = validate_context_data(ctx['context_data'])
+            if not is_valid:
+                raise ValueError(f"Dados de contexto inválidos: {error_msg}")
+            
+            expires_at = ctx.get('expires_at')
+            records.append({
+                'session_id': str(session_uuid),
+                'agent_name': self.agent_name,
+                'context_type': ContextType(ctx['context_type']).value,
+                'context_key': ctx['context_key'],
+                'context_data': ctx['context_data'],
+                'data_size_bytes': calculate_data_size(ctx['context_data']),
+                'priority': ctx.get('priority', MemoryConfig.DEFAULT_CONTEXT_PRIORITY),
+                'expires_at': expires_at.isoformat() if isinstance(expires_at, datetime) else expires_at,
+                'metadata': ctx.get('metadata') or {},
+                'updated_at': now,
+                'last_accessed_at': now
+            })
+        
+        try:
+            result = await self._execute(
+                supabase.table('agent_context').upsert(
+                    records, on_conflict='session_id,agent_name,context_type,context_key'
+                )
+            )
+            saved = [self._parse_context_data(data) for data in result.data]
+            for context in saved:
+                self._cache.put_context(context)
+            self.logger.debug(f"{len(saved)} contexto(s) salvo(s) em lote")
+            return saved
+            
+        except Exception as e:
+            self.logger.error(f"Erro ao salvar contextos em lote: {e}")
+            raise
+    
     async def get_context(self, session_id: str, context_type: ContextType,
                         context_key: str) -> Optional[AgentContext]:
         """
@@ -403,14 +613,21 @@ class SupabaseMemoryManager(BaseMemoryManager):
         if not session_uuid:
             return None
         
+        cache_key = self._cache.context_key(session_uuid, self.agent_name, context_type.value, context_key)
+        cached = self._cache.get_context(cache_key)
+        if cached is not None:
+            self._record_context_access(cached.id)
+            return cached
+        
         try:
-            result = supabase.table('agent_context').select('*').eq('session_id', str(session_uuid)).eq('agent_name', self.agent_name).eq('context_type', context_type.value).eq('context_key', context_key).execute()
+            result = await self._execute(supabase.table('agent_context').select('*').eq('session_id', str(session_uuid)).eq('agent_name', self.agent_name).eq('context_type', context_type.value).eq('context_key', context_key))
             
             if result.data:
                 context = self._parse_context_data(result.data[0])
+                self._cache.put_context(context)
                 
-                # Atualiza last_accessed_at
-                await self._update_context_access(context.id)
+                # Atualiza last_accessed_at/access_count (agregado, em lote)
+                self._record_context_access(context.id)
                 
                 return context
             else:
@@ -442,9 +659,11 @@ class SupabaseMemoryManager(BaseMemoryManager):
             if context_type:
                 query = query.eq('context_type', context_type.value)
             
-            result = query.order('created_at').execute()
+            result = await self._execute(query.order('created_at'))
             
             contexts = [self._parse_context_data(data) for data in result.data]
+            for context in contexts:
+                self._cache.put_context(context)
             self.logger.debug(f"Recuperados {len(contexts)} contextos para sessão {session_id}")
             
             return contexts
@@ -470,8 +689,12 @@ class SupabaseMemoryManager(BaseMemoryManager):
         if not session_uuid:
             return False
         
+        self._cache.invalidate_context(
+            self._cache.context_key(session_uuid, self.agent_name, context_type.value, context_key)
+        )
+        
         try:
-            result = supabase.table('agent_context').delete().eq('session_id', str(session_uuid)).eq('agent_name', self.agent_name).eq('context_type', context_type.value).eq('context_key', context_key).execute()
+            result = await self._execute(supabase.table('agent_context').delete().eq('session_id', str(session_uuid)).eq('agent_name', self.agent_name).eq('context_type', context_type.value).eq('context_key', context_key))
             
             success = bool(result.data)
             if success:
@@ -511,7 +734,7 @@ class SupabaseMemoryManager(BaseMemoryManager):
         }
         
         try:
-            result = supabase.table('agent_memory_embeddings').insert(embedding_data).execute()
+            result = await self._execute(supabase.table('agent_memory_embeddings').insert(embedding_data))
             
             success = bool(result.data)
             if success:
@@ -548,13 +771,13 @@ class SupabaseMemoryManager(BaseMemoryManager):
         
         try:
             # Usa função SQL customizada para busca de similaridade
-            result = supabase.rpc('search_memory_similarity', {
+            result = await self._execute(supabase.rpc('search_memory_similarity', {
                 'p_agent_name': self.agent_name,
                 'p_session_id': str(session_uuid) if session_uuid else None,
                 'p_query_embedding': query_embedding,
                 'p_similarity_threshold': similarity_threshold,
                 'p_limit': limit
-            }).execute()
+            }))
             
             similarities = []
             for data in result.data:
@@ -592,7 +815,7 @@ class SupabaseMemoryManager(BaseMemoryManager):
         
         try:
             # Chama função SQL de limpeza
-            result = supabase.rpc('cleanup_expired_sessions').execute()
+            result = await self._execute(supabase.rpc('cleanup_expired_sessions'))
             
             if result.data:
                 stats['expired_sessions'] = result.data
@@ -600,10 +823,14 @@ class SupabaseMemoryManager(BaseMemoryManager):
             # Limpa contextos expirados específicos do agente
             cutoff_date = datetime.now() - timedelta(days=MemoryConfig.EXPIRED_SESSION_RETENTION_DAYS)
             
-            contexts_result = supabase.table('agent_context').delete().eq('agent_name', self.agent_name).lt('expires_at', cutoff_date.isoformat()).execute()
+            contexts_result = await self._execute(supabase.table('agent_context').delete().eq('agent_name', self.agent_name).lt('expires_at', cutoff_date.isoformat()))
             
             if contexts_result.data:
                 stats['expired_contexts'] = len(contexts_result.data)
+                get_access_counter_buffer().discard(row['id'] for row in contexts_result.data)
+            
+            # Sessões e contextos vencidos saem do cache do processo
+            self._cache.invalidate_expired()
             
             self.logger.info(f"Limpeza concluída: {stats}")
             return stats
@@ -616,13 +843,32 @@ class SupabaseMemoryManager(BaseMemoryManager):
     # MÉTODOS AUXILIARES PRIVADOS
     # ========================================================================
     
+    async def _execute(self, query: Any) -> Any:
+        """Executa uma query do supabase-py fora do event loop.
+        
+        A montagem da query (table/select/eq/...) não faz I/O; apenas o
+        .execute() final é enviado ao pool limitado de threads.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_memory_io_executor(), query.execute)
+    
     async def _get_session_uuid(self, session_id: str) -> Optional[UUID]:
-        """Recupera UUID da sessão pelo session_id."""
+        """Recupera UUID da sessão pelo session_id (com cache em processo)."""
+        cached = self._cache.get_session_uuid(session_id)
+        if cached:
+            return cached
+        
         try:
-            result = supabase.table('agent_sessions').select('id').eq('session_id', session_id).execute()
+            result = await self._execute(supabase.table('agent_sessions').select('id, expires_at').eq('session_id', session_id))
             
             if result.data:
-                return UUID(result.data[0]['id'])
+                session_uuid = UUID(result.data[0]['id'])
+                expires_at = result.data[0].get('expires_at')
+                self._cache.put_session(
+                    session_id, session_uuid,
+                    datetime.fromisoformat(expires_at.replace('Z', '+00:00')) if expires_at else None
+                )
+                return session_uuid
             else:
                 return None
                 
@@ -633,7 +879,7 @@ class SupabaseMemoryManager(BaseMemoryManager):
     async def _get_next_conversation_turn(self, session_uuid: UUID) -> int:
         """Calcula próximo número de turno na conversação."""
         try:
-            result = supabase.table('agent_conversations').select('conversation_turn').eq('session_id', str(session_uuid)).order('conversation_turn', desc=True).limit(1).execute()
+            result = await self._execute(supabase.table('agent_conversations').select('conversation_turn').eq('session_id', str(session_uuid)).order('conversation_turn', desc=True).limit(1))
             
             if result.data:
                 return result.data[0]['conversation_turn'] + 1
@@ -644,18 +890,43 @@ class SupabaseMemoryManager(BaseMemoryManager):
             self.logger.error(f"Erro ao calcular próximo turno: {e}")
             return 1
     
-    async def _update_context_access(self, context_id: UUID) -> None:
-        """Atualiza timestamp de último acesso do contexto."""
-        try:
-            update_data = {
-                'last_accessed_at': datetime.now().isoformat(),
-                'access_count': supabase.table('agent_context').select('access_count').eq('id', str(context_id)).execute().data[0]['access_count'] + 1
-            }
-            
-            supabase.table('agent_context').update(update_data).eq('id', str(context_id)).execute()
-            
-        except Exception as e:
-            self.logger.debug(f"Erro ao atualizar acesso do contexto: {e}")
+    async def increment_context_access(self, access_counts: Dict[str, int]) -> None:
+        """
+        Aplica contadores de acesso acumulados (context_id -> nº de acessos)
+        em uma única chamada.
+        
+        Args:
+            access_counts: Acessos a somar por contexto
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(get_memory_io_executor(), increment_context_access_sync, access_counts)
+    
+    def _record_context_access(self, context_id: UUID) -> None:
+        """Registra um acesso ao contexto sem I/O no caminho da leitura."""
+        if self._access_recorder is not None:
+            self._access_recorder(context_id)
+        else:
+            get_access_counter_buffer().record(context_id)
+    
+    def _build_message_record(self, message_type: MessageType, content: str,
+                              **kwargs) -> Dict[str, Any]:
+        """Monta o registro de agent_conversations (sem sessão/turno)."""
+        record = {
+            'agent_name': self.agent_name,
+            'message_type': message_type.value,
+            'content': content,
+            'content_format': kwargs.get('content_format', ContentFormat.TEXT.value),
+            'processing_time_ms': kwargs.get('processing_time_ms'),
+            'token_count': kwargs.get('token_count'),
+            'model_used': kwargs.get('model_used'),
+            'confidence_score': kwargs.get('confidence_score'),
+            'metadata': kwargs.get('metadata') or {},
+            'timestamp': kwargs.get('timestamp') or datetime.now().isoformat()
+        }
+        # id gerado pelo cliente (write-behind) torna a gravação idempotente
+        if kwargs.get('id'):
+            record['id'] = str(kwargs['id'])
+        return record
     
     def _parse_session_data(self, data: Dict[str, Any]) -> SessionInfo:
         """Converte dados do Supabase para SessionInfo."""
@@ -0,0 +1,726 @@
+"""
+Write-behind para a camada de memória dos agentes.
+
+Gravações de memória (mensagens, contexto e contadores de acesso) não
+precisam bloquear a resposta do /chat: o usuário nunca espera pelo seu
+resultado. Este módulo as desvia para uma fila em processo, espelhada em um
+journal append-only em disco, e uma thread de fundo as envia em lote ao
+backend (RPC multi-mensagem para conversas, upsert multi-linha para contexto
+e incremento agregado para acessos).
+
+Durabilidade:
+    Cada item é gravado no journal antes de entrar na fila; depois do envio
+    uma linha de ack é anexada. Ao iniciar, o writer assume os journals de
+    processos que não existem mais e reenfileira os itens sem ack (replay).
+    Mensagens levam UUID gerado no cliente, então o replay é idempotente
+    (migration 0011).
+
+Read-your-writes:
+    WriteBehindMemoryManager mescla os itens ainda pendentes nas leituras de
+    histórico e de contexto, de modo que a própria sessão enxerga o que
+    acabou de gravar mesmo antes do flush.
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from ..settings import (
+    MEMORY_JOURNAL_DIR,
+    MEMORY_JOURNAL_FSYNC,
+    MEMORY_WRITE_BEHIND_BATCH_SIZE,
+    MEMORY_WRITE_BEHIND_FLUSH_INTERVAL,
+    MEMORY_WRITE_BEHIND_MAX_ATTEMPTS
+)
+from ..utils.logging_config import get_logger
+from .base_memory import BaseMemoryManager
+from .memory_types import (
+    AgentContext,
+    ContentFormat,
+    ContextType,
+    ConversationMessage,
+    MemoryConfig,
+    MemoryEmbedding,
+    MessageType,
+    SessionInfo,
+    SimilaritySearchResult
+)
+from .memory_utils import calculate_data_size, validate_context_data
+
+logger = get_logger(__name__)
+
+# Operações suportadas pelo writer
+OP_CONVERSATION = "conversation"
+OP_CONTEXT = "context"
+OP_CONTEXT_ACCESS = "context_access"
+
+_JOURNAL_PREFIX = "memory-journal-"
+_MAX_BACKOFF_EXPONENT = 7  # flush_interval * 2^7 (~64s com o padrão de 0.5s)
+
+
+@dataclass
+class PendingWrite:
+    """Item de memória aguardando envio ao backend."""
+    seq: int
+    op: str
+    agent_name: str
+    session_id: Optional[str]
+    payload: Dict[str, Any]
+    attempts: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = asdict(self)
+        record.pop('attempts')
+        return record
+
+
+def _pid_alive(pid: int) -> bool:
+    """Verifica se um processo ainda existe (sem sinalizá-lo no Windows)."""
+    if pid == os.getpid():
+        return True
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+    if os.name == "nt":
+        # os.kill(pid, 0) no Windows envia CTRL_C_EVENT; sem psutil, assume vivo
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _journal_owner_pid(path: Path) -> Optional[int]:
+    """Extrai o PID dono de um journal (ativo ou em replay)."""
+    name = path.name
+    try:
+        if ".replay-" in name:
+            # <journal>.replay-<pid>.<n>: o dono é quem assumiu o replay
+            return int(name.rsplit(".replay-", 1)[1].split(".", 1)[0])
+        return int(name[len(_JOURNAL_PREFIX):].split(".", 1)[0])
+    except ValueError:
+        return None
+
+
+def _run_coroutine(coro):
+    """Executa uma coroutine a partir de código síncrono, com ou sem loop ativo."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+class MemoryWriteBehindWriter:
+    """
+    Fila de gravações de memória com journal local e flush em lote.
+
+    Uma instância por processo (ver get_memory_writer); todos os agentes
+    compartilham a mesma fila, e cada item é roteado para o backend do seu
+    agente no momento do flush.
+    """
+
+    def __init__(self, backend_factory: Callable[[str], BaseMemoryManager],
+                 journal_dir: Path = MEMORY_JOURNAL_DIR,
+                 flush_interval: float = MEMORY_WRITE_BEHIND_FLUSH_INTERVAL,
+                 batch_size: int = MEMORY_WRITE_BEHIND_BATCH_SIZE,
+                 max_attempts: int = MEMORY_WRITE_BEHIND_MAX_ATTEMPTS,
+                 fsync: bool = MEMORY_JOURNAL_FSYNC,
+                 autostart: bool = True):
+        """
+        Inicializa o writer e faz replay de journals órfãos.
+
+        Args:
+            backend_factory: Cria o backend de um agente (usado no replay)
+            journal_dir: Diretório dos journals
+            flush_interval: Intervalo entre flushes em segundos
+            batch_size: Máximo de itens por flush
+            max_attempts: Tentativas antes de descartar itens rejeitados
+                pelo backend (ValueError); falhas transitórias não contam
+            fsync: Se deve chamar os.fsync a cada append no journal
+            autostart: Se deve iniciar a thread de flush imediatamente
+        """
+        self._backend_factory = backend_factory
+        self._backends: Dict[str, BaseMemoryManager] = {}
+        self.journal_dir = Path(journal_dir)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.fsync = fsync
+
+        self._pending: "OrderedDict[int, PendingWrite]" = OrderedDict()
+        self._seq = 0
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = Counter()
+
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self.journal_path = self.journal_dir / f"{_JOURNAL_PREFIX}{os.getpid()}.jsonl"
+        claimed = self._claim_orphan_journals()
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        for path in claimed:
+            self._replay_journal(path)
+
+        if autostart:
+            self.start()
+
+    # ========================================================================
+    # CICLO DE VIDA
+    # ========================================================================
+
+    def start(self) -> None:
+        """Inicia a thread de flush em segundo plano."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="memory-write-behind", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Para a thread, tenta um último flush e fecha o journal."""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout)
+        try:
+            self.flush(timeout)
+        finally:
+            with self._lock:
+                if not self._journal.closed:
+                    self._journal.close()
+
+    def register_backend(self, agent_name: str, backend: BaseMemoryManager) -> None:
+        """Associa o backend usado no flush dos itens de um agente."""
+        with self._lock:
+            self._backends[agent_name] = backend
+
+    # ========================================================================
+    # ENFILEIRAMENTO E CONSULTA
+    # ========================================================================
+
+    def enqueue(self, op: str, agent_name: str, session_id: Optional[str],
+                payload: Dict[str, Any]) -> PendingWrite:
+        """
+        Registra um item no journal e na fila.
+
+        Returns:
+            Item enfileirado
+        """
+        with self._lock:
+            self._seq += 1
+            entry = PendingWrite(self._seq, op, agent_name, session_id, payload)
+            self._append_journal(entry.to_dict())
+            self._pending[entry.seq] = entry
+            self.stats['enqueued'] += 1
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+        return entry
+
+    def pending_for(self, op: str, session_id: Optional[str] = None,
+                    agent_name: Optional[str] = None) -> List[PendingWrite]:
+        """Itens ainda não enviados, na ordem de enfileiramento."""
+        with self._lock:
+            return [
+                entry for entry in self._pending.values()
+                if entry.op == op
+                and (session_id is None or entry.session_id == session_id)
+                and (agent_name is None or entry.agent_name == agent_name)
+            ]
+
+    def discard(self, predicate: Callable[[PendingWrite], bool]) -> int:
+        """Remove (e confirma no journal) itens pendentes que atendem ao filtro."""
+        with self._lock:
+            seqs = [seq for seq, entry in self._pending.items() if predicate(entry)]
+            for seq in seqs:
+                del self._pending[seq]
+            if seqs:
+                self._append_journal({'ack': seqs})
+            return len(seqs)
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    # ========================================================================
+    # FLUSH
+    # ========================================================================
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """
+        Envia tudo o que estiver pendente (bloqueante).
+
+        Returns:
+            True se a fila ficou vazia dentro do timeout
+        """
+        deadline = datetime.now().timestamp() + timeout
+        while self.pending_count and datetime.now().timestamp() < deadline:
+            flushed, failed = self.flush_once()
+            if not flushed and failed:
+                break
+        return self.pending_count == 0
+
+    def flush_once(self) -> Tuple[int, int]:
+        """
+        Envia um lote de até batch_size itens.
+
+        Returns:
+            (itens confirmados, itens que falharam)
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._pending.values())[:self.batch_size]
+            if not batch:
+                return 0, 0
+
+            done, failed = _run_coroutine(self._flush_batch(batch))
+
+            with self._lock:
+                acked = [entry.seq for entry in done]
+                for entry, error in failed:
+                    entry.attempts += 1
+                    if isinstance(error, ValueError) and entry.attempts >= self.max_attempts:
+                        logger.error(f"Descartando item de memória {entry.op} #{entry.seq} "
+                                     f"após {entry.attempts} tentativas: {error}")
+                        acked.append(entry.seq)
+                        self.stats['dropped'] += 1
+                for seq in acked:
+                    self._pending.pop(seq, None)
+                if acked:
+                    self._append_journal({'ack': acked})
+                self.stats['flushed'] += len(done)
+                self.stats['failed'] += len(failed)
+                self.stats['flushes'] += 1
+                if not self._pending:
+                    self._truncate_journal()
+
+            return len(done), len(failed)
+
+    async def _flush_batch(self, batch: List[PendingWrite]):
+        """Agrupa o lote por operação/agente/sessão e envia cada grupo."""
+        conversations: Dict[Tuple[str, str], List[PendingWrite]] = OrderedDict()
+        contexts: Dict[Tuple[str, str], List[PendingWrite]] = OrderedDict()
+        accesses: Dict[str, List[PendingWrite]] = OrderedDict()
+
+        for entry in batch:
+            if entry.op == OP_CONVERSATION:
+                conversations.setdefault((entry.agent_name, entry.session_id), []).append(entry)
+            elif entry.op == OP_CONTEXT:
+                contexts.setdefault((entry.agent_name, entry.session_id), []).append(entry)
+            elif entry.op == OP_CONTEXT_ACCESS:
+                accesses.setdefault(entry.agent_name, []).append(entry)
+
+        jobs = []
+        for (agent_name, session_id), entries in conversations.items():
+            jobs.append((entries, self._flush_conversations(agent_name, session_id, entries)))
+        for (agent_name, session_id), entries in contexts.items():
+            jobs.append((entries, self._flush_contexts(agent_name, session_id, entries)))
+        for agent_name, entries in accesses.items():
+            jobs.append((entries, self._flush_accesses(agent_name, entries)))
+
+        results = await asyncio.gather(*[job for _, job in jobs], return_exceptions=True)
+
+        done: List[PendingWrite] = []
+        failed: List[Tuple[PendingWrite, Exception]] = []
+        for (entries, _), result in zip(jobs, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Flush de memória falhou para {len(entries)} item(ns) "
+                               f"({entries[0].op}): {result}")
+                failed.extend((entry, result) for entry in entries)
+            else:
+                done.extend(entries)
+        return done, failed
+
+    async def _flush_conversations(self, agent_name: str, session_id: str,
+                                   entries: List[PendingWrite]) -> None:
+        messages = []
+        for entry in entries:
+            message = dict(entry.payload)
+            message['message_type'] = MessageType(message['message_type'])
+            messages.append(message)
+        await self._get_backend(agent_name).save_conversation_batch(session_id, messages)
+
+    async def _flush_contexts(self, agent_name: str, session_id: str,
+                              entries: List[PendingWrite]) -> None:
+        # Última gravação de cada chave vence (mesma semântica do upsert)
+        latest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for entry in entries:
+            ctx = dict(entry.payload)
+            ctx.pop('enqueued_at', None)
+            if ctx.get('expires_at'):
+                ctx['expires_at'] = datetime.fromisoformat(ctx['expires_at'])
+            latest[(ctx['context_type'], ctx['context_key'])] = ctx
+        await self._get_backend(agent_name).save_context_batch(session_id, list(latest.values()))
+
+    async def _flush_accesses(self, agent_name: str, entries: List[PendingWrite]) -> None:
+        counts = Counter(entry.payload['context_id'] for entry in entries)
+        await self._get_backend(agent_name).increment_context_access(dict(counts))
+
+    def _get_backend(self, agent_name: str) -> BaseMemoryManager:
+        with self._lock:
+            backend = self._backends.get(agent_name)
+            if backend is None:
+                backend = self._backend_factory(agent_name)
+                self._backends[agent_name] = backend
+            return backend
+
+    def _run(self) -> None:
+        backoff = 0
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval * (2 ** backoff))
+            self._wakeup.clear()
+            if self._stop.is_set():
+                break
+            try:
+                flushed, failed = self.flush_once()
+                while flushed and self.pending_count and not self._stop.is_set():
+                    flushed, failed = self.flush_once()
+                backoff = min(backoff + 1, _MAX_BACKOFF_EXPONENT) if failed else 0
+            except Exception as e:
+                logger.error(f"Erro na thread de write-behind da memória: {e}")
+                backoff = min(backoff + 1, _MAX_BACKOFF_EXPONENT)
+
+    # ========================================================================
+    # JOURNAL
+    # ========================================================================
+
+    def _append_journal(self, record: Dict[str, Any]) -> None:
+        self._journal.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+
+    def _truncate_journal(self) -> None:
+        """Tudo confirmado: recomeça o journal vazio."""
+        self._journal.close()
+        self._journal = open(self.journal_path, "w", encoding="utf-8")
+
+    def _claim_orphan_journals(self) -> List[Path]:
+        """Renomeia para este processo os journals de processos encerrados."""
+        claimed = []
+        for path in sorted(self.journal_dir.glob(f"{_JOURNAL_PREFIX}*")):
+            owner = _journal_owner_pid(path)
+            if owner is None:
+                continue
+            # O próprio PID só aparece aqui se um processo anterior o usou
+            # (PID 1 em containers): o journal é de uma execução passada
+            if owner != os.getpid() and _pid_alive(owner):
+                continue
+            target = path.with_name(f"{path.name.split('.replay-')[0]}.replay-{os.getpid()}.{len(claimed)}")
+            try:
+                os.rename(path, target)
+            except OSError:
+                continue  # outro processo assumiu primeiro
+            claimed.append(target)
+        return claimed
+
+    def _replay_journal(self, path: Path) -> None:
+        """Reenfileira os itens sem ack de um journal assumido."""
+        entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        acked = set()
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # linha parcial de um crash durante o append
+                    if 'ack' in record:
+                        acked.update(record['ack'])
+                    elif 'seq' in record:
+                        entries[record['seq']] = record
+        except OSError as e:
+            logger.error(f"Falha ao ler journal de memória {path}: {e}")
+            return
+
+        replayed = 0
+        for seq, record in entries.items():
+            if seq in acked:
+                continue
+            self.enqueue(record['op'], record['agent_name'], record.get('session_id'), record['payload'])
+            replayed += 1
+
+        path.unlink(missing_ok=True)
+        self.stats['replayed'] += replayed
+        if replayed:
+            logger.info(f"Replay do journal {path.name}: {replayed} item(ns) reenfileirado(s)")
+
+
+# ============================================================================
+# GERENCIADOR COM WRITE-BEHIND
+# ============================================================================
+
+class WriteBehindMemoryManager(BaseMemoryManager):
+    """
+    Gerenciador de memória que adia as gravações para o writer em lote.
+
+    Envolve um backend concreto (normalmente SupabaseMemoryManager): leituras,
+    sessões e embeddings são delegados diretamente; mensagens, contexto e
+    contadores de acesso vão para a fila do writer. As leituras mesclam os
+    itens pendentes (read-your-writes).
+    """
+
+    def __init__(self, backend: BaseMemoryManager,
+                 writer: Optional[MemoryWriteBehindWriter] = None):
+        """
+        Args:
+            backend: Gerenciador que efetivamente persiste os dados
+            writer: Writer a usar (padrão: o singleton do processo)
+        """
+        super().__init__(backend.agent_name)
+        self.logger = get_logger(f"memory.write_behind.{self.agent_name}")
+        self._backend = backend
+        self._writer = writer or get_memory_writer()
+        self._writer.register_backend(self.agent_name, backend)
+        self._session_uuids: Dict[str, UUID] = {}
+
+        if hasattr(backend, '_access_recorder'):
+            backend._access_recorder = self._record_access
+
+    @property
+    def backend(self) -> BaseMemoryManager:
+        return self._backend
+
+    # ------------------------------------------------------------------------
+    # Sessões (síncronas: a sessão precisa existir antes do flush)
+    # ------------------------------------------------------------------------
+
+    async def create_session(self, session_id: Optional[str] = None,
+                           user_id: Optional[str] = None,
+                           metadata: Optional[Dict[str, Any]] = None) -> SessionInfo:
+        session = await self._backend.create_session(session_id, user_id, metadata)
+        self._session_uuids[session.session_id] = session.id
+        return session
+
+    async def get_session(self, session_id: str) -> Optional[SessionInfo]:
+        session = await self._backend.get_session(session_id)
+        if session:
+            self._session_uuids[session.session_id] = session.id
+        return session
+
+    async def update_session(self, session_id: str, **kwargs) -> bool:
+        return await self._backend.update_session(session_id, **kwargs)
+
+    # ------------------------------------------------------------------------
+    # Conversação
+    # ------------------------------------------------------------------------
+
+    async def save_conversation(self, session_id: str, message_type: MessageType,
+                              content: str, **kwargs) -> ConversationMessage:
+        messages = await self.save_conversation_batch(session_id, [
+            {'message_type': message_type, 'content': content, **kwargs}
+        ])
+        return messages[0]
+
+    async def save_conversation_batch(self, session_id: str,
+                                      messages: List[Dict[str, Any]]) -> List[ConversationMessage]:
+        """Enfileira as mensagens; o turno definitivo é atribuído no flush."""
+        provisional = []
+        for message in messages:
+            payload = {
+                'id': str(uuid4()),
+                'message_type': MessageType(message['message_type']).value,
+                'content': message['content'],
+                'content_format': ContentFormat(message.get('content_format', ContentFormat.TEXT)).value,
+                'processing_time_ms': message.get('processing_time_ms'),
+                'token_count': message.get('token_count'),
+                'model_used': message.get('model_used'),
+                'confidence_score': message.get('confidence_score'),
+                'metadata': message.get('metadata') or {},
+                'timestamp': datetime.now().isoformat()
+            }
+            entry = self._writer.enqueue(OP_CONVERSATION, self.agent_name, session_id, payload)
+            provisional.append(self._message_from_pending(entry))
+        return provisional
+
+    async def get_conversation_history(self, session_id: str,
+                                     limit: Optional[int] = None,
+                                     since: Optional[datetime] = None) -> List[ConversationMessage]:
+        persisted = await self._backend.get_conversation_history(session_id, limit, since)
+        known_ids = {msg.id for msg in persisted}
+
+        pending = []
+        for entry in self._writer.pending_for(OP_CONVERSATION, session_id):
+            message = self._message_from_pending(entry)
+            if message.id in known_ids:
+                continue
+            if since and message.timestamp < since:
+                continue
+            pending.append(message)
+
+        merged = persisted + pending
+        return merged[:limit] if limit else merged
+
+    # ------------------------------------------------------------------------
+    # Contexto
+    # ------------------------------------------------------------------------
+
+    async def save_context(self, session_id: str, context_type: ContextType,
+                         context_key: str, context_data: Dict[str, Any],
+                         **kwargs) -> AgentContext:
+        """Valida e enfileira o contexto (upsert no flush)."""
+        is_valid, error_msg = validate_context_data(context_data)
+        if not is_valid:
+            raise ValueError(f"Dados de contexto inválidos: {error_msg}")
+
+        expires_at = kwargs.get('expires_at')
+        payload = {
+            'context_type': ContextType(context_type).value,
+            'context_key': context_key,
+            'context_data': context_data,
+            'priority': kwargs.get('priority', MemoryConfig.DEFAULT_CONTEXT_PRIORITY),
+            'expires_at': expires_at.isoformat() if isinstance(expires_at, datetime) else expires_at,
+            'metadata': kwargs.get('metadata') or {},
+            'enqueued_at': datetime.now().isoformat()
+        }
+        entry = self._writer.enqueue(OP_CONTEXT, self.agent_name, session_id, payload)
+        return self._context_from_pending(entry)
+
+    async def get_context(self, session_id: str, context_type: ContextType,
+                        context_key: str) -> Optional[AgentContext]:
+        pending = self._pending_contexts(session_id).get((ContextType(context_type).value, context_key))
+        if pending is not None:
+            return self._context_from_pending(pending)
+        return await self._backend.get_context(session_id, context_type, context_key)
+
+    async def list_contexts(self, session_id: str,
+                          context_type: Optional[ContextType] = None) -> List[AgentContext]:
+        persisted = await self._backend.list_contexts(session_id, context_type)
+        pending = self._pending_contexts(session_id)
+        if context_type:
+            pending = {k: v for k, v in pending.items() if k[0] == ContextType(context_type).value}
+
+        merged = [
+            ctx for ctx in persisted
+            if (ctx.context_type.value, ctx.context_key) not in pending
+        ]
+        merged.extend(self._context_from_pending(entry) for entry in pending.values())
+        return merged
+
+    async def delete_context(self, session_id: str, context_type: ContextType,
+                           context_key: str) -> bool:
+        type_value = ContextType(context_type).value
+        discarded = self._writer.discard(
+            lambda e: e.op == OP_CONTEXT and e.agent_name == self.agent_name
+            and e.session_id == session_id
+            and e.payload['context_type'] == type_value
+            and e.payload['context_key'] == context_key
+        )
+        deleted = await self._backend.delete_context(session_id, context_type, context_key)
+        return deleted or discarded > 0
+
+    # ------------------------------------------------------------------------
+    # Embeddings e limpeza (delegados)
+    # ------------------------------------------------------------------------
+
+    async def save_embedding(self, embedding: MemoryEmbedding) -> bool:
+        return await self._backend.save_embedding(embedding)
+
+    async def search_similar(self, query_embedding: List[float],
+                           similarity_threshold: float = 0.8,
+                           limit: int = 10,
+                           session_id: Optional[str] = None) -> List[SimilaritySearchResult]:
+        return await self._backend.search_similar(query_embedding, similarity_threshold, limit, session_id)
+
+    async def cleanup_expired(self) -> Dict[str, int]:
+        return await self._backend.cleanup_expired()
+
+    async def flush(self, timeout: float = 10.0) -> bool:
+        """Força o envio de tudo o que está pendente no writer."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._writer.flush, timeout)
+
+    # ------------------------------------------------------------------------
+    # Auxiliares
+    # ------------------------------------------------------------------------
+
+    def _record_access(self, context_id: UUID) -> None:
+        self._writer.enqueue(OP_CONTEXT_ACCESS, self.agent_name, None, {'context_id': str(context_id)})
+
+    def _pending_contexts(self, session_id: str) -> Dict[Tuple[str, str], PendingWrite]:
+        latest = {}
+        for entry in self._writer.pending_for(OP_CONTEXT, session_id, self.agent_name):
+            latest[(entry.payload['context_type'], entry.payload['context_key'])] = entry
+        return latest
+
+    def _provisional_session_uuid(self, session_id: str) -> UUID:
+        # UUID nulo quando a sessão não passou por este gerenciador
+        return self._session_uuids.get(session_id, UUID(int=0))
+
+    def _message_from_pending(self, entry: PendingWrite) -> ConversationMessage:
+        payload = entry.payload
+        return ConversationMessage(
+            id=UUID(payload['id']),
+            session_id=self._provisional_session_uuid(entry.session_id),
+            agent_name=entry.agent_name,
+            conversation_turn=0,  # atribuído pelo banco no flush
+            message_type=MessageType(payload['message_type']),
+            content=payload['content'],
+            content_format=ContentFormat(payload.get('content_format', 'text')),
+            processing_time_ms=payload.get('processing_time_ms'),
+            token_count=payload.get('token_count'),
+            model_used=payload.get('model_used'),
+            confidence_score=payload.get('confidence_score'),
+            metadata=payload.get('metadata') or {},
+            timestamp=datetime.fromisoformat(payload['timestamp'])
+        )
+
+    def _context_from_pending(self, entry: PendingWrite) -> AgentContext:
+        payload = entry.payload
+        enqueued_at = datetime.fromisoformat(payload['enqueued_at'])
+        return AgentContext(
+            session_id=self._provisional_session_uuid(entry.session_id),
+            agent_name=entry.agent_name,
+            context_type=ContextType(payload['context_type']),
+            context_key=payload['context_key'],
+            context_data=payload['context_data'],
+            data_size_bytes=calculate_data_size(payload['context_data']),
+            priority=payload.get('priority', MemoryConfig.DEFAULT_CONTEXT_PRIORITY),
+            expires_at=datetime.fromisoformat(payload['expires_at']) if payload.get('expires_at') else None,
+            created_at=enqueued_at,
+            updated_at=enqueued_at,
+            last_accessed_at=enqueued_at,
+            metadata=payload.get('metadata') or {}
+        )
+
+
+# ============================================================================
+# SINGLETON DO PROCESSO
+# ============================================================================
+
+_writer: Optional[MemoryWriteBehindWriter] = None
+_writer_lock = threading.Lock()
+
+
+def _default_backend_factory(agent_name: str) -> BaseMemoryManager:
+    from .supabase_memory import SupabaseMemoryManager
+    return SupabaseMemoryManager(agent_name)
+
+
+def get_memory_writer() -> MemoryWriteBehindWriter:
+    """Retorna o writer do processo, criando-o (e fazendo replay) na primeira chamada."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = MemoryWriteBehindWriter(_default_backend_factory)
+                atexit.register(_writer.close)
+    return _writer
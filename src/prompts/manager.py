@@ -5,11 +5,25 @@ Este módulo fornece:
 - Contextos específicos para diferentes domínios
 - Templates reutilizáveis para construção de prompts
 - Configurações de personalidade e comportamento dos agentes
+
+Os templates são compilados uma vez por processo (variáveis conferidas com
+as declaradas já na criação do PromptManager) e renderizados como
+``RenderedPrompt``: prefixo estático (instruções fixas) seguido do sufixo
+volátil (dados, histórico, pergunta). O prefixo idêntico entre chamadas é o
+que o cache de prompt dos provedores reaproveita; ``prefix_hash`` o
+identifica e ``prompt_metrics`` mede o custo de renderização e a taxa de
+tokens servidos do cache.
 """
 from __future__ import annotations
-from typing import Dict, List, Optional, Any
+from typing import Dict, FrozenSet, List, Mapping, Optional, Any, Sequence, Tuple, Union
+from collections import Counter
 from enum import Enum
 from dataclasses import dataclass
+from functools import lru_cache
+import hashlib
+import string
+import threading
+import time
 
 
 class AgentRole(Enum):
@@ -35,15 +49,156 @@ class PromptTemplate:
     role: AgentRole
     type: PromptType
     content: str
-    variables: List[str] = None  # Variáveis que podem ser substituídas
+    variables: List[str] = None  # Variáveis que podem ser substituídas (None = inferidas do texto)
     metadata: Dict[str, Any] = None
 
 
+@lru_cache(maxsize=256)
+def prompt_prefix_hash(prefix: str) -> str:
+    """Hash curto e estável do prefixo estático de um prompt."""
+    return hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class RenderedPrompt:
+    """Prompt dividido em prefixo estável e sufixo volátil."""
+    prefix: str
+    suffix: str = ""
+
+    @property
+    def text(self) -> str:
+        return self.prefix + self.suffix
+
+    @property
+    def prefix_hash(self) -> str:
+        """Identifica o prefixo (ex.: ``prompt_cache_key`` do provedor)."""
+        return prompt_prefix_hash(self.prefix)
+
+
+_FORMATTER = string.Formatter()
+
+# (variável, formato, conversão, texto fixo seguinte)
+Segment = Tuple[str, str, Optional[str], str]
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """Template analisado uma vez: texto fixo inicial e segmentos com variáveis."""
+    key: str
+    head: str
+    segments: Tuple[Segment, ...]
+    variables: FrozenSet[str]
+    tail: str = ""  # Segmentos reescritos como string de formato (renderizada em C)
+
+    @classmethod
+    def compile(cls, key: str, template: PromptTemplate) -> "CompiledTemplate":
+        """Analisa o texto e confere as variáveis usadas contra as declaradas.
+
+        Raises:
+            ValueError: Template mal formado, campo posicional/composto ou
+                variáveis diferentes das declaradas
+        """
+        try:
+            parsed = list(_FORMATTER.parse(template.content))
+        except ValueError as e:
+            raise ValueError(f"Prompt '{key}' mal formado: {e}") from e
+
+        head: List[str] = []
+        segments: List[List[Any]] = []
+        for literal, field, spec, conversion in parsed:
+            if segments:
+                segments[-1][3] += literal
+            else:
+                head.append(literal)
+            if field is None:
+                continue
+            if not field.isidentifier() or (spec and "{" in spec):
+                raise ValueError(f"Prompt '{key}': campo '{{{field}}}' não suportado; use nomes simples")
+            segments.append([field, spec or "", conversion, ""])
+
+        used = frozenset(segment[0] for segment in segments)
+        if template.variables is not None and used != set(template.variables):
+            raise ValueError(
+                f"Prompt '{key}': variáveis no texto {sorted(used)} "
+                f"diferem das declaradas {sorted(template.variables)}"
+            )
+        tail = "".join(
+            "{" + field + (f"!{conversion}" if conversion else "") + (f":{spec}" if spec else "") + "}"
+            + literal.replace("{", "{{").replace("}", "}}")
+            for field, spec, conversion, literal in segments
+        )
+        return cls(key, "".join(head), tuple(tuple(segment) for segment in segments), used, tail)
+
+    def render(self, variables: Mapping[str, Any]) -> RenderedPrompt:
+        if not self.segments:
+            return RenderedPrompt(self.head)
+        try:
+            return RenderedPrompt(self.head, self.tail.format_map(variables))
+        except KeyError as e:
+            raise ValueError(f"Variável '{e.args[0]}' necessária para prompt '{self.key}' não fornecida") from e
+
+
+class PromptMetrics:
+    """Custo de renderização dos prompts e aproveitamento do cache de prompt do provedor."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.renders = 0
+            self.render_seconds = 0.0
+            self.llm_calls = 0
+            self.prompt_tokens = 0
+            self.cached_tokens = 0
+            self.prefixes: Counter = Counter()
+
+    def record_render(self, seconds: float) -> None:
+        with self._lock:
+            self.renders += 1
+            self.render_seconds += seconds
+
+    def record_usage(self, prefix_hash: Optional[str], prompt_tokens: Optional[int],
+                     cached_tokens: Optional[int]) -> None:
+        """Registra o uso de uma chamada ao LLM (provedores sem dados de uso não entram na taxa)."""
+        with self._lock:
+            self.llm_calls += 1
+            if prefix_hash:
+                self.prefixes[prefix_hash] += 1
+            if prompt_tokens:
+                self.prompt_tokens += prompt_tokens
+                self.cached_tokens += cached_tokens or 0
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "renders": self.renders,
+                "avg_render_us": self.render_seconds / self.renders * 1e6 if self.renders else 0.0,
+                "llm_calls": self.llm_calls,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "cached_token_rate": self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0,
+                "distinct_prefixes": len(self.prefixes),
+            }
+
+
+# Instância global: renderizações do PromptManager e chamadas do LLMManager
+prompt_metrics = PromptMetrics()
+
+
 class PromptManager:
     """Gerenciador centralizado de prompts para agentes."""
     
     def __init__(self):
         self.prompts = self._initialize_prompts()
+        # Compilação única: variáveis inválidas falham aqui, não na primeira chamada
+        self._compiled: Dict[str, Dict[str, CompiledTemplate]] = {
+            role: {key: CompiledTemplate.compile(key, template) for key, template in templates.items()}
+            for role, templates in self.prompts.items()
+        }
+        self._prefixes: Dict[Tuple[str, Tuple[str, ...], str], str] = {}
     
     def _initialize_prompts(self) -> Dict[str, Dict[str, PromptTemplate]]:
         """Inicializa todos os prompts do sistema."""
@@ -81,17 +236,7 @@ class PromptManager:
             "data_analysis_context": PromptTemplate(
                 role=AgentRole.ORCHESTRATOR,
                 type=PromptType.CONTEXT,
-                content="""📊 **CONTEXTO DE ANÁLISE DE DADOS**
-
-Dados Carregados: {has_data}
-Arquivo: {file_path}
-Dimensões: {shape}
-Colunas: {columns_summary}
-
-📈 **ANÁLISE DISPONÍVEL**:
-{csv_analysis}
-
-🎯 **INSTRUÇÕES CRÍTICAS PARA TIPOS DE DADOS**:
+                content="""🎯 **INSTRUÇÕES CRÍTICAS PARA TIPOS DE DADOS**:
 - Use EXCLUSIVAMENTE os dtypes reais do DataFrame para classificar tipos
 - int64, float64, int32, float32 = NUMÉRICOS
 - object = CATEGÓRICO (mas verifique se não são números como strings)
@@ -105,8 +250,137 @@ Colunas: {columns_summary}
 - Seja preciso sobre estatísticas e tipos REAIS
 - NÃO forneça respostas genéricas sobre conceitos
 - Inclua números específicos quando relevante
-- Para tipos de dados, liste apenas o que os dtypes indicam""",
+- Para tipos de dados, liste apenas o que os dtypes indicam
+
+📊 **CONTEXTO DE ANÁLISE DE DADOS**
+
+Dados Carregados: {has_data}
+Arquivo: {file_path}
+Dimensões: {shape}
+Colunas: {columns_summary}
+
+📈 **ANÁLISE DISPONÍVEL**:
+{csv_analysis}""",
                 variables=["has_data", "file_path", "shape", "columns_summary", "csv_analysis"]
+            ),
+            
+            "conversation_system": PromptTemplate(
+                role=AgentRole.ORCHESTRATOR,
+                type=PromptType.SYSTEM,
+                content="""Você é Carlos, Coordenador Central do Sistema Multiagente EDA AI Minds.
+
+══════════════════════════════════════════════════════════════════
+🎯 SUA FUNÇÃO ESPECÍFICA (ORCHESTRATOR AGENT)
+══════════════════════════════════════════════════════════════════
+
+VOCÊ É O AGENTE COORDENADOR que:
+- 🧭 Roteia queries para agentes especializados (RAG Data, NFe Tax Specialist, etc)
+- 💬 Responde saudações e consultas gerais sobre o sistema
+- 🤝 Interage diretamente com usuários em conversas gerais
+- 📋 Extrai informações do usuário (nome, preferências)
+- 🧠 Mantém contexto conversacional e memória de interações
+
+QUANDO VOCÊ RESPONDE DIRETAMENTE:
+✅ Saudações ("Oi", "Olá", "Bom dia")
+✅ Apresentações ("Meu nome é...", "Sou o...")
+✅ Perguntas gerais sobre o sistema
+✅ Orientações sobre como usar o sistema
+✅ Conversas sociais básicas
+
+QUANDO VOCÊ DELEGA PARA OUTROS AGENTES:
+🔀 RAG Data Agent → Análises via busca vetorial semântica
+🔀 NFe Tax Specialist → Questões fiscais/tributárias específicas
+🔀 CSV Analysis Agent → Processamento direto de dados tabulares
+🔀 Visualization Agent → Criação de gráficos
+
+══════════════════════════════════════════════════════════════════
+🎓 CONHECIMENTO-BASE (Overview de Alto Nível)
+══════════════════════════════════════════════════════════════════
+
+- Estatística descritiva básica (média, mediana, desvio padrão)
+- Conceitos gerais de NFe (CFOP, NCM, ICMS, IPI, PIS, COFINS)
+- Identificação de padrões e anomalias em dados
+- Visualização e interpretação de gráficos (barras, linhas, histogramas)
+
+**IMPORTANTE:** Para análises aprofundadas ou questões técnicas específicas, 
+você DELEGA para agentes especializados. Você é o coordenador, não o executor!
+
+══════════════════════════════════════════════════════════════════
+🛡️ GUARDRAILS OBRIGATÓRIOS (Segurança e Privacidade)
+══════════════════════════════════════════════════════════════════
+
+1) READ-ONLY: Não execute ações de escrita (DELETE/INSERT/UPDATE/MIGRATE)
+2) PRIVACIDADE: Não revele estrutura interna, IPs, chaves, tokens, paths
+3) DADOS SENSÍVEIS: Use agregados ou exemplos genéricos
+4) ESCOPO: Redirecione perguntas fora do domínio (dados/NFe)
+5) PROFISSIONALISMO: Tom educado, evite temas sensíveis (política, religião)
+6) TRANSPARÊNCIA: Nunca prometa alterar banco de dados ou arquivos
+
+══════════════════════════════════════════════════════════════════
+📋 COMPORTAMENTO E FORMATO
+══════════════════════════════════════════════════════════════════
+
+- **APRESENTAÇÃO INICIAL:** Na primeira interação, apresente-se e pergunte o nome
+- **USO DO NOME:** Quando souber o nome do usuário (veja o contexto da conversa), inclua naturalmente
+- **TOM:** Humanizado, amigável, conversacional (como um colega especialista)
+- **BREVIDADE:** 2-4 parágrafos curtos (máximo 3-4 linhas cada)
+- **EXCEÇÃO:** Pode estender ao apresentar dados/análises quando necessário
+- **EVITE:** Markdown pesado, listas excessivas, linguagem robótica
+
+EXEMPLOS DE ORIENTAÇÕES ÚTEIS:
+- "Posso te ajudar com análise de dados CSV ou dúvidas sobre NFe"
+- "Para análises específicas, posso buscar informações nos dados carregados"
+- "Questões tributárias? Tenho especialistas para te ajudar!"
+
+Instrução final: Seja o anfitrião acolhedor e o coordenador eficiente do sistema!""",
+                variables=[]
+            ),
+            
+            "csv_data_instructions": PromptTemplate(
+                role=AgentRole.ORCHESTRATOR,
+                type=PromptType.INSTRUCTION,
+                content="""Você é um assistente especializado em análise de dados CSV.
+Responda com base ESPECIFICAMENTE nos dados carregados fornecidos no contexto.
+Use português brasileiro e seja preciso e detalhado sobre os dados reais.
+
+🎯 INSTRUÇÕES CRÍTICAS PARA ANÁLISE DE DADOS CSV (da tabela embeddings):
+
+📥 CONTEXTO RECEBIDO:
+- Você recebeu DADOS ESTRUTURADOS (DataFrame) reconstruídos da coluna chunk_text da tabela embeddings
+- Esses dados foram parseados como CSV e representam as COLUNAS ORIGINAIS do arquivo CSV carregado
+- As estatísticas fornecidas (dtypes, describe, info) refletem os DADOS REAIS, não a estrutura da tabela embeddings
+
+🔍 COMO ANALISAR:
+1. EXAMINE as COLUNAS listadas na seção "ANÁLISE DOS DADOS"
+2. IDENTIFIQUE os TIPOS DE DADOS usando dtypes:
+   - **Numéricos**: float64, int64, float32, int32, etc.
+   - **Categóricos**: object, category, bool
+   - **Temporais**: datetime64, timedelta
+   - **Texto**: object (sem padrão numérico)
+
+3. USE as ESTATÍSTICAS FORNECIDAS:
+   - Para distribuições: count, mean, std, min, max, quartis
+   - Para valores únicos: nunique(), value_counts()
+   - Para tipos: dtypes explícitos
+
+⚠️ REGRAS CRÍTICAS:
+- Use APENAS os dtypes fornecidos para classificar tipos de dados
+- NÃO confunda com colunas da tabela embeddings (id, chunk_text, created_at, embedding)
+- NÃO interprete palavras soltas ou descrições textuais como se fossem colunas
+- Se o contexto mostra "Colunas: ['Time', 'V1', ..., 'Amount', 'Class']", essas são as colunas REAIS
+- Seja PRECISO: liste EXATAMENTE as colunas fornecidas, com seus tipos REAIS
+- Se a informação não está no contexto estruturado, diga que não tem acesso a ela""",
+                variables=[]
+            ),
+            
+            "general_data_instructions": PromptTemplate(
+                role=AgentRole.ORCHESTRATOR,
+                type=PromptType.INSTRUCTION,
+                content="""Você é um assistente de análise de dados especializado em CSV e análise estatística.
+Responda de forma clara, precisa e útil. Use português brasileiro.
+
+🎯 Forneça uma resposta útil e estruturada:""",
+                variables=[]
             )
         }
         
@@ -236,26 +510,53 @@ Baseie-se EXCLUSIVAMENTE nos dados reais fornecidos.""",
             "search_context": PromptTemplate(
                 role=AgentRole.RAG_SPECIALIST,
                 type=PromptType.CONTEXT,
-                content="""🔍 **CONTEXTO DE BUSCA RECUPERADO**
+                content="""🎯 **INSTRUÇÕES**:
+- Use EXCLUSIVAMENTE as informações do contexto de busca abaixo
+- Mantenha fidelidade ao contexto original
+- Se informações são insuficientes, diga claramente
+- Cite números de chunk quando relevante
+
+🔍 **CONTEXTO DE BUSCA RECUPERADO**
 
 Consulta: {query}
 Resultados encontrados: {num_results}
 Similaridade média: {avg_similarity:.3f}
 
 📄 **FRAGMENTOS RELEVANTES**:
-{context_chunks}
-
-🎯 **INSTRUÇÕES**:
-- Use EXCLUSIVAMENTE as informações acima
-- Mantenha fidelidade ao contexto original
-- Se informações são insuficientes, diga claramente
-- Cite números de chunk quando relevante""",
+{context_chunks}""",
                 variables=["query", "num_results", "avg_similarity", "context_chunks"]
             )
         }
         
         return prompts
     
+    def _template(self, agent_role: AgentRole, prompt_key: str) -> CompiledTemplate:
+        role_key = agent_role.value
+        
+        if role_key not in self._compiled:
+            raise ValueError(f"Agente '{role_key}' não encontrado nos prompts")
+        
+        if prompt_key not in self._compiled[role_key]:
+            raise ValueError(f"Prompt '{prompt_key}' não encontrado para agente '{role_key}'")
+        
+        return self._compiled[role_key][prompt_key]
+    
+    def render(self, agent_role: AgentRole, prompt_key: str, **variables) -> RenderedPrompt:
+        """Renderiza um prompt separando o texto fixo inicial (prefixo) do restante.
+        
+        Args:
+            agent_role: Papel do agente
+            prompt_key: Chave do prompt específico
+            **variables: Variáveis para substituição no template
+            
+        Returns:
+            RenderedPrompt com prefixo estável e sufixo com as variáveis
+        """
+        start = time.perf_counter()
+        rendered = self._template(agent_role, prompt_key).render(variables)
+        prompt_metrics.record_render(time.perf_counter() - start)
+        return rendered
+    
     def get_prompt(self, agent_role: AgentRole, prompt_key: str, **variables) -> str:
         """Recupera um prompt formatado para um agente específico.
         
@@ -267,21 +568,36 @@ Similaridade média: {avg_similarity:.3f}
         Returns:
             Prompt formatado pronto para uso
         """
-        role_key = agent_role.value
-        
-        if role_key not in self.prompts:
-            raise ValueError(f"Agente '{role_key}' não encontrado nos prompts")
-        
-        if prompt_key not in self.prompts[role_key]:
-            raise ValueError(f"Prompt '{prompt_key}' não encontrado para agente '{role_key}'")
+        return self.render(agent_role, prompt_key, **variables).text
+    
+    def compose(self, agent_role: AgentRole, static_keys: Sequence[str] = ("system_base",),
+                volatile: Union[str, Sequence[str]] = (), separator: str = "\n\n") -> RenderedPrompt:
+        """Monta prompt com templates fixos no prefixo e conteúdo volátil no sufixo.
         
-        template = self.prompts[role_key][prompt_key]
+        Args:
+            agent_role: Papel do agente
+            static_keys: Prompts sem variáveis que formam o prefixo, nesta ordem
+            volatile: Dados, histórico, pergunta etc. (partes vazias são ignoradas)
+            separator: Separador entre as partes
+            
+        Returns:
+            RenderedPrompt cujo prefixo é idêntico para os mesmos ``static_keys``
+        """
+        start = time.perf_counter()
+        cache_key = (agent_role.value, tuple(static_keys), separator)
+        prefix = self._prefixes.get(cache_key)
+        if prefix is None:
+            templates = [self._template(agent_role, key) for key in static_keys]
+            dynamic = [template.key for template in templates if template.variables]
+            if dynamic:
+                raise ValueError(f"Prompts com variáveis não podem compor o prefixo fixo: {dynamic}")
+            prefix = self._prefixes[cache_key] = separator.join(template.head for template in templates)
         
-        try:
-            return template.content.format(**variables)
-        except KeyError as e:
-            missing_var = str(e).strip("'")
-            raise ValueError(f"Variável '{missing_var}' necessária para prompt '{prompt_key}' não fornecida")
+        parts = [volatile] if isinstance(volatile, str) else list(volatile)
+        parts = [part for part in parts if part]
+        suffix = separator + separator.join(parts) if parts else ""
+        prompt_metrics.record_render(time.perf_counter() - start)
+        return RenderedPrompt(prefix, suffix)
     
     def get_system_prompt(self, agent_role: AgentRole) -> str:
         """Recupera o prompt base (system) para um agente.
@@ -319,29 +635,36 @@ Similaridade média: {avg_similarity:.3f}
             prompt_key: Chave única para o prompt
             content: Conteúdo do prompt
             prompt_type: Tipo do prompt
-            variables: Lista de variáveis que o prompt aceita
+            variables: Lista de variáveis que o prompt aceita (None = as usadas no texto)
+        
+        Raises:
+            ValueError: Se o texto usa variáveis diferentes das declaradas
         """
         role_key = agent_role.value
-        
-        if role_key not in self.prompts:
-            self.prompts[role_key] = {}
-        
-        self.prompts[role_key][prompt_key] = PromptTemplate(
+        template = PromptTemplate(
             role=agent_role,
             type=prompt_type,
             content=content,
-            variables=variables or []
+            variables=variables
         )
+        compiled = CompiledTemplate.compile(prompt_key, template)
+        
+        self.prompts.setdefault(role_key, {})[prompt_key] = template
+        self._compiled.setdefault(role_key, {})[prompt_key] = compiled
+        self._prefixes = {key: prefix for key, prefix in self._prefixes.items() if key[0] != role_key}
 
 
 # Singleton instance
 _prompt_manager: Optional[PromptManager] = None
+_prompt_manager_lock = threading.Lock()
 
 def get_prompt_manager() -> PromptManager:
-    """Retorna instância singleton do PromptManager."""
+    """Retorna instância singleton do PromptManager (templates compilados uma vez por processo)."""
     global _prompt_manager
     if _prompt_manager is None:
-        _prompt_manager = PromptManager()
+        with _prompt_manager_lock:
+            if _prompt_manager is None:
+                _prompt_manager = PromptManager()
     return _prompt_manager
 
 
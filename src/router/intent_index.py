@@ -0,0 +1,285 @@
+"""Índice em memória de protótipos de intenção para o roteamento semântico.
+
+A classificação de intenção buscava o exemplo mais próximo via pgvector na
+tabela ``embeddings``, competindo com todos os chunks de dados e pagando uma
+ida ao banco por pergunta. Este módulo mantém os exemplos de cada categoria
+(``scripts/populate_intent_embeddings.py``) numa matriz float32 normalizada,
+carregada de um arquivo ``.npz`` versionado:
+
+- ``embeddings`` (n, d) float32, ``labels`` e ``texts`` (n,);
+- ``model``, ``version`` (hash de modelo + exemplos), ``temperature``;
+- ``calibration`` (a, b) de Platt ajustado por leave-one-out nos exemplos.
+
+Classificar é um produto matriz-vetor, votação ponderada nos ``top_k``
+vizinhos e a confiança calibrada ``sigmoid(a * raw + b)``, onde ``raw`` é a
+fração do voto do vencedor vezes sua maior similaridade. O arquivo é gravado
+de forma atômica e relido quando o mtime muda (hot reload).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.settings import (
+    INTENT_INDEX_PATH,
+    INTENT_INDEX_RELOAD_INTERVAL,
+    INTENT_INDEX_TOP_K,
+)
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_TEMPERATURE = 0.05
+
+
+@dataclass(frozen=True)
+class IntentPrediction:
+    """Intenção prevista para uma pergunta."""
+    category: str
+    confidence: float
+    similarity: float
+    votes: Dict[str, float] = field(default_factory=dict)
+    nearest_example: str = ""
+
+
+@dataclass(frozen=True)
+class _IndexData:
+    """Conteúdo imutável de uma versão do índice (trocado inteiro no reload)."""
+    matrix: np.ndarray
+    labels: np.ndarray
+    texts: np.ndarray
+    model: str
+    version: str
+    temperature: float
+    calibration: Optional[Tuple[float, float]]
+    mtime: float
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def _vote(similarities: np.ndarray, labels: np.ndarray, top_k: int,
+          temperature: float) -> Tuple[str, float, float, Dict[str, float]]:
+    """Votação ponderada por softmax(similaridade / temperatura) nos top_k vizinhos.
+
+    Returns:
+        (categoria, raw, maior similaridade da categoria, votos normalizados)
+    """
+    k = min(top_k, len(similarities))
+    top = np.argpartition(-similarities, k - 1)[:k]
+    top_sims = similarities[top]
+    weights = np.exp((top_sims - top_sims.max()) / temperature)
+    votes: Dict[str, float] = {}
+    best_sim: Dict[str, float] = {}
+    for label, weight, sim in zip(labels[top], weights, top_sims):
+        votes[label] = votes.get(label, 0.0) + float(weight)
+        best_sim[label] = max(best_sim.get(label, -1.0), float(sim))
+    total = sum(votes.values())
+    votes = {label: weight / total for label, weight in votes.items()}
+    winner = max(votes, key=lambda label: (votes[label], best_sim[label]))
+    return winner, votes[winner] * max(best_sim[winner], 0.0), best_sim[winner], votes
+
+
+def fit_platt(raw: np.ndarray, correct: np.ndarray, iterations: int = 50,
+              l2: float = 1e-3) -> Optional[Tuple[float, float]]:
+    """Ajusta sigmoid(a * raw + b) a acertos/erros por Newton-Raphson.
+
+    Retorna None quando só há uma classe (sem erros não há o que calibrar).
+    """
+    raw = np.asarray(raw, dtype=np.float64)
+    correct = np.asarray(correct, dtype=np.float64)
+    if len(raw) == 0 or correct.min() == correct.max():
+        return None
+    X = np.column_stack([raw, np.ones_like(raw)])
+    w = np.zeros(2)
+    for _ in range(iterations):
+        p = 1.0 / (1.0 + np.exp(-X @ w))
+        gradient = X.T @ (p - correct) + l2 * w
+        hessian = X.T @ (X * (p * (1 - p))[:, None]) + l2 * np.eye(2)
+        step = np.linalg.solve(hessian, gradient)
+        w -= step
+        if np.abs(step).max() < 1e-8:
+            break
+    return float(w[0]), float(w[1])
+
+
+def index_version(model: str, texts: Sequence[str], labels: Sequence[str]) -> str:
+    """Hash estável do modelo e dos exemplos (muda quando o conjunto muda)."""
+    digest = hashlib.sha256(model.encode("utf-8"))
+    for label, text in sorted(zip(labels, texts)):
+        digest.update(f"\x00{label}\x00{text}".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def save_intent_index(path: Union[str, Path], texts: Sequence[str], labels: Sequence[str],
+                      embeddings: Sequence[Sequence[float]], model: str,
+                      top_k: int = INTENT_INDEX_TOP_K,
+                      temperature: float = DEFAULT_TEMPERATURE) -> str:
+    """Grava o índice de protótipos com calibração leave-one-out.
+
+    A gravação vai para um arquivo temporário e é trocada com ``os.replace``;
+    processos que recarregam o índice nunca leem um arquivo pela metade.
+
+    Returns:
+        Versão gravada
+    """
+    path = Path(path)
+    matrix = _normalize_rows(embeddings)
+    labels_arr = np.asarray(labels, dtype=str)
+    if len(matrix) != len(labels_arr) or len(labels_arr) != len(texts):
+        raise ValueError("texts, labels e embeddings devem ter o mesmo tamanho")
+
+    # Leave-one-out: cada exemplo classificado pelos demais
+    similarities = matrix @ matrix.T
+    np.fill_diagonal(similarities, -np.inf)
+    raw, correct = [], []
+    for i in range(len(matrix)):
+        others = np.isfinite(similarities[i])
+        winner, score, _, _ = _vote(similarities[i][others], labels_arr[others], top_k, temperature)
+        raw.append(score)
+        correct.append(winner == labels_arr[i])
+    calibration = fit_platt(np.array(raw), np.array(correct))
+
+    version = index_version(model, texts, labels)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as fh:
+        np.savez(
+            fh,
+            embeddings=matrix,
+            labels=labels_arr,
+            texts=np.asarray(texts, dtype=str),
+            model=np.asarray(model),
+            version=np.asarray(version),
+            temperature=np.asarray(temperature, dtype=np.float64),
+            calibration=np.asarray(calibration if calibration else (np.nan, np.nan), dtype=np.float64),
+        )
+    os.replace(tmp_path, path)
+    logger.info(
+        f"Índice de intenções gravado: {path} (versão {version}, {len(matrix)} exemplos, "
+        f"acurácia LOO {np.mean(correct):.1%})"
+    )
+    return version
+
+
+class IntentPrototypeIndex:
+    """Classificador de intenção por vizinhos mais próximos sobre protótipos em memória."""
+
+    def __init__(self, path: Union[str, Path] = INTENT_INDEX_PATH,
+                 top_k: int = INTENT_INDEX_TOP_K,
+                 reload_interval: float = INTENT_INDEX_RELOAD_INTERVAL):
+        self.path = Path(path)
+        self.top_k = top_k
+        self.reload_interval = reload_interval
+        self._data: Optional[_IndexData] = None
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self.reload()
+
+    @property
+    def loaded(self) -> bool:
+        return self._data is not None
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._data.version if self._data else None
+
+    @property
+    def size(self) -> int:
+        return len(self._data.labels) if self._data else 0
+
+    def reload(self) -> bool:
+        """Carrega o arquivo se o mtime mudou. Retorna True quando trocou a versão."""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                mtime = self.path.stat().st_mtime
+            except FileNotFoundError:
+                return False
+            if self._data is not None and self._data.mtime == mtime:
+                return False
+            try:
+                with np.load(self.path, allow_pickle=False) as npz:
+                    calibration = tuple(float(v) for v in npz["calibration"])
+                    data = _IndexData(
+                        matrix=np.ascontiguousarray(npz["embeddings"], dtype=np.float32),
+                        labels=npz["labels"],
+                        texts=npz["texts"],
+                        model=str(npz["model"]),
+                        version=str(npz["version"]),
+                        temperature=float(npz["temperature"]),
+                        calibration=None if np.isnan(calibration).any() else calibration,
+                        mtime=mtime,
+                    )
+            except Exception as e:
+                logger.warning(f"Falha ao carregar índice de intenções {self.path}: {e}")
+                return False
+            previous = self.version
+            self._data = data
+        logger.info(f"Índice de intenções carregado: versão {data.version} ({len(data.labels)} exemplos)"
+                    + (f", antes {previous}" if previous else ""))
+        return True
+
+    def maybe_reload(self) -> bool:
+        """Verifica o arquivo no máximo uma vez a cada ``reload_interval`` segundos."""
+        if time.monotonic() - self._checked_at < self.reload_interval:
+            return False
+        return self.reload()
+
+    def classify(self, embedding: Sequence[float]) -> Optional[IntentPrediction]:
+        """Classifica um embedding de pergunta.
+
+        Returns:
+            IntentPrediction, ou None sem índice carregado ou com dimensão incompatível
+        """
+        self.maybe_reload()
+        data = self._data
+        if data is None:
+            return None
+        query = _normalize_rows(np.asarray(embedding, dtype=np.float32)[None, :])[0]
+        if query.shape[0] != data.matrix.shape[1]:
+            logger.warning(
+                f"Dimensão do embedding ({query.shape[0]}) difere do índice de intenções "
+                f"({data.matrix.shape[1]}, modelo {data.model})"
+            )
+            return None
+
+        similarities = data.matrix @ query
+        category, raw, similarity, votes = _vote(similarities, data.labels, self.top_k, data.temperature)
+        if data.calibration:
+            a, b = data.calibration
+            confidence = 1.0 / (1.0 + np.exp(-(a * raw + b)))
+        else:
+            confidence = raw
+        nearest = int(np.argmax(similarities))
+        return IntentPrediction(
+            category=str(category),
+            confidence=float(confidence),
+            similarity=similarity,
+            votes=votes,
+            nearest_example=str(data.texts[nearest]),
+        )
+
+
+_index: Optional[IntentPrototypeIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_intent_index() -> IntentPrototypeIndex:
+    """Instância única do índice de intenções no processo (vazia se o arquivo não existir)."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = IntentPrototypeIndex()
+    return _index
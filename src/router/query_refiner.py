@@ -62,8 +62,10 @@ class QueryRefiner:
                  similarity_threshold: float = 0.72,
                  max_iterations: int = 3,
                  enable_paraphrase: bool = True,
-                 num_paraphrases: int = 3):
-        self.embedding_gen = EmbeddingGenerator(provider=embedding_provider)
+                 num_paraphrases: int = 3,
+                 embedding_generator: Optional[EmbeddingGenerator] = None):
+        # Reusar um generator já carregado evita recarregar o modelo a cada instância
+        self.embedding_gen = embedding_generator or EmbeddingGenerator(provider=embedding_provider)
         # usar VectorStore (síncrono) para histórico de queries/embeddings
         self.memory = memory or VectorStore()
         self.similarity_threshold = similarity_threshold
@@ -193,7 +195,10 @@ Produza exatamente {self.num_paraphrases} variações distintas, uma por linha,
             return []
     
     def _test_paraphrases(self, paraphrases: List[str]) -> Dict[str, Any]:
-        """Testa cada paraphrase na busca vetorial e retorna a melhor.
+        """Testa as paraphrases na busca vetorial e retorna a melhor.
+        
+        Os embeddings saem de um único lote e as buscas no histórico rodam
+        concorrentemente.
         
         Args:
             paraphrases: Lista de queries parafraseadas
@@ -215,28 +220,27 @@ Produza exatamente {self.num_paraphrases} variações distintas, uma por linha,
         
         logger.info("🔍 Testando %d paraphrases na busca vetorial...", len(paraphrases))
         
-        for i, paraphrase in enumerate(paraphrases, 1):
-            try:
-                # Gerar embedding para paraphrase
-                emb_result = self.embedding_gen.generate_embedding(paraphrase)
-                query_emb = emb_result.embedding
-                
-                # Buscar similaridade com histórico
-                similarity = self._get_best_historical_similarity(query_emb)
-                
-                logger.debug(
-                    "  Paraphrase %d: similarity=%.3f query='%s'",
-                    i, similarity, paraphrase[:60] + ('...' if len(paraphrase) > 60 else '')
-                )
-                
-                if similarity > best_similarity:
-                    best_similarity = similarity
-                    best_query = paraphrase
-                    best_embedding = query_emb
-                    
-            except Exception as e:
-                logger.warning("⚠️ Erro ao testar paraphrase %d: %s", i, str(e))
-                continue
+        try:
+            embeddings = self.embedding_gen.embed_texts(paraphrases)
+            historical = self.memory.search_similar_many(
+                embeddings, similarity_threshold=0.0, limit=10
+            )
+        except Exception as e:
+            logger.warning("⚠️ Erro ao testar paraphrases: %s", str(e))
+            embeddings, historical = [], []
+        
+        for i, (paraphrase, query_emb, results) in enumerate(zip(paraphrases, embeddings, historical), 1):
+            similarity = max((r.similarity_score for r in results), default=0.0)
+            
+            logger.debug(
+                "  Paraphrase %d: similarity=%.3f query='%s'",
+                i, similarity, paraphrase[:60] + ('...' if len(paraphrase) > 60 else '')
+            )
+            
+            if similarity > best_similarity:
+                best_similarity = similarity
+                best_query = paraphrase
+                best_embedding = query_emb
         
         if best_query:
             logger.info(
@@ -4,14 +4,17 @@ Pipeline avançado de roteamento semântico para perguntas do backend multiagent
 Utiliza embeddings, consulta vetorial, fallback inteligente e validação Pydantic.
 """
 
+import threading
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, ValidationError
 
 from src.embeddings.generator import EmbeddingGenerator, EmbeddingProvider
-from src.embeddings.vector_store import VectorStore
+from src.embeddings.vector_store import VectorStore, VectorSearchResult
 from src.utils.logging_config import get_logger
 from src.router.semantic_ontology import StatisticalOntology
 from src.router.query_refiner import QueryRefiner
+from src.router.intent_index import get_intent_index
+from src.settings import INTENT_INDEX_MIN_CONFIDENCE
 
 logger = get_logger(__name__)
 
@@ -26,6 +29,53 @@ class QuestionIntent(BaseModel):
 embedding_generator = EmbeddingGenerator(provider=EmbeddingProvider.SENTENCE_TRANSFORMER)
 vector_store = VectorStore()
 
+# Constante k do Reciprocal Rank Fusion (valor usual da literatura)
+RRF_K = 60
+
+# Parâmetros do roteamento: a intenção exige o threshold maior; o fallback
+# contextual aceita o menor. Uma única busca usa o menor threshold e o maior limite.
+INTENT_THRESHOLD = 0.7
+INTENT_LIMIT = 3
+CONTEXTUAL_THRESHOLD = 0.6
+CONTEXTUAL_LIMIT = 1
+
+_query_refiner: Optional[QueryRefiner] = None
+_query_refiner_lock = threading.Lock()
+
+
+def get_query_refiner() -> QueryRefiner:
+    """Retorna o QueryRefiner compartilhado, criado sob demanda com o generator do módulo."""
+    global _query_refiner
+    if _query_refiner is None:
+        with _query_refiner_lock:
+            if _query_refiner is None:
+                _query_refiner = QueryRefiner(
+                    embedding_provider=EmbeddingProvider.SENTENCE_TRANSFORMER,
+                    memory=vector_store,
+                    embedding_generator=embedding_generator
+                )
+    return _query_refiner
+
+
+def reciprocal_rank_fusion(result_lists: List[List[VectorSearchResult]],
+                           k: int = RRF_K) -> List[VectorSearchResult]:
+    """Funde rankings de várias buscas por Reciprocal Rank Fusion.
+    
+    Cada chunk soma 1/(k + posição) em cada lista onde aparece; chunks
+    recuperados por várias variações sobem mesmo sem o maior score isolado.
+    Mantém o resultado de maior similaridade de cada embedding_id.
+    """
+    fused: Dict[str, float] = {}
+    best: Dict[str, VectorSearchResult] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, 1):
+            key = result.embedding_id
+            fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank)
+            if key not in best or result.similarity_score > best[key].similarity_score:
+                best[key] = result
+    ordered = sorted(fused, key=lambda key: (fused[key], best[key].similarity_score), reverse=True)
+    return [best[key] for key in ordered]
+
 
 class SemanticRouter:
     """
@@ -43,6 +93,9 @@ class SemanticRouter:
         self.logger = logger
         self.ingestion_id = ingestion_id
         self.source_id = source_id
+        # Memo por requisição: (pergunta normalizada, filtros) -> candidatos; route() o reinicia
+        self._search_memo: Dict[tuple, List[VectorSearchResult]] = {}
+        self._embedding_memo: Dict[str, List[float]] = {}
 
     def normalize(self, question: str) -> str:
         """
@@ -63,19 +116,42 @@ class SemanticRouter:
         Returns:
             Vetor de embedding (List[float])
         """
-        result = self.embedding_generator.generate_embedding(question)
-        return result.embedding
+        if question not in self._embedding_memo:
+            self._embedding_memo[question] = self.embedding_generator.generate_embedding(question).embedding
+        return self._embedding_memo[question]
 
-    def search_with_expansion(self, question: str,
-                              base_threshold: float = 0.7,
-                              base_limit: int = 3) -> List["VectorSearchResult"]:
-        """Busca chunks SEMPRE filtrando por ingestion_id/source_id para garantir isolamento de contexto."""
-        # Montar filtro
+    def _filters(self) -> Dict[str, str]:
         filters = {}
         if self.ingestion_id:
             filters['ingestion_id'] = self.ingestion_id
         if self.source_id:
             filters['source_id'] = self.source_id
+        return filters
+
+    def candidates(self, question: str) -> List[VectorSearchResult]:
+        """
+        Conjunto único de candidatos da pergunta para intenção e fallback contextual.
+
+        Busca uma vez com o menor threshold (CONTEXTUAL_THRESHOLD) e o maior limite
+        (INTENT_LIMIT); classify_intent e fallback_contextual filtram o resultado.
+        Memoizado por (pergunta normalizada, filtros) até o próximo route().
+        Args:
+            question: Pergunta normalizada
+        Returns:
+            Resultados ordenados por relevância
+        """
+        key = (question, tuple(sorted(self._filters().items())))
+        if key not in self._search_memo:
+            self._search_memo[key] = self.search_with_expansion(
+                question, base_threshold=CONTEXTUAL_THRESHOLD, base_limit=INTENT_LIMIT
+            )
+        return self._search_memo[key]
+
+    def search_with_expansion(self, question: str,
+                              base_threshold: float = 0.7,
+                              base_limit: int = 3) -> List["VectorSearchResult"]:
+        """Busca chunks SEMPRE filtrando por ingestion_id/source_id para garantir isolamento de contexto."""
+        filters = self._filters()
 
         # 1) search original
         embedding = self.embed_question(question)
@@ -91,8 +167,7 @@ class SemanticRouter:
 
         # 2) tentar refinamento iterativo via QueryRefiner (histórico)
         try:
-            refiner = QueryRefiner(embedding_provider=EmbeddingProvider.SENTENCE_TRANSFORMER)
-            ref_result = refiner.refine_query(question)
+            ref_result = get_query_refiner().refine_query(question)
             if ref_result and ref_result.success:
                 emb = ref_result.embedding
                 alt_results = self.vector_store.search_similar(
@@ -106,47 +181,56 @@ class SemanticRouter:
         except Exception as e:
             self.logger.warning(f"QueryRefiner falhou: {e}")
 
-        # 3) expand queries and retry with relaxed params
+        # 3) expandir a pergunta: um lote de embeddings e buscas concorrentes
+        # com parâmetros relaxados, fundidas por RRF
         variations = StatisticalOntology.generate_simple_expansions(question)
-        aggregated = []
-        seen_ids = set()
-
-        for var in variations:
-            try:
-                emb = self.embed_question(var)
-                # relaxar threshold e aumentar limite
-                alt_results = self.vector_store.search_similar(
-                    query_embedding=emb,
-                    similarity_threshold=max(0.5, base_threshold - 0.15),
-                    limit=min(10, base_limit * 3),
-                    filters=filters if filters else None
-                )
+        if not variations:
+            return []
+        try:
+            embeddings = self.embedding_generator.embed_texts(variations)
+        except Exception as e:
+            self.logger.warning(f"Falha ao gerar embeddings das variações: {e}")
+            return []
 
-                for r in alt_results:
-                    if r.embedding_id not in seen_ids:
-                        aggregated.append(r)
-                        seen_ids.add(r.embedding_id)
-            except Exception:
-                continue
+        def enough_strong_hits(arrived: List[VectorSearchResult]) -> bool:
+            # parar cedo quando já há base_limit chunks distintos acima do threshold original
+            strong = {r.embedding_id for r in arrived if r.similarity_score >= base_threshold}
+            return len(strong) >= base_limit
 
-        # ordenar por similaridade e retornar os top base_limit
-        aggregated.sort(key=lambda x: x.similarity_score, reverse=True)
-        return aggregated[:base_limit]
+        result_lists = self.vector_store.search_similar_many(
+            embeddings,
+            similarity_threshold=max(0.5, base_threshold - 0.15),
+            limit=min(10, base_limit * 3),
+            filters=filters if filters else None,
+            stop_when=enough_strong_hits
+        )
+        return reciprocal_rank_fusion(result_lists)[:base_limit]
 
     def classify_intent(self, question: str) -> Optional[QuestionIntent]:
         """
         Classifica a intenção da pergunta via busca vetorial e validação Pydantic.
+        Usa o índice de protótipos em memória quando disponível; sem índice ou
+        com confiança baixa, recorre aos candidatos da busca vetorial.
         Args:
             question: Pergunta normalizada
         Returns:
             Instância QuestionIntent ou None se não houver correspondência
         """
-        # Usar busca com expansão para melhorar recall
-        results = self.search_with_expansion(question, base_threshold=0.7, base_limit=3)
+        index = get_intent_index()
+        index.maybe_reload()  # índice gerado depois do início do processo
+        if index.loaded:
+            prediction = index.classify(self.embed_question(question))
+            if prediction and prediction.confidence >= INTENT_INDEX_MIN_CONFIDENCE:
+                intent = QuestionIntent(category=prediction.category, entities=[],
+                                        confidence=prediction.confidence)
+                self.logger.info(f"Classificação semântica (índice {index.version}): {intent}")
+                return intent
+
+        results = [r for r in self.candidates(question) if r.similarity_score >= INTENT_THRESHOLD]
         if not results:
             self.logger.warning("Nenhuma correspondência semântica encontrada para a pergunta.")
             return None
-        top = results[0]
+        top = max(results, key=lambda r: r.similarity_score)
         try:
             intent = QuestionIntent(
                 category=top.metadata.get('category', 'unknown'),
@@ -167,8 +251,7 @@ class SemanticRouter:
         Returns:
             Texto da resposta contextual ou None
         """
-        # tentar busca com expansão para melhorar recall
-        results = self.search_with_expansion(question, base_threshold=0.6, base_limit=1)
+        results = self.candidates(question)[:CONTEXTUAL_LIMIT]
         if results:
             resposta = results[0].chunk_text
             self.logger.info("Resposta contextualizada encontrada via embeddings.")
@@ -186,6 +269,8 @@ class SemanticRouter:
             Dicionário com rota, entidades, confiança e fonte
         """
         q_norm = self.normalize(question)
+        self._search_memo = {}
+        self._embedding_memo = {}
         intent = self.classify_intent(q_norm)
         if intent:
             return {
@@ -201,6 +201,7 @@ class AutoIngestService:
             # 3. Move para pasta 'processado'
             logger.info("  → Movendo para pasta 'processado'...")
             processed_path = self.file_manager.move_to_processed(processing_path)
+            self._prepare_frame_cache(processed_path)
             # 4. Atualiza estatísticas
             self.stats["total_files_processed"] += 1
             self.stats["last_success"] = datetime.now().isoformat()
@@ -213,6 +214,16 @@ class AutoIngestService:
             self.stats["last_error"] = str(e)
             return False
 
+    def _prepare_frame_cache(self, processed_path: Path) -> None:
+        """Gera o sidecar Parquet do CSV processado (leituras rápidas no RAGDataAgent)."""
+        try:
+            from src.data.csv_frame_cache import get_csv_frame_cache
+            sidecar = get_csv_frame_cache().prepare(processed_path)
+            if sidecar:
+                logger.info(f"  ✅ Sidecar Parquet gerado: {sidecar.name}")
+        except Exception as e:
+            logger.warning(f"  ⚠️ Falha ao gerar sidecar Parquet de {processed_path}: {e}")
+
     def _check_and_process_new_files(self) -> int:
         """Verifica o Google Drive por novos CSVs e processa cada um.
 
@@ -253,6 +264,7 @@ class AutoIngestService:
 
                     # Move para processado
                     processed_path = self.file_manager.move_to_processed(download_path)
+                    self._prepare_frame_cache(processed_path)
                     files_processed += 1
                     self.stats["total_files_processed"] += 1
                     self.stats["last_success"] = datetime.now().isoformat()
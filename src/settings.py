@@ -8,8 +8,11 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 
+# Raiz do projeto: caminhos relativos de arquivos gerados não dependem do diretório de trabalho
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
 # Carrega .env se existir
-ENV_PATH = Path(__file__).resolve().parents[1] / "configs" / ".env"
+ENV_PATH = PROJECT_ROOT / "configs" / ".env"
 if ENV_PATH.exists():
     load_dotenv(dotenv_path=ENV_PATH)
 
@@ -23,6 +26,13 @@ LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
 SONAR_API_KEY: str | None = os.getenv("SONAR_API_KEY")
 SONAR_API_BASE: str = os.getenv("SONAR_API_BASE", "https://api.perplexity.ai")
 SONAR_DEFAULT_MODEL: str = os.getenv("SONAR_DEFAULT_MODEL", "sonar-pro")
+# Cliente Sonar (src/api/sonar_client.py): conexões keep-alive reaproveitadas,
+# limite de consultas simultâneas e cache de respostas por (modelo, pergunta
+# normalizada, hash do contexto). Regras tributárias mudam pouco: TTL de 7 dias
+SONAR_MAX_CONCURRENCY: int = int(os.getenv("SONAR_MAX_CONCURRENCY", "4"))
+SONAR_POOL_SIZE: int = int(os.getenv("SONAR_POOL_SIZE", "10"))
+SONAR_CACHE_TTL: float = float(os.getenv("SONAR_CACHE_TTL", str(7 * 24 * 3600)))  # 0 = sem cache
+SONAR_CACHE_MAX_ENTRIES: int = int(os.getenv("SONAR_CACHE_MAX_ENTRIES", "1000"))
 
 # Validações leves (opcionalmente tornar estritas em produção)
 REQUIRED_ON_RUNTIME = [
@@ -38,6 +48,31 @@ if missing:
 
 HISTOGRAMS_DIR: str = os.getenv("HISTOGRAMS_DIR", "static/histogramas")
 
+# Gráficos do GraphGenerator: cache em disco (LRU) dos bytes renderizados por
+# (dataset, tipo, colunas, parâmetros) e pool de processos (backend Agg)
+GRAPH_CACHE_ENABLED: bool = os.getenv("GRAPH_CACHE_ENABLED", "true").lower() == "true"
+GRAPH_CACHE_DIR: Path = Path(os.getenv("GRAPH_CACHE_DIR", "data/chart_cache"))
+GRAPH_CACHE_MAX_BYTES: int = int(os.getenv("GRAPH_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# 0 = renderiza na própria thread da requisição
+GRAPH_RENDER_WORKERS: int = int(os.getenv("GRAPH_RENDER_WORKERS", "2"))
+GRAPH_RENDER_TIMEOUT: float = float(os.getenv("GRAPH_RENDER_TIMEOUT", "30"))
+# Renderizações por processo antes de reciclá-lo (matplotlib acumula memória)
+GRAPH_RENDER_MAX_TASKS_PER_CHILD: int = int(os.getenv("GRAPH_RENDER_MAX_TASKS_PER_CHILD", "50"))
+# Gráficos desenhados a partir de agregados (src/tools/chart_data.py):
+# acima do orçamento de pontos a dispersão vira grade de densidade/amostra
+GRAPH_SCATTER_POINT_BUDGET: int = int(os.getenv("GRAPH_SCATTER_POINT_BUDGET", "20000"))
+GRAPH_DENSITY_GRIDSIZE: int = int(os.getenv("GRAPH_DENSITY_GRIDSIZE", "150"))
+GRAPH_KDE_SAMPLE: int = int(os.getenv("GRAPH_KDE_SAMPLE", "20000"))
+GRAPH_BOX_MAX_FLIERS: int = int(os.getenv("GRAPH_BOX_MAX_FLIERS", "2000"))
+GRAPH_HEATMAP_MAX_COLUMNS: int = int(os.getenv("GRAPH_HEATMAP_MAX_COLUMNS", "40"))
+# Acima disso os valores não são escritos nas células do heatmap
+GRAPH_HEATMAP_ANNOT_MAX_COLUMNS: int = int(os.getenv("GRAPH_HEATMAP_ANNOT_MAX_COLUMNS", "20"))
+# Formato de saída: png | webp | svg (barras/histogramas, gzip) | spec (Vega-Lite, o frontend desenha)
+GRAPH_OUTPUT_FORMAT: str = os.getenv("GRAPH_OUTPUT_FORMAT", "png").lower()
+GRAPH_WEBP_QUALITY: int = int(os.getenv("GRAPH_WEBP_QUALITY", "80"))
+# Arquivos com hash de conteúdo no nome são imutáveis: cache longo no navegador/CDN
+GRAPH_STATIC_MAX_AGE: int = int(os.getenv("GRAPH_STATIC_MAX_AGE", str(365 * 24 * 3600)))
+
 # ========================================================================
 # CONFIGURAÇÕES DA API
 # ========================================================================
@@ -60,6 +95,47 @@ SEMANTIC_MEMORY_RECALL_LIMIT: int = int(os.getenv("SEMANTIC_MEMORY_RECALL_LIMIT"
 # Padrão anterior era 0.6; configurable via .env se necessário
 SEMANTIC_MEMORY_SIMILARITY_THRESHOLD: float = float(os.getenv("SEMANTIC_MEMORY_SIMILARITY_THRESHOLD", "0.6"))
 
+# Máximo de threads para I/O síncrono do Supabase na camada de memória.
+# Limita as chamadas simultâneas ao PostgREST sem bloquear o event loop.
+MEMORY_IO_MAX_WORKERS: int = int(os.getenv("MEMORY_IO_MAX_WORKERS", "8"))
+
+# Buscas vetoriais concorrentes (variações de uma pergunta no SemanticRouter):
+# uma RPC match_embeddings por vetor, no máximo N em paralelo
+VECTOR_SEARCH_MAX_WORKERS: int = int(os.getenv("VECTOR_SEARCH_MAX_WORKERS", "8"))
+
+# Write-behind: gravações de memória (conversas, contexto, acessos) vão para
+# uma fila local com journal em disco e são enviadas em lote por uma thread
+# de fundo, fora do caminho crítico do /chat.
+MEMORY_WRITE_BEHIND_ENABLED: bool = os.getenv("MEMORY_WRITE_BEHIND_ENABLED", "false").lower() == "true"
+MEMORY_WRITE_BEHIND_FLUSH_INTERVAL: float = float(os.getenv("MEMORY_WRITE_BEHIND_FLUSH_INTERVAL", "0.5"))
+MEMORY_WRITE_BEHIND_BATCH_SIZE: int = int(os.getenv("MEMORY_WRITE_BEHIND_BATCH_SIZE", "200"))
+MEMORY_WRITE_BEHIND_MAX_ATTEMPTS: int = int(os.getenv("MEMORY_WRITE_BEHIND_MAX_ATTEMPTS", "5"))
+MEMORY_JOURNAL_DIR: Path = Path(os.getenv("MEMORY_JOURNAL_DIR", "data/memory_journal"))
+# fsync a cada append protege também contra queda do SO (custa ~1-5 ms por gravação)
+MEMORY_JOURNAL_FSYNC: bool = os.getenv("MEMORY_JOURNAL_FSYNC", "false").lower() == "true"
+
+# Cache em processo: session_id -> UUID e contextos quentes (TTL em segundos).
+# Sessões nunca ficam em cache além do próprio expires_at.
+MEMORY_CACHE_ENABLED: bool = os.getenv("MEMORY_CACHE_ENABLED", "true").lower() == "true"
+MEMORY_SESSION_CACHE_TTL: float = float(os.getenv("MEMORY_SESSION_CACHE_TTL", "300"))
+MEMORY_SESSION_CACHE_MAX_ENTRIES: int = int(os.getenv("MEMORY_SESSION_CACHE_MAX_ENTRIES", "10000"))
+MEMORY_CONTEXT_CACHE_TTL: float = float(os.getenv("MEMORY_CONTEXT_CACHE_TTL", "60"))
+MEMORY_CONTEXT_CACHE_MAX_ENTRIES: int = int(os.getenv("MEMORY_CONTEXT_CACHE_MAX_ENTRIES", "2000"))
+# Intervalo de envio dos contadores de acesso agregados (um UPDATE por ciclo)
+MEMORY_ACCESS_FLUSH_INTERVAL: float = float(os.getenv("MEMORY_ACCESS_FLUSH_INTERVAL", "5"))
+
+# Compactação da memória (src/memory/compaction.py): turnos além dos N mais
+# recentes e mais antigos que a idade máxima viram um resumo cumulativo;
+# embeddings antigos são reduzidos a alguns representativos.
+MEMORY_COMPACTION_ENABLED: bool = os.getenv("MEMORY_COMPACTION_ENABLED", "false").lower() == "true"
+MEMORY_COMPACTION_INTERVAL_HOURS: float = float(os.getenv("MEMORY_COMPACTION_INTERVAL_HOURS", "6"))
+MEMORY_COMPACTION_KEEP_TURNS: int = int(os.getenv("MEMORY_COMPACTION_KEEP_TURNS", "40"))
+MEMORY_COMPACTION_MIN_KEEP_TURNS: int = int(os.getenv("MEMORY_COMPACTION_MIN_KEEP_TURNS", "10"))
+MEMORY_COMPACTION_MAX_AGE_HOURS: float = float(os.getenv("MEMORY_COMPACTION_MAX_AGE_HOURS", "24"))
+MEMORY_COMPACTION_MAX_EMBEDDINGS: int = int(os.getenv("MEMORY_COMPACTION_MAX_EMBEDDINGS", "8"))
+# Cota de armazenamento por sessão (conteúdo + embeddings), em bytes
+MEMORY_SESSION_QUOTA_BYTES: int = int(os.getenv("MEMORY_SESSION_QUOTA_BYTES", str(2 * 1024 * 1024)))
+
 # ========================================================================
 # CONFIGURAÇÕES DE INGESTÃO AUTOMÁTICA DE CSV
 # ========================================================================
@@ -71,6 +147,55 @@ EDA_DATA_DIR_PROCESSANDO: Path = Path(os.getenv("EDA_DATA_DIR_PROCESSANDO", "dat
 EDA_DATA_DIR_PROCESSADO: Path = Path(os.getenv("EDA_DATA_DIR_PROCESSADO", "data/processado"))
 EDA_DATA_DIR_HISTORICO: Path = Path(os.getenv("EDA_DATA_DIR_HISTORICO", "data/historico"))
 
+# Snapshot do dataset por ingestion_id (src/data/dataset_snapshot.py): o
+# DataFrame é montado uma vez por ingestão, mantido em memória até o limite
+# abaixo e persistido em Parquet ao lado do CSV processado.
+DATASET_SNAPSHOT_ENABLED: bool = os.getenv("DATASET_SNAPSHOT_ENABLED", "true").lower() == "true"
+DATASET_SNAPSHOT_MAX_BYTES: int = int(os.getenv("DATASET_SNAPSHOT_MAX_BYTES", str(1024 * 1024 * 1024)))
+DATASET_SNAPSHOT_PERSIST: bool = os.getenv("DATASET_SNAPSHOT_PERSIST", "true").lower() == "true"
+# Intervalo (s) entre verificações de qual ingestão está ativa no banco
+DATASET_SNAPSHOT_KEY_TTL: float = float(os.getenv("DATASET_SNAPSHOT_KEY_TTL", "5"))
+# Registros por página ao ler a tabela embeddings (paginação keyset em id;
+# não deve exceder o max-rows do PostgREST)
+EMBEDDINGS_FETCH_PAGE_SIZE: int = int(os.getenv("EMBEDDINGS_FETCH_PAGE_SIZE", "1000"))
+
+# Cache de CSVs processados lidos pelo RAGDataAgent (src/data/csv_frame_cache.py):
+# frames no LRU dos snapshots (DATASET_SNAPSHOT_MAX_BYTES) + Parquet em data/processado
+CSV_SIDECAR_ENABLED: bool = os.getenv("CSV_SIDECAR_ENABLED", "true").lower() == "true"
+
+# Sandbox de código gerado por LLM (src/tools/python_sandbox.py): processos
+# pré-aquecidos com limites de CPU/memória por trecho; 0 = executa no processo da API
+PYTHON_SANDBOX_WORKERS: int = int(os.getenv("PYTHON_SANDBOX_WORKERS", "2"))
+PYTHON_SANDBOX_TIMEOUT: float = float(os.getenv("PYTHON_SANDBOX_TIMEOUT", "15"))
+PYTHON_SANDBOX_CPU_SECONDS: float = float(os.getenv("PYTHON_SANDBOX_CPU_SECONDS", "10"))
+# Memória adicional por trecho, além da já ocupada pelo processo e pelo dataset
+PYTHON_SANDBOX_MEMORY_MB: int = int(os.getenv("PYTHON_SANDBOX_MEMORY_MB", "1024"))
+PYTHON_SANDBOX_MAX_RUNS: int = int(os.getenv("PYTHON_SANDBOX_MAX_RUNS", "100"))
+
+# Perfil do dataset calculado na ingestão (src/data/dataset_profile.py):
+# gravado em JSON local e na tabela dataset_profiles (migration 0013)
+DATASET_PROFILE_ENABLED: bool = os.getenv("DATASET_PROFILE_ENABLED", "true").lower() == "true"
+DATASET_PROFILE_DIR: Path = Path(os.getenv("DATASET_PROFILE_DIR", "data/profiles"))
+DATASET_PROFILE_TOP_K: int = int(os.getenv("DATASET_PROFILE_TOP_K", "20"))
+DATASET_PROFILE_HISTOGRAM_BINS: int = int(os.getenv("DATASET_PROFILE_HISTOGRAM_BINS", "30"))
+DATASET_PROFILE_MAX_CORR_COLUMNS: int = int(os.getenv("DATASET_PROFILE_MAX_CORR_COLUMNS", "60"))
+
+# Política de memória das análises (src/data/memory_policy.py): orçamento do
+# DataFrame por requisição; acima dele a carga vira amostra ou blocos
+ANALYSIS_MEMORY_BUDGET_BYTES: int = int(os.getenv("ANALYSIS_MEMORY_BUDGET_BYTES", str(512 * 1024 * 1024)))
+ANALYSIS_CATEGORICAL_MAX_RATIO: float = float(os.getenv("ANALYSIS_CATEGORICAL_MAX_RATIO", "0.5"))
+# float64 -> float32 mesmo com perda de precisão (padrão: só quando exato)
+ANALYSIS_DOWNCAST_FLOAT32: bool = os.getenv("ANALYSIS_DOWNCAST_FLOAT32", "false").lower() == "true"
+
+# Índice de protótipos de intenção (src/router/intent_index.py): matriz
+# float32 dos exemplos de scripts/populate_intent_embeddings.py, recarregada
+# quando o arquivo muda (caminho relativo é resolvido a partir da raiz do projeto)
+INTENT_INDEX_PATH: Path = PROJECT_ROOT / os.getenv("INTENT_INDEX_PATH", "data/intent_index.npz")
+INTENT_INDEX_TOP_K: int = int(os.getenv("INTENT_INDEX_TOP_K", "5"))
+INTENT_INDEX_MIN_CONFIDENCE: float = float(os.getenv("INTENT_INDEX_MIN_CONFIDENCE", "0.5"))
+# Intervalo (s) entre verificações de mtime do arquivo do índice
+INTENT_INDEX_RELOAD_INTERVAL: float = float(os.getenv("INTENT_INDEX_RELOAD_INTERVAL", "5"))
+
 # Google Drive API
 GOOGLE_DRIVE_ENABLED: bool = os.getenv("GOOGLE_DRIVE_ENABLED", "false").lower() == "true"
 
@@ -0,0 +1,186 @@
+"""Cache em disco dos gráficos renderizados pelo GraphGenerator.
+
+A mesma pergunta de visualização sobre o mesmo dataset redesenhava o gráfico
+inteiro. Aqui cada gráfico é guardado por chave
+``(impressão das colunas usadas, tipo, colunas, parâmetros)``:
+
+- ``<chave>.img``: bytes da imagem já codificada;
+- ``<chave>.json``: estatísticas devolvidas junto com a imagem.
+
+A remoção é LRU por tamanho total do diretório (``GRAPH_CACHE_MAX_BYTES``),
+com a ordem de uso refletida no mtime dos arquivos; assim vários workers
+compartilham o diretório. Cada processo conhece só o que ele mesmo gravou, então
+o inventário é relido do disco a cada ``RESCAN_EVERY_PUTS`` gravações: o limite
+vale para o diretório e pode ser excedido por no máximo essas gravações de
+cada worker.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+import pandas as pd
+
+from src.settings import GRAPH_CACHE_DIR, GRAPH_CACHE_ENABLED, GRAPH_CACHE_MAX_BYTES
+from src.utils.logging_config import get_logger
+
+logger = get_logger("tools.chart_cache")
+
+IMAGE_SUFFIX = ".img"
+META_SUFFIX = ".json"
+
+# Gravações entre releituras do diretório (contabiliza o que outros workers gravaram)
+RESCAN_EVERY_PUTS = 16
+
+
+def columns_fingerprint(df: pd.DataFrame, columns: Optional[Iterable[str]] = None) -> str:
+    """Hash do conteúdo das colunas usadas no gráfico (todas as linhas).
+
+    O hash é exato (``hash_pandas_object``): um gráfico em cache nunca é
+    servido para dados diferentes. Custa uma passada vetorizada, muito
+    menos que rasterizar o gráfico.
+    """
+    frame = df[list(columns)] if columns else df
+    digest = hashlib.sha1()
+    digest.update(repr((frame.shape, [(str(c), str(t)) for c, t in frame.dtypes.items()])).encode())
+    try:
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    except TypeError:
+        digest.update(frame.astype(str).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def chart_cache_key(kind: str, fingerprint: str, columns: Iterable[Any], params: Dict[str, Any]) -> str:
+    """Chave estável do gráfico a partir de tipo, dados, colunas e parâmetros."""
+    raw = json.dumps([kind, fingerprint, [str(c) for c in columns], params], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ChartCache:
+    """
+    Cache LRU em disco de gráficos renderizados.
+
+    Args:
+        directory: Diretório dos arquivos
+        max_bytes: Tamanho máximo somado das imagens e metadados no diretório
+            (compartilhado por todos os processos)
+    """
+
+    def __init__(self, directory: Union[str, Path] = GRAPH_CACHE_DIR,
+                 max_bytes: int = GRAPH_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._scan()
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return self.directory / f"{key}{IMAGE_SUFFIX}", self.directory / f"{key}{META_SUFFIX}"
+
+    def _scan(self) -> None:
+        """Reconstrói a ordem LRU e o tamanho total a partir dos arquivos existentes."""
+        found = []
+        for image_path in self.directory.glob(f"*{IMAGE_SUFFIX}"):
+            meta_path = image_path.with_suffix(META_SUFFIX)
+            try:
+                stat = image_path.stat()
+                size = stat.st_size + meta_path.stat().st_size
+            except FileNotFoundError:
+                continue
+            found.append((stat.st_mtime, image_path.stem, size))
+        entries: 'OrderedDict[str, int]' = OrderedDict()
+        for _, key, size in sorted(found):
+            entries[key] = size
+        with self._lock:
+            self._entries = entries
+            self._total_bytes = sum(entries.values())
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """Retorna (bytes da imagem, metadados) ou None."""
+        image_path, meta_path = self._paths(key)
+        try:
+            data = image_path.read_bytes()
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            os.utime(image_path)
+        except (FileNotFoundError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            if key not in self._entries:
+                # gravado por outro worker
+                self._entries[key] = len(data) + meta_path.stat().st_size
+                self._total_bytes += self._entries[key]
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return data, meta
+
+    def put(self, key: str, data: bytes, meta: Dict[str, Any]) -> None:
+        """Grava o gráfico de forma atômica e remove os menos usados acima do limite."""
+        image_path, meta_path = self._paths(key)
+        meta_bytes = json.dumps(meta, default=str).encode("utf-8")
+        size = len(data) + len(meta_bytes)
+        if size > self.max_bytes:
+            return
+        try:
+            for path, content in ((meta_path, meta_bytes), (image_path, data)):
+                tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp_path.write_bytes(content)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Falha ao gravar gráfico em cache: {e}")
+            return
+
+        with self._lock:
+            self._puts += 1
+            rescan = self._puts % RESCAN_EVERY_PUTS == 0
+        if rescan:
+            self._scan()
+
+        evicted = []
+        with self._lock:
+            self._total_bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+                evicted.append(old_key)
+        for old_key in evicted:
+            for path in self._paths(old_key):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache: Optional[ChartCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_chart_cache() -> Optional[ChartCache]:
+    """Cache compartilhado do processo (None quando GRAPH_CACHE_ENABLED=false)."""
+    global _cache
+    if not GRAPH_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ChartCache()
+    return _cache
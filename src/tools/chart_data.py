@@ -0,0 +1,148 @@
+"""Agregados que o GraphGenerator desenha em vez dos dados brutos.
+
+O custo de desenhar passa a depender do tamanho do gráfico, não do número de
+linhas: o processo da API reduz os dados (passadas vetorizadas em numpy) e o
+processo de renderização recebe só o que vai para a tela.
+
+- histograma: contagens de ``np.histogram`` (ou do perfil do dataset) e KDE
+  estimada numa amostra;
+- dispersão: pontos até ``GRAPH_SCATTER_POINT_BUDGET``; acima disso, grade
+  de densidade 2D ou amostra uniforme (quando há ``hue``);
+- boxplot: quartis, bigodes e uma amostra dos outliers (``Axes.bxp``);
+- correlação: calculada uma vez em float32 e mantida em cache LRU.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.stats import gaussian_kde
+
+from src.data.dataset_snapshot import freeze_frame, readonly_copy
+from src.settings import (
+    GRAPH_BOX_MAX_FLIERS,
+    GRAPH_DENSITY_GRIDSIZE,
+    GRAPH_KDE_SAMPLE,
+)
+
+SAMPLE_SEED = 0
+KDE_GRID_POINTS = 256
+
+
+def sample_indices(n: int, k: int, seed: int = SAMPLE_SEED) -> np.ndarray:
+    """Índices de uma amostra uniforme sem reposição, em ordem (determinística).
+
+    Com os dados já em memória equivale ao reservoir sampling, sem percorrer
+    linha a linha.
+    """
+    if n <= k:
+        return np.arange(n)
+    return np.sort(np.random.default_rng(seed).choice(n, size=k, replace=False))
+
+
+def histogram_bins(values: np.ndarray, bins: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Contagens e bordas dos bins (valores não finitos ignorados)."""
+    finite = values[np.isfinite(values)]
+    return np.histogram(finite, bins=bins)
+
+
+def kde_curve(values: np.ndarray, edges: np.ndarray,
+              max_points: int = GRAPH_KDE_SAMPLE) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Curva KDE na escala de contagem do histograma, estimada numa amostra.
+
+    Mesma escala do ``sns.histplot(kde=True)``: densidade × n × largura do bin.
+    """
+    finite = values[np.isfinite(values)]
+    if finite.size < 2 or np.ptp(finite) == 0:
+        return None
+    sample = finite[sample_indices(finite.size, max_points)]
+    grid = np.linspace(edges[0], edges[-1], KDE_GRID_POINTS)
+    density = gaussian_kde(sample)(grid)
+    bin_width = float(np.mean(np.diff(edges)))
+    return grid, density * finite.size * bin_width
+
+
+def density_grid(x: np.ndarray, y: np.ndarray,
+                 gridsize: int = GRAPH_DENSITY_GRIDSIZE) -> Dict[str, np.ndarray]:
+    """Contagens 2D (``np.histogram2d``) para desenhar a dispersão como densidade."""
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=gridsize)
+    return {'counts': counts.astype(np.float32), 'x_edges': x_edges, 'y_edges': y_edges}
+
+
+def box_stats(values: np.ndarray, label: Any = None,
+              max_fliers: int = GRAPH_BOX_MAX_FLIERS) -> Dict[str, Any]:
+    """Estatísticas de uma caixa no formato de ``Axes.bxp`` (bigodes a 1,5 IQR)."""
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return {'label': label, 'med': np.nan, 'q1': np.nan, 'q3': np.nan,
+                'whislo': np.nan, 'whishi': np.nan, 'fliers': np.array([])}
+    q1, med, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    low, high = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    inside = values[(values >= low) & (values <= high)]
+    fliers = values[(values < low) | (values > high)]
+    if fliers.size > max_fliers:
+        fliers = fliers[sample_indices(fliers.size, max_fliers)]
+    return {
+        'label': label,
+        'med': float(med), 'q1': float(q1), 'q3': float(q3),
+        'whislo': float(inside.min()) if inside.size else float(q1),
+        'whishi': float(inside.max()) if inside.size else float(q3),
+        'fliers': fliers,
+    }
+
+
+def _correlation_float32(frame: pd.DataFrame) -> np.ndarray:
+    """Pearson em float32: colunas centralizadas e um único produto matricial."""
+    values = frame.to_numpy(dtype=np.float32)
+    if np.isnan(values).any():
+        # Correlação par a par com valores ausentes: mantém a semântica do pandas
+        return frame.astype(np.float32).corr().to_numpy(dtype=np.float32)
+    values -= values.mean(axis=0, dtype=np.float64).astype(np.float32)
+    cov = values.T @ values
+    std = np.sqrt(np.diag(cov))
+    std[std == 0] = np.nan
+    return np.clip(cov / np.outer(std, std), -1.0, 1.0)
+
+
+class CorrelationCache:
+    """Cache LRU de matrizes de correlação por impressão digital das colunas.
+
+    As matrizes ficam em arrays somente leitura e cada chamada recebe uma cópia
+    rasa: escrever numa delas levanta ``ValueError`` em vez de alterar o cache.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, pd.DataFrame]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, fingerprint: str, frame: pd.DataFrame) -> pd.DataFrame:
+        with self._lock:
+            cached = self._entries.get(fingerprint)
+            if cached is not None:
+                self._entries.move_to_end(fingerprint)
+                return readonly_copy(cached)
+        matrix = freeze_frame(
+            pd.DataFrame(_correlation_float32(frame), index=frame.columns, columns=frame.columns)
+        )
+        with self._lock:
+            self._entries[fingerprint] = matrix
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return readonly_copy(matrix)
+
+
+correlation_cache = CorrelationCache()
+
+
+def select_heatmap_columns(corr: pd.DataFrame, max_columns: int) -> List[Any]:
+    """Colunas mais correlacionadas com as demais (média de |r|) quando há colunas demais."""
+    if len(corr.columns) <= max_columns:
+        return list(corr.columns)
+    strength = corr.abs().sum(axis=0) - 1.0
+    keep = strength.nlargest(max_columns).index
+    return [col for col in corr.columns if col in keep]
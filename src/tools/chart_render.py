@@ -0,0 +1,302 @@
+"""Renderização dos gráficos do GraphGenerator fora da thread da requisição.
+
+Cada tipo de gráfico tem uma função ``draw_<tipo>(payload)`` que recebe só
+agregados já preparados (``src.tools.chart_data``: bins, grade de
+densidade, estatísticas de caixa, matriz de correlação) e devolve os bytes
+da imagem (PNG, WebP ou SVG comprimido); o custo de desenhar não cresce com
+o número de linhas. Como o payload é serializável, a renderização roda num
+pool de processos ``spawn`` com backend Agg: o rasterizador do matplotlib
+não segura o GIL do worker da API e uma renderização travada é interrompida
+pelo timeout.
+
+Este módulo importa apenas numpy/matplotlib/seaborn para que os processos
+do pool subam rápido.
+"""
+from __future__ import annotations
+
+import gzip
+import io
+import multiprocessing
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Backend não-interativo
+import matplotlib.pyplot as plt
+import seaborn as sns
+from matplotlib.colors import LogNorm
+
+from src.settings import (
+    GRAPH_RENDER_MAX_TASKS_PER_CHILD,
+    GRAPH_RENDER_TIMEOUT,
+    GRAPH_RENDER_WORKERS,
+)
+from src.utils.logging_config import get_logger
+
+logger = get_logger("tools.chart_render")
+
+IMAGE_DPI = 100
+
+
+class ChartRenderTimeout(TimeoutError):
+    """Renderização excedeu o tempo limite."""
+
+
+def _apply_style() -> None:
+    sns.set_style("whitegrid")
+    plt.rcParams['figure.figsize'] = (10, 6)
+    plt.rcParams['figure.dpi'] = IMAGE_DPI
+
+
+_apply_style()
+
+
+def _figure_bytes(fig, p: Optional[Dict[str, Any]] = None) -> bytes:
+    """Codifica a figura no formato pedido no payload (``format``/``quality``).
+
+    - png: padrão;
+    - webp: com perdas, ``quality`` de 0 a 100;
+    - svg: texto como ``<text>`` (sem contornos das fontes), sem data e com
+      ids estáveis, comprimido com gzip (``.svgz``).
+    """
+    p = p or {}
+    image_format = p.get('format', 'png')
+    try:
+        buf = io.BytesIO()
+        if image_format == 'svg':
+            with plt.rc_context({'svg.fonttype': 'none', 'svg.hashsalt': 'agentnfe'}):
+                fig.savefig(buf, format='svg', bbox_inches='tight', metadata={'Date': None})
+            return gzip.compress(buf.getvalue(), mtime=0)
+        if image_format == 'webp':
+            fig.savefig(buf, format='webp', bbox_inches='tight', dpi=IMAGE_DPI,
+                        pil_kwargs={'quality': p.get('quality', 80)})
+        else:
+            fig.savefig(buf, format='png', bbox_inches='tight', dpi=IMAGE_DPI)
+        return buf.getvalue()
+    finally:
+        plt.close(fig)
+
+
+# ============================================================================
+# FUNÇÕES DE DESENHO (executadas no processo de renderização)
+# ============================================================================
+
+def draw_histogram(p: Dict[str, Any]) -> bytes:
+    fig, ax = plt.subplots(figsize=(10, 6))
+    edges = np.asarray(p['edges'])
+    ax.bar(edges[:-1], p['counts'], width=np.diff(edges), align='edge',
+           color=p['color'], edgecolor='black', alpha=0.7)
+    if p.get('kde') is not None:
+        kde_x, kde_y = p['kde']
+        ax.plot(kde_x, kde_y, color=p['color'], linewidth=2)
+    ax.set_title(p['title'], fontsize=14, fontweight='bold')
+    ax.set_xlabel(p['xlabel'], fontsize=12)
+    ax.set_ylabel(p['ylabel'], fontsize=12)
+    ax.axvline(p['mean'], color='red', linestyle='--', linewidth=2, label=f"Média: {p['mean']:.2f}")
+    ax.axvline(p['median'], color='green', linestyle='--', linewidth=2, label=f"Mediana: {p['median']:.2f}")
+    ax.legend()
+    plt.tight_layout()
+    return _figure_bytes(fig, p)
+
+
+def draw_scatter(p: Dict[str, Any]) -> bytes:
+    fig, ax = plt.subplots(figsize=(10, 6))
+    if p.get('density') is not None:
+        grid = p['density']
+        counts = np.ma.masked_equal(grid['counts'].T, 0)
+        mesh = ax.pcolormesh(grid['x_edges'], grid['y_edges'], counts, cmap='viridis',
+                             norm=LogNorm(vmin=1, vmax=max(float(counts.max()), 1.0)))
+        fig.colorbar(mesh, ax=ax, label='Pontos por célula')
+    elif p.get('hue') is not None:
+        sns.scatterplot(x=p['x'], y=p['y'], hue=p['hue'], s=p['size'], alpha=p['alpha'], ax=ax)
+    else:
+        ax.scatter(p['x'], p['y'], s=p['size'], alpha=p['alpha'], color='steelblue')
+    ax.set_title(p['title'], fontsize=14, fontweight='bold')
+    ax.set_xlabel(p['xlabel'], fontsize=12)
+    ax.set_ylabel(p['ylabel'], fontsize=12)
+    # Linha de tendência: dois pontos bastam para a reta
+    line_x = np.asarray(p['x_range'], dtype=float)
+    ax.plot(line_x, np.poly1d(p['trend'])(line_x), "r--", alpha=0.8,
+            label=f"Correlação: {p['correlation']:.3f}")
+    # loc='best' testaria cada célula da grade de densidade
+    ax.legend(loc='upper left' if p.get('density') is not None else 'best')
+    plt.tight_layout()
+    return _figure_bytes(fig, p)
+
+
+def draw_boxplot(p: Dict[str, Any]) -> bytes:
+    fig, ax = plt.subplots(figsize=(10, 6))
+    boxes = p['boxes']
+    colors = sns.color_palette(n_colors=len(boxes))
+    artists = ax.bxp(boxes, showfliers=True, patch_artist=True,
+                     flierprops={'marker': 'd', 'markersize': 4, 'alpha': 0.5})
+    for patch, color in zip(artists['boxes'], colors):
+        patch.set_facecolor(color)
+    if len(boxes) == 1 and boxes[0].get('label') is None:
+        ax.set_xticks([])
+    ax.set_title(p['title'], fontsize=14, fontweight='bold')
+    ax.set_xlabel(p['xlabel'], fontsize=12)
+    ax.set_ylabel(p['ylabel'], fontsize=12)
+    plt.tight_layout()
+    return _figure_bytes(fig, p)
+
+
+def draw_bar(p: Dict[str, Any]) -> bytes:
+    fig, ax = plt.subplots(figsize=(10, 6))
+    if p['horizontal']:
+        ax.barh(p['categories'], p['values'], color=p['color'], edgecolor='black', alpha=0.7)
+    else:
+        ax.bar(p['categories'], p['values'], color=p['color'], edgecolor='black', alpha=0.7)
+    ax.set_title(p['title'], fontsize=14, fontweight='bold')
+    ax.set_xlabel(p['xlabel'], fontsize=12)
+    ax.set_ylabel(p['ylabel'], fontsize=12)
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    return _figure_bytes(fig, p)
+
+
+def draw_heatmap(p: Dict[str, Any]) -> bytes:
+    import pandas as pd
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+    corr = pd.DataFrame(p['matrix'], index=p['labels'], columns=p['labels'])
+    sns.heatmap(corr, annot=p['annot'], cmap=p['cmap'], center=0,
+                square=True, linewidths=1, cbar_kws={"shrink": 0.8}, ax=ax)
+    ax.set_title(p['title'], fontsize=14, fontweight='bold')
+    plt.tight_layout()
+    return _figure_bytes(fig, p)
+
+
+DRAWERS: Dict[str, Callable[[Dict[str, Any]], bytes]] = {
+    'histogram': draw_histogram,
+    'scatter': draw_scatter,
+    'boxplot': draw_boxplot,
+    'bar': draw_bar,
+    'heatmap': draw_heatmap,
+}
+
+
+def draw(kind: str, payload: Dict[str, Any]) -> bytes:
+    """Desenha o gráfico ``kind`` no processo atual."""
+    return DRAWERS[kind](payload)
+
+
+# ============================================================================
+# POOL DE PROCESSOS
+# ============================================================================
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_pool_tasks = 0
+
+# max_tasks_per_child só existe a partir do Python 3.11; antes disso o pool
+# inteiro é trocado a cada GRAPH_RENDER_MAX_TASKS_PER_CHILD tarefas por processo
+_NATIVE_TASK_LIMIT = sys.version_info >= (3, 11)
+
+
+def _get_render_pool() -> Optional[ProcessPoolExecutor]:
+    """Pool ``spawn`` compartilhado (None quando GRAPH_RENDER_WORKERS <= 0)."""
+    global _pool
+    if GRAPH_RENDER_WORKERS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                kwargs: Dict[str, Any] = {}
+                if _NATIVE_TASK_LIMIT and GRAPH_RENDER_MAX_TASKS_PER_CHILD > 0:
+                    kwargs['max_tasks_per_child'] = GRAPH_RENDER_MAX_TASKS_PER_CHILD
+                # spawn: o processo da API tem threads; fork poderia herdar locks ocupados
+                _pool = ProcessPoolExecutor(
+                    max_workers=GRAPH_RENDER_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_apply_style,
+                    **kwargs,
+                )
+    return _pool
+
+
+def _count_render_task(pool: ProcessPoolExecutor) -> None:
+    """Sem ``max_tasks_per_child`` (Python 3.10), aposenta o pool após o limite de tarefas.
+
+    O pool aposentado termina as tarefas já enviadas e encerra seus processos;
+    a próxima renderização cria um pool novo.
+    """
+    global _pool, _pool_tasks
+    if _NATIVE_TASK_LIMIT or GRAPH_RENDER_MAX_TASKS_PER_CHILD <= 0:
+        return
+    with _pool_lock:
+        if _pool is not pool:
+            return
+        _pool_tasks += 1
+        if _pool_tasks < GRAPH_RENDER_MAX_TASKS_PER_CHILD * GRAPH_RENDER_WORKERS:
+            return
+        _pool, _pool_tasks = None, 0
+    pool.shutdown(wait=False)
+
+
+def _discard_render_pool(pool: Optional[ProcessPoolExecutor] = None) -> None:
+    """
+    Descarta o pool matando seus processos (ex.: renderização travada após timeout).
+
+    Args:
+        pool: Pool que falhou (padrão: o pool atual). Se já foi aposentado por
+            ``_count_render_task``, o pool novo em uso continua intacto.
+    """
+    global _pool, _pool_tasks
+    with _pool_lock:
+        if pool is None:
+            pool = _pool
+        if _pool is pool:
+            _pool, _pool_tasks = None, 0
+    if pool is None:
+        return
+    # O executor não cancela tarefas em execução; matar os processos é a única
+    # forma de liberar o worker travado
+    for process in list((pool._processes or {}).values()):
+        process.kill()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def render_chart(kind: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> bytes:
+    """
+    Renderiza um gráfico no pool de processos e devolve os bytes da imagem.
+
+    Args:
+        kind: Tipo do gráfico (chave de DRAWERS)
+        payload: Dados preparados para a função de desenho
+        timeout: Segundos de espera (padrão: GRAPH_RENDER_TIMEOUT)
+
+    Raises:
+        ChartRenderTimeout: Se a renderização exceder o tempo; o pool é
+            reiniciado para liberar o processo travado
+    """
+    timeout = GRAPH_RENDER_TIMEOUT if timeout is None else timeout
+    try:
+        pool = _get_render_pool()
+    except OSError as e:
+        logger.warning(f"Pool de renderização indisponível, renderizando na thread: {e}")
+        pool = None
+    if pool is None:
+        return draw(kind, payload)
+
+    try:
+        future = pool.submit(draw, kind, payload)
+    except RuntimeError:
+        # pool aposentado por outra thread entre a obtenção e o envio
+        pool = _get_render_pool()
+        future = pool.submit(draw, kind, payload)
+    _count_render_task(pool)
+    try:
+        return future.result(timeout)
+    except FutureTimeoutError:
+        logger.error(f"Renderização de '{kind}' excedeu {timeout:g}s; reiniciando pool")
+        _discard_render_pool(pool)
+        raise ChartRenderTimeout(f"Renderização de '{kind}' excedeu {timeout:g}s")
+    except BrokenProcessPool:
+        # processo de renderização morreu (ex.: falta de memória); o próximo gráfico recria o pool
+        _discard_render_pool(pool)
+        raise
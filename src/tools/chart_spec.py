@@ -0,0 +1,224 @@
+"""Especificações Vega-Lite dos gráficos do GraphGenerator (modo ``spec``).
+
+Em vez de uma imagem, o GraphGenerator devolve dados + codificação visual e o
+frontend desenha o gráfico (vega-embed). Cada ``spec_<tipo>(payload)`` recebe
+o mesmo payload de agregados das funções de desenho de
+``src.tools.chart_render``; por isso o JSON tem tamanho limitado
+independentemente do número de linhas. Como os pontos viajam como texto, a
+dispersão usa um orçamento menor (``SPEC_POINT_BUDGET``) e uma grade de
+densidade mais grossa (``SPEC_DENSITY_GRIDSIZE``) que a versão rasterizada,
+e cada caixa do boxplot leva no máximo ``SPEC_MAX_FLIERS`` outliers.
+"""
+from __future__ import annotations
+
+import json
+import math
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.tools.chart_data import sample_indices
+
+VEGA_LITE_SCHEMA = "https://vega.github.io/schema/vega-lite/v5.json"
+SPEC_POINT_BUDGET = 5000
+SPEC_DENSITY_GRIDSIZE = 40
+SPEC_MAX_FLIERS = 200
+SPEC_HEIGHT = 360
+
+# Colormaps do matplotlib usados pelo GraphGenerator → esquemas do Vega
+_SCHEMES = {
+    'coolwarm': {'scheme': 'redblue', 'reverse': True},
+    'RdBu': {'scheme': 'redblue'},
+    'RdBu_r': {'scheme': 'redblue', 'reverse': True},
+    'viridis': {'scheme': 'viridis'},
+}
+
+
+def _num(value: Any, digits: int = 6) -> Optional[float]:
+    """Número com ``digits`` algarismos significativos (NaN/inf → None)."""
+    value = float(value)
+    if not math.isfinite(value):
+        return None
+    return float(f"{value:.{digits}g}")
+
+
+def _base(p: Dict[str, Any], layers: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "$schema": VEGA_LITE_SCHEMA,
+        "title": p['title'],
+        "width": "container",
+        "height": SPEC_HEIGHT,
+        "layer": layers,
+    }
+
+
+def _mean_median_rules(p: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "data": {"values": [
+            {"label": f"Média: {p['mean']:.2f}", "value": _num(p['mean'])},
+            {"label": f"Mediana: {p['median']:.2f}", "value": _num(p['median'])},
+        ]},
+        "mark": {"type": "rule", "strokeDash": [6, 4], "strokeWidth": 2},
+        "encoding": {
+            "x": {"field": "value", "type": "quantitative"},
+            "color": {"field": "label", "type": "nominal", "title": None,
+                      "scale": {"range": ["red", "green"]}},
+        },
+    }
+
+
+def spec_histogram(p: Dict[str, Any]) -> Dict[str, Any]:
+    edges = np.asarray(p['edges'], dtype=float)
+    bins = [{"bin_start": _num(lo), "bin_end": _num(hi), "count": int(c)}
+            for lo, hi, c in zip(edges[:-1], edges[1:], p['counts'])]
+    layers = [{
+        "data": {"values": bins},
+        "mark": {"type": "bar", "color": p['color'], "stroke": "black", "opacity": 0.7},
+        "encoding": {
+            "x": {"field": "bin_start", "type": "quantitative", "bin": {"binned": True},
+                  "title": p['xlabel']},
+            "x2": {"field": "bin_end"},
+            "y": {"field": "count", "type": "quantitative", "title": p['ylabel']},
+        },
+    }]
+    if p.get('kde') is not None:
+        kde_x, kde_y = p['kde']
+        layers.append({
+            "data": {"values": [{"x": _num(x), "y": _num(y)} for x, y in zip(kde_x, kde_y)]},
+            "mark": {"type": "line", "color": p['color'], "strokeWidth": 2},
+            "encoding": {"x": {"field": "x", "type": "quantitative"},
+                         "y": {"field": "y", "type": "quantitative"}},
+        })
+    layers.append(_mean_median_rules(p))
+    return _base(p, layers)
+
+
+def spec_scatter(p: Dict[str, Any]) -> Dict[str, Any]:
+    x_axis = {"type": "quantitative", "title": p['xlabel'], "scale": {"zero": False}}
+    y_axis = {"type": "quantitative", "title": p['ylabel'], "scale": {"zero": False}}
+    if p.get('density') is not None:
+        grid = p['density']
+        counts = np.asarray(grid['counts'])
+        x_edges, y_edges = grid['x_edges'], grid['y_edges']
+        cells = [{"x": _num(x_edges[i]), "x2": _num(x_edges[i + 1]),
+                  "y": _num(y_edges[j]), "y2": _num(y_edges[j + 1]), "count": int(counts[i, j])}
+                 for i, j in zip(*np.nonzero(counts))]
+        layers = [{
+            "data": {"values": cells},
+            "mark": {"type": "rect"},
+            "encoding": {
+                "x": dict(x_axis, field="x"), "x2": {"field": "x2"},
+                "y": dict(y_axis, field="y"), "y2": {"field": "y2"},
+                "color": {"field": "count", "type": "quantitative", "title": "Pontos por célula",
+                          "scale": {"type": "log", "scheme": "viridis"}},
+            },
+        }]
+    else:
+        hue = p.get('hue')
+        points = [{"x": _num(x), "y": _num(y)} for x, y in zip(p['x'], p['y'])]
+        if hue is not None:
+            for point, h in zip(points, hue):
+                point["hue"] = str(h)
+        encoding = {"x": dict(x_axis, field="x"), "y": dict(y_axis, field="y")}
+        if hue is not None:
+            encoding["color"] = {"field": "hue", "type": "nominal", "title": None}
+        layers = [{
+            "data": {"values": points},
+            "mark": {"type": "circle", "size": p['size'], "opacity": p['alpha'],
+                     **({} if hue is not None else {"color": "steelblue"})},
+            "encoding": encoding,
+        }]
+    trend = np.poly1d(p['trend'])
+    layers.append({
+        "data": {"values": [{"x": _num(x), "y": _num(trend(x))} for x in p['x_range']]},
+        "mark": {"type": "line", "color": "red", "strokeDash": [6, 4]},
+        "encoding": {"x": {"field": "x", "type": "quantitative"},
+                     "y": {"field": "y", "type": "quantitative"}},
+        "description": f"Correlação: {p['correlation']:.3f}",
+    })
+    return _base(p, layers)
+
+
+def spec_boxplot(p: Dict[str, Any]) -> Dict[str, Any]:
+    boxes, fliers = [], []
+    for box in p['boxes']:
+        label = "" if box.get('label') is None else str(box['label'])
+        boxes.append({"label": label, "lower": _num(box['whislo']), "q1": _num(box['q1']),
+                      "median": _num(box['med']), "q3": _num(box['q3']), "upper": _num(box['whishi'])})
+        box_fliers = np.asarray(box['fliers'])
+        box_fliers = box_fliers[sample_indices(box_fliers.size, SPEC_MAX_FLIERS)]
+        fliers.extend({"label": label, "value": _num(v)} for v in box_fliers)
+    x = {"field": "label", "type": "nominal", "title": p['xlabel'] or None, "sort": None}
+    y_title = {"title": p['ylabel']}
+    layers = [
+        {"mark": {"type": "rule"},
+         "encoding": {"x": x, "y": dict(y_title, field="lower", type="quantitative",
+                                        scale={"zero": False}),
+                      "y2": {"field": "upper"}}},
+        {"mark": {"type": "bar", "size": 40},
+         "encoding": {"x": x, "y": {"field": "q1", "type": "quantitative"}, "y2": {"field": "q3"},
+                      "color": {"field": "label", "type": "nominal", "legend": None}}},
+        {"mark": {"type": "tick", "color": "black", "size": 40},
+         "encoding": {"x": x, "y": {"field": "median", "type": "quantitative"}}},
+    ]
+    spec = _base(p, [{"data": {"values": boxes}, "layer": layers}])
+    if fliers:
+        spec["layer"].append({
+            "data": {"values": fliers},
+            "mark": {"type": "point", "shape": "diamond", "size": 16, "opacity": 0.5},
+            "encoding": {"x": x, "y": {"field": "value", "type": "quantitative"}},
+        })
+    return spec
+
+
+def spec_bar(p: Dict[str, Any]) -> Dict[str, Any]:
+    values = [{"category": str(c), "value": _num(v)} for c, v in zip(p['categories'], p['values'])]
+    category = {"field": "category", "type": "nominal", "sort": None}
+    value = {"field": "value", "type": "quantitative"}
+    if p['horizontal']:
+        encoding = {"y": dict(category, title=p['ylabel']), "x": dict(value, title=p['xlabel'])}
+    else:
+        encoding = {"x": dict(category, title=p['xlabel']), "y": dict(value, title=p['ylabel'])}
+    return _base(p, [{
+        "data": {"values": values},
+        "mark": {"type": "bar", "color": p['color'], "stroke": "black", "opacity": 0.7},
+        "encoding": encoding,
+    }])
+
+
+def spec_heatmap(p: Dict[str, Any]) -> Dict[str, Any]:
+    labels = p['labels']
+    matrix = np.asarray(p['matrix'])
+    cells = [{"row": labels[i], "col": labels[j], "r": _num(matrix[i, j], 3)}
+             for i in range(len(labels)) for j in range(len(labels))]
+    axis = {"type": "nominal", "sort": labels, "title": None}
+    scale = dict(_SCHEMES.get(p['cmap'], {'scheme': p['cmap']}), domain=[-1, 1])
+    layers = [{
+        "mark": {"type": "rect", "stroke": "white", "strokeWidth": 1},
+        "encoding": {"x": dict(axis, field="col"), "y": dict(axis, field="row"),
+                     "color": {"field": "r", "type": "quantitative", "title": "r", "scale": scale}},
+    }]
+    if p['annot']:
+        layers.append({
+            "mark": {"type": "text", "fontSize": 10},
+            "encoding": {"x": dict(axis, field="col"), "y": dict(axis, field="row"),
+                         "text": {"field": "r", "type": "quantitative", "format": ".2f"}},
+        })
+    spec = _base(p, [{"data": {"values": cells}, "layer": layers}])
+    spec["width"] = spec["height"] = SPEC_HEIGHT
+    return spec
+
+
+SPEC_BUILDERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    'histogram': spec_histogram,
+    'scatter': spec_scatter,
+    'boxplot': spec_boxplot,
+    'bar': spec_bar,
+    'heatmap': spec_heatmap,
+}
+
+
+def chart_spec_bytes(kind: str, payload: Dict[str, Any]) -> bytes:
+    """Especificação Vega-Lite do gráfico ``kind`` serializada em JSON compacto."""
+    spec = SPEC_BUILDERS[kind](payload)
+    return json.dumps(spec, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
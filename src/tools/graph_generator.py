@@ -2,30 +2,71 @@
 
 Este módulo fornece ferramentas para criar gráficos e visualizações
 usando Matplotlib, Seaborn e Plotly para enriquecer respostas dos agentes.
+
+Os métodos preparam agregados e estatísticas no processo da API
+(``src.tools.chart_data``); o desenho roda no pool de
+``src.tools.chart_render`` e o resultado fica no cache em disco de
+``src.tools.chart_cache``.
+
+Formatos de saída (``GRAPH_OUTPUT_FORMAT``): PNG, WebP com qualidade
+configurável, SVG comprimido para barras/histogramas e ``spec`` (JSON
+Vega-Lite de ``src.tools.chart_spec``, desenhado pelo frontend). Arquivos
+gravados em disco recebem o hash do conteúdo no nome e são imutáveis.
 """
-import io
 import base64
-from typing import Any, Dict, List, Optional, Tuple, Union
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from pathlib import Path
 from datetime import datetime
 
 import pandas as pd
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')  # Backend não-interativo
-import matplotlib.pyplot as plt
-import seaborn as sns
 import plotly.graph_objects as go
 import plotly.express as px
 
+from src.settings import (
+    GRAPH_DENSITY_GRIDSIZE,
+    GRAPH_HEATMAP_ANNOT_MAX_COLUMNS,
+    GRAPH_HEATMAP_MAX_COLUMNS,
+    GRAPH_OUTPUT_FORMAT,
+    GRAPH_SCATTER_POINT_BUDGET,
+    GRAPH_WEBP_QUALITY,
+)
+from src.tools.chart_cache import ChartCache, chart_cache_key, columns_fingerprint, get_chart_cache
+from src.tools.chart_data import (
+    box_stats,
+    correlation_cache,
+    density_grid,
+    histogram_bins,
+    kde_curve,
+    sample_indices,
+    select_heatmap_columns,
+)
+from src.tools.chart_render import render_chart
+from src.tools.chart_spec import SPEC_DENSITY_GRIDSIZE, SPEC_POINT_BUDGET, chart_spec_bytes
 from src.utils.logging_config import get_logger
 
 logger = get_logger("tools.graph_generator")
 
-# Configuração de estilo padrão
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (10, 6)
-plt.rcParams['figure.dpi'] = 100
+_DEFAULT_CACHE = object()
+
+# formato → (tipo MIME, extensão do arquivo)
+OUTPUT_FORMATS: Dict[str, Tuple[str, str]] = {
+    'png': ('image/png', '.png'),
+    'webp': ('image/webp', '.webp'),
+    'svg': ('image/svg+xml', '.svgz'),
+    'spec': ('application/vnd.vegalite+json', '.vl.json'),
+}
+# SVG só compensa com poucos elementos; os demais gráficos saem em PNG
+VECTOR_KINDS = frozenset({'bar', 'histogram'})
+CONTENT_HASH_LENGTH = 16
+
+# Imagem (data URI ou caminho) ou especificação Vega-Lite
+ChartOutput = Union[str, Dict[str, Any]]
 
 
 class GraphGeneratorError(Exception):
@@ -47,12 +88,25 @@ class GraphGenerator:
     - E mais...
     """
     
-    def __init__(self, output_dir: Optional[Path] = None):
+    def __init__(self, output_dir: Optional[Path] = None,
+                 cache: Optional[ChartCache] = _DEFAULT_CACHE,
+                 render_timeout: Optional[float] = None,
+                 output_format: Optional[str] = None,
+                 webp_quality: int = GRAPH_WEBP_QUALITY):
         """
         Inicializa o gerador de gráficos.
         Args:
             output_dir: Diretório para salvar gráficos (None = usa settings.HISTOGRAMS_DIR)
+            cache: Cache de gráficos (padrão: cache compartilhado; None desativa)
+            render_timeout: Tempo máximo por renderização (None = GRAPH_RENDER_TIMEOUT)
+            output_format: png, webp, svg ou spec (None = GRAPH_OUTPUT_FORMAT)
+            webp_quality: Qualidade do WebP (0-100)
         """
+        output_format = (output_format or GRAPH_OUTPUT_FORMAT).lower()
+        if output_format not in OUTPUT_FORMATS:
+            raise GraphGeneratorError(
+                f"Formato de saída inválido: {output_format} (use {', '.join(OUTPUT_FORMATS)})"
+            )
         if output_dir is None:
             try:
                 from src.settings import HISTOGRAMS_DIR
@@ -67,51 +121,108 @@ class GraphGenerator:
             output_dir.mkdir(parents=True, exist_ok=True)
         
         self.logger = get_logger("graph_generator")
+        self.cache = get_chart_cache() if cache is _DEFAULT_CACHE else cache
+        self.render_timeout = render_timeout
+        self.output_format = output_format
+        self.webp_quality = webp_quality
     
     # ========================================================================
     # MÉTODOS AUXILIARES
     # ========================================================================
     
-    def _save_or_encode(self, fig, filename: Optional[str] = None,
-                       return_base64: bool = True) -> Optional[str]:
+    def _format_for(self, kind: Optional[str]) -> str:
+        """Formato efetivo do gráfico ``kind`` (SVG só para tipos vetoriais simples)."""
+        if self.output_format == 'svg' and kind not in VECTOR_KINDS:
+            return 'png'
+        return self.output_format
+    
+    def _save_or_encode(self, image: bytes, filename: Optional[str] = None,
+                       return_base64: bool = True,
+                       kind: Optional[str] = None) -> Optional[ChartOutput]:
         """
         Salva gráfico em arquivo ou retorna como base64.
         
         Args:
-            fig: Figura do matplotlib
-            filename: Nome do arquivo (se None, gera timestamp)
-            return_base64: Se True, retorna string base64
+            image: Bytes do gráfico no formato de ``kind`` (ver _format_for)
+            filename: Nome do arquivo (se None, usa o hash do conteúdo)
+            return_base64: Se True, retorna data URI (ou a spec, no modo spec)
+            kind: Tipo do gráfico
             
         Returns:
-            String base64 da imagem ou caminho do arquivo
+            Data URI, especificação Vega-Lite ou caminho do arquivo
         """
         try:
+            image_format = self._format_for(kind) if kind else 'png'
+            mime_type, suffix = OUTPUT_FORMATS[image_format]
             if return_base64:
-                # Converte para base64
-                buf = io.BytesIO()
-                fig.savefig(buf, format='png', bbox_inches='tight', dpi=100)
-                buf.seek(0)
-                img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-                buf.close()
-                plt.close(fig)
-                return f"data:image/png;base64,{img_base64}"
-            
-            # Salva em arquivo
-            if not filename:
-                filename = f"graph_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+                if image_format == 'spec':
+                    return json.loads(image)
+                # data URI não admite Content-Encoding: o SVG vai descomprimido
+                raw = gzip.decompress(image) if image_format == 'svg' else image
+                img_base64 = base64.b64encode(raw).decode('utf-8')
+                return f"data:{mime_type};base64,{img_base64}"
+            
+            # Salva em arquivo; nome pelo conteúdo torna o arquivo imutável
+            content_named = not filename
+            if content_named:
+                digest = hashlib.sha256(image).hexdigest()[:CONTENT_HASH_LENGTH]
+                filename = f"{kind or 'graph'}_{digest}{suffix}"
             
             filepath = self.output_dir / filename if self.output_dir else Path(filename)
-            fig.savefig(filepath, bbox_inches='tight', dpi=100)
-            plt.close(fig)
+            if not (content_named and filepath.exists()):
+                tmp_path = filepath.with_name(f".{filepath.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp_path.write_bytes(image)
+                os.replace(tmp_path, filepath)
             
             self.logger.info(f"Gráfico salvo: {filepath}")
             return str(filepath)
             
         except Exception as e:
             self.logger.error(f"Erro ao salvar gráfico: {e}")
-            plt.close(fig)
             raise GraphGeneratorError(f"Falha ao salvar gráfico: {e}")
     
+    def _render_cached(self, kind: str, df: Optional[pd.DataFrame], columns: List[Any],
+                       params: Dict[str, Any],
+                       prepare: Callable[[], Tuple[Dict[str, Any], Dict[str, Any]]],
+                       fingerprint: Optional[str] = None
+                       ) -> Tuple[bytes, Dict[str, Any]]:
+        """
+        Renderiza um gráfico ou o recupera do cache.
+        
+        Args:
+            kind: Tipo do gráfico (ver chart_render.DRAWERS)
+            df: Dados de origem (só ``columns`` entram na impressão digital)
+            columns: Colunas usadas no gráfico
+            params: Parâmetros que alteram o desenho
+            prepare: Retorna (payload de desenho, estatísticas); só é chamado sem cache
+            fingerprint: Impressão digital já calculada (dispensa ``df``)
+            
+        Returns:
+            Tuple (bytes no formato de saída, estatísticas)
+        """
+        image_format = self._format_for(kind)
+        output = {'format': image_format}
+        if image_format == 'webp':
+            output['quality'] = self.webp_quality
+        
+        key = None
+        if self.cache is not None:
+            fingerprint = fingerprint or columns_fingerprint(df, columns)
+            key = chart_cache_key(kind, fingerprint, columns, dict(params, **output))
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.logger.debug(f"Gráfico '{kind}' servido do cache")
+                return cached[0], cached[1]['stats']
+        
+        payload, stats = prepare()
+        if image_format == 'spec':
+            image = chart_spec_bytes(kind, payload)
+        else:
+            image = render_chart(kind, dict(payload, **output), timeout=self.render_timeout)
+        if key is not None:
+            self.cache.put(key, image, {'stats': stats})
+        return image, stats
+    
     def _validate_data(self, data: Union[pd.DataFrame, pd.Series, np.ndarray],
                       columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
@@ -152,7 +263,7 @@ class GraphGenerator:
                  ylabel: str = "Frequência",
                  color: str = "skyblue",
                  kde: bool = True,
-                 return_base64: bool = True) -> Tuple[Optional[str], Dict[str, Any]]:
+                 return_base64: bool = True) -> Tuple[Optional[ChartOutput], Dict[str, Any]]:
         """
         Cria um histograma da distribuição de dados.
         
@@ -172,51 +283,109 @@ class GraphGenerator:
         """
         try:
             df = self._validate_data(data, [column] if column else None)
-            
-            if column:
-                values = df[column].dropna()
-            else:
-                values = df.iloc[:, 0].dropna()
-            
-            # Calcula estatísticas
-            stats = {
-                "count": len(values),
-                "mean": float(values.mean()),
-                "median": float(values.median()),
-                "std": float(values.std()),
-                "min": float(values.min()),
-                "max": float(values.max()),
-                "q25": float(values.quantile(0.25)),
-                "q75": float(values.quantile(0.75))
+            source_column = column if column else df.columns[0]
+            params = {
+                "bins": bins,
+                "title": title or f"Distribuição de {column or 'Dados'}",
+                "xlabel": xlabel or (column if column else "Valor"),
+                "ylabel": ylabel,
+                "color": color,
+                "kde": kde,
             }
             
-            # Cria gráfico
-            fig, ax = plt.subplots(figsize=(10, 6))
+            def prepare():
+                values = df[source_column].dropna()
+                array = values.to_numpy(dtype=float)
+                q25, median, q75 = np.quantile(array, [0.25, 0.5, 0.75])
+                
+                # Calcula estatísticas
+                stats = {
+                    "count": len(values),
+                    "mean": float(array.mean()),
+                    "median": float(median),
+                    "std": float(values.std()),
+                    "min": float(array.min()),
+                    "max": float(array.max()),
+                    "q25": float(q25),
+                    "q75": float(q75)
+                }
+                counts, edges = histogram_bins(array, bins)
+                payload = dict(params, counts=counts, edges=edges, mean=stats['mean'], median=stats['median'],
+                               kde=kde_curve(array, edges) if kde else None)
+                return payload, stats
+            
+            image, stats = self._render_cached('histogram', df, [source_column], params, prepare)
+            img = self._save_or_encode(image, return_base64=return_base64, kind='histogram')
             
-            if kde:
-                sns.histplot(values, bins=bins, kde=True, color=color, ax=ax)
-            else:
-                ax.hist(values, bins=bins, color=color, edgecolor='black', alpha=0.7)
+            self.logger.info(f"Histograma criado: {column or 'dados'}")
+            return img, stats
+            
+        except Exception as e:
+            self.logger.error(f"Erro ao criar histograma: {e}")
+            raise GraphGeneratorError(f"Falha ao criar histograma: {e}")
+    
+    def histogram_from_profile(self, profile: Any, column: str,
+                               title: Optional[str] = None,
+                               xlabel: Optional[str] = None,
+                               ylabel: str = "Frequência",
+                               color: str = "skyblue",
+                               return_base64: bool = True) -> Tuple[Optional[ChartOutput], Dict[str, Any]]:
+        """
+        Cria o histograma a partir do perfil do dataset, sem ler os dados.
+        
+        Args:
+            profile: DatasetProfile (src/data/dataset_profile.py) da ingestão
+            column: Coluna numérica do perfil
+            title: Título do gráfico
+            xlabel: Rótulo do eixo X
+            ylabel: Rótulo do eixo Y
+            color: Cor das barras
+            return_base64: Se True, retorna base64
             
-            ax.set_title(title or f"Distribuição de {column or 'Dados'}", fontsize=14, fontweight='bold')
-            ax.set_xlabel(xlabel or (column if column else "Valor"), fontsize=12)
-            ax.set_ylabel(ylabel, fontsize=12)
+        Returns:
+            Tuple (imagem/caminho, estatísticas)
+        """
+        try:
+            col = profile.columns.get(column) or {}
+            histogram = col.get('histogram') or {}
+            if not histogram.get('counts'):
+                raise GraphGeneratorError(f"Perfil sem histograma para a coluna '{column}'")
             
-            # Adiciona linha de média
-            ax.axvline(stats['mean'], color='red', linestyle='--', linewidth=2, label=f"Média: {stats['mean']:.2f}")
-            ax.axvline(stats['median'], color='green', linestyle='--', linewidth=2, label=f"Mediana: {stats['median']:.2f}")
-            ax.legend()
+            quantiles = col.get('quantiles') or {}
+            stats = {
+                "count": col.get('count'),
+                "mean": col.get('mean'),
+                "median": quantiles.get('0.5'),
+                "std": col.get('std'),
+                "min": col.get('min'),
+                "max": col.get('max'),
+                "q25": quantiles.get('0.25'),
+                "q75": quantiles.get('0.75')
+            }
+            params = {
+                "title": title or f"Distribuição de {column}",
+                "xlabel": xlabel or column,
+                "ylabel": ylabel,
+                "color": color,
+            }
             
-            plt.tight_layout()
+            def prepare():
+                payload = dict(params, counts=np.asarray(histogram['counts']),
+                               edges=np.asarray(histogram['edges'], dtype=float),
+                               mean=stats['mean'], median=stats['median'], kde=None)
+                return payload, stats
             
-            img = self._save_or_encode(fig, return_base64=return_base64)
+            fingerprint = f"profile:{profile.ingestion_id}:{profile.created_at}"
+            image, stats = self._render_cached('histogram', None, [column], params, prepare,
+                                               fingerprint=fingerprint)
+            img = self._save_or_encode(image, return_base64=return_base64, kind='histogram')
             
-            self.logger.info(f"Histograma criado: {column or 'dados'}")
+            self.logger.info(f"Histograma criado a partir do perfil: {column}")
             return img, stats
             
         except Exception as e:
-            self.logger.error(f"Erro ao criar histograma: {e}")
-            raise GraphGeneratorError(f"Falha ao criar histograma: {e}")
+            self.logger.error(f"Erro ao criar histograma do perfil: {e}")
+            raise GraphGeneratorError(f"Falha ao criar histograma do perfil: {e}")
     
     # ========================================================================
     # SCATTER PLOTS
@@ -231,10 +400,15 @@ class GraphGenerator:
                     ylabel: Optional[str] = None,
                     size: int = 50,
                     alpha: float = 0.6,
-                    return_base64: bool = True) -> Tuple[Optional[str], Dict[str, Any]]:
+                    return_base64: bool = True,
+                    max_points: int = GRAPH_SCATTER_POINT_BUDGET) -> Tuple[Optional[ChartOutput], Dict[str, Any]]:
         """
         Cria gráfico de dispersão (scatter plot).
         
+        Acima de ``max_points`` pontos o gráfico vira uma grade de densidade
+        2D; com ``hue_column`` desenha uma amostra uniforme de ``max_points``.
+        Correlação e tendência usam sempre todos os pontos.
+        
         Args:
             data: DataFrame com os dados
             x_column: Coluna para eixo X
@@ -246,50 +420,63 @@ class GraphGenerator:
             size: Tamanho dos pontos
             alpha: Transparência
             return_base64: Se True, retorna base64
+            max_points: Orçamento de pontos desenhados
             
         Returns:
             Tuple (imagem/caminho, estatísticas)
         """
         try:
             df = self._validate_data(data, [x_column, y_column])
-            
-            # Remove NaN
-            plot_data = df[[x_column, y_column]].dropna()
-            
-            # Calcula correlação
-            correlation = plot_data[x_column].corr(plot_data[y_column])
-            
-            stats = {
-                "correlation": float(correlation),
-                "n_points": len(plot_data),
-                "x_mean": float(plot_data[x_column].mean()),
-                "y_mean": float(plot_data[y_column].mean())
+            hue = hue_column if hue_column and hue_column in df.columns else None
+            columns = [x_column, y_column] + ([hue] if hue else [])
+            params = {
+                "title": title or f"{y_column} vs {x_column}",
+                "xlabel": xlabel or x_column,
+                "ylabel": ylabel or y_column,
+                "size": size,
+                "alpha": alpha,
+                "max_points": max_points,
             }
             
-            # Cria gráfico
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            if hue_column and hue_column in df.columns:
-                sns.scatterplot(data=df, x=x_column, y=y_column, hue=hue_column,
-                              s=size, alpha=alpha, ax=ax)
-            else:
-                ax.scatter(plot_data[x_column], plot_data[y_column],
-                          s=size, alpha=alpha, color='steelblue')
-            
-            ax.set_title(title or f"{y_column} vs {x_column}", fontsize=14, fontweight='bold')
-            ax.set_xlabel(xlabel or x_column, fontsize=12)
-            ax.set_ylabel(ylabel or y_column, fontsize=12)
-            
-            # Adiciona linha de tendência
-            z = np.polyfit(plot_data[x_column], plot_data[y_column], 1)
-            p = np.poly1d(z)
-            ax.plot(plot_data[x_column], p(plot_data[x_column]), "r--", alpha=0.8,
-                   label=f"Correlação: {correlation:.3f}")
-            ax.legend()
-            
-            plt.tight_layout()
-            
-            img = self._save_or_encode(fig, return_base64=return_base64)
+            # Na spec os pontos viajam como JSON: orçamento e grade menores
+            spec = self._format_for('scatter') == 'spec'
+            budget = min(max_points, SPEC_POINT_BUDGET) if spec else max_points
+            gridsize = SPEC_DENSITY_GRIDSIZE if spec else GRAPH_DENSITY_GRIDSIZE
+            
+            def prepare():
+                # Remove NaN
+                plot_data = df[columns].dropna(subset=[x_column, y_column])
+                x = plot_data[x_column].to_numpy(dtype=float)
+                y = plot_data[y_column].to_numpy(dtype=float)
+                
+                # Calcula correlação
+                correlation = plot_data[x_column].corr(plot_data[y_column])
+                
+                stats = {
+                    "correlation": float(correlation),
+                    "n_points": len(plot_data),
+                    "x_mean": float(x.mean()),
+                    "y_mean": float(y.mean())
+                }
+                payload = dict(
+                    params,
+                    correlation=stats['correlation'],
+                    trend=np.polyfit(x, y, 1),  # linha de tendência
+                    x_range=(float(x.min()), float(x.max())),
+                )
+                if len(x) <= budget:
+                    payload.update(x=x, y=y, hue=plot_data[hue].to_numpy() if hue else None)
+                elif hue:
+                    idx = sample_indices(len(x), budget)
+                    payload.update(x=x[idx], y=y[idx], hue=plot_data[hue].to_numpy()[idx])
+                    stats["sampled_points"] = len(idx)
+                else:
+                    payload['density'] = density_grid(x, y, gridsize)
+                    stats["rendering"] = "density"
+                return payload, stats
+            
+            image, stats = self._render_cached('scatter', df, columns, params, prepare)
+            img = self._save_or_encode(image, return_base64=return_base64, kind='scatter')
             
             self.logger.info(f"Scatter plot criado: {y_column} vs {x_column}")
             return img, stats
@@ -308,7 +495,7 @@ class GraphGenerator:
                title: Optional[str] = None,
                xlabel: Optional[str] = None,
                ylabel: Optional[str] = None,
-               return_base64: bool = True) -> Tuple[Optional[str], Dict[str, Any]]:
+               return_base64: bool = True) -> Tuple[Optional[ChartOutput], Dict[str, Any]]:
         """
         Cria boxplot para visualizar distribuição e outliers.
         
@@ -326,38 +513,40 @@ class GraphGenerator:
         """
         try:
             df = self._validate_data(data, [column, group_by] if column and group_by else [column] if column else None)
-            
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            if group_by and group_by in df.columns:
-                sns.boxplot(data=df, x=group_by, y=column, ax=ax)
-            else:
-                col_data = df[column] if column else df.iloc[:, 0]
-                sns.boxplot(y=col_data, ax=ax)
-            
-            ax.set_title(title or f"Boxplot de {column or 'Dados'}", fontsize=14, fontweight='bold')
-            ax.set_xlabel(xlabel or (group_by if group_by else ""), fontsize=12)
-            ax.set_ylabel(ylabel or (column if column else "Valor"), fontsize=12)
-            
-            plt.tight_layout()
-            
-            # Calcula estatísticas
-            col_data = df[column] if column else df.iloc[:, 0]
-            q1 = col_data.quantile(0.25)
-            q3 = col_data.quantile(0.75)
-            iqr = q3 - q1
-            outliers = col_data[(col_data < q1 - 1.5 * iqr) | (col_data > q3 + 1.5 * iqr)]
-            
-            stats = {
-                "q1": float(q1),
-                "median": float(col_data.median()),
-                "q3": float(q3),
-                "iqr": float(iqr),
-                "outliers_count": len(outliers),
-                "outliers_percentage": float(len(outliers) / len(col_data) * 100)
+            source_column = column if column else df.columns[0]
+            group = group_by if group_by and group_by in df.columns else None
+            columns = [source_column] + ([group] if group else [])
+            params = {
+                "title": title or f"Boxplot de {column or 'Dados'}",
+                "xlabel": xlabel or (group_by if group_by else ""),
+                "ylabel": ylabel or (column if column else "Valor"),
             }
             
-            img = self._save_or_encode(fig, return_base64=return_base64)
+            def prepare():
+                # Calcula estatísticas
+                col_data = df[source_column]
+                values = col_data.to_numpy(dtype=float)
+                q1, median, q3 = np.nanquantile(values, [0.25, 0.5, 0.75])
+                iqr = q3 - q1
+                n_outliers = int(((values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)).sum())
+                
+                stats = {
+                    "q1": float(q1),
+                    "median": float(median),
+                    "q3": float(q3),
+                    "iqr": float(iqr),
+                    "outliers_count": n_outliers,
+                    "outliers_percentage": float(n_outliers / len(col_data) * 100)
+                }
+                if group:
+                    groups = pd.Series(values, index=df.index).groupby(df[group], sort=True, observed=True)
+                    boxes = [box_stats(g.to_numpy(), label=name) for name, g in groups]
+                else:
+                    boxes = [box_stats(values)]
+                return dict(params, boxes=boxes), stats
+            
+            image, stats = self._render_cached('boxplot', df, columns, params, prepare)
+            img = self._save_or_encode(image, return_base64=return_base64, kind='boxplot')
             
             self.logger.info(f"Boxplot criado: {column or 'dados'}")
             return img, stats
@@ -378,7 +567,7 @@ class GraphGenerator:
                  ylabel: Optional[str] = None,
                  color: str = "steelblue",
                  horizontal: bool = False,
-                 return_base64: bool = True) -> Tuple[Optional[str], Dict[str, Any]]:
+                 return_base64: bool = True) -> Tuple[Optional[ChartOutput], Dict[str, Any]]:
         """
         Cria gráfico de barras.
         
@@ -404,28 +593,26 @@ class GraphGenerator:
             else:
                 df = self._validate_data(data, [x_column, y_column] if x_column and y_column else None)
             
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            if horizontal:
-                ax.barh(df[x_column], df[y_column], color=color, edgecolor='black', alpha=0.7)
-            else:
-                ax.bar(df[x_column], df[y_column], color=color, edgecolor='black', alpha=0.7)
-            
-            ax.set_title(title or f"{y_column} por {x_column}", fontsize=14, fontweight='bold')
-            ax.set_xlabel(xlabel or (y_column if horizontal else x_column), fontsize=12)
-            ax.set_ylabel(ylabel or (x_column if horizontal else y_column), fontsize=12)
-            
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            
-            stats = {
-                "total": float(df[y_column].sum()),
-                "mean": float(df[y_column].mean()),
-                "max": float(df[y_column].max()),
-                "max_category": str(df.loc[df[y_column].idxmax(), x_column])
+            params = {
+                "title": title or f"{y_column} por {x_column}",
+                "xlabel": xlabel or (y_column if horizontal else x_column),
+                "ylabel": ylabel or (x_column if horizontal else y_column),
+                "color": color,
+                "horizontal": horizontal,
             }
             
-            img = self._save_or_encode(fig, return_base64=return_base64)
+            def prepare():
+                stats = {
+                    "total": float(df[y_column].sum()),
+                    "mean": float(df[y_column].mean()),
+                    "max": float(df[y_column].max()),
+                    "max_category": str(df.loc[df[y_column].idxmax(), x_column])
+                }
+                payload = dict(params, categories=df[x_column].to_numpy(), values=df[y_column].to_numpy())
+                return payload, stats
+            
+            image, stats = self._render_cached('bar', df, [x_column, y_column], params, prepare)
+            img = self._save_or_encode(image, return_base64=return_base64, kind='bar')
             
             self.logger.info(f"Gráfico de barras criado")
             return img, stats
@@ -443,7 +630,7 @@ class GraphGenerator:
                           title: Optional[str] = None,
                           annot: bool = True,
                           cmap: str = "coolwarm",
-                          return_base64: bool = True) -> Tuple[Optional[str], Dict[str, Any]]:
+                          return_base64: bool = True) -> Tuple[Optional[ChartOutput], Dict[str, Any]]:
         """
         Cria heatmap de correlação entre variáveis.
         
@@ -470,38 +657,48 @@ class GraphGenerator:
             if numeric_df.empty:
                 raise GraphGeneratorError("Nenhuma coluna numérica encontrada")
             
-            # Calcula correlação
-            corr_matrix = numeric_df.corr()
-            
-            fig, ax = plt.subplots(figsize=(12, 8))
-            
-            sns.heatmap(corr_matrix, annot=annot, cmap=cmap, center=0,
-                       square=True, linewidths=1, cbar_kws={"shrink": 0.8}, ax=ax)
-            
-            ax.set_title(title or "Matriz de Correlação", fontsize=14, fontweight='bold')
-            
-            plt.tight_layout()
-            
-            # Encontra correlações mais fortes
-            corr_pairs = []
-            for i in range(len(corr_matrix.columns)):
-                for j in range(i+1, len(corr_matrix.columns)):
-                    corr_pairs.append({
-                        'var1': corr_matrix.columns[i],
-                        'var2': corr_matrix.columns[j],
-                        'correlation': float(corr_matrix.iloc[i, j])
-                    })
-            
-            corr_pairs.sort(key=lambda x: abs(x['correlation']), reverse=True)
-            
-            stats = {
-                "n_variables": len(corr_matrix),
-                "strongest_positive": corr_pairs[0] if corr_pairs else None,
-                "strongest_negative": min(corr_pairs, key=lambda x: x['correlation']) if corr_pairs else None,
-                "mean_correlation": float(corr_matrix.values[np.triu_indices_from(corr_matrix.values, k=1)].mean())
+            params = {
+                "title": title or "Matriz de Correlação",
+                "annot": annot,
+                "cmap": cmap,
             }
-            
-            img = self._save_or_encode(fig, return_base64=return_base64)
+            fingerprint = columns_fingerprint(numeric_df)
+            
+            def prepare():
+                # Correlação em float32, calculada uma vez por conteúdo das colunas
+                corr_matrix = correlation_cache.get_or_compute(fingerprint, numeric_df)
+                
+                # Encontra correlações mais fortes
+                corr_pairs = []
+                for i in range(len(corr_matrix.columns)):
+                    for j in range(i+1, len(corr_matrix.columns)):
+                        corr_pairs.append({
+                            'var1': corr_matrix.columns[i],
+                            'var2': corr_matrix.columns[j],
+                            'correlation': float(corr_matrix.iloc[i, j])
+                        })
+                
+                corr_pairs.sort(key=lambda x: abs(x['correlation']), reverse=True)
+                
+                stats = {
+                    "n_variables": len(corr_matrix),
+                    "strongest_positive": corr_pairs[0] if corr_pairs else None,
+                    "strongest_negative": min(corr_pairs, key=lambda x: x['correlation']) if corr_pairs else None,
+                    "mean_correlation": float(corr_matrix.values[np.triu_indices_from(corr_matrix.values, k=1)].mean())
+                }
+                
+                # Muitas colunas: desenha só as mais correlacionadas, sem anotar células
+                shown = select_heatmap_columns(corr_matrix, GRAPH_HEATMAP_MAX_COLUMNS)
+                if len(shown) < len(corr_matrix.columns):
+                    stats["columns_shown"] = [str(c) for c in shown]
+                shown_matrix = corr_matrix.loc[shown, shown]
+                payload = dict(params, matrix=shown_matrix.to_numpy(), labels=[str(c) for c in shown],
+                               annot=annot and len(shown) <= GRAPH_HEATMAP_ANNOT_MAX_COLUMNS)
+                return payload, stats
+            
+            image, stats = self._render_cached('heatmap', numeric_df, list(numeric_df.columns), params, prepare,
+                                               fingerprint=fingerprint)
+            img = self._save_or_encode(image, return_base64=return_base64, kind='heatmap')
             
             self.logger.info(f"Heatmap de correlação criado")
             return img, stats
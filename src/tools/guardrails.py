@@ -11,8 +11,9 @@ from pathlib import Path
 root_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(root_dir))
 
-from typing import Any, Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from collections import Counter
+from dataclasses import dataclass, field
 import re
 import math
 
@@ -26,6 +27,196 @@ class ValidationResult:
     issues: List[str]
     corrected_values: Optional[Dict[str, Any]] = None
 
+
+# ============================================================================
+# EXTRAÇÃO DE AFIRMAÇÕES NUMÉRICAS (uma passada sobre a resposta)
+# ============================================================================
+
+# Número (com unidade ou % colada), palavra ou fim de frase. Cada unidade tem
+# seu grupo, e ``match.lastgroup`` diz o tipo do token; "colunas numéricas" é
+# contagem de numéricas, não de colunas.
+_CLAIM_TOKEN_RE = re.compile(r"""
+    (?P<num>-?\d+(?:[.,]\d+)*)
+    (?:\s*(?P<percentage>%)
+      |\s+(?:(?P<numeric>(?:colunas?\s+)?num[ée]ric[oa]s?)
+            |(?P<columns>colunas?|columns|vari[áa]veis)
+            |(?P<records>registros|records|transa[çc][õo]es|linhas|rows))\b)?
+    |(?P<word>[^\W\d]\w*)
+    |(?P<stop>[;!?\n]|\.(?!\d))
+""", re.IGNORECASE | re.VERBOSE)
+
+_WORD_RE = re.compile(r'[^\W\d]\w*')
+_V_FEATURE_RE = re.compile(r'v\d+')
+
+# Palavra-chave → tipo de afirmação do próximo número sem unidade
+_CLAIM_KEYWORDS = {
+    'média': 'mean', 'media': 'mean', 'médias': 'mean', 'mean': 'mean', 'average': 'mean',
+    'desvio': 'std', 'std': 'std',
+    'mínimo': 'min', 'minimo': 'min', 'mínima': 'min', 'min': 'min',
+    'máximo': 'max', 'maximo': 'max', 'máxima': 'max', 'max': 'max',
+    'mediana': 'median', 'median': 'median',
+    'registros': 'records', 'records': 'records', 'transações': 'records',
+    'transacoes': 'records', 'linhas': 'records', 'rows': 'records',
+    'colunas': 'columns', 'columns': 'columns', 'variáveis': 'columns', 'variaveis': 'columns',
+    'numéricas': 'numeric', 'numéricos': 'numeric', 'numericas': 'numeric', 'numericos': 'numeric',
+}
+STAT_KINDS = ('mean', 'std', 'min', 'max', 'median')
+_STAT_LABELS = {
+    'mean': ('Média', 'incorreta'),
+    'std': ('Desvio padrão', 'incorreto'),
+    'min': ('Mínimo', 'incorreto'),
+    'max': ('Máximo', 'incorreto'),
+    'median': ('Mediana', 'incorreta'),
+}
+STAT_TOLERANCE = 0.01  # 1% do valor real
+ROUNDING_TOLERANCE = 0.005  # valores próximos de zero arredondados para 2 casas
+
+_CATEGORICAL_MENTIONS = ('categóric', 'categoric', 'texto', 'string', 'object')
+
+# Colunas e classes conhecidas do dataset creditcard
+_CREDITCARD_COLUMNS = ('Time', 'Amount', 'Class')
+_CREDITCARD_CLASSES = {'Class': {'0': '0', 'normal': '0', '1': '1', 'fraude': '1', 'fraudes': '1'}}
+
+
+def parse_claim_number(raw: str, count: bool = False) -> Optional[float]:
+    """Converte número em formato brasileiro ou americano.
+
+    Com os dois separadores, o último é o decimal (``1.234,56`` e
+    ``1,234.56``). Com um só, grupos de 3 dígitos repetidos são milhares;
+    um único grupo de 3 dígitos só é milhar quando ``count`` (contagens de
+    registros/colunas não têm casas decimais).
+    """
+    try:
+        if ',' in raw and '.' in raw:
+            decimal = ',' if raw.rfind(',') > raw.rfind('.') else '.'
+            thousands = '.' if decimal == ',' else ','
+            return float(raw.replace(thousands, '').replace(decimal, '.'))
+        separator = ',' if ',' in raw else '.' if '.' in raw else None
+        if separator is None:
+            return float(raw)
+        groups = raw.split(separator)
+        if len(groups) > 2 or (count and len(groups[1]) == 3):
+            return float(raw.replace(separator, ''))
+        return float(raw.replace(separator, '.'))
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class Claim:
+    """Afirmação numérica encontrada na resposta do LLM."""
+    kind: str  # records, columns, numeric, mean, std, min, max, median, percentage, number
+    value: float
+    raw: str
+    column: Optional[str] = None
+    category: Optional[str] = None
+
+
+@dataclass
+class ClaimSet:
+    """Afirmações da resposta agrupadas por tipo, mais a contagem de palavras."""
+    by_kind: Dict[str, List[Claim]] = field(default_factory=dict)
+    words: Counter = field(default_factory=Counter)
+
+    def of(self, kind: str) -> List[Claim]:
+        return self.by_kind.get(kind, [])
+
+    def add(self, claim: Claim) -> None:
+        self.by_kind.setdefault(claim.kind, []).append(claim)
+
+
+def extract_claims(content: str, columns: Iterable[str] = (),
+                   categories: Optional[Mapping[str, Mapping[str, str]]] = None) -> ClaimSet:
+    """Extrai todas as afirmações numéricas da resposta em uma passada.
+
+    Dentro de cada frase, palavras-chave ("média", "máximo", "registros"...)
+    ficam pendentes e são consumidas, na ordem, pelos números sem unidade
+    seguintes; o nome de coluna mais recente dá a coluna da afirmação, e um
+    novo nome de coluna reaproveita a última estatística ("Média: Amount
+    88,35, Time 94813"). Substantivos de contagem ("registros", "colunas")
+    valem só até a próxima palavra de conteúdo. Números com unidade ("284.807 registros") e
+    percentuais não consomem palavras-chave; um percentual é atribuído à
+    categoria citada antes dele ("Class 0: 99,83%").
+
+    Args:
+        content: Resposta do LLM
+        columns: Nomes de colunas do dataset (só nomes de uma palavra)
+        categories: coluna → {token minúsculo: rótulo da categoria}
+    """
+    column_index = {name.lower(): name for name in columns if _WORD_RE.fullmatch(name)}
+    category_index: Dict[str, Dict[str, str]] = {}
+    for column, tokens in (categories or {}).items():
+        for token, label in tokens.items():
+            category_index.setdefault(token, {})[column] = label
+
+    claims = ClaimSet()
+    pending: List[str] = []
+    last_stat: Optional[str] = None
+    column: Optional[str] = None
+    category: Optional[Tuple[str, str]] = None
+
+    for match in _CLAIM_TOKEN_RE.finditer(content):
+        token_type = match.lastgroup
+        if token_type == 'stop':
+            pending, last_stat, column, category = [], None, None, None
+            continue
+
+        if token_type == 'word':
+            token = match.group('word').lower()
+            claims.words[token] += 1
+            kind = _CLAIM_KEYWORDS.get(token)
+            if kind == 'numeric' and pending and pending[-1] == 'columns':
+                pending[-1] = kind  # "colunas numéricas: 30"
+            elif kind is not None:
+                pending.append(kind)
+            elif token in column_index:
+                column = column_index[token]
+                if not pending and last_stat is not None:
+                    pending.append(last_stat)
+            elif token in category_index:
+                category = _pick_category(category_index[token], column, pending)
+            elif len(token) > 3 and pending:
+                # contagens só valem logo após o substantivo ("registros: 284.807",
+                # "colunas é de 31"), não em "transações do parágrafo 3"
+                pending = [kind for kind in pending if kind in STAT_KINDS]
+            continue
+
+        raw = match.group('num')
+        value = parse_claim_number(raw, count=token_type in ('numeric', 'columns', 'records'))
+        if value is None:
+            continue
+        claims.add(Claim('number', value, raw))
+
+        if token_type == 'percentage':
+            cat_column, cat_label = category or (column, None)
+            claims.add(Claim('percentage', value, raw, cat_column, cat_label))
+            category = None
+        elif token_type != 'num':
+            claims.add(Claim(token_type, value, raw))
+        else:
+            cited = category_index.get(raw.lower())
+            cited = _pick_category(cited, column, pending) if cited else None
+            if cited is not None:
+                category = cited
+            elif pending:
+                kind = pending.pop(0)
+                is_stat = kind in STAT_KINDS
+                claims.add(Claim(kind, value, raw, column if is_stat else None))
+                if is_stat:
+                    last_stat = kind
+    return claims
+
+
+def _pick_category(columns: Dict[str, str], column: Optional[str],
+                   pending: List[str]) -> Optional[Tuple[str, str]]:
+    """Categoria citada: da coluna atual, ou da única coluna que a contém quando
+    nenhuma estatística aguarda valor (senão o número é a estatística)."""
+    if column in columns:
+        return column, columns[column]
+    if not pending and len(columns) == 1:
+        return next(iter(columns.items()))
+    return None
+
 class StatisticsGuardrails:
     """Sistema de guardrails para validação de estatísticas.
     
@@ -90,6 +281,9 @@ class StatisticsGuardrails:
     def _validate_against_real_data(self, content: str, context: Dict[str, Any]) -> ValidationResult:
         """Valida resposta comparando com dados REAIS do contexto.
         
+        As afirmações numéricas são extraídas uma vez (``extract_claims``) e
+        cada validador só consulta as estatísticas reais por coluna/categoria.
+        
         Args:
             content: Conteúdo da resposta do LLM
             context: Contexto com dados reais calculados
@@ -103,20 +297,26 @@ class StatisticsGuardrails:
             issues.append("⚠️ Resposta não demonstra interpretação semântica adequada dos chunks fornecidos")
             confidence_score -= 0.3
         
-        # Extrair dados reais do contexto
+        # Extrair dados reais do contexto (texto livre só passa pela validação semântica)
         real_data = context.get('csv_analysis', {})
+        if not isinstance(real_data, dict):
+            real_data = {}
+        claims = self._extract_real_data_claims(content, real_data)
         
         # 1. Validar contagens básicas
-        self._validate_basic_counts(content, real_data, issues, corrected_values)
+        self._validate_basic_counts(claims, real_data, issues, corrected_values)
         
         # 2. Validar tipos de dados
-        self._validate_data_types(content, real_data, issues, corrected_values)
+        self._validate_data_types(content, claims, real_data, issues, corrected_values)
         
         # 3. Validar estatísticas numéricas
-        self._validate_statistics(content, real_data, issues, corrected_values)
+        self._validate_statistics(claims, real_data, issues, corrected_values)
         
         # 4. Validar distribuições
-        self._validate_distributions(content, real_data, issues, corrected_values)
+        self._validate_distributions(claims, real_data, issues, corrected_values)
+        
+        # A mesma afirmação repetida na resposta conta uma vez
+        issues = list(dict.fromkeys(issues))
         
         # Calcular score de confiança
         if issues:
@@ -129,139 +329,99 @@ class StatisticsGuardrails:
             corrected_values=corrected_values
         )
     
-    def _validate_basic_counts(self, content: str, real_data: Dict, issues: list, corrected_values: Dict):
+    def _extract_real_data_claims(self, content: str, real_data: Dict) -> ClaimSet:
+        """Extrai as afirmações usando as colunas e categorias do dataset real"""
+        stats = real_data.get('estatisticas') or {}
+        distributions = {col: dist for col, dist in (real_data.get('distribuicao') or {}).items()
+                         if isinstance(dist, dict)}
+        columns = set(stats) | set(distributions) | set(real_data.get('columns') or ())
+        categories = {col: {str(value).lower(): str(value) for value in dist}
+                      for col, dist in distributions.items()}
+        return extract_claims(content, columns, categories)
+    
+    def _validate_basic_counts(self, claims: ClaimSet, real_data: Dict, issues: list, corrected_values: Dict):
         """Valida contagens básicas (registros, colunas) com dados reais"""
-        import re
-        
         # Validar total de registros
         if 'total_records' in real_data:
             real_records = real_data['total_records']
-            
-            # Buscar números de registros na resposta
-            record_patterns = [
-                r'(\d{1,3}(?:[,.]?\d{3})*)\s*registros',
-                r'Total.*?(\d{1,3}(?:[,.]?\d{3})*)',
-                r'(\d{1,3}(?:[,.]?\d{3})*)\s*transações'
-            ]
-            
-            for pattern in record_patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                for match in matches:
-                    claimed_records = int(match.replace(',', '').replace('.', ''))
-                    if abs(claimed_records - real_records) > 100:  # Tolerância de 100
-                        issues.append(f"Registros incorretos: {claimed_records} (real: {real_records})")
-                        corrected_values['total_records'] = real_records
+            for claim in claims.of('records'):
+                if abs(claim.value - real_records) > 100:  # Tolerância de 100
+                    issues.append(f"Registros incorretos: {int(claim.value)} (real: {real_records})")
+                    corrected_values['total_records'] = real_records
         
         # Validar total de colunas
         if 'total_columns' in real_data:
             real_columns = real_data['total_columns']
-            
-            column_patterns = [
-                r'(\d+)\s*colunas',
-                r'Total.*?colunas.*?(\d+)',
-                r'(\d+)\s*variáveis'
-            ]
-            
-            for pattern in column_patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                for match in matches:
-                    claimed_columns = int(match)
-                    if claimed_columns != real_columns:
-                        issues.append(f"Colunas incorretas: {claimed_columns} (real: {real_columns})")
-                        corrected_values['total_columns'] = real_columns
+            for claim in claims.of('columns'):
+                if claim.value != real_columns:
+                    issues.append(f"Colunas incorretas: {int(claim.value)} (real: {real_columns})")
+                    corrected_values['total_columns'] = real_columns
     
-    def _validate_data_types(self, content: str, real_data: Dict, issues: list, corrected_values: Dict):
+    def _validate_data_types(self, content: str, claims: ClaimSet, real_data: Dict, issues: list, corrected_values: Dict):
         """Valida tipos de dados com dados reais"""
         if 'tipos_dados' in real_data:
             tipos_reais = real_data['tipos_dados']
             
             # Se todos são numéricos, não deveria mencionar categóricas
             if tipos_reais.get('total_categoricos', 0) == 0:
-                categorical_mentions = [
-                    'categóric', 'categoric', 'texto', 'string', 'object'
-                ]
-                
-                for mention in categorical_mentions:
-                    if mention in content.lower() and 'não' not in content.lower():
-                        issues.append("Menciona colunas categóricas quando não existem")
-                        corrected_values['categorical_error'] = "Todas as colunas são numéricas"
+                content_lower = content.lower()
+                if 'não' not in content_lower and any(mention in content_lower for mention in _CATEGORICAL_MENTIONS):
+                    issues.append("Menciona colunas categóricas quando não existem")
+                    corrected_values['categorical_error'] = "Todas as colunas são numéricas"
             
             # Verificar contagem de tipos
             if tipos_reais.get('total_numericos'):
                 real_numeric = tipos_reais['total_numericos']
-                import re
-                numeric_pattern = r'(\d+)\s*(?:colunas?\s*)?(?:numéricas?|numéricos?)'
-                matches = re.findall(numeric_pattern, content, re.IGNORECASE)
-                
-                for match in matches:
-                    claimed_numeric = int(match)
-                    if claimed_numeric != real_numeric:
-                        issues.append(f"Tipos incorretos: {claimed_numeric} numéricas (real: {real_numeric})")
+                for claim in claims.of('numeric'):
+                    if claim.value != real_numeric:
+                        issues.append(f"Tipos incorretos: {int(claim.value)} numéricas (real: {real_numeric})")
                         corrected_values['numeric_count'] = real_numeric
     
-    def _validate_statistics(self, content: str, real_data: Dict, issues: list, corrected_values: Dict):
-        """Valida estatísticas numéricas com dados reais"""
-        if 'estatisticas' in real_data:
-            stats_reais = real_data['estatisticas']
-            
-            import re
-            
-            # Validar médias
-            for col, stats in stats_reais.items():
-                if 'mean' in stats:
-                    real_mean = stats['mean']
-                    
-                    # Buscar menções da média desta coluna
-                    patterns = [
-                        rf'{col}.*?média.*?R?\$?\s*([\d,.]+)',
-                        rf'média.*?{col}.*?R?\$?\s*([\d,.]+)',
-                        rf'média.*?R?\$?\s*([\d,.]+)'  # Genérico
-                    ]
-                    
-                    for pattern in patterns:
-                        matches = re.findall(pattern, content, re.IGNORECASE)
-                        for match in matches:
-                            try:
-                                claimed_mean = float(match.replace(',', '.'))
-                                tolerance = abs(real_mean * 0.01)  # 1% de tolerância
-                                
-                                if abs(claimed_mean - real_mean) > tolerance:
-                                    issues.append(f"Média {col} incorreta: {claimed_mean} (real: {real_mean:.2f})")
-                                    corrected_values[f'{col}_mean'] = real_mean
-                            except ValueError:
-                                continue
+    def _validate_statistics(self, claims: ClaimSet, real_data: Dict, issues: list, corrected_values: Dict):
+        """Valida estatísticas numéricas (média, desvio, mínimo, máximo, mediana) com dados reais.
+        
+        Afirmações sem coluna só são conferidas quando uma única coluna tem a estatística.
+        """
+        stats_reais = real_data.get('estatisticas')
+        if not stats_reais:
+            return
+        
+        for kind in STAT_KINDS:
+            owners = [col for col, stats in stats_reais.items() if kind in stats]
+            for claim in claims.of(kind):
+                col = claim.column
+                if col is None and len(owners) == 1:
+                    col = owners[0]
+                if kind not in stats_reais.get(col, {}):
+                    continue
+                
+                real_value = stats_reais[col][kind]
+                tolerance = max(abs(real_value * STAT_TOLERANCE), ROUNDING_TOLERANCE)
+                if abs(claim.value - real_value) > tolerance:
+                    label, wrong = _STAT_LABELS[kind]
+                    issues.append(f"{label} {col} {wrong}: {claim.value} (real: {real_value:.2f})")
+                    corrected_values[f'{col}_{kind}'] = real_value
     
-    def _validate_distributions(self, content: str, real_data: Dict, issues: list, corrected_values: Dict):
-        """Valida distribuições com dados reais"""
-        if 'distribuicao' in real_data:
-            dist_reais = real_data['distribuicao']
-            
-            import re
-            
-            # Validar percentuais
-            for col, dist in dist_reais.items():
-                if isinstance(dist, dict):
-                    for value, count in dist.items():
-                        total = real_data.get('total_records', 1)
-                        real_percentage = (count / total) * 100
-                        
-                        # Buscar menções de percentuais
-                        patterns = [
-                            rf'{value}.*?(\d+(?:[,.]?\d+)?)%',
-                            rf'(\d+(?:[,.]?\d+)?)%.*?{value}'
-                        ]
-                        
-                        for pattern in patterns:
-                            matches = re.findall(pattern, content, re.IGNORECASE)
-                            for match in matches:
-                                try:
-                                    claimed_percentage = float(match.replace(',', '.'))
-                                    
-                                    if abs(claimed_percentage - real_percentage) > 1.0:  # 1% tolerância
-                                        issues.append(f"Percentual {col}={value} incorreto: {claimed_percentage}% (real: {real_percentage:.2f}%)")
-                                        corrected_values[f'{col}_{value}_pct'] = real_percentage
-                                except ValueError:
-                                    continue
+    def _validate_distributions(self, claims: ClaimSet, real_data: Dict, issues: list, corrected_values: Dict):
+        """Valida percentuais das categorias com dados reais"""
+        if 'distribuicao' not in real_data:
+            return
+        
+        real_percentages = {}
+        for col, dist in real_data['distribuicao'].items():
+            if isinstance(dist, dict):
+                total = real_data.get('total_records') or sum(dist.values()) or 1
+                for value, count in dist.items():
+                    real_percentages[(col, str(value))] = (count / total) * 100
+        
+        for claim in claims.of('percentage'):
+            real_percentage = real_percentages.get((claim.column, claim.category))
+            if real_percentage is None:
+                continue
+            if abs(claim.value - real_percentage) > 1.0:  # 1% tolerância
+                issues.append(f"Percentual {claim.column}={claim.category} incorreto: "
+                              f"{claim.value}% (real: {real_percentage:.2f}%)")
+                corrected_values[f'{claim.column}_{claim.category}_pct'] = real_percentage
     
     def _validate_basic_consistency(self, content: str) -> ValidationResult:
         """Validação básica de consistência quando não há contexto"""
@@ -294,45 +454,46 @@ class StatisticsGuardrails:
         # Obter ranges para o dataset
         ranges = self.dataset_ranges.get(dataset_type, self.dataset_ranges['generic'])
         
-        # Extrair valores numéricos da resposta
-        extracted_values = self._extract_numerical_values(content)
-        
         if dataset_type == 'creditcard':
             # Validações específicas para creditcard
-            return self._validate_creditcard_specific(content, ranges, issues, confidence_score, corrected_values)
+            claims = extract_claims(content, _CREDITCARD_COLUMNS, _CREDITCARD_CLASSES)
+            return self._validate_creditcard_specific(claims, ranges, issues, confidence_score, corrected_values)
         else:
             # Validações genéricas
-            return self._validate_generic_dataset(content, ranges, issues, confidence_score, corrected_values)
+            return self._validate_generic_dataset(extract_claims(content), ranges, issues, confidence_score, corrected_values)
     
-    def _validate_creditcard_specific(self, content: str, ranges: dict, issues: list, confidence_score: float, corrected_values: dict) -> ValidationResult:
+    def _validate_creditcard_specific(self, claims: ClaimSet, ranges: dict, issues: list, confidence_score: float, corrected_values: dict) -> ValidationResult:
         """Validações específicas para dataset creditcard"""
         
         # Validar total de transações
-        total_match = re.search(r'(\d{1,3}(?:[,.]?\d{3})*)\s*(?:transações|registros|linhas)', content, re.IGNORECASE)
-        if total_match:
-            total = self._parse_number(total_match.group(1))
-            if total and not (ranges['total_transactions'][0] <= total <= ranges['total_transactions'][1]):
-                issues.append(f"Total de transações suspeito: {total:,} (esperado: ~284.807)")
+        records = claims.of('records')
+        if records:
+            total = records[0].value
+            if not (ranges['total_transactions'][0] <= total <= ranges['total_transactions'][1]):
+                issues.append(f"Total de transações suspeito: {total:,.0f} (esperado: ~284.807)")
                 confidence_score -= 0.2
                 corrected_values['total_transactions'] = 284807
         
         # Validar estatísticas Amount
-        amount_mean = self._extract_amount_statistic(content, ['média', 'mean'])
-        if amount_mean and not (ranges['amount_mean'][0] <= amount_mean <= ranges['amount_mean'][1]):
+        amount_mean = self._first_statistic(claims, 'mean', 'Amount')
+        if amount_mean is not None and not (ranges['amount_mean'][0] <= amount_mean <= ranges['amount_mean'][1]):
             issues.append(f"Média de Amount suspeita: R$ {amount_mean:.2f} (esperado: ~R$ 88)")
             confidence_score -= 0.3
             corrected_values['amount_mean'] = 88.35
         
-        amount_std = self._extract_amount_statistic(content, ['desvio', 'std', 'standard'])
-        if amount_std and not (ranges['amount_std'][0] <= amount_std <= ranges['amount_std'][1]):
+        amount_std = self._first_statistic(claims, 'std', 'Amount')
+        if amount_std is not None and not (ranges['amount_std'][0] <= amount_std <= ranges['amount_std'][1]):
             issues.append(f"Desvio padrão de Amount suspeito: R$ {amount_std:.2f} (esperado: ~R$ 250)")
             confidence_score -= 0.3
             corrected_values['amount_std'] = 250.12
         
-        # Validar distribuição Class
-        class_percentages = self._extract_class_percentages(content)
-        if class_percentages:
-            class_0_pct, class_1_pct = class_percentages
+        # Validar distribuição Class (primeira menção de cada classe)
+        class_percentages = {}
+        for claim in claims.of('percentage'):
+            if claim.column == 'Class' and claim.category is not None:
+                class_percentages.setdefault(claim.category, claim.value)
+        if '0' in class_percentages and '1' in class_percentages:
+            class_0_pct, class_1_pct = class_percentages['0'], class_percentages['1']
             
             if not (ranges['class_0_percentage'][0] <= class_0_pct <= ranges['class_0_percentage'][1]):
                 issues.append(f"Porcentagem Class 0 suspeita: {class_0_pct:.1f}% (esperado: ~99.8%)")
@@ -345,7 +506,7 @@ class StatisticsGuardrails:
                 corrected_values['class_1_percentage'] = 0.17
         
         # Validar features V1-V28
-        v_features_count = len(re.findall(r'\bV\d+\b', content))
+        v_features_count = sum(count for word, count in claims.words.items() if _V_FEATURE_RE.fullmatch(word))
         if v_features_count > 0 and v_features_count != 28:
             issues.append(f"Número de features V suspeito: {v_features_count} (esperado: 28)")
             confidence_score -= 0.1
@@ -357,38 +518,28 @@ class StatisticsGuardrails:
             corrected_values=corrected_values if corrected_values else None
         )
     
-    def _validate_generic_dataset(self, content: str, ranges: dict, issues: list, confidence_score: float, corrected_values: dict) -> ValidationResult:
+    def _validate_generic_dataset(self, claims: ClaimSet, ranges: dict, issues: list, confidence_score: float, corrected_values: dict) -> ValidationResult:
         """Validações genéricas para qualquer dataset"""
         
         # Validar total de registros (range genérico)
-        total_match = re.search(r'(\d{1,3}(?:[,.]?\d{3})*)\s*(?:transações|registros|linhas|rows)', content, re.IGNORECASE)
-        if total_match:
-            total = self._parse_number(total_match.group(1))
-            if total and not (ranges['total_transactions'][0] <= total <= ranges['total_transactions'][1]):
-                issues.append(f"Total de registros fora do range esperado: {total:,}")
+        records = claims.of('records')
+        if records:
+            total = records[0].value
+            if not (ranges['total_transactions'][0] <= total <= ranges['total_transactions'][1]):
+                issues.append(f"Total de registros fora do range esperado: {total:,.0f}")
                 confidence_score -= 0.1
         
         # Validar percentuais genéricos
-        percentages = re.findall(r'(\d+(?:[,.]\d+)?)\s*%', content)
-        for pct_str in percentages:
-            try:
-                pct = float(pct_str.replace(',', '.'))
-                if not (ranges['percentage_ranges'][0] <= pct <= ranges['percentage_ranges'][1]):
-                    issues.append(f"Percentual impossível: {pct}%")
-                    confidence_score -= 0.2
-            except:
-                continue
+        for claim in claims.of('percentage'):
+            if not (ranges['percentage_ranges'][0] <= claim.value <= ranges['percentage_ranges'][1]):
+                issues.append(f"Percentual impossível: {claim.value}%")
+                confidence_score -= 0.2
         
-        # Validar números muito grandes ou pequenos
-        numbers = re.findall(r'\b\d{1,3}(?:[,.]\d{3})*(?:[,.]\d+)?\b', content)
-        for num_str in numbers:
-            try:
-                num = self._parse_number(num_str)
-                if num and (num > 1000000000 or (num > 100 and num < 0.001)):
-                    issues.append(f"Valor numérico suspeito: {num}")
-                    confidence_score -= 0.1
-            except:
-                continue
+        # Validar números muito grandes
+        for claim in claims.of('number'):
+            if claim.value > 1000000000:
+                issues.append(f"Valor numérico suspeito: {claim.value}")
+                confidence_score -= 0.1
         
         return ValidationResult(
             is_valid=len(issues) <= 2,  # Tolerar até 2 issues menores em datasets genéricos
@@ -399,70 +550,15 @@ class StatisticsGuardrails:
     
     def _validate_generic_response(self, content: str) -> ValidationResult:
         """Validações genéricas para qualquer resposta (método mantido para compatibilidade)"""
-        return self._validate_generic_dataset(content, self.dataset_ranges['generic'], [], 1.0, {})
-    
-    def _extract_numerical_values(self, content: str) -> Dict[str, float]:
-        """Extrai valores numéricos da resposta"""
-        values = {}
-        
-        # Padrões para extrair estatísticas comuns
-        patterns = {
-            'mean': r'média[:\s]*(?:R\$\s*)?(\d+(?:[,.]\d+)?)',
-            'std': r'desvio[:\s]*(?:R\$\s*)?(\d+(?:[,.]\d+)?)',
-            'min': r'mínimo[:\s]*(?:R\$\s*)?(\d+(?:[,.]\d+)?)',
-            'max': r'máximo[:\s]*(?:R\$\s*)?(\d+(?:[,.]\d+)?)',
-        }
-        
-        for key, pattern in patterns.items():
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                values[key] = self._parse_number(match.group(1))
-        
-        return values
+        return self._validate_generic_dataset(extract_claims(content), self.dataset_ranges['generic'], [], 1.0, {})
     
-    def _extract_amount_statistic(self, content: str, keywords: List[str]) -> Optional[float]:
-        """Extrai estatística específica de Amount"""
-        for keyword in keywords:
-            pattern = f'{keyword}[:\s]*(?:R\$\s*)?(\d+(?:[,.]\d+)?)'
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                return self._parse_number(match.group(1))
+    def _first_statistic(self, claims: ClaimSet, kind: str, column: str) -> Optional[float]:
+        """Primeira estatística ``kind`` atribuída à coluna (ou sem coluna)"""
+        for claim in claims.of(kind):
+            if claim.column in (None, column):
+                return claim.value
         return None
     
-    def _extract_class_percentages(self, content: str) -> Optional[Tuple[float, float]]:
-        """Extrai percentuais das classes 0 e 1"""
-        class_0_match = re.search(r'(?:class\s*0|normal)[:\s]*(\d+(?:[,.]\d+)?)\s*%', content, re.IGNORECASE)
-        class_1_match = re.search(r'(?:class\s*1|fraude)[:\s]*(\d+(?:[,.]\d+)?)\s*%', content, re.IGNORECASE)
-        
-        if class_0_match and class_1_match:
-            class_0_pct = float(class_0_match.group(1).replace(',', '.'))
-            class_1_pct = float(class_1_match.group(1).replace(',', '.'))
-            return (class_0_pct, class_1_pct)
-        
-        return None
-    
-    def _parse_number(self, num_str: str) -> Optional[float]:
-        """Parse seguro de números com diferentes formatos"""
-        try:
-            # Remover separadores de milhares e normalizar decimal
-            clean_num = num_str.replace('.', '').replace(',', '.')
-            
-            # Se há mais de um ponto, assumir formato brasileiro (1.234,56)
-            if '.' in num_str and ',' in num_str:
-                # Formato brasileiro: 1.234,56
-                clean_num = num_str.replace('.', '').replace(',', '.')
-            elif ',' in num_str and num_str.count(',') == 1:
-                # Pode ser decimal brasileiro (123,45) ou separador de milhares (1,234)
-                parts = num_str.split(',')
-                if len(parts[1]) <= 2:  # Provavelmente decimal
-                    clean_num = num_str.replace(',', '.')
-                else:  # Provavelmente separador de milhares
-                    clean_num = num_str.replace(',', '')
-            
-            return float(clean_num)
-        except:
-            return None
-    
     def generate_correction_prompt(self, validation_result: ValidationResult) -> str:
         """Gera prompt de correção baseado nos issues encontrados"""
         if validation_result.is_valid:
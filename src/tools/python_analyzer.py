@@ -20,7 +20,6 @@ import pandas as pd
 import numpy as np
 from typing import Any, Dict, List, Optional, Union
 from dataclasses import dataclass
-import io
 import traceback
 import warnings
 
@@ -28,6 +27,11 @@ import warnings
 warnings.filterwarnings('ignore')
 
 from src.utils.logging_config import get_logger
+from src.settings import DATASET_PROFILE_ENABLED, DATASET_SNAPSHOT_ENABLED
+from src.data.dataset_snapshot import get_dataset_snapshot_service, resolve_snapshot_key
+from src.data.dataset_profile import DatasetProfile, get_dataset_profile_store
+from src.data.chunk_reconstruction import fetch_embedding_rows, reconstruct_dataframe_from_chunks
+from src.tools.python_sandbox import ALLOWED_MODULES, SAFE_BUILTINS, DatasetRef, dataset_ref, run_python
 
 # Import do cliente Supabase para recuperação de dados
 try:
@@ -121,19 +125,10 @@ class PythonDataAnalyzer:
     
     def _setup_secure_environment(self):
         """Configura ambiente seguro para execução de código Python"""
-        # Lista de módulos permitidos (segurança)
-        self.allowed_modules = {
-            'pandas', 'numpy', 'math', 'statistics', 'datetime', 'json',
-            'collections', 're', 'itertools', 'functools'
-        }
-        
-        # Namespaces seguros para execução
+        # Módulos e builtins permitidos: aplicados pelo sandbox (src/tools/python_sandbox.py)
+        self.allowed_modules = set(ALLOWED_MODULES)
         self.safe_globals = {
-            '__builtins__': {
-                'len', 'sum', 'min', 'max', 'abs', 'round', 'sorted',
-                'enumerate', 'zip', 'range', 'list', 'dict', 'tuple', 'set',
-                'str', 'int', 'float', 'bool', 'print'
-            },
+            '__builtins__': set(SAFE_BUILTINS),
             'pd': pd,
             'np': np,
         }
@@ -156,29 +151,23 @@ class PythonDataAnalyzer:
         try:
             self.logger.info("✅ Recuperando dados da tabela embeddings (CONFORMIDADE)")
             
-            query = supabase.table('embeddings').select('*')
-            
-            # Aplicar filtros se especificados
-            if metadata_filter:
-                for key, value in metadata_filter.items():
-                    query = query.eq(f'metadata->{key}', value)
-            
-            if limit:
-                query = query.limit(limit)
-            
-            result = query.execute()
+            # Sem a coluna embedding (vetor) e paginado por id: um select('*') único
+            # seria truncado em 1000 linhas pelo PostgREST
+            columns = 'id, chunk_text, metadata' if parse_chunk_text else 'id, chunk_text, metadata, created_at'
+            rows = fetch_embedding_rows(supabase, columns=columns, metadata_filter=metadata_filter, limit=limit)
             
-            if not result.data:
+            if not rows:
                 self.logger.warning("Nenhum dado encontrado na tabela embeddings")
                 return None
             
-            df = pd.DataFrame(result.data)
-            self.logger.info(f"✅ Dados recuperados: {len(df)} registros da tabela embeddings")
+            self.logger.info(f"✅ Dados recuperados: {len(rows)} registros da tabela embeddings")
             
-            # SEMPRE tentar parsear chunk_text para reconstruir dados originais do CSV
-            if 'chunk_text' in df.columns:
-                self.logger.info("🔄 Parseando chunk_text para reconstruir colunas originais do CSV...")
-                parsed_df = self._parse_chunk_text_to_dataframe(df)
+            if parse_chunk_text:
+                self.logger.info("🔄 Reconstruindo colunas originais do CSV a partir do chunk_text...")
+                parsed_df = reconstruct_dataframe_from_chunks(rows)
+                if parsed_df is None:
+                    # Chunks sem o formato CSV_ROW: parser heurístico linha a linha
+                    parsed_df = self._parse_chunk_text_to_dataframe(pd.DataFrame(rows))
                 if parsed_df is not None:
                     self.logger.info(f"✅ Dados parseados com sucesso: {len(parsed_df)} linhas, {len(parsed_df.columns)} colunas originais")
                     self.logger.info(f"📊 Colunas reconstruídas: {list(parsed_df.columns)}")
@@ -186,13 +175,8 @@ class PythonDataAnalyzer:
                 else:
                     self.logger.warning("⚠️ Falha ao parsear chunk_text, retornando dados brutos da tabela embeddings")
             
-            # Fallback: Remover colunas com tipos não-hashable (metadata, embedding) para evitar erros
-            if 'metadata' in df.columns:
-                df = df.drop(columns=['metadata'])
-            if 'embedding' in df.columns:
-                df = df.drop(columns=['embedding'])
-            
-            return df
+            # Fallback: Remover colunas com tipos não-hashable (metadata) para evitar erros
+            return pd.DataFrame(rows).drop(columns=['metadata'], errors='ignore')
             
         except Exception as e:
             self.logger.error(f"Erro ao recuperar dados da tabela embeddings: {str(e)}")
@@ -369,6 +353,50 @@ class PythonDataAnalyzer:
             self.logger.error(f"Erro ao recuperar dados do Supabase: {str(e)}")
             return None
     
+    def get_dataset_snapshot(self) -> Optional[pd.DataFrame]:
+        """Retorna o DataFrame da ingestão ativa a partir do snapshot compartilhado.
+        
+        O snapshot (memória do processo ou Parquet em data/processado) é montado
+        uma única vez por ingestion_id; só na ausência dele os chunks da tabela
+        embeddings são baixados e parseados. Os tipos ficam os do pandas
+        (int64/float64 e texto ``object``): o frame chega ao código gerado no
+        sandbox, que não deve ver estouro de int8 nem arredondamento de float32.
+        
+        Returns:
+            DataFrame com os dados originais ou None se falhar
+        """
+        if not DATASET_SNAPSHOT_ENABLED or not SUPABASE_CLIENT_AVAILABLE or not supabase:
+            return self.get_data_from_embeddings(limit=None, parse_chunk_text=True)
+        
+        service = get_dataset_snapshot_service()
+        try:
+            key = service.active_key(lambda: resolve_snapshot_key(supabase))
+        except Exception as e:
+            self.logger.warning(f"⚠️ Não foi possível identificar a ingestão ativa: {e}")
+            key = None
+        if key is None:
+            return self.get_data_from_embeddings(limit=None, parse_chunk_text=True)
+        
+        return service.get(key, lambda: self.get_data_from_embeddings(limit=None, parse_chunk_text=True))
+    
+    def get_dataset_profile(self) -> Optional[DatasetProfile]:
+        """Retorna o perfil pré-calculado na ingestão ativa (tipos, momentos, quantis, top-k, correlação).
+        
+        Returns:
+            DatasetProfile ou None se a ingestão ativa não tiver perfil
+        """
+        if not DATASET_PROFILE_ENABLED or not SUPABASE_CLIENT_AVAILABLE or not supabase:
+            return None
+        try:
+            key = get_dataset_snapshot_service().active_key(lambda: resolve_snapshot_key(supabase))
+            profile = get_dataset_profile_store().get(key)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Perfil do dataset indisponível: {e}")
+            return None
+        if profile is not None:
+            self.logger.info(f"📐 Usando perfil pré-calculado da ingestão {profile.ingestion_id}")
+        return profile
+    
     def reconstruct_original_data(self) -> Optional[pd.DataFrame]:
         """Reconstrói dados originais APENAS da tabela embeddings do Supabase.
         
@@ -381,8 +409,8 @@ class PythonDataAnalyzer:
             self.logger.info("🔄 Reconstruindo dados originais APENAS da tabela embeddings...")
             
             # ÚNICA FONTE DE DADOS: Tabela embeddings do Supabase
-            # O método get_data_from_embeddings() já parseia chunk_text automaticamente
-            df = self.get_data_from_embeddings(limit=None, parse_chunk_text=True)
+            # Snapshot por ingestão: chunks são baixados/parseados uma vez, não a cada pergunta
+            df = self.get_dataset_snapshot()
             
             if df is not None:
                 self.logger.info(f"✅ Dados reconstruídos: {len(df)} registros, {len(df.columns)} colunas (CONFORMIDADE TOTAL)")
@@ -454,6 +482,11 @@ class PythonDataAnalyzer:
             Dicionário com estatísticas calculadas
         """
         try:
+            # Perfil calculado na ingestão: evita reprocessar os dados a cada pergunta
+            profile = self.get_dataset_profile()
+            if profile is not None:
+                return self._statistics_from_profile(profile, query_type)
+            
             # Obter dados reais
             df = self.reconstruct_original_data()
             if df is None:
@@ -589,9 +622,106 @@ class PythonDataAnalyzer:
             self.logger.error(error_msg)
             return {"error": error_msg}
     
+    def _statistics_from_profile(self, profile: DatasetProfile, query_type: str) -> Dict[str, Any]:
+        """Monta o resultado de calculate_real_statistics a partir do perfil da ingestão."""
+        columns = profile.columns
+        result = {
+            "data_source": "dataset genérico",
+            "total_records": profile.n_rows,
+            "total_columns": profile.n_columns,
+            "columns": list(columns)
+        }
+        object_cols = [name for name, col in columns.items() if col.get('dtype') == 'object']
+        
+        if query_type in ["tipos_dados", "all"]:
+            numeric_cols = [name for name, col in columns.items()
+                            if col['kind'] in ('numeric', 'boolean') or col.get('numeric_like')]
+            datetime_cols = profile.columns_of_kind('datetime')
+            categorical_cols = [name for name in columns if name not in numeric_cols and name not in datetime_cols]
+            result.update({
+                "tipos_dados": {
+                    "numericos": numeric_cols,
+                    "categoricos": categorical_cols,
+                    "datetime": datetime_cols,
+                    "total_numericos": len(numeric_cols),
+                    "total_categoricos": len(categorical_cols),
+                    "total_datetime": len(datetime_cols)
+                }
+            })
+        
+        if query_type in ["estatisticas", "all"]:
+            estatisticas = {}
+            for name in profile.numeric_columns():
+                col = columns[name]
+                quantiles = col.get('quantiles') or {}
+                estatisticas[name] = {
+                    "tipo": col['dtype'],
+                    "count": col['count'],
+                    "mean": col.get('mean'),
+                    "std": col.get('std'),
+                    "min": col.get('min'),
+                    "max": col.get('max'),
+                    "median": quantiles.get('0.5'),
+                    "q25": quantiles.get('0.25'),
+                    "q75": quantiles.get('0.75')
+                }
+            for name in object_cols:
+                col = columns[name]
+                if col['unique'] <= 20:
+                    top = col['top_k'][:10]
+                    estatisticas[name] = {
+                        "tipo": col['dtype'],
+                        "unique_values": [value for value, _ in top],
+                        "value_counts": {value: count for value, count in top},
+                        "percentages": {value: round(count / profile.n_rows * 100, 2) for value, count in top}
+                    }
+            result.update({"estatisticas": estatisticas})
+        
+        if query_type in ["distribuicao", "all"]:
+            distribuicao = {}
+            for name in object_cols:
+                col = columns[name]
+                if col['unique'] <= 10:
+                    distribuicao[name] = {
+                        str(value): {"count": count, "percentage": count / profile.n_rows * 100}
+                        for value, count in col['top_k']
+                    }
+            numeric_ranges = {}
+            for name in profile.numeric_columns():
+                col = columns[name]
+                if col.get('min') is None:
+                    continue
+                numeric_ranges[name] = {
+                    "range_min": col['min'],
+                    "range_max": col['max'],
+                    "range_amplitude": col['max'] - col['min']
+                }
+            result.update({
+                "distribuicao": distribuicao,
+                "ranges_numericos": numeric_ranges
+            })
+        
+        return result
+    
+    def _active_dataset_ref(self) -> Optional[DatasetRef]:
+        """Parquet do snapshot da ingestão ativa, carregado pelos processos do sandbox."""
+        if not DATASET_SNAPSHOT_ENABLED or not SUPABASE_CLIENT_AVAILABLE or not supabase:
+            return None
+        try:
+            service = get_dataset_snapshot_service()
+            path = service.find_parquet(service.active_key(lambda: resolve_snapshot_key(supabase)))
+        except Exception as e:
+            self.logger.warning(f"⚠️ Snapshot indisponível para o sandbox: {e}")
+            return None
+        return dataset_ref('parquet', path) if path is not None else None
+    
     def execute_safe_python(self, code: str, context: Dict[str, Any] = None) -> PythonAnalysisResult:
         """Executa código Python de forma segura.
         
+        O código roda num processo do sandbox (src/tools/python_sandbox.py),
+        com limites de CPU, memória e tempo. Sem ``df`` no contexto, o
+        dataset da ingestão ativa fica disponível como ``df``.
+        
         Args:
             code: Código Python para executar
             context: Contexto adicional (DataFrames, variáveis)
@@ -599,61 +729,35 @@ class PythonDataAnalyzer:
         Returns:
             Resultado da execução
         """
-        import time
-        start_time = time.time()
+        dataset = None if context and 'df' in context else self._active_dataset_ref()
+        sandbox = run_python(code, dataset=dataset, context=context)
+        if not sandbox.success:
+            first_line = (sandbox.error or '').split('\n')[0]
+            self.logger.warning(f"Código falhou no sandbox: {first_line}")
         
-        # Capturar output
-        old_stdout = sys.stdout
-        sys.stdout = captured_output = io.StringIO()
-        
-        try:
-            # Preparar namespace seguro
-            local_vars = self.safe_globals.copy()
-            if context:
-                local_vars.update(context)
-            
-            # Executar código
-            exec(code, {"__builtins__": {}}, local_vars)
-            
-            # Capturar resultado
-            output = captured_output.getvalue()
-            execution_time = time.time() - start_time
-            
-            return PythonAnalysisResult(
-                success=True,
-                result=local_vars.get('result'),
-                output=output,
-                execution_time=execution_time
-            )
-            
-        except Exception as e:
-            execution_time = time.time() - start_time
-            error_msg = f"Erro na execução: {str(e)}\n{traceback.format_exc()}"
-            
-            return PythonAnalysisResult(
-                success=False,
-                result=None,
-                output=captured_output.getvalue(),
-                error=error_msg,
-                execution_time=execution_time
-            )
-        
-        finally:
-            sys.stdout = old_stdout
+        return PythonAnalysisResult(
+            success=sandbox.success,
+            result=sandbox.result,
+            output=sandbox.output,
+            error=sandbox.error,
+            execution_time=sandbox.execution_time
+        )
     
-    def calculate_clustering_analysis(self, n_clusters: int = 3) -> Dict[str, Any]:
+    def calculate_clustering_analysis(self, n_clusters: Optional[int] = 3) -> Dict[str, Any]:
         """
         Calcula análise de clustering (KMeans) nos dados numéricos do dataset.
         
+        Usa o ClusteringAnalyzer: acima de alguns dezenas de milhares de linhas,
+        MiniBatchKMeans em blocos e silhouette amostral com intervalo de confiança.
+        
         Args:
-            n_clusters: Número de clusters desejados (padrão: 3)
+            n_clusters: Número de clusters desejados (padrão: 3; None = seleção automática)
             
         Returns:
             Dicionário com informações sobre os clusters encontrados
         """
         try:
-            from sklearn.cluster import KMeans
-            from sklearn.preprocessing import StandardScaler
+            from src.analysis.clustering_analyzer import ClusteringAnalyzer
             
             # 1. Recuperar dados do Supabase usando reconstruct_original_data
             df = self.reconstruct_original_data()
@@ -676,47 +780,36 @@ class PythonDataAnalyzer:
                     "available_columns": df.columns.tolist()
                 }
             
-            self.logger.info(f"🔬 Aplicando KMeans com {n_clusters} clusters em {len(numeric_cols)} variáveis numéricas")
-            
-            # 3. Preparar dados para clustering
-            X = df[numeric_cols].copy()
-            
-            # Remover linhas com valores nulos
-            X = X.dropna()
+            self.logger.info(f"🔬 Aplicando KMeans com {n_clusters or 'k automático'} clusters em {len(numeric_cols)} variáveis numéricas")
             
-            if len(X) == 0:
+            # 3. Preparar dados para clustering (linhas com nulos removidas)
+            if df[numeric_cols].dropna().empty:
                 return {
                     "error": "Todos os dados têm valores nulos nas colunas numéricas"
                 }
             
-            # 4. Normalizar dados (importante para KMeans)
-            scaler = StandardScaler()
-            X_scaled = scaler.fit_transform(X)
-            
-            # 5. Aplicar KMeans
-            kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-            cluster_labels = kmeans.fit_predict(X_scaled)
+            # 4-5. Normalizar e aplicar KMeans (MiniBatchKMeans em datasets grandes)
+            clustering = ClusteringAnalyzer(self.logger).analyze(
+                df, n_clusters=n_clusters, method='kmeans', features=numeric_cols
+            )
+            n_clusters = clustering.n_clusters
             
             # 6. Contar pontos por cluster
-            unique, counts = np.unique(cluster_labels, return_counts=True)
-            cluster_distribution = dict(zip(unique.tolist(), counts.tolist()))
+            cluster_distribution = clustering.cluster_distribution
             
             # 7. Calcular percentuais
-            total_points = len(cluster_labels)
+            total_points = len(clustering.cluster_labels)
             cluster_percentages = {
                 cluster: (count / total_points) * 100 
                 for cluster, count in cluster_distribution.items()
             }
             
-            # 8. Calcular centróides (características médias de cada cluster)
-            centroids = kmeans.cluster_centers_
-            
-            # 9. Verificar balanceamento
+            # 8. Verificar balanceamento
             max_cluster_pct = max(cluster_percentages.values())
             min_cluster_pct = min(cluster_percentages.values())
             is_balanced = (max_cluster_pct / min_cluster_pct) < 3.0  # threshold arbitrário
             
-            # 10. Construir resposta estruturada
+            # 9. Construir resposta estruturada
             result = {
                 "success": True,
                 "n_clusters": n_clusters,
@@ -726,7 +819,8 @@ class PythonDataAnalyzer:
                 "cluster_percentages": cluster_percentages,
                 "is_balanced": is_balanced,
                 "balance_ratio": max_cluster_pct / min_cluster_pct if min_cluster_pct > 0 else float('inf'),
-                "inertia": float(kmeans.inertia_),  # Soma das distâncias quadradas aos centróides
+                "inertia": clustering.metadata["inertia"],  # Soma das distâncias quadradas aos centróides
+                "quality_metrics": clustering.quality_metrics,
                 "interpretation": self._interpret_clustering_results(
                     cluster_distribution,
                     cluster_percentages,
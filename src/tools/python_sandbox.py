@@ -0,0 +1,462 @@
+"""Execução de código Python gerado por LLM em processos isolados e pré-aquecidos.
+
+``PythonDataAnalyzer.execute_safe_python`` e ``RAGDataAgent`` executavam o
+código com ``exec`` no processo da API, trocando o ``sys.stdout`` global
+(inseguro com requisições concorrentes) e sem limite de tempo ou memória.
+Aqui cada trecho roda num processo do pool:
+
+- processos criados pelo forkserver com pandas/numpy já importados (o fork
+  custa milissegundos; sem o forkserver, ``spawn``);
+- o dataset ativo (Parquet do snapshot/sidecar, lido com memory-map) fica
+  carregado no processo entre execuções, identificado por caminho, mtime e
+  tamanho (``dataset_ref``); cada trecho recebe uma cópia própria como ``df``;
+- um trecho por vez, sob ``RLIMIT_CPU`` e ``RLIMIT_AS`` (o Linux não aplica
+  ``RLIMIT_RSS``; o limite de memória vale sobre o espaço de endereços além
+  do já ocupado pelo processo) e um timeout de relógio no processo da API,
+  que mata o processo travado;
+- stdout e resultado voltam como dados estruturados (``SandboxResult``);
+- processos são reciclados após ``PYTHON_SANDBOX_MAX_RUNS`` execuções,
+  timeout, estouro de CPU ou morte do processo; o substituto já começa a
+  subir enquanto a resposta volta.
+
+Com ``PYTHON_SANDBOX_WORKERS=0`` o código roda no próprio processo (sem
+limites), serializado por um lock.
+
+O isolamento é de recursos (rlimits, timeout e processo descartável), não de
+permissões: a lista de imports e builtins só evita erros comuns do código
+gerado. Objetos do pandas/numpy alcançam ``os`` (ex.: ``pd.io.common.os``),
+e o processo tem o mesmo usuário e sistema de arquivos da API.
+"""
+from __future__ import annotations
+
+import builtins
+import contextlib
+import io
+import multiprocessing
+import os
+import pickle
+import queue
+import signal
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows: sem rlimits, só o timeout
+    resource = None
+
+from src.settings import (
+    PYTHON_SANDBOX_CPU_SECONDS,
+    PYTHON_SANDBOX_MAX_RUNS,
+    PYTHON_SANDBOX_MEMORY_MB,
+    PYTHON_SANDBOX_TIMEOUT,
+    PYTHON_SANDBOX_WORKERS,
+)
+from src.utils.logging_config import get_logger
+
+logger = get_logger("tools.python_sandbox")
+
+# Módulos que o código pode importar e builtins disponíveis (higiene, não segurança)
+ALLOWED_MODULES = frozenset({
+    'pandas', 'numpy', 'math', 'statistics', 'datetime', 'json',
+    'collections', 're', 'itertools', 'functools',
+})
+SAFE_BUILTINS = (
+    'len', 'sum', 'min', 'max', 'abs', 'round', 'sorted', 'divmod', 'pow',
+    'enumerate', 'zip', 'range', 'list', 'dict', 'tuple', 'set', 'frozenset', 'slice',
+    'str', 'int', 'float', 'bool', 'complex', 'bytes', 'chr', 'ord', 'print',
+    'format', 'repr', 'hash', 'iter', 'next', 'callable',
+    'isinstance', 'issubclass', 'type', 'getattr', 'hasattr', 'setattr', 'vars',
+    'any', 'all', 'map', 'filter', 'reversed',
+    # definição de classes
+    '__build_class__', 'object', 'super', 'property', 'staticmethod', 'classmethod',
+    # exceções padrão (levantadas pelo pandas e capturadas pelo código gerado)
+    'BaseException', 'Exception', 'ArithmeticError', 'AssertionError', 'AttributeError',
+    'FloatingPointError', 'IndexError', 'KeyError', 'LookupError', 'NameError',
+    'NotImplementedError', 'OverflowError', 'RuntimeError', 'StopIteration', 'TypeError',
+    'ValueError', 'ZeroDivisionError', 'Warning', 'UserWarning', 'RuntimeWarning',
+    'FutureWarning', 'DeprecationWarning',
+)
+MAX_OUTPUT_CHARS = 100_000
+MAX_RESULT_BYTES = 16 * 1024 * 1024
+
+# ('parquet' | 'csv', caminho, identidade do arquivo): dataset carregado no
+# processo e exposto como ``df``; um arquivo regravado no mesmo caminho muda a identidade
+DatasetRef = Tuple[str, str, str]
+
+
+@dataclass
+class SandboxResult:
+    """Resultado de um trecho executado no sandbox."""
+    success: bool
+    result: Any
+    output: str
+    error: Optional[str] = None
+    execution_time: float = 0.0
+    timed_out: bool = False
+    worker_pid: Optional[int] = None
+
+
+class SandboxLimitExceeded(Exception):
+    """Trecho excedeu o limite de CPU do processo."""
+
+
+# ============================================================================
+# PROCESSO DE EXECUÇÃO
+# ============================================================================
+
+def _safe_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name.split('.')[0] not in ALLOWED_MODULES:
+        raise ImportError(f"Importação não permitida no sandbox: {name}")
+    return builtins.__import__(name, globals, locals, fromlist, level)
+
+
+def _safe_builtins() -> Dict[str, Any]:
+    safe = {name: getattr(builtins, name) for name in SAFE_BUILTINS}
+    safe['__import__'] = _safe_import
+    return safe
+
+
+def dataset_ref(kind: str, path: Union[str, Path]) -> DatasetRef:
+    """Referência do dataset com mtime (ns) e tamanho do arquivo."""
+    stat = os.stat(path)
+    return kind, str(path), f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def load_dataset(ref: DatasetRef) -> pd.DataFrame:
+    """Carrega o dataset referenciado (Parquet com memory-map ou CSV via cache de frames)."""
+    kind, path = ref[0], ref[1]
+    if kind == 'parquet':
+        return pd.read_parquet(path, memory_map=True)
+    if kind == 'csv':
+        from src.data.csv_frame_cache import get_csv_frame_cache
+        return get_csv_frame_cache().load(path)
+    raise ValueError(f"Tipo de dataset desconhecido: {kind}")
+
+
+def _vm_bytes() -> int:
+    """Espaço de endereços atual do processo (Linux)."""
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return 0
+
+
+def _set_limits(cpu_seconds: float, memory_bytes: int) -> None:
+    """Limites do próximo trecho, relativos ao que o processo já consumiu."""
+    if resource is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = usage.ru_utime + usage.ru_stime
+    _, cpu_hard = resource.getrlimit(resource.RLIMIT_CPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (int(used + cpu_seconds) + 1, cpu_hard))
+    if memory_bytes > 0:
+        _, as_hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (_vm_bytes() + memory_bytes, as_hard))
+
+
+def _clear_limits() -> None:
+    if resource is None:
+        return
+    for limit in (resource.RLIMIT_CPU, resource.RLIMIT_AS):
+        _, hard = resource.getrlimit(limit)
+        resource.setrlimit(limit, (hard, hard))
+
+
+def _on_cpu_limit(signum, frame):
+    raise SandboxLimitExceeded("Limite de CPU do sandbox excedido")
+
+
+def execute_snippet(code: str, frame: Optional[pd.DataFrame], context: Optional[Dict[str, Any]],
+                    result_var: str) -> Dict[str, Any]:
+    """Executa o trecho num namespace restrito e devolve saída e resultado serializáveis.
+
+    ``frame`` vira ``df`` sem cópia: quem chama entrega um DataFrame que o
+    trecho pode alterar (``working_copy``).
+    """
+    namespace: Dict[str, Any] = {'__builtins__': _safe_builtins(), '__name__': '__sandbox__',
+                                 'pd': pd, 'np': np}
+    if frame is not None:
+        namespace['df'] = frame
+    if context:
+        namespace.update(context)
+
+    output = io.StringIO()
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output):
+            exec(compile(code, '<sandbox>', 'exec'), namespace)
+        result = namespace.get(result_var)
+        success, error = True, None
+    except MemoryError:
+        result, success, error = None, False, "Erro na execução: limite de memória do sandbox excedido"
+    except SandboxLimitExceeded:
+        raise
+    except Exception as e:
+        result, success = None, False
+        error = f"Erro na execução: {e}\n{traceback.format_exc()}"
+    elapsed = time.perf_counter() - started
+
+    if success:
+        try:
+            if len(pickle.dumps(result)) > MAX_RESULT_BYTES:
+                result, success, error = None, False, "Resultado grande demais para o sandbox"
+        except Exception:
+            result = repr(result)
+    text = output.getvalue()
+    if len(text) > MAX_OUTPUT_CHARS:
+        text = text[:MAX_OUTPUT_CHARS] + "\n... (saída truncada)"
+    return {'success': success, 'result': result, 'output': text, 'error': error,
+            'execution_time': elapsed}
+
+
+def working_copy(frame: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """Cópia gravável do dataset para um trecho.
+
+    Os frames em cache (Parquet com memory-map, snapshots somente leitura)
+    continuam intactos para as próximas execuções, e escritas in-place do código
+    gerado (``df.loc[...] = ...``) funcionam.
+    """
+    return frame.copy() if frame is not None else None
+
+
+def _worker_main(conn, cpu_seconds: float, memory_bytes: int) -> None:
+    """Laço do processo de execução: uma tarefa por vez até receber None."""
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+    loaded_ref: Optional[DatasetRef] = None
+    frame: Optional[pd.DataFrame] = None
+    conn.send({'ready': os.getpid()})
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        ref = task.get('dataset')
+        try:
+            if ref is not None and tuple(ref) != loaded_ref:
+                frame, loaded_ref = None, None
+                frame, loaded_ref = load_dataset(ref), tuple(ref)
+                conn.send({'loaded': loaded_ref})
+            # cópia fora dos limites do trecho: o orçamento de memória vale para o código gerado
+            df = working_copy(frame) if ref is not None else None
+            _set_limits(cpu_seconds, memory_bytes)
+            try:
+                reply = execute_snippet(task['code'], df, task.get('context'), task.get('result_var', 'result'))
+            finally:
+                _clear_limits()
+                df = None
+        except SandboxLimitExceeded as e:
+            reply = {'success': False, 'result': None, 'output': '', 'error': str(e),
+                     'execution_time': 0.0, 'recycle': True}
+        except Exception as e:
+            reply = {'success': False, 'result': None, 'output': '',
+                     'error': f"Falha ao preparar o sandbox: {e}", 'execution_time': 0.0}
+        conn.send(reply)
+
+
+# ============================================================================
+# POOL
+# ============================================================================
+
+def _context():
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context('forkserver')
+        ctx.set_forkserver_preload(['numpy', 'pandas', __name__])
+        return ctx
+    return multiprocessing.get_context('spawn')
+
+
+class _Worker:
+    def __init__(self, ctx, cpu_seconds: float, memory_bytes: int):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, cpu_seconds, memory_bytes),
+                                   daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.runs = 0
+        self.ready = False
+        self.dataset: Optional[DatasetRef] = None
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid
+
+    def wait_ready(self, timeout: float) -> None:
+        if not self.ready:
+            if not self.conn.poll(timeout):
+                raise TimeoutError("Processo do sandbox não iniciou a tempo")
+            self.conn.recv()
+            self.ready = True
+
+    def kill(self) -> None:
+        with contextlib.suppress(Exception):
+            self.process.kill()
+            self.process.join(1)
+        with contextlib.suppress(Exception):
+            self.conn.close()
+
+    def stop(self) -> None:
+        with contextlib.suppress(Exception):
+            self.conn.send(None)
+            self.process.join(1)
+        if self.process.is_alive():
+            self.kill()
+        with contextlib.suppress(Exception):
+            self.conn.close()
+
+
+class PythonSandboxPool:
+    """
+    Pool de processos que executam trechos de código sob limites.
+
+    Args:
+        size: Número de processos
+        timeout: Tempo de relógio por trecho (segundos)
+        cpu_seconds: Tempo de CPU por trecho
+        memory_mb: Memória adicional por trecho (MB; 0 = sem limite)
+        max_runs: Execuções por processo antes de reciclá-lo
+    """
+
+    STARTUP_TIMEOUT = 60.0
+
+    def __init__(self, size: int = PYTHON_SANDBOX_WORKERS,
+                 timeout: float = PYTHON_SANDBOX_TIMEOUT,
+                 cpu_seconds: float = PYTHON_SANDBOX_CPU_SECONDS,
+                 memory_mb: int = PYTHON_SANDBOX_MEMORY_MB,
+                 max_runs: int = PYTHON_SANDBOX_MAX_RUNS):
+        self.size = size
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_mb * 1024 * 1024
+        self.max_runs = max_runs
+        self._ctx = _context()
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {"runs": 0, "timeouts": 0, "crashes": 0, "recycled": 0}
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self.cpu_seconds, self.memory_bytes)
+
+    def _replace(self, worker: _Worker, kill: bool) -> None:
+        """Descarta o processo e coloca um novo (já iniciando) no lugar."""
+        worker.kill() if kill else worker.stop()
+        if not self._closed:
+            self._idle.put(self._spawn())
+
+    def run(self, code: str, dataset: Optional[DatasetRef] = None,
+            context: Optional[Dict[str, Any]] = None, result_var: str = 'result',
+            timeout: Optional[float] = None) -> SandboxResult:
+        """
+        Executa um trecho num processo do pool.
+
+        Args:
+            code: Código Python
+            dataset: Dataset exposto como ``df`` (mantido carregado no processo)
+            context: Variáveis adicionais (serializadas a cada chamada)
+            result_var: Variável lida como resultado
+            timeout: Tempo de relógio (padrão: o do pool)
+        """
+        timeout = self.timeout if timeout is None else timeout
+        worker = self._idle.get()
+        started = time.perf_counter()
+        try:
+            worker.wait_ready(self.STARTUP_TIMEOUT)
+            worker.conn.send({'code': code, 'dataset': dataset, 'context': context,
+                              'result_var': result_var})
+            reply = None
+            if dataset is not None and tuple(dataset) != worker.dataset:
+                # carga do dataset fica fora do timeout do trecho
+                if not worker.conn.poll(self.STARTUP_TIMEOUT):
+                    raise TimeoutError("Dataset não carregado a tempo")
+                reply = worker.conn.recv()
+                if 'loaded' in reply:
+                    worker.dataset, reply = tuple(reply['loaded']), None
+            if reply is None and not worker.conn.poll(timeout):
+                self.stats["timeouts"] += 1
+                logger.warning(f"Trecho excedeu {timeout:g}s no sandbox (pid {worker.pid}); processo descartado")
+                self._replace(worker, kill=True)
+                return SandboxResult(False, None, '', error=f"Tempo limite de {timeout:g}s excedido",
+                                     execution_time=time.perf_counter() - started, timed_out=True,
+                                     worker_pid=worker.pid)
+            if reply is None:
+                reply = worker.conn.recv()
+        except (EOFError, OSError, TimeoutError) as e:
+            # processo morreu (ex.: sinal de CPU/memória) ou não subiu
+            self.stats["crashes"] += 1
+            logger.warning(f"Processo do sandbox (pid {worker.pid}) falhou: {e or type(e).__name__}")
+            self._replace(worker, kill=True)
+            return SandboxResult(False, None, '', error="Processo do sandbox encerrado durante a execução",
+                                 execution_time=time.perf_counter() - started, worker_pid=worker.pid)
+
+        self.stats["runs"] += 1
+        worker.runs += 1
+        if reply.pop('recycle', False) or worker.runs >= self.max_runs:
+            self.stats["recycled"] += 1
+            self._replace(worker, kill=False)
+        else:
+            self._idle.put(worker)
+        return SandboxResult(worker_pid=worker.pid, **reply)
+
+    def close(self) -> None:
+        """Encerra todos os processos ociosos."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                return
+
+
+_pool: Optional[PythonSandboxPool] = None
+_pool_lock = threading.Lock()
+_inline_lock = threading.Lock()
+
+
+def get_python_sandbox() -> Optional[PythonSandboxPool]:
+    """Pool compartilhado do processo (None quando PYTHON_SANDBOX_WORKERS <= 0)."""
+    global _pool
+    if PYTHON_SANDBOX_WORKERS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PythonSandboxPool()
+    return _pool
+
+
+def run_python(code: str, dataset: Optional[DatasetRef] = None, frame: Optional[pd.DataFrame] = None,
+               context: Optional[Dict[str, Any]] = None, result_var: str = 'result') -> SandboxResult:
+    """
+    Executa código no sandbox compartilhado (ou no próprio processo, se desativado).
+
+    Args:
+        code: Código Python
+        dataset: Dataset carregado pelo processo do sandbox como ``df``
+        frame: DataFrame já em memória (usado sem ``dataset``; copiado para o processo)
+        context: Variáveis adicionais
+        result_var: Variável lida como resultado
+    """
+    pool = get_python_sandbox()
+    if pool is None:
+        if frame is None and dataset is not None:
+            frame = load_dataset(dataset)
+        with _inline_lock:
+            reply = execute_snippet(code, working_copy(frame), context, result_var)
+        return SandboxResult(worker_pid=os.getpid(), **reply)
+    if dataset is None and frame is not None:
+        context = dict(context or {}, df=frame)
+    return pool.run(code, dataset=dataset, context=context, result_var=result_var)
@@ -7,45 +7,77 @@ from agent.rag_data_agent import RAGDataAgent
 def make_df_temporal(cols, values):
     return pd.DataFrame({col: val for col, val in zip(cols, values)})
 
-def test_detect_no_temporal():
+def test_detect_no_temporal(tmp_path):
     df = make_df_temporal(['A', 'B'], [[1,2,3],[4,5,6]])
-    df.to_csv('temp_none.csv', index=False)
+    csv_path = str(tmp_path / 'temp_none.csv')
+    df.to_csv(csv_path, index=False)
     agent = RAGDataAgent()
-    result = agent._analisar_completo_csv('temp_none.csv', 'média', override_temporal_col=None)
+    result = agent._analisar_completo_csv(csv_path, 'média', override_temporal_col=None)
     assert 'Resumo estatístico' in result or 'Média' in result
 
-def test_detect_single_temporal():
+def test_detect_single_temporal(tmp_path):
     df = make_df_temporal(['data'], [pd.date_range('2020-01-01', periods=3)])
-    df.to_csv('temp_single.csv', index=False)
+    csv_path = str(tmp_path / 'temp_single.csv')
+    df.to_csv(csv_path, index=False)
     agent = RAGDataAgent()
-    result = agent._analisar_completo_csv('temp_single.csv', 'análise temporal')
+    result = agent._analisar_completo_csv(csv_path, 'análise temporal')
     assert 'dimensão temporal' in result
 
-def test_detect_multiple_temporal():
+def test_detect_multiple_temporal(tmp_path):
     df = make_df_temporal(['data', 'timestamp'], [pd.date_range('2020-01-01', periods=3), pd.date_range('2021-01-01', periods=3)])
-    df.to_csv('temp_multi.csv', index=False)
+    csv_path = str(tmp_path / 'temp_multi.csv')
+    df.to_csv(csv_path, index=False)
     agent = RAGDataAgent()
-    result = agent._analisar_completo_csv('temp_multi.csv', 'análise temporal')
+    result = agent._analisar_completo_csv(csv_path, 'análise temporal')
     assert result.count('dimensão temporal') == 2
 
-def test_override_manual():
+def test_override_manual(tmp_path):
     df = make_df_temporal(['A', 'B', 'tempo'], [[1,2,3],[4,5,6], pd.date_range('2022-01-01', periods=3)])
-    df.to_csv('temp_override.csv', index=False)
+    csv_path = str(tmp_path / 'temp_override.csv')
+    df.to_csv(csv_path, index=False)
     agent = RAGDataAgent()
-    result = agent._analisar_completo_csv('temp_override.csv', 'análise temporal', override_temporal_col='tempo')
+    result = agent._analisar_completo_csv(csv_path, 'análise temporal', override_temporal_col='tempo')
     assert 'tempo' in result
 
-def test_convertible_temporal():
+def test_convertible_temporal(tmp_path):
     df = make_df_temporal(['str_date'], [['2023-01-01','2023-01-02','2023-01-03']])
-    df.to_csv('temp_convert.csv', index=False)
+    csv_path = str(tmp_path / 'temp_convert.csv')
+    df.to_csv(csv_path, index=False)
     agent = RAGDataAgent()
-    result = agent._analisar_completo_csv('temp_convert.csv', 'análise temporal')
+    result = agent._analisar_completo_csv(csv_path, 'análise temporal')
     assert 'str_date' in result
 
-def test_invalid_temporal():
+def test_invalid_temporal(tmp_path):
     df = make_df_temporal(['bad_date'], [['foo','bar','baz']])
-    df.to_csv('temp_invalid.csv', index=False)
+    csv_path = str(tmp_path / 'temp_invalid.csv')
+    df.to_csv(csv_path, index=False)
     agent = RAGDataAgent()
-    result = agent._analisar_completo_csv('temp_invalid.csv', 'análise temporal')
+    result = agent._analisar_completo_csv(csv_path, 'análise temporal')
     # Deve retornar análise estatística geral (sem colunas temporais detectadas)
     assert 'Resumo estatístico' in result or 'Média' in result or 'estatísticas gerais' in result
+
+def test_coluna_texto_convertida_com_formato_detectado(tmp_path, monkeypatch):
+    from src.analysis import temporal_detection
+    from src.analysis.temporal_analyzer import TemporalAnalyzer
+
+    chamadas, dtypes = [], []
+    parse_original = temporal_detection._parse_fixed_width
+    def parse_espiao(values, fmt):
+        chamadas.append(fmt)
+        return parse_original(values, fmt)
+    analyze_original = TemporalAnalyzer.analyze
+    def analyze_espiao(self, df, col, **kwargs):
+        dtypes.append(df[col].dtype)
+        return analyze_original(self, df, col, **kwargs)
+    monkeypatch.setattr(temporal_detection, '_parse_fixed_width', parse_espiao)
+    monkeypatch.setattr(TemporalAnalyzer, 'analyze', analyze_espiao)
+
+    datas = pd.date_range('2024-01-01', periods=40, freq='D').strftime('%d/%m/%Y %H:%M:%S')
+    df = make_df_temporal(['data_emissao', 'valor'], [datas, range(40)])
+    csv_path = str(tmp_path / 'temp_nfe.csv')
+    df.to_csv(csv_path, index=False)
+    # Sem LLM: só a análise determinística do CSV é exercitada
+    agent = RAGDataAgent.__new__(RAGDataAgent)
+    agent._analisar_completo_csv(csv_path, 'análise temporal')
+    assert chamadas == ['%d/%m/%Y %H:%M:%S']
+    assert dtypes and all(pd.api.types.is_datetime64_any_dtype(d) for d in dtypes)
@@ -0,0 +1,63 @@
+"""
+Testes do caminho escalável do analisador de clustering (MiniBatchKMeans,
+amostra estratificada com propagação de rótulos e silhouette amostral).
+
+Autor: EDA AI Minds Team
+Data: 2025-10-19
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from sklearn.datasets import make_blobs
+
+from analysis.clustering_analyzer import ClusteringAnalyzer
+
+
+class TestScalableClustering:
+    """Testes para datasets acima do limite do caminho exato."""
+
+    @pytest.fixture
+    def df(self):
+        """Fixture: 4 grupos bem separados."""
+        X, _ = make_blobs(n_samples=6000, n_features=3, centers=4, cluster_std=0.4, random_state=0)
+        return pd.DataFrame(X, columns=['a', 'b', 'c'])
+
+    @pytest.fixture
+    def analyzer(self):
+        """Fixture: limites reduzidos para exercitar o caminho escalável."""
+        return ClusteringAnalyzer(
+            large_dataset_rows=1000,
+            sample_size=800,
+            silhouette_sample_size=500,
+            n_jobs=1
+        )
+
+    @pytest.mark.parametrize("method", ["kmeans", "hierarchical", "dbscan"])
+    def test_large_path_labels_every_point(self, analyzer, df, method):
+        result = analyzer.analyze(df, n_clusters=4, method=method, scale_features=False)
+
+        assert result.metadata['scalable_path']
+        assert len(result.cluster_labels) == len(df)
+        assert result.n_clusters == 4
+        non_noise = sorted(size for label, size in result.cluster_distribution.items() if label != -1)
+        assert non_noise[0] > len(df) * 0.2
+
+    def test_sample_fit_propagates_labels(self, analyzer, df):
+        result = analyzer.analyze(df, n_clusters=4, method='hierarchical', scale_features=False)
+
+        assert result.metadata['label_propagation'] == 'nearest_centroid'
+        assert result.metadata['fit_sample_points'] < len(df)
+
+    def test_sampled_silhouette_has_confidence_interval(self, analyzer, df):
+        metrics = analyzer.analyze(df, n_clusters=4, scale_features=False).quality_metrics
+
+        assert metrics['silhouette_ci95_low'] <= metrics['silhouette_score'] <= metrics['silhouette_ci95_high']
+        assert metrics['silhouette_score'] > 0.7
+
+    def test_automatic_k_selection(self, analyzer, df):
+        result = analyzer.analyze(df, n_clusters=None, scale_features=False)
+
+        assert result.metadata['k_selection']['best_k'] == 4
+        assert result.n_clusters == 4
+        assert [s['k'] for s in result.metadata['k_selection']['scores']] == list(range(2, 11))
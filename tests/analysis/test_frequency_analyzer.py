@@ -0,0 +1,86 @@
+"""
+Testes do analisador de frequência: contagem única compartilhada, caminho
+com sketches (heavy hitters, Count-Min, HyperLogLog) e conversão categórica.
+
+Autor: EDA AI Minds Team
+Data: 2025-10-19
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from analysis.frequency_analyzer import FrequencyAnalyzer
+from analysis.frequency_sketches import HyperLogLog, hash_values, to_categorical
+
+
+class TestFrequencyAnalyzer:
+    """Testes para analisador de frequência."""
+
+    @pytest.fixture
+    def df(self):
+        """Fixture: NCMs com distribuição de cauda longa e UF com ausentes."""
+        rng = np.random.default_rng(3)
+        n = 40_000
+        return pd.DataFrame({
+            'ncm': (rng.zipf(1.4, n) % 20_000).astype(str),
+            'uf': rng.choice(['SP', 'MG', 'RJ', None], n),
+        })
+
+    def test_exact_path_matches_value_counts(self, df):
+        result = FrequencyAnalyzer().analyze(df)
+        counts = df['ncm'].value_counts()
+
+        assert not result.metadata['approximate']
+        assert result.mode_stats['ncm']['mode_count'] == counts.iloc[0]
+        assert result.value_counts['ncm']['unique_values'] == df['ncm'].nunique()
+        assert result.value_counts['uf']['null_count'] == df['uf'].isna().sum()
+        assert result.rarity_analysis['ncm']['rare_values_count'] == int((counts / len(df) < 0.01).sum())
+
+    def test_categorical_conversion_keeps_results(self, df):
+        plain = FrequencyAnalyzer().analyze(df)
+        converted = FrequencyAnalyzer().analyze(df, categorical=True)
+
+        assert converted.metadata['categorical_bytes_saved']['uf'] > 0
+        assert converted.rarity_analysis == plain.rarity_analysis
+        assert converted.mode_stats == plain.mode_stats
+
+    def test_sketch_path_reports_bounded_errors(self, df):
+        exact = df['ncm'].value_counts()
+        result = FrequencyAnalyzer(sketch_rows_threshold=0, block_rows=5000, sketch_capacity=200).analyze(df)
+        approximation = result.metadata['approximation']['ncm']
+        table = result.frequency_tables['ncm']
+
+        assert result.metadata['approximate']
+        assert approximation['count_max_error'] <= len(df) / 201
+        for value, count, error in zip(table['Valor'], table['Frequência'], table['Erro (±)']):
+            assert abs(count - exact[value]) <= error + 1
+        assert list(table['Valor'][:3]) == list(exact.index[:3])
+        distinct = result.value_counts['ncm']['unique_values']
+        assert abs(distinct - exact.size) <= 4 * approximation['distinct_relative_error'] * exact.size
+        assert result.value_counts['uf']['null_count'] == df['uf'].isna().sum()
+
+    def test_stream_of_chunks(self, df):
+        chunks = (df.iloc[start:start + 7000] for start in range(0, len(df), 7000))
+        result = FrequencyAnalyzer().analyze_stream(chunks, ['uf'])
+
+        assert result.metadata['total_rows'] == len(df)
+        assert result.mode_stats['uf']['mode_count'] == df['uf'].value_counts().iloc[0]
+
+
+def test_hyperloglog_merge_is_union():
+    left, right = HyperLogLog(), HyperLogLog()
+    left.update(hash_values(pd.Series(np.arange(0, 60_000))))
+    right.update(hash_values(pd.Series(np.arange(40_000, 100_000))))
+    left.merge(right)
+
+    assert left.count() == pytest.approx(100_000, rel=4 * left.relative_error)
+
+
+def test_to_categorical_skips_high_cardinality():
+    df = pd.DataFrame({'id': [str(i) for i in range(100)], 'uf': ['SP', 'RJ'] * 50})
+    converted, savings = to_categorical(df)
+
+    assert list(savings) == ['uf']
+    assert isinstance(converted['uf'].dtype, pd.CategoricalDtype)
+    assert converted['id'].dtype == object
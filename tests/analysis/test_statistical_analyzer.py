@@ -0,0 +1,92 @@
+"""
+Testes do analisador estatístico em passagem única (momentos de Welford e
+sketch de quantis combinável).
+
+Autor: EDA AI Minds Team
+Data: 2025-10-19
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from scipy import stats as scipy_stats
+
+from analysis.statistical_analyzer import StatisticalAnalyzer
+from analysis.streaming_statistics import QuantileSketch
+
+
+class TestStatisticalAnalyzer:
+    """Testes para o analisador estatístico."""
+
+    @pytest.fixture
+    def df(self):
+        """Fixture: dados com ausentes e distribuições distintas."""
+        rng = np.random.default_rng(42)
+        df = pd.DataFrame({
+            'normal': rng.normal(50, 10, 900),
+            'discreta': rng.integers(0, 6, 900).astype(float),
+            'exponencial': rng.exponential(3, 900),
+        })
+        df.loc[::9, 'normal'] = np.nan
+        return df
+
+    def test_small_data_matches_pandas(self, df):
+        """Abaixo da capacidade do sketch, os resultados são exatos."""
+        result = StatisticalAnalyzer(block_rows=128).analyze(df)
+        series = df['normal'].dropna()
+
+        assert result.metadata['quantiles_exact']
+        assert result.summary_stats['normal']['count'] == len(series)
+        assert result.summary_stats['normal']['mean'] == pytest.approx(series.mean())
+        assert result.summary_stats['normal']['std'] == pytest.approx(series.std())
+        assert result.variability_stats['normal']['iqr'] == pytest.approx(
+            series.quantile(0.75) - series.quantile(0.25)
+        )
+        assert result.position_stats['discreta']['mode'] == df['discreta'].mode().iloc[0]
+        assert result.distribution_stats['exponencial']['skewness'] == pytest.approx(
+            scipy_stats.skew(df['exponencial'])
+        )
+        assert result.distribution_stats['exponencial']['kurtosis'] == pytest.approx(
+            scipy_stats.kurtosis(df['exponencial'])
+        )
+        assert result.distribution_stats['discreta']['unique_values'] == 6
+
+    def test_merged_states_equal_single_pass(self, df):
+        """Estados de partes combinados equivalem a uma análise do todo."""
+        analyzer = StatisticalAnalyzer()
+        state = analyzer.accumulate(df.iloc[:400])
+        state.merge(analyzer.accumulate(df.iloc[400:700]))
+        analyzer.accumulate(df.iloc[700:], state=state)
+
+        merged = analyzer.analyze_state(state)
+        full = analyzer.analyze(df)
+
+        assert merged.metadata['total_rows'] == len(df)
+        for col in df.columns:
+            for key, value in full.summary_stats[col].items():
+                assert merged.summary_stats[col][key] == pytest.approx(value)
+            assert merged.distribution_stats[col]['kurtosis'] == pytest.approx(
+                full.distribution_stats[col]['kurtosis']
+            )
+
+    def test_large_data_quantiles_within_error_bounds(self):
+        """Quantis aproximados ficam dentro dos limites reportados."""
+        rng = np.random.default_rng(0)
+        values = rng.lognormal(0, 1, 200_000)
+        result = StatisticalAnalyzer(sketch_k=256).analyze(pd.DataFrame({'v': values}))
+        bounds = result.metadata['quantile_error_bounds']['v']
+
+        assert not result.metadata['quantiles_exact']
+        assert 0 < bounds['rank_error_%'] < 2
+        for q, (low, high) in bounds['bounds'].items():
+            assert low <= np.quantile(values, float(q)) <= high
+        assert result.summary_stats['v']['median'] == pytest.approx(np.median(values), rel=0.02)
+
+    def test_sketch_memory_is_bounded(self):
+        """O sketch guarda O(k log n) itens, não os dados."""
+        sketch = QuantileSketch(k=128, seed=1)
+        for block in np.array_split(np.arange(100_000, dtype=float), 50):
+            sketch.update(block)
+
+        assert sketch.n == 100_000
+        assert sum(len(level) for level in sketch.levels) <= 128 * len(sketch.levels)
@@ -18,6 +18,7 @@ from analysis.temporal_analyzer import (
     TrendType,
     SeasonalityType
 )
+from analysis.temporal_vectorized import fft_autocorrelation, linear_trend, resample_series
 
 
 class TestTemporalAnalyzer:
@@ -368,3 +369,111 @@ class TestTemporalAnalysisResult:
         assert 'Teste de interpretação' in markdown
         assert 'Recomendação 1' in markdown
         assert 'Recomendação 2' in markdown
+
+
+class TestMultiSeriesTemporal:
+    """Testes para a análise vetorizada de várias séries."""
+    
+    @pytest.fixture
+    def matrix(self):
+        """Fixture: 3 anos diários com tendência, ciclo semanal, ciclo anual e ruído."""
+        rng = np.random.default_rng(7)
+        index = pd.date_range('2022-01-01', periods=1096, freq='D')
+        t = np.arange(len(index))
+        matrix = pd.DataFrame({
+            'tendencia': 0.5 * t + rng.normal(0, 5, len(t)),
+            'semanal': 10 * (index.dayofweek < 5) + rng.normal(0, 1, len(t)),
+            'anual': 10 * np.sin(2 * np.pi * t / 365.25) + rng.normal(0, 1, len(t)),
+            'ruido': rng.normal(0, 1, len(t)),
+        }, index=index)
+        matrix.iloc[400, 3] = 40
+        matrix.iloc[100:130, 2] = np.nan
+        return matrix
+    
+    def test_matrix_matches_per_series_analysis(self, matrix):
+        analyzer = TemporalAnalyzer()
+        series = analyzer.analyze_matrix(matrix).series
+        
+        for col in ['tendencia', 'ruido']:
+            single = analyzer.analyze(matrix.reset_index(drop=True), col)
+            assert series.loc[col, 'trend'] == single.trend['type']
+            assert series.loc[col, 'slope'] == pytest.approx(single.trend['slope'])
+            assert series.loc[col, 'r2_score'] == pytest.approx(single.trend['r2_score'])
+            assert series.loc[col, 'lag1'] == pytest.approx(single.autocorrelation['lag1'])
+    
+    def test_dominant_periods(self, matrix):
+        series = TemporalAnalyzer().analyze_matrix(matrix).series
+        
+        assert series.loc['semanal', 'seasonal_period'] == 7
+        assert series.loc['semanal', 'seasonality'] == SeasonalityType.SEMANAL.value
+        assert series.loc['anual', 'seasonality'] == SeasonalityType.ANUAL.value
+        assert not series.loc['ruido', 'seasonality_detected']
+        assert not series.loc['tendencia', 'seasonality_detected']
+    
+    def test_mad_anomalies(self, matrix):
+        result = TemporalAnalyzer().analyze_matrix(matrix)
+        
+        assert result.series.loc['ruido', 'anomaly_count'] >= 1
+        assert abs(result.anomaly_scores['ruido'].iloc[400]) > 10
+        assert result.anomaly_scores['anual'].iloc[100:130].isna().all()
+    
+    def test_analyze_many_from_irregular_timestamps(self):
+        rng = np.random.default_rng(3)
+        n = 5000
+        df = pd.DataFrame({
+            'data_emissao': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.uniform(0, 60, n), unit='D'),
+            'uf': rng.choice(['SP', 'MG', 'RJ'], n),
+            'valor_total': rng.gamma(2.0, 100.0, n),
+        })
+        result = TemporalAnalyzer().analyze_many(df, 'data_emissao', ['valor_total'], group_col='uf')
+        
+        assert list(result.series.index) == ['MG', 'RJ', 'SP']
+        assert result.metadata['periods'] == 60
+        assert result.freq == 'D'
+        assert result.series['observations'].tolist() == [60, 60, 60]
+        assert '# Análise Temporal de Múltiplas Séries' in result.to_markdown()
+
+
+def test_resample_fills_empty_periods():
+    df = pd.DataFrame({
+        'data_emissao': ['2024-01-01 10:00', '2024-01-01 18:30', '2024-01-04 09:00'],
+        'valor': [10.0, 5.0, 7.0],
+    })
+    total = resample_series(df, 'data_emissao', ['valor'])
+    mean = resample_series(df, 'data_emissao', ['valor'], agg='mean')
+    weekly = resample_series(df, 'data_emissao', ['valor'], freq='W')
+    
+    assert total['valor'].tolist() == [15.0, 0.0, 0.0, 7.0]
+    assert mean['valor'].iloc[0] == 7.5 and np.isnan(mean['valor'].iloc[1])
+    assert weekly['valor'].tolist() == [22.0]
+    assert weekly.index[0] == pd.Timestamp('2024-01-07')  # semana terminando no domingo
+
+
+def test_resample_le_datas_ambiguas_como_o_detector():
+    df = pd.DataFrame({
+        'data_emissao': ['01/02/2024 10:00:00', '01/02/2024 18:30:00', '03/02/2024 09:00:00'],
+        'valor': [10.0, 5.0, 7.0],
+    })
+    total = resample_series(df, 'data_emissao', ['valor'])
+    many = TemporalAnalyzer().analyze_many(df, 'data_emissao', ['valor'])
+    
+    assert list(total.index) == list(pd.date_range('2024-02-01', '2024-02-03'))
+    assert total['valor'].tolist() == [15.0, 0.0, 7.0]
+    assert many.metadata['periods'] == 3
+    us = resample_series(df, 'data_emissao', ['valor'], dayfirst=False)
+    assert us.index[0] == pd.Timestamp('2024-01-02')
+
+
+def test_kernels_match_reference():
+    rng = np.random.default_rng(0)
+    values = np.cumsum(rng.normal(size=(300, 4)), axis=0)
+    fit = linear_trend(values)
+    acf = fft_autocorrelation(values, max_lag=40)
+    
+    for j in range(values.shape[1]):
+        slope, intercept = np.polyfit(np.arange(300), values[:, j], 1)
+        assert fit['slope'][j] == pytest.approx(slope)
+        assert fit['intercept'][j] == pytest.approx(intercept)
+        centered = values[:, j] - values[:, j].mean()
+        reference = np.correlate(centered, centered, 'full')[299:340] / np.dot(centered, centered)
+        assert acf[:, j] == pytest.approx(reference)
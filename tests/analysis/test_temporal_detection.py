@@ -16,7 +16,9 @@ from analysis.temporal_detection import (
     TemporalColumnDetector,
     TemporalDetectionConfig,
     DetectionMethod,
-    DetectionResult
+    DetectionResult,
+    DetectionCache,
+    dataset_fingerprint
 )
 
 
@@ -411,3 +413,73 @@ class TestTemporalColumnDetector:
         
         assert 'timestamp' in temporal_cols
         assert len(temporal_cols) == 1  # Apenas timestamp deve ser detectada
+
+
+class TestSampledDetection:
+    """Testes da detecção amostrada, do cache e da conversão por formato."""
+    
+    @pytest.fixture
+    def df_nfe(self):
+        """Fixture: emissões em dd/mm/aaaa hh:mm:ss com poucos valores inválidos."""
+        rng = np.random.default_rng(7)
+        n = 20_000
+        dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365 * 86400, n), unit='s')
+        text = pd.Series(dates.strftime('%d/%m/%Y %H:%M:%S'), dtype=object)
+        text[::997] = 'sem data'
+        return pd.DataFrame({
+            'data_emissao': text,
+            'valor_total': rng.gamma(2.0, 150.0, n),
+            'uf': rng.choice(['SP', 'MG', 'RJ'], n),
+        })
+    
+    def test_format_fingerprint_and_full_column_stats(self, df_nfe):
+        detector = TemporalColumnDetector(cache=DetectionCache())
+        results = detector.detect(df_nfe)
+        stats = results[0].conversion_stats
+        
+        assert detector.get_detected_columns(results) == ['data_emissao']
+        assert stats['sampled'] and stats['sample_size'] == 2000
+        assert stats['format'] == '%d/%m/%Y %H:%M:%S'
+        assert stats['unique_values'] == df_nfe['data_emissao'].nunique()
+    
+    def test_non_date_text_exits_early(self, df_nfe):
+        detector = TemporalColumnDetector(cache=DetectionCache())
+        stats = detector._try_datetime_conversion(df_nfe['uf'])
+        
+        assert not stats['success']
+        assert stats['reason'] == 'fingerprint_mismatch'
+    
+    def test_cache_hit_on_same_dataset(self, df_nfe):
+        cache = DetectionCache()
+        detector = TemporalColumnDetector(cache=cache)
+        first = detector.detect(df_nfe)
+        first[0].metadata['alterado'] = True
+        second = detector.detect(df_nfe.copy())
+        
+        assert cache.hits == len(df_nfe.columns)
+        assert 'alterado' not in second[0].metadata
+        assert dataset_fingerprint(df_nfe) != dataset_fingerprint(df_nfe.iloc[::-1])
+    
+    def test_parse_column_matches_strptime(self, df_nfe):
+        detector = TemporalColumnDetector(cache=DetectionCache())
+        series = df_nfe['data_emissao'].copy()
+        series[1] = '5/3/2024 07:08:09'
+        series[2] = '31/02/2024 10:00:00'
+        result = detector.detect(df_nfe[['data_emissao']])[0]
+        
+        parsed = detector.parse_column(series, result)
+        expected = pd.to_datetime(series, format='%d/%m/%Y %H:%M:%S', errors='coerce')
+        
+        pd.testing.assert_series_equal(parsed, expected)
+        assert pd.isna(parsed[2]) and parsed[1] == pd.Timestamp('2024-03-05 07:08:09')
+    
+    def test_day_first_when_ambiguous(self):
+        detector = TemporalColumnDetector(cache=DetectionCache())
+        series = pd.Series(['03/04/2024', '05/06/2024', '12/11/2024'] * 10)
+        month_first = TemporalColumnDetector(TemporalDetectionConfig(dayfirst=False), cache=DetectionCache())
+        
+        assert detector._try_datetime_conversion(series)['format'] == '%d/%m/%Y'
+        assert detector.parse_column(series)[0] == pd.Timestamp('2024-04-03')
+        assert month_first._try_datetime_conversion(series)['format'] == '%m/%d/%Y'
+        # Um segundo campo > 12 só pode ser o dia, qualquer que seja a configuração
+        assert detector._try_datetime_conversion(series.replace('12/11/2024', '12/25/2024'))['format'] == '%m/%d/%Y'
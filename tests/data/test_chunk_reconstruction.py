@@ -0,0 +1,131 @@
+"""
+Testes da reconstrução vetorizada do CSV a partir dos chunks (src/data/chunk_reconstruction.py).
+"""
+
+import random
+
+import numpy as np
+import pandas as pd
+
+from src.data.chunk_reconstruction import (
+    DATA_MARKER,
+    fetch_embedding_rows,
+    reconstruct_dataframe_from_chunks,
+)
+from src.embeddings.chunker import TextChunker
+
+
+def _source_frame(rows: int = 250) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({
+        "Time": np.arange(rows, dtype="int64"),
+        "V1": rng.normal(size=rows).round(6),
+        "Amount": rng.uniform(0, 500, size=rows).round(2),
+        "Class": np.where(np.arange(rows) % 50 == 0, 1, 0),
+    })
+
+
+def _embedding_rows(df: pd.DataFrame, chunk_rows: int = 20, overlap: int = 4):
+    chunker = TextChunker(csv_chunk_size_rows=chunk_rows, csv_overlap_rows=overlap)
+    csv_text = df.to_csv(index=False, quoting=1)  # header e valores entre aspas, como no RAGAgent
+    rows = []
+    for i, chunk in enumerate(chunker._chunk_csv_data(csv_text, "creditcard")):
+        info = chunk.metadata.additional_info
+        rows.append({
+            "id": f"{i:08d}",
+            "chunk_text": f"Chunk do dataset creditcard.csv\nColunas: x\n\n{DATA_MARKER}\n{chunk.content}",
+            "metadata": {"source": "creditcard", "strategy": "csv_row", **info},
+        })
+    rows.append({  # chunk analítico de metadados: não faz parte dos dados
+        "id": "zzzzzzzz",
+        "chunk_text": "ANÁLISE DE TIPOS DE DADOS, ESTRUTURA\nColunas numéricas: 4",
+        "metadata": {"source": "creditcard", "strategy": "csv_row", "chunk_type": "metadata_types"},
+    })
+    return rows
+
+
+def test_overlap_rows_are_dropped_by_index():
+    df = _source_frame()
+    rows = _embedding_rows(df)
+    random.Random(1).shuffle(rows)
+
+    rebuilt = reconstruct_dataframe_from_chunks(rows)
+
+    pd.testing.assert_frame_equal(rebuilt, df)
+
+
+def test_repeated_rows_in_source_are_kept():
+    df = pd.concat([_source_frame(30)] * 2, ignore_index=True)
+
+    rebuilt = reconstruct_dataframe_from_chunks(_embedding_rows(df, chunk_rows=10, overlap=3))
+
+    assert len(rebuilt) == 60
+    assert rebuilt.duplicated().sum() == 30
+
+
+def test_dtype_map_falls_back_when_sample_is_not_representative():
+    df = _source_frame(3000).astype({"Class": "Int64"})
+    df.loc[2900, "Class"] = pd.NA  # a amostra vê inteiros; o NaN só aparece no fim
+
+    rebuilt = reconstruct_dataframe_from_chunks(_embedding_rows(df, chunk_rows=500, overlap=50))
+
+    assert len(rebuilt) == 3000
+    assert rebuilt["Class"].isna().sum() == 1
+
+
+def test_non_csv_chunks_return_none():
+    rows = [{"id": "1", "chunk_text": "texto livre sem dados", "metadata": {"strategy": "paragraph"}}]
+    assert reconstruct_dataframe_from_chunks(rows) is None
+
+
+class _PagedClient:
+    """Simula o PostgREST: ordenação por id, filtro gt e corte em max_rows."""
+
+    def __init__(self, rows, max_rows=1000):
+        self.rows = sorted(rows, key=lambda r: r["id"])
+        self.max_rows = max_rows
+        self.requests = []
+
+    def table(self, _name):
+        return _PagedQuery(self)
+
+
+class _PagedQuery:
+    def __init__(self, client):
+        self.client = client
+        self.after = None
+        self.size = None
+        self.columns = None
+
+    def select(self, columns):
+        self.columns = columns
+        return self
+
+    def gt(self, _column, value):
+        self.after = value
+        return self
+
+    def order(self, _column):
+        return self
+
+    def limit(self, size):
+        self.size = size
+        return self
+
+    def execute(self):
+        self.client.requests.append(self.columns)
+        data = [r for r in self.client.rows if self.after is None or r["id"] > self.after]
+        data = data[:min(self.size, self.client.max_rows)]
+        return type("Response", (), {"data": data})()
+
+
+def test_keyset_pagination_reads_past_server_cap():
+    rows = [{"id": f"{i:06d}", "chunk_text": "x", "metadata": {}} for i in range(2500)]
+    client = _PagedClient(rows, max_rows=1000)
+
+    fetched = fetch_embedding_rows(client, page_size=1000)
+
+    assert len(fetched) == 2500
+    assert len(client.requests) == 4  # 3 páginas + página vazia final
+    assert all("embedding" not in cols for cols in client.requests)
+    assert len(fetch_embedding_rows(client, limit=1500)) == 1500
@@ -0,0 +1,105 @@
+"""
+Testes do cache de CSVs processados (src/data/csv_frame_cache.py), que guarda
+frames e Parquet no serviço de snapshots.
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from src.data.csv_frame_cache import CSVFrameCache, sidecar_pattern, sniff_encoding
+from src.data.dataset_snapshot import SNAPSHOT_SUFFIX, DatasetSnapshotService
+
+
+@pytest.fixture
+def processado(tmp_path):
+    folder = tmp_path / "processado"
+    folder.mkdir()
+    return folder
+
+
+def _cache(folder, **kwargs):
+    return CSVFrameCache(DatasetSnapshotService(snapshot_dir=folder, **kwargs))
+
+
+def _write_nfe(path, rows=50):
+    df = pd.DataFrame({
+        "emitente": ["Padaria São João"] * rows,
+        "valor": [float(i) for i in range(rows)],
+        "uf": ["SP", "MG"] * (rows // 2),
+    })
+    df.to_csv(path, index=False, encoding="latin-1")
+    return df
+
+
+def test_latin1_is_sniffed_once_and_served_from_memory(processado):
+    csv_path = processado / "nfe.csv"
+    expected = _write_nfe(csv_path)
+    cache = _cache(processado)
+
+    assert sniff_encoding(csv_path) != "utf-8"
+    for _ in range(3):
+        pd.testing.assert_frame_equal(cache.load(csv_path), expected)
+
+    assert cache.stats["csv_reads"] == 1
+    assert cache.stats["memory_hits"] == 2
+
+
+def test_sidecar_is_shared_and_projected(processado):
+    csv_path = processado / "nfe.csv"
+    _write_nfe(csv_path)
+    sidecar = _cache(processado).prepare(csv_path)
+    assert sidecar.name.endswith(SNAPSHOT_SUFFIX)
+
+    other_worker = _cache(processado)
+    df = other_worker.load(csv_path, columns=["valor"])
+
+    assert list(df.columns) == ["valor"]
+    assert other_worker.stats == {"memory_hits": 0, "sidecar_reads": 1, "csv_reads": 0}
+    assert other_worker.columns(csv_path) == ["emitente", "valor", "uf"]
+
+
+def test_changed_csv_gets_new_sidecar(processado):
+    csv_path = processado / "nfe.csv"
+    _write_nfe(csv_path)
+    cache = _cache(processado)
+    first = cache.prepare(csv_path)
+
+    _write_nfe(csv_path, rows=10)
+    stat = csv_path.stat()
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert len(cache.load(csv_path)) == 10
+    assert cache.prepare(csv_path) != first
+
+
+def test_csv_outside_processado_is_not_sidecarred(tmp_path, processado):
+    csv_path = tmp_path / "avulso.csv"
+    _write_nfe(csv_path)
+
+    _cache(processado).load(csv_path)
+
+    assert not list(tmp_path.rglob(f"*{SNAPSHOT_SUFFIX}"))
+
+
+def test_published_csv_reuses_the_ingestion_snapshot(tmp_path, processado):
+    processando = tmp_path / "processando"
+    processando.mkdir()
+    csv_path = processando / "nfe.csv"
+    df = _write_nfe(csv_path)
+    service = DatasetSnapshotService(snapshot_dir=processado)
+    cache = CSVFrameCache(service)
+
+    published = service.publish("ing-1", df=df, csv_path=csv_path)
+    moved = csv_path.rename(processado / "nfe.csv")  # move_to_processed mantém nome e mtime
+
+    assert cache.load(moved).shape == (50, 3)
+    assert cache.stats == {"memory_hits": 1, "sidecar_reads": 0, "csv_reads": 0}
+    assert list(service.info()["entries"]) == ["ing-1"]
+
+    # Outros workers leem o mesmo arquivo (hard link), sem segunda cópia em disco
+    sidecar = _cache(processado).prepare(moved)
+    assert sidecar.name != published.name
+    assert os.path.samefile(sidecar, published)
+    assert sorted(p.name for p in processado.glob(sidecar_pattern(moved))) == [sidecar.name]
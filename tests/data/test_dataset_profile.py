@@ -0,0 +1,123 @@
+"""
+Testes do perfil do dataset calculado na ingestão (src/data/dataset_profile.py).
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.dataset_profile import DatasetProfile, DatasetProfileStore, build_dataset_profile
+
+
+@pytest.fixture
+def nfe_df():
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({
+        "valor": rng.normal(100, 15, 500).round(2),
+        "quantidade": rng.integers(1, 10, 500),
+        "uf": rng.choice(["SP", "MG", "RJ"], 500),
+        "cfop": [str(5102 + i % 3) for i in range(500)],
+    })
+
+
+class _FakeTable:
+    def __init__(self, rows):
+        self.rows = rows
+        self._filter = None
+
+    def upsert(self, row, on_conflict=None):
+        self.rows[row["ingestion_id"]] = row
+        return self
+
+    def select(self, *_):
+        return self
+
+    def eq(self, _, value):
+        self._filter = value
+        return self
+
+    def limit(self, _):
+        return self
+
+    def execute(self):
+        row = self.rows.get(self._filter)
+        return type("Result", (), {"data": [row] if row else []})()
+
+
+class _FakeClient:
+    def __init__(self):
+        self.rows = {}
+
+    def table(self, _):
+        return _FakeTable(self.rows)
+
+
+def test_profile_matches_pandas(nfe_df):
+    profile = build_dataset_profile(nfe_df, "ing-1", "nfe.csv")
+
+    assert (profile.n_rows, profile.n_columns) == (500, 4)
+    assert profile.numeric_columns() == ["valor", "quantidade"]
+    stats = profile.numeric_stats()
+    assert stats.at["valor", "mean"] == pytest.approx(nfe_df["valor"].mean())
+    assert stats.at["valor", "median"] == pytest.approx(nfe_df["valor"].median())
+    assert stats.at["valor", "std"] == pytest.approx(nfe_df["valor"].std())
+    assert stats.at["quantidade", "mode"] == nfe_df["quantidade"].mode().iloc[0]
+    assert sum(profile.columns["valor"]["histogram"]["counts"]) == 500
+    assert profile.columns["cfop"]["numeric_like"] is True
+    assert dict(map(tuple, profile.columns["uf"]["top_k"])) == nfe_df["uf"].value_counts().to_dict()
+    pd.testing.assert_frame_equal(
+        profile.correlation_frame(), nfe_df[["valor", "quantidade"]].corr().round(6), check_names=False
+    )
+
+
+def test_profile_is_json_safe_with_nulls():
+    df = pd.DataFrame({"a": [1.0, np.nan, 3.0], "b": [np.nan] * 3})
+    profile = build_dataset_profile(df, "ing-nulls")
+
+    restored = DatasetProfile.from_dict(json.loads(json.dumps(profile.to_dict(), allow_nan=False)))
+
+    assert restored.columns["a"]["nulls"] == 1
+    assert restored.columns["b"]["count"] == 0
+
+
+def test_wide_dataset_correlation_keeps_most_variable_columns():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({f"v{i}": rng.normal(0, i + 1, 200) for i in range(6)})
+    df.insert(0, "constante", 1.0)
+
+    profile = build_dataset_profile(df, "ing-wide", max_corr_columns=3)
+
+    assert profile.correlation["columns"] == ["v3", "v4", "v5"]
+    assert profile.correlation["truncated"] is True
+    assert profile.correlation["total_numeric"] == 7
+    assert build_dataset_profile(df, "ing-all").correlation["truncated"] is False
+
+
+def test_store_serves_other_workers_from_disk_and_supabase(tmp_path, nfe_df):
+    client = _FakeClient()
+    profile = build_dataset_profile(nfe_df, "ing-2", "nfe.csv")
+    DatasetProfileStore(local_dir=tmp_path / "a", client=client).save(profile)
+
+    same_host = DatasetProfileStore(local_dir=tmp_path / "a", client=_FakeClient()).get("ing-2")
+    other_host = DatasetProfileStore(local_dir=tmp_path / "b", client=client).get("ing-2")
+
+    assert same_host.to_dict() == profile.to_dict()
+    assert other_host.to_dict() == json.loads(json.dumps(profile.to_dict()))
+    assert DatasetProfileStore(local_dir=tmp_path / "c", client=_FakeClient()).get("ing-2") is None
+
+
+def test_analyzer_statistics_from_profile(nfe_df, monkeypatch):
+    python_analyzer = pytest.importorskip("src.tools.python_analyzer")
+    analyzer = python_analyzer.PythonDataAnalyzer()
+    profile = build_dataset_profile(nfe_df, "ing-3")
+    monkeypatch.setattr(analyzer, "get_dataset_profile", lambda: profile)
+    monkeypatch.setattr(analyzer, "reconstruct_original_data", lambda: pytest.fail("dados brutos relidos"))
+
+    result = analyzer.calculate_real_statistics("all")
+
+    assert result["tipos_dados"]["numericos"] == ["valor", "quantidade", "cfop"]
+    assert result["tipos_dados"]["categoricos"] == ["uf"]
+    assert result["estatisticas"]["valor"]["q75"] == pytest.approx(nfe_df["valor"].quantile(0.75))
+    assert result["distribuicao"]["uf"]["SP"]["count"] == int((nfe_df["uf"] == "SP").sum())
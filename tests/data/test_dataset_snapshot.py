@@ -0,0 +1,148 @@
+"""
+Testes do snapshot compartilhado do dataset (src/data/dataset_snapshot.py).
+
+Valida que o DataFrame é montado uma vez por ingestão, compartilhado entre
+workers via Parquet e descartado quando uma nova ingestão é publicada.
+"""
+
+import pandas as pd
+import pytest
+
+from src.data.dataset_snapshot import DatasetSnapshotService, resolve_snapshot_key
+
+
+def _frame(rows: int = 100) -> pd.DataFrame:
+    return pd.DataFrame({"Time": range(rows), "Amount": [float(i) * 1.5 for i in range(rows)]})
+
+
+class _Builder:
+    def __init__(self, df):
+        self.df = df
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.df
+
+
+@pytest.fixture
+def service(tmp_path):
+    return DatasetSnapshotService(max_bytes=10**8, snapshot_dir=tmp_path, key_ttl=60)
+
+
+def test_frame_is_built_once_per_ingestion(service):
+    builder = _Builder(_frame())
+
+    first = service.get("ing-1", builder)
+    first["extra"] = 1  # cópia rasa: não altera o snapshot
+    second = service.get("ing-1", builder)
+
+    assert builder.calls == 1
+    assert "extra" not in second.columns
+    assert service.stats["hits"] == 1
+
+
+def test_in_place_writes_cannot_corrupt_the_snapshot(service):
+    service.get("ing-1", _Builder(_frame()))
+
+    df = service.get("ing-1", _Builder(None))
+    with pytest.raises(ValueError, match="read-only"):
+        df.loc[0, "Amount"] = -1.0
+    editable = df.copy()
+    editable.loc[0, "Amount"] = -1.0
+
+    assert service.get("ing-1", _Builder(None)).loc[0, "Amount"] == 0.0
+
+
+def test_parquet_is_shared_with_other_workers(service, tmp_path):
+    service.get("ing-1", _Builder(_frame()))
+    assert service.find_parquet("ing-1") is not None
+
+    other_worker = DatasetSnapshotService(snapshot_dir=tmp_path)
+    builder = _Builder(None)
+    df = other_worker.get("ing-1", builder)
+
+    assert builder.calls == 0
+    assert other_worker.stats["parquet_loads"] == 1
+    pd.testing.assert_frame_equal(df, _frame())
+
+
+def test_publish_invalidates_previous_ingestions(service, tmp_path):
+    csv_path = tmp_path / "vendas.csv"
+    _frame(10).to_csv(csv_path, index=False)
+    service.get("ing-old", _Builder(_frame()))
+
+    path = service.publish("ing-new", csv_path=csv_path)
+
+    assert path.name == "vendas.ing-new.snapshot.parquet"
+    assert service.find_parquet("ing-old") is None
+    assert list(service.info()["entries"]) == ["ing-new"]
+    builder = _Builder(None)
+    assert len(service.get("ing-new", builder)) == 10
+    assert builder.calls == 0
+
+
+def test_active_key_is_rechecked_after_ttl(tmp_path):
+    service = DatasetSnapshotService(snapshot_dir=tmp_path, key_ttl=0)
+    keys = iter(["ing-1", "ing-1", "ing-2"])
+    resolver = lambda: next(keys)
+
+    service.get(service.active_key(resolver), _Builder(_frame()))
+    assert service.active_key(resolver) == "ing-1"
+    assert "ing-1" in service.info()["entries"]
+
+    assert service.active_key(resolver) == "ing-2"
+    assert service.info()["entries"] == {}
+
+
+def test_memory_cap_evicts_least_recent(tmp_path):
+    size = int(_frame().memory_usage(deep=True).sum())
+    service = DatasetSnapshotService(max_bytes=int(size * 1.5), snapshot_dir=tmp_path, persist=False)
+
+    service.get("a", _Builder(_frame()))
+    service.get("b", _Builder(_frame()))
+
+    assert list(service.info()["entries"]) == ["b"]
+    assert service.stats["evictions"] == 1
+
+
+def test_resolve_key_prefers_ingestion_id():
+    class _Query:
+        def __init__(self, data):
+            self.data = data
+
+        def __getattr__(self, _name):
+            return lambda *a, **k: self
+
+        def execute(self):
+            return self
+
+    class _Client:
+        def __init__(self, data):
+            self.data = data
+
+        def table(self, _name):
+            return _Query(self.data)
+
+    assert resolve_snapshot_key(_Client([{"id": "x", "metadata": {"ingestion_id": "abc"}}])) == "abc"
+    assert resolve_snapshot_key(_Client([{"id": "x", "metadata": {}}])) == "latest-x"
+    assert resolve_snapshot_key(_Client([])) is None
+
+
+def test_analyzer_reuses_snapshot_across_questions(monkeypatch, tmp_path):
+    python_analyzer = pytest.importorskip("src.tools.python_analyzer")
+
+    service = DatasetSnapshotService(snapshot_dir=tmp_path, key_ttl=60)
+    monkeypatch.setattr(python_analyzer, "get_dataset_snapshot_service", lambda: service)
+    monkeypatch.setattr(python_analyzer, "resolve_snapshot_key", lambda _client: "ing-1")
+    monkeypatch.setattr(python_analyzer, "supabase", object())
+    monkeypatch.setattr(python_analyzer, "SUPABASE_CLIENT_AVAILABLE", True)
+    builder = _Builder(_frame())
+    monkeypatch.setattr(python_analyzer.PythonDataAnalyzer, "get_data_from_embeddings",
+                        lambda self, **kwargs: builder())
+
+    analyzer = python_analyzer.PythonDataAnalyzer(caller_agent="test_system")
+    for _ in range(3):
+        assert len(analyzer.reconstruct_original_data()) == 100
+
+    assert builder.calls == 1
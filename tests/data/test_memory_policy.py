@@ -0,0 +1,102 @@
+"""
+Testes da política de memória das análises (src/data/memory_policy.py).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.memory_policy import (
+    LOAD_CHUNKED,
+    LOAD_FULL,
+    LOAD_SAMPLED,
+    MemoryPolicy,
+    count_csv_rows,
+    downcast_numeric,
+    estimate_csv_rows,
+    estimate_frame_bytes,
+    iter_csv_chunks,
+    optimize_dtypes,
+    plan_csv_load,
+    read_csv_bounded,
+)
+
+
+@pytest.fixture
+def nfe_df():
+    rng = np.random.default_rng(0)
+    n = 30_000
+    return pd.DataFrame({
+        "uf": rng.choice(["SP", "MG", "RJ"], n),
+        "cfop": rng.integers(5100, 6999, n),
+        "valor": rng.gamma(2.0, 150.0, n).round(2),
+        "quantidade": rng.integers(0, 100, n).astype(float),
+        "chave": [f"NFe{i:044d}" for i in range(n)],
+    })
+
+
+@pytest.fixture
+def nfe_csv(tmp_path, nfe_df):
+    path = tmp_path / "nfe.csv"
+    nfe_df.to_csv(path, index=False)
+    return path
+
+
+def test_optimize_dtypes_is_lossless_by_default(nfe_df):
+    optimized, report = optimize_dtypes(nfe_df)
+
+    assert report["bytes_after"] < 0.7 * report["bytes_before"]
+    assert report["categorical"] == ["uf"]
+    assert optimized["cfop"].dtype == np.uint16
+    assert optimized["quantidade"].dtype == np.float32
+    assert optimized["valor"].dtype == np.float64  # centavos não cabem em float32
+    assert optimized["chave"].dtype == object
+    pd.testing.assert_frame_equal(optimized.astype(nfe_df.dtypes.to_dict()), nfe_df)
+    assert nfe_df["cfop"].dtype == np.int64  # original intocado
+
+
+def test_downcast_float32_opt_in():
+    series = pd.Series([0.1, 0.2, np.nan])
+
+    assert downcast_numeric(series).dtype == np.float64
+    assert downcast_numeric(series, float32=True).dtype == np.float32
+    assert downcast_numeric(pd.Series([-3, 200])).dtype == np.int16
+
+
+def test_plan_projects_columns_and_fits_budget(nfe_csv, nfe_df):
+    plan = plan_csv_load(nfe_csv, columns=["uf", "cfop"], policy=MemoryPolicy(schema_sample_rows=5000))
+    df = read_csv_bounded(nfe_csv, plan)
+
+    assert plan.mode == LOAD_FULL
+    assert abs(plan.estimated_rows - len(nfe_df)) <= 0.05 * len(nfe_df)
+    assert list(df.columns) == ["uf", "cfop"]
+    assert isinstance(df["uf"].dtype, pd.CategoricalDtype)
+    assert df["cfop"].tolist() == nfe_df["cfop"].tolist()
+
+
+def test_over_budget_falls_back_to_sample_or_chunks(nfe_csv, nfe_df):
+    policy = MemoryPolicy(budget_bytes=200_000, chunk_rows=7000, schema_sample_rows=5000)
+
+    sampled = plan_csv_load(nfe_csv, policy=policy)
+    df = read_csv_bounded(nfe_csv, sampled)
+    assert sampled.mode == LOAD_SAMPLED
+    assert df["chave"].tolist() == nfe_df["chave"].iloc[::sampled.sample_step].tolist()
+    assert optimize_dtypes(df)[1]["bytes_before"] <= 1.2 * policy.budget_bytes
+    assert sampled.sampling(len(df), count_csv_rows(nfe_csv)) == {
+        "sampled": True, "sample_step": sampled.sample_step, "loaded_rows": len(df), "original_rows": len(nfe_df),
+    }
+    assert plan_csv_load(nfe_csv, policy=MemoryPolicy(schema_sample_rows=5000)).sampling(len(nfe_df))["sampled"] is False
+
+    chunked = plan_csv_load(nfe_csv, policy=policy, streaming=True)
+    chunks = list(iter_csv_chunks(nfe_csv, chunked))
+    assert chunked.mode == LOAD_CHUNKED
+    assert [len(c) for c in chunks] == [7000] * 4 + [2000]
+    with pytest.raises(ValueError):
+        read_csv_bounded(nfe_csv, chunked)
+
+
+def test_size_estimates(nfe_csv, nfe_df):
+    exact = int(nfe_df.memory_usage(deep=True).sum())
+
+    assert estimate_csv_rows(nfe_csv) == len(nfe_df)
+    assert estimate_frame_bytes(nfe_df, sample_rows=1000) == pytest.approx(exact, rel=0.02)
@@ -0,0 +1,260 @@
+"""
+Fixtures compartilhadas dos testes de memória.
+
+Fornece um cliente Supabase falso, em memória, que imita a API fluente do
+supabase-py (table/select/eq/order/limit/range/execute e rpc) o suficiente para
+exercitar o SupabaseMemoryManager sem rede. A latência de cada .execute()
+é configurável para simular o round-trip HTTP bloqueante do cliente real.
+"""
+
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+from uuid import uuid4
+
+import pytest
+
+
+class FakeQuery:
+    """Builder de query em memória com a mesma interface fluente do PostgREST."""
+
+    def __init__(self, client: "FakeSupabase", table: str):
+        self._client = client
+        self._table = table
+        self._op = "select"
+        self._payload: Any = None
+        self._filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self._order: Optional[tuple] = None
+        self._limit: Optional[int] = None
+        self._offset = 0
+
+    # Operações -------------------------------------------------------------
+    def select(self, *_columns, **_kwargs):
+        self._op = "select"
+        return self
+
+    def insert(self, payload):
+        self._op, self._payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict: str = "id"):
+        self._op, self._payload = "upsert", payload
+        self._conflict_columns = [c.strip() for c in on_conflict.split(",")]
+        return self
+
+    def update(self, payload):
+        self._op, self._payload = "update", payload
+        return self
+
+    def delete(self):
+        self._op = "delete"
+        return self
+
+    # Filtros ---------------------------------------------------------------
+    def eq(self, column, value):
+        self._filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        values = list(values)
+        self._filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def gte(self, column, value):
+        self._filters.append(lambda row: row.get(column) is not None and row.get(column) >= value)
+        return self
+
+    def gt(self, column, value):
+        self._filters.append(lambda row: row.get(column) is not None and row.get(column) > value)
+        return self
+
+    def lt(self, column, value):
+        self._filters.append(lambda row: row.get(column) is not None and row.get(column) < value)
+        return self
+
+    def order(self, column, desc=False):
+        self._order = (column, desc)
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def range(self, start, end):
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    # Execução --------------------------------------------------------------
+    def execute(self):
+        self._client._before_execute()
+        with self._client.lock:
+            rows = self._client.tables.setdefault(self._table, [])
+            if self._op == "insert":
+                payloads = self._payload if isinstance(self._payload, list) else [self._payload]
+                inserted = [self._client._fill_defaults(dict(p)) for p in payloads]
+                rows.extend(inserted)
+                return SimpleNamespace(data=[dict(r) for r in inserted])
+
+            if self._op == "upsert":
+                payloads = self._payload if isinstance(self._payload, list) else [self._payload]
+                result = []
+                for payload in payloads:
+                    key = [payload.get(c) for c in self._conflict_columns]
+                    existing = next((r for r in rows if [r.get(c) for c in self._conflict_columns] == key), None)
+                    if existing is None:
+                        existing = self._client._fill_defaults(dict(payload))
+                        rows.append(existing)
+                    else:
+                        existing.update(payload)
+                    result.append(dict(existing))
+                return SimpleNamespace(data=result)
+
+            matched = [r for r in rows if all(f(r) for f in self._filters)]
+            if self._op == "update":
+                for r in matched:
+                    r.update(self._payload)
+                return SimpleNamespace(data=[dict(r) for r in matched])
+            if self._op == "delete":
+                self._client.tables[self._table] = [r for r in rows if r not in matched]
+                return SimpleNamespace(data=[dict(r) for r in matched])
+
+            if self._order:
+                column, desc = self._order
+                matched = sorted(matched, key=lambda r: r.get(column), reverse=desc)
+            if self._limit is not None:
+                matched = matched[self._offset:self._offset + self._limit]
+            if self._client.max_rows is not None:
+                matched = matched[:self._client.max_rows]
+            return SimpleNamespace(data=[dict(r) for r in matched])
+
+
+class FakeAPIError(Exception):
+    """Imita postgrest.exceptions.APIError (expõe .code)."""
+
+    def __init__(self, message: str, code: str):
+        super().__init__(message)
+        self.code = code
+
+
+def _append_conversation_messages(client: "FakeSupabase", params: Dict[str, Any]):
+    """Emula a RPC append_conversation_messages (migrations 0010/0011)."""
+    sessions = client.tables.setdefault("agent_sessions", [])
+    session = next((s for s in sessions if s["session_id"] == params["p_session_id"]), None)
+    if session is None:
+        raise FakeAPIError(f"Sessão não encontrada: {params['p_session_id']}", "P0002")
+    messages = params["p_messages"]
+    first_turn = session.get("last_conversation_turn", 0) + 1
+    session["last_conversation_turn"] = first_turn + len(messages) - 1
+    conversations = client.tables.setdefault("agent_conversations", [])
+    existing_ids = {r["id"] for r in conversations}
+    rows = []
+    for offset, message in enumerate(messages):
+        if message.get("id") in existing_ids:
+            continue  # ON CONFLICT (id) DO NOTHING
+        row = client._fill_defaults({
+            **message,
+            "session_id": session["id"],
+            "agent_name": message.get("agent_name") or params["p_agent_name"],
+            "conversation_turn": first_turn + offset,
+        })
+        conversations.append(row)
+        rows.append(dict(row))
+    return rows
+
+
+def _increment_context_access(client: "FakeSupabase", params: Dict[str, Any]):
+    """Emula a RPC increment_context_access (migration 0012)."""
+    now = datetime.now().isoformat()
+    updated = 0
+    for row in client.tables.get("agent_context", []):
+        count = params["p_counts"].get(row["id"])
+        if count:
+            row["access_count"] = row.get("access_count", 0) + count
+            row["last_accessed_at"] = now
+            updated += 1
+    return updated
+
+
+class FakeRpc:
+    def __init__(self, client: "FakeSupabase", name: str, params: Dict[str, Any]):
+        self._client, self._name, self._params = client, name, params or {}
+
+    def execute(self):
+        self._client._before_execute()
+        handler = self._client.rpc_handlers.get(self._name)
+        if handler is None:
+            raise FakeAPIError(f"Could not find the function {self._name}", "PGRST202")
+        with self._client.lock:
+            return SimpleNamespace(data=handler(self._client, self._params))
+
+
+class FakeSupabase:
+    """Cliente Supabase falso com latência bloqueante configurável."""
+
+    def __init__(self, latency_s: float = 0.0):
+        self.latency_s = latency_s
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.rpc_handlers: Dict[str, Callable] = {
+            "append_conversation_messages": _append_conversation_messages,
+            "increment_context_access": _increment_context_access,
+        }
+        self.lock = threading.RLock()
+        self.calls = 0
+        self.threads: set = set()
+        self.max_rows: Optional[int] = None  # Corte do PostgREST (db-max-rows) por resposta
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> FakeRpc:
+        return FakeRpc(self, name, params)
+
+    def _before_execute(self):
+        with self.lock:
+            self.calls += 1
+            self.threads.add(threading.current_thread().name)
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    @staticmethod
+    def _fill_defaults(row: Dict[str, Any]) -> Dict[str, Any]:
+        now = datetime.now().isoformat()
+        row.setdefault("id", str(uuid4()))
+        for column in ("created_at", "updated_at", "last_accessed_at", "timestamp"):
+            row.setdefault(column, now)
+        row.setdefault("access_count", 0)
+        return row
+
+    def add_session(self, session_id: str, agent_name: str = "test_agent") -> Dict[str, Any]:
+        """Cria uma sessão ativa diretamente na tabela agent_sessions."""
+        row = self._fill_defaults({
+            "session_id": session_id,
+            "agent_name": agent_name,
+            "session_type": "interactive",
+            "status": "active",
+            "expires_at": datetime(2100, 1, 1).isoformat(),
+            "metadata": {},
+        })
+        self.tables.setdefault("agent_sessions", []).append(row)
+        return row
+
+
+@pytest.fixture
+def fake_supabase(monkeypatch):
+    """Substitui o cliente global usado pelo SupabaseMemoryManager."""
+    try:
+        from src.memory import supabase_memory
+    except Exception as e:  # cliente real exige SUPABASE_URL/SUPABASE_KEY no import
+        pytest.skip(f"supabase_memory indisponível: {e}")
+    from src.memory.memory_cache import get_memory_cache
+
+    client = FakeSupabase()
+    monkeypatch.setattr(supabase_memory, "supabase", client)
+    monkeypatch.setattr(supabase_memory, "_increment_rpc_available", True)
+    monkeypatch.setattr(supabase_memory, "_access_buffer", None)
+    # O cache é do processo: cada teste começa sem sessões/contextos cacheados
+    get_memory_cache().clear()
+    yield client
+    get_memory_cache().clear()
@@ -0,0 +1,120 @@
+"""
+Testes do cache em processo da memória (src/memory/memory_cache.py).
+
+Valida que session_id -> UUID e contextos quentes deixam de ir ao banco a
+cada chamada, que os contadores de acesso são enviados em um único
+incremento e que sessões expiradas/limpas não são servidas do cache.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.memory.memory_cache import TTLCache
+from src.memory.memory_types import ContextType, MessageType
+
+
+@pytest.fixture
+def manager(fake_supabase):
+    from src.memory.supabase_memory import SupabaseMemoryManager
+    return SupabaseMemoryManager("test_agent")
+
+
+def test_ttl_cache_bounds_size_and_age():
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None  # menos recente removido
+    assert cache.get("a") == 1
+
+    cache.put("d", 4, ttl_seconds=0)
+    assert cache.get("d") is None
+
+
+@pytest.mark.asyncio
+async def test_session_uuid_resolved_once_per_process(manager, fake_supabase):
+    fake_supabase.add_session("sess_cache")
+
+    await manager.get_conversation_history("sess_cache")
+    calls_after_first = fake_supabase.calls
+    await manager.get_conversation_history("sess_cache")
+    await manager.list_contexts("sess_cache")
+
+    # Sem cache seriam 2 chamadas (UUID + SELECT) por leitura
+    assert fake_supabase.calls - calls_after_first == 2
+
+
+@pytest.mark.asyncio
+async def test_context_hits_are_counted_in_one_increment(manager, fake_supabase):
+    from src.memory.supabase_memory import get_access_counter_buffer
+
+    fake_supabase.add_session("sess_ctx")
+    await manager.save_context("sess_ctx", ContextType.DATA, "dataset", {"rows": 10})
+    buffer = get_access_counter_buffer()
+    buffer.flush()
+
+    calls_before = fake_supabase.calls
+    for _ in range(3):
+        context = await manager.get_context("sess_ctx", ContextType.DATA, "dataset")
+        context.context_data["rows"] = 0  # cópia: não altera o cache
+
+    assert fake_supabase.calls == calls_before
+    assert list(buffer.pending.values()) == [3]
+
+    assert buffer.flush() == 1
+    assert fake_supabase.calls == calls_before + 1
+    assert fake_supabase.tables["agent_context"][0]["access_count"] == 3
+    cached = await manager.get_context("sess_ctx", ContextType.DATA, "dataset")
+    assert cached.context_data == {"rows": 10}
+
+
+@pytest.mark.asyncio
+async def test_increment_falls_back_without_rpc(manager, fake_supabase):
+    from src.memory import supabase_memory
+
+    fake_supabase.add_session("sess_legacy")
+    saved = await manager.save_context("sess_legacy", ContextType.DATA, "k", {"v": 1})
+    del fake_supabase.rpc_handlers["increment_context_access"]
+
+    await manager.increment_context_access({str(saved.id): 2})
+
+    assert supabase_memory._increment_rpc_available is False
+    assert fake_supabase.tables["agent_context"][0]["access_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_delete_and_session_update_invalidate(manager, fake_supabase):
+    fake_supabase.add_session("sess_inv")
+    await manager.save_context("sess_inv", ContextType.DATA, "k", {"v": 1})
+
+    assert await manager.delete_context("sess_inv", ContextType.DATA, "k")
+    assert await manager.get_context("sess_inv", ContextType.DATA, "k") is None
+
+    await manager.update_session("sess_inv", status="expired")
+    fake_supabase.tables["agent_sessions"].clear()
+    assert await manager._get_session_uuid("sess_inv") is None
+
+
+@pytest.mark.asyncio
+async def test_expired_session_is_not_served_after_cleanup(manager, fake_supabase):
+    row = fake_supabase.add_session("sess_exp")
+    row["expires_at"] = (datetime.now() + timedelta(seconds=0.2)).isoformat()
+    await manager.save_context("sess_exp", ContextType.DATA, "k", {"v": 1})
+    assert await manager.get_context("sess_exp", ContextType.DATA, "k") is not None
+
+    def _cleanup(client, _params):
+        client.tables["agent_sessions"].clear()
+        client.tables["agent_context"].clear()
+        return 1
+
+    fake_supabase.rpc_handlers["cleanup_expired_sessions"] = _cleanup
+    await asyncio.sleep(0.25)
+    await manager.cleanup_expired()
+
+    assert await manager.get_context("sess_exp", ContextType.DATA, "k") is None
+    with pytest.raises(ValueError):
+        await manager.save_conversation("sess_exp", MessageType.QUERY, "oi")
@@ -0,0 +1,188 @@
+"""
+Testes da compactação de memória (src/memory/compaction.py).
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.memory.memory_types import MessageType
+
+
+def _seed_history(client, session_row, turns: int, hours_ago: float = 48, content_size: int = 200):
+    start = datetime.now() - timedelta(hours=hours_ago)
+    rows = client.tables.setdefault("agent_conversations", [])
+    for turn in range(1, turns + 1):
+        rows.append(client._fill_defaults({
+            "session_id": session_row["id"],
+            "agent_name": "test_agent",
+            "conversation_turn": turn,
+            "message_type": "query" if turn % 2 else "response",
+            "content": f"mensagem {turn} " + "x" * content_size,
+            "content_format": "text",
+            "metadata": {},
+            "timestamp": (start + timedelta(minutes=turn)).isoformat(),
+        }))
+    session_row["last_conversation_turn"] = turns
+
+
+def _seed_embeddings(client, session_row, count: int, clusters: int = 3, dim: int = 16):
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(clusters, dim))
+    created = (datetime.now() - timedelta(days=3)).isoformat()
+    rows = client.tables.setdefault("agent_memory_embeddings", [])
+    for i in range(count):
+        vector = centers[i % clusters] + rng.normal(scale=0.01, size=dim)
+        rows.append(client._fill_defaults({
+            "session_id": session_row["id"],
+            "agent_name": "test_agent",
+            "embedding_type": "query",
+            "source_text": f"texto {i}",
+            "embedding": str(vector.tolist()),
+            "metadata": {},
+            "created_at": created,
+        }))
+
+
+@pytest.fixture
+def compactor_factory(fake_supabase):
+    from src.memory.compaction import CompactionPolicy, MemoryCompactor
+
+    def _make(**policy):
+        defaults = dict(keep_recent_turns=10, max_age_hours=24, max_session_bytes=10**9,
+                        max_embeddings=3, min_keep_turns=4)
+        defaults.update(policy)
+        return MemoryCompactor(CompactionPolicy(**defaults))
+
+    return _make
+
+
+@pytest.mark.asyncio
+async def test_old_turns_become_one_summary(compactor_factory, fake_supabase):
+    from src.memory.supabase_memory import SupabaseMemoryManager
+
+    session = fake_supabase.add_session("sess_compact")
+    _seed_history(fake_supabase, session, turns=50)
+
+    report = await compactor_factory().run(["sess_compact"], measure_recall=True)
+
+    history = await SupabaseMemoryManager("test_agent").get_conversation_history("sess_compact")
+    assert len(history) == 11
+    summary = history[0]
+    assert summary.message_type == MessageType.SYSTEM
+    assert summary.metadata["compacted"] is True
+    assert summary.metadata["original_count"] == 40
+    assert summary.conversation_turn == 1
+    assert [m.conversation_turn for m in history[1:]] == list(range(41, 51))
+
+    assert report.conversation_rows_deleted == 40
+    assert report.summary_rows_written == 1
+    assert report.rows_reclaimed == 39
+    assert report.bytes_reclaimed > 0
+    assert report.recall_ms_before is not None and report.recall_ms_after is not None
+
+
+@pytest.mark.asyncio
+async def test_summary_is_rolling_and_new_turns_keep_numbering(compactor_factory, fake_supabase):
+    from src.memory.supabase_memory import SupabaseMemoryManager
+
+    session = fake_supabase.add_session("sess_rolling")
+    _seed_history(fake_supabase, session, turns=30)
+    await compactor_factory().run(["sess_rolling"])
+
+    manager = SupabaseMemoryManager("test_agent")
+    await manager.save_conversation("sess_rolling", MessageType.QUERY, "nova")
+    for row in fake_supabase.tables["agent_conversations"]:
+        row["timestamp"] = (datetime.now() - timedelta(hours=48)).isoformat()
+
+    await compactor_factory().run(["sess_rolling"])
+
+    history = await manager.get_conversation_history("sess_rolling")
+    summaries = [m for m in history if m.metadata.get("compacted")]
+    assert len(summaries) == 1
+    assert summaries[0].metadata["original_count"] == 21
+    assert history[-1].content == "nova"
+    assert history[-1].conversation_turn == 31
+
+
+@pytest.mark.asyncio
+async def test_recent_turns_are_not_compacted(compactor_factory, fake_supabase):
+    session = fake_supabase.add_session("sess_recent")
+    _seed_history(fake_supabase, session, turns=50, hours_ago=1)
+
+    report = await compactor_factory().run(["sess_recent"])
+
+    assert report.sessions_compacted == 0
+    assert len(fake_supabase.tables["agent_conversations"]) == 50
+
+
+@pytest.mark.asyncio
+async def test_quota_forces_deeper_compaction(compactor_factory, fake_supabase):
+    session = fake_supabase.add_session("sess_quota")
+    _seed_history(fake_supabase, session, turns=50, hours_ago=1, content_size=2000)
+
+    report = await compactor_factory(max_session_bytes=30_000).run(["sess_quota"])
+
+    assert report.quota_violations == 1
+    remaining = [r for r in fake_supabase.tables["agent_conversations"]
+                 if not r["metadata"].get("compacted")]
+    assert 4 <= len(remaining) < 50
+    assert report.bytes_after <= 30_000
+
+
+@pytest.mark.asyncio
+async def test_old_embeddings_reduced_to_representatives(compactor_factory, fake_supabase):
+    session = fake_supabase.add_session("sess_emb")
+    _seed_embeddings(fake_supabase, session, count=30, clusters=3)
+
+    report = await compactor_factory(max_embeddings=3).run(["sess_emb"])
+
+    rows = fake_supabase.tables["agent_memory_embeddings"]
+    assert report.embedding_rows_deleted == 27
+    assert len(rows) == 3
+    assert sorted(r["metadata"]["represents"] for r in rows) == [10, 10, 10]
+    assert {int(r["source_text"].split()[1]) % 3 for r in rows} == {0, 1, 2}
+
+
+@pytest.mark.asyncio
+async def test_long_session_is_read_in_pages(compactor_factory, fake_supabase, monkeypatch):
+    from src.memory import compaction
+
+    monkeypatch.setattr(compaction, "_PAGE_SIZE", 7)
+    fake_supabase.max_rows = 7
+    session = fake_supabase.add_session("sess_long")
+    _seed_history(fake_supabase, session, turns=50)
+
+    report = await compactor_factory().run(["sess_long"])
+
+    rows = sorted(fake_supabase.tables["agent_conversations"], key=lambda r: r["conversation_turn"])
+    assert [r["conversation_turn"] for r in rows if not r["metadata"].get("compacted")] == list(range(41, 51))
+    assert report.conversation_rows_deleted == 40
+
+
+@pytest.mark.asyncio
+async def test_embeddings_without_vectors_are_left_alone(compactor_factory, fake_supabase):
+    session = fake_supabase.add_session("sess_novec")
+    _seed_embeddings(fake_supabase, session, count=5)
+    for row in fake_supabase.tables["agent_memory_embeddings"]:
+        row["embedding"] = None
+
+    report = await compactor_factory(max_embeddings=3).run(["sess_novec"])
+
+    assert report.errors == []
+    assert len(fake_supabase.tables["agent_memory_embeddings"]) == 5
+
+
+def test_dry_run_does_not_write(compactor_factory, fake_supabase):
+    import asyncio
+    from src.memory.compaction import CompactionPolicy, MemoryCompactor
+
+    session = fake_supabase.add_session("sess_dry")
+    _seed_history(fake_supabase, session, turns=50)
+
+    compactor = MemoryCompactor(CompactionPolicy(keep_recent_turns=10, max_age_hours=24), dry_run=True)
+    report = asyncio.run(compactor.run())
+
+    assert report.conversation_rows_deleted == 40
+    assert len(fake_supabase.tables["agent_conversations"]) == 50
@@ -0,0 +1,165 @@
+"""
+Testes do write-behind da memória (src/memory/write_behind.py).
+
+Valida o envio em lote, read-your-writes antes do flush, o replay do journal
+local após um crash simulado e a agregação dos contadores de acesso.
+"""
+
+import json
+
+import pytest
+
+from src.memory.memory_types import ContextType, MessageType
+
+
+@pytest.fixture
+def make_writer(fake_supabase, tmp_path):
+    from src.memory.supabase_memory import SupabaseMemoryManager
+    from src.memory.write_behind import MemoryWriteBehindWriter
+
+    writers = []
+
+    def _make(**kwargs):
+        writer = MemoryWriteBehindWriter(
+            lambda agent_name: SupabaseMemoryManager(agent_name),
+            journal_dir=tmp_path, autostart=False, **kwargs
+        )
+        writers.append(writer)
+        return writer
+
+    yield _make
+    for writer in writers:
+        if not writer._journal.closed:
+            writer._journal.close()
+
+
+@pytest.fixture
+def manager_factory(make_writer):
+    from src.memory.supabase_memory import SupabaseMemoryManager
+    from src.memory.write_behind import WriteBehindMemoryManager
+
+    def _make(writer, agent_name="test_agent"):
+        return WriteBehindMemoryManager(SupabaseMemoryManager(agent_name), writer=writer)
+
+    return _make
+
+
+@pytest.mark.asyncio
+async def test_turns_are_sent_in_one_rpc_per_session(make_writer, manager_factory, fake_supabase):
+    fake_supabase.add_session("sess_wb")
+    writer = make_writer()
+    manager = manager_factory(writer)
+
+    for i in range(5):
+        await manager.add_interaction(f"pergunta {i}", f"resposta {i}", session_id="sess_wb")
+
+    assert fake_supabase.calls == 0
+    assert writer.pending_count == 10
+
+    flushed, failed = writer.flush_once()
+
+    assert (flushed, failed) == (10, 0)
+    assert fake_supabase.calls == 1
+    turns = [r["conversation_turn"] for r in fake_supabase.tables["agent_conversations"]]
+    assert turns == list(range(1, 11))
+    assert writer.journal_path.read_text() == ""
+
+
+@pytest.mark.asyncio
+async def test_reads_see_pending_writes(make_writer, manager_factory, fake_supabase):
+    fake_supabase.add_session("sess_ryw")
+    writer = make_writer()
+    manager = manager_factory(writer)
+
+    await manager.save_conversation("sess_ryw", MessageType.QUERY, "pergunta")
+    await manager.save_context("sess_ryw", ContextType.DATA, "dataset", {"rows": 10})
+
+    history = await manager.get_conversation_history("sess_ryw")
+    context = await manager.get_context("sess_ryw", ContextType.DATA, "dataset")
+
+    assert [m.content for m in history] == ["pergunta"]
+    assert context.context_data == {"rows": 10}
+
+    writer.flush_once()
+    history = await manager.get_conversation_history("sess_ryw")
+    contexts = await manager.list_contexts("sess_ryw")
+
+    assert [m.content for m in history] == ["pergunta"]
+    assert [c.context_key for c in contexts] == ["dataset"]
+    assert len(fake_supabase.tables["agent_context"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_journal_replay_after_crash_is_idempotent(make_writer, manager_factory, fake_supabase, tmp_path):
+    fake_supabase.add_session("sess_crash")
+    writer = make_writer()
+    manager = manager_factory(writer)
+    await manager.save_conversation("sess_crash", MessageType.QUERY, "antes do crash")
+    await manager.save_conversation("sess_crash", MessageType.RESPONSE, "resposta")
+
+    # Crash entre o INSERT e o ack: a primeira mensagem já está no banco
+    first = writer.pending_for("conversation")[0]
+    await manager.backend.save_conversation_batch("sess_crash", [
+        {**first.payload, "message_type": MessageType(first.payload["message_type"])}
+    ])
+    writer._journal.close()
+
+    recovered = make_writer()
+    assert recovered.stats["replayed"] == 2
+    assert not list(tmp_path.glob("*.replay-*"))
+
+    recovered.flush_once()
+
+    contents = [r["content"] for r in fake_supabase.tables["agent_conversations"]]
+    assert contents == ["antes do crash", "resposta"]
+    assert recovered.pending_count == 0
+
+
+@pytest.mark.asyncio
+async def test_replay_skips_acked_and_partial_lines(make_writer, tmp_path):
+    journal = tmp_path / "memory-journal-999999999.jsonl"
+    lines = [
+        {"seq": 1, "op": "context_access", "agent_name": "a", "session_id": None, "payload": {"context_id": "x"}},
+        {"seq": 2, "op": "context_access", "agent_name": "a", "session_id": None, "payload": {"context_id": "y"}},
+        {"ack": [1]},
+    ]
+    journal.write_text("\n".join(json.dumps(l) for l in lines) + '\n{"seq": 3, "op"')
+
+    writer = make_writer()
+
+    pending = writer.pending_for("context_access")
+    assert [e.payload["context_id"] for e in pending] == ["y"]
+    assert not journal.exists()
+
+
+@pytest.mark.asyncio
+async def test_replay_claimed_by_dead_process_is_reclaimed(make_writer, tmp_path):
+    # Processo que assumiu o journal morreu antes de concluir o replay
+    claimed = tmp_path / "memory-journal-888888888.jsonl.replay-999999999.0"
+    record = {"seq": 1, "op": "context_access", "agent_name": "a", "session_id": None,
+              "payload": {"context_id": "z"}}
+    claimed.write_text(json.dumps(record) + "\n")
+
+    writer = make_writer()
+
+    assert writer.stats["replayed"] == 1
+    assert [e.payload["context_id"] for e in writer.pending_for("context_access")] == ["z"]
+    assert not list(tmp_path.glob("*.replay-*"))
+
+
+@pytest.mark.asyncio
+async def test_context_accesses_are_aggregated(make_writer, manager_factory, fake_supabase):
+    fake_supabase.add_session("sess_acc")
+    writer = make_writer()
+    manager = manager_factory(writer)
+    await manager.save_context("sess_acc", ContextType.DATA, "dataset", {"rows": 10})
+    writer.flush_once()
+
+    for _ in range(4):
+        await manager.backend.get_context("sess_acc", ContextType.DATA, "dataset")
+
+    assert writer.pending_count == 4
+    writer.flush_once()
+
+    row = fake_supabase.tables["agent_context"][0]
+    assert row["access_count"] == 4
@@ -0,0 +1,68 @@
+"""
+Testes do offload de I/O do SupabaseMemoryManager.
+
+Valida que as chamadas síncronas do supabase-py rodam no pool limitado de
+threads da camada de memória, sem bloquear o event loop sob concorrência.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.memory.memory_types import MessageType
+
+
+async def _measure_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Mede o maior atraso observado de um heartbeat no event loop."""
+    max_lag = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, time.perf_counter() - start - interval)
+    return max_lag
+
+
+@pytest.fixture
+def manager(fake_supabase):
+    from src.memory.supabase_memory import SupabaseMemoryManager
+    return SupabaseMemoryManager("test_agent")
+
+
+@pytest.mark.asyncio
+async def test_execute_runs_in_memory_io_pool(manager, fake_supabase):
+    fake_supabase.add_session("sess_offload")
+
+    session = await manager.get_session("sess_offload")
+
+    assert session is not None
+    assert fake_supabase.threads
+    assert all(name.startswith("memory-io") for name in fake_supabase.threads)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_saves_do_not_block_event_loop(manager, fake_supabase):
+    from src.settings import MEMORY_IO_MAX_WORKERS
+
+    fake_supabase.latency_s = 0.05
+    sessions = [f"sess_{i}" for i in range(50)]
+    for session_id in sessions:
+        fake_supabase.add_session(session_id)
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(_measure_loop_lag(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        manager.save_conversation(session_id, MessageType.QUERY, "pergunta")
+        for session_id in sessions
+    ])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    max_lag = await lag_task
+
+    # Executados em série seriam pelo menos 50 * 50ms = 2.5s
+    serial_time = len(sessions) * fake_supabase.latency_s
+    assert elapsed < serial_time / 2
+    assert max_lag < fake_supabase.latency_s
+    assert len(fake_supabase.threads) <= MEMORY_IO_MAX_WORKERS
+    assert len(fake_supabase.tables["agent_conversations"]) == 50
@@ -0,0 +1,76 @@
+"""
+Testes da gravação de conversação em um único round-trip (migration 0010).
+
+Valida a numeração atômica de turnos, a gravação em lote de uma troca
+completa (consulta + resposta) e o fallback quando a RPC não existe.
+"""
+
+import asyncio
+
+import pytest
+
+from src.memory.memory_types import MessageType
+
+
+@pytest.fixture
+def manager(fake_supabase):
+    from src.memory.supabase_memory import SupabaseMemoryManager
+    return SupabaseMemoryManager("test_agent")
+
+
+@pytest.mark.asyncio
+async def test_save_conversation_uses_single_rpc(manager, fake_supabase):
+    fake_supabase.add_session("sess_rpc")
+
+    message = await manager.save_conversation("sess_rpc", MessageType.QUERY, "olá")
+
+    assert fake_supabase.calls == 1
+    assert message.conversation_turn == 1
+    assert message.content == "olá"
+
+
+@pytest.mark.asyncio
+async def test_add_interaction_persists_exchange_in_one_call(manager, fake_supabase):
+    fake_supabase.add_session("sess_batch")
+
+    saved = await manager.add_interaction(
+        "Qual a média?", "A média é 42.", "sess_batch",
+        processing_time_ms=120, model_used="gemini"
+    )
+
+    assert fake_supabase.calls == 1
+    assert [m.message_type for m in saved] == [MessageType.QUERY, MessageType.RESPONSE]
+    assert [m.conversation_turn for m in saved] == [1, 2]
+    assert saved[1].processing_time_ms == 120
+
+
+@pytest.mark.asyncio
+async def test_concurrent_saves_get_unique_turns(manager, fake_supabase):
+    fake_supabase.add_session("sess_race")
+    fake_supabase.latency_s = 0.01
+
+    await asyncio.gather(*[
+        manager.add_interaction(f"q{i}", f"r{i}", "sess_race") for i in range(10)
+    ])
+
+    turns = sorted(r["conversation_turn"] for r in fake_supabase.tables["agent_conversations"])
+    assert turns == list(range(1, 21))
+
+
+@pytest.mark.asyncio
+async def test_unknown_session_raises_value_error(manager, fake_supabase):
+    with pytest.raises(ValueError):
+        await manager.save_conversation("sess_inexistente", MessageType.QUERY, "x")
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_legacy_path_without_rpc(manager, fake_supabase):
+    fake_supabase.rpc_handlers.clear()
+    fake_supabase.add_session("sess_legacy")
+
+    saved = await manager.add_interaction("q", "r", "sess_legacy")
+    again = await manager.save_conversation("sess_legacy", MessageType.QUERY, "q2")
+
+    assert [m.conversation_turn for m in saved] == [1, 2]
+    assert again.conversation_turn == 3
+    assert manager._atomic_append_available is False
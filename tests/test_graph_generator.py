@@ -0,0 +1,210 @@
+"""Testes do cache, da renderização fora de processo, dos agregados e dos formatos do GraphGenerator."""
+import gzip
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+chart_cache = pytest.importorskip("src.tools.chart_cache")
+chart_data = pytest.importorskip("src.tools.chart_data")
+chart_render = pytest.importorskip("src.tools.chart_render")
+graph_generator = pytest.importorskip("src.tools.graph_generator")
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"valor": rng.gamma(2.0, 100.0, 5000), "qtd": rng.integers(1, 50, 5000)})
+
+
+@pytest.fixture
+def inline_render(monkeypatch):
+    monkeypatch.setattr(chart_render, "GRAPH_RENDER_WORKERS", 0)
+
+
+def test_cache_lru_por_tamanho(tmp_path):
+    cache = chart_cache.ChartCache(tmp_path, max_bytes=2500)
+    for key in ("a", "b", "c"):
+        cache.put(key, b"x" * 1000, {"stats": {}})
+    assert cache.get("a") is None  # removido (menos usado)
+    assert cache.get("b") is not None
+
+    cache.put("d", b"x" * 1000, {"stats": {}})
+    assert cache.get("c") is None  # "b" foi usado depois de "c"
+    assert sorted(chart_cache.ChartCache(tmp_path, max_bytes=2500)._entries) == ["b", "d"]
+
+
+def test_limite_vale_para_o_diretorio_compartilhado(tmp_path, monkeypatch):
+    monkeypatch.setattr(chart_cache, "RESCAN_EVERY_PUTS", 1)
+    workers = [chart_cache.ChartCache(tmp_path, max_bytes=2500) for _ in range(2)]
+    for i in range(6):
+        workers[i % 2].put(f"k{i}", b"x" * 1000, {"stats": {}})
+
+    assert sorted(p.stem for p in tmp_path.glob("*.img")) == ["k4", "k5"]
+
+
+def test_grafico_repetido_vem_do_cache(tmp_path, df, inline_render, monkeypatch):
+    generator = graph_generator.GraphGenerator(output_dir=tmp_path / "out",
+                                               cache=chart_cache.ChartCache(tmp_path / "cache"))
+    img, stats = generator.histogram(df, column="valor", bins=20)
+
+    calls = []
+    monkeypatch.setattr(graph_generator, "render_chart", lambda *a, **k: calls.append(a) or b"png")
+    assert generator.histogram(df, column="valor", bins=20) == (img, stats)
+    assert calls == []
+
+    generator.histogram(df, column="valor", bins=40)  # parâmetro diferente
+    df.loc[0, "valor"] = -1.0
+    generator.histogram(df, column="valor", bins=20)  # dados diferentes
+    assert len(calls) == 2
+
+
+def test_timeout_reinicia_pool(df):
+    payload = {"x": np.arange(3_000_000.0), "y": np.arange(3_000_000.0), "hue": None, "size": 50,
+               "alpha": 0.6, "title": "t", "xlabel": "x", "ylabel": "y", "correlation": 1.0,
+               "trend": [1.0, 0.0], "x_range": (0.0, 3e6)}
+    with pytest.raises(chart_render.ChartRenderTimeout):
+        chart_render.render_chart("scatter", payload, timeout=0.01)
+    assert chart_render._pool is None
+
+
+def test_pool_reciclado_sem_max_tasks_per_child(monkeypatch):
+    monkeypatch.setattr(chart_render, "_NATIVE_TASK_LIMIT", False)  # caminho do Python 3.10
+    monkeypatch.setattr(chart_render, "GRAPH_RENDER_WORKERS", 1)
+    monkeypatch.setattr(chart_render, "GRAPH_RENDER_MAX_TASKS_PER_CHILD", 2)
+    chart_render._discard_render_pool()
+    payload = {"categories": ["SP", "MG"], "values": [3, 1], "color": "steelblue", "horizontal": False,
+               "title": "t", "xlabel": "uf", "ylabel": "n"}
+
+    first = chart_render._get_render_pool()
+    assert getattr(first, "_max_tasks_per_child", None) is None
+    chart_render.render_chart("bar", payload)
+    assert chart_render._pool is first
+    assert chart_render.render_chart("bar", payload).startswith(b"\x89PNG")
+    assert chart_render._pool is None
+    assert chart_render._get_render_pool() is not first
+    chart_render._discard_render_pool()
+
+
+def test_timeout_em_pool_aposentado_preserva_pool_novo(monkeypatch):
+    monkeypatch.setattr(chart_render, "_NATIVE_TASK_LIMIT", False)
+    monkeypatch.setattr(chart_render, "GRAPH_RENDER_WORKERS", 1)
+    monkeypatch.setattr(chart_render, "GRAPH_RENDER_MAX_TASKS_PER_CHILD", 1)
+    chart_render._discard_render_pool()
+    pools = []
+    count_original = chart_render._count_render_task
+
+    def count_e_recria(pool):
+        count_original(pool)  # aposenta o pool; outra thread já cria o próximo
+        pools.extend([pool, chart_render._get_render_pool()])
+
+    monkeypatch.setattr(chart_render, "_count_render_task", count_e_recria)
+    payload = {"x": np.arange(3_000_000.0), "y": np.arange(3_000_000.0), "hue": None, "size": 50,
+               "alpha": 0.6, "title": "t", "xlabel": "x", "ylabel": "y", "correlation": 1.0,
+               "trend": [1.0, 0.0], "x_range": (0.0, 3e6)}
+    with pytest.raises(chart_render.ChartRenderTimeout):
+        chart_render.render_chart("scatter", payload, timeout=0.01)
+
+    old, novo = pools
+    assert chart_render._pool is novo
+    for process in list((old._processes or {}).values()):
+        process.join(5)
+        assert not process.is_alive()
+    monkeypatch.setattr(chart_render, "_count_render_task", count_original)
+    bar = {"categories": ["SP"], "values": [1], "color": "steelblue", "horizontal": False,
+           "title": "t", "xlabel": "uf", "ylabel": "n"}
+    assert novo.submit(chart_render.draw, "bar", bar).result(30).startswith(b"\x89PNG")
+    chart_render._discard_render_pool()
+
+def test_histograma_usa_bins_do_numpy(tmp_path, df, inline_render, monkeypatch):
+    payloads = []
+    monkeypatch.setattr(graph_generator, "render_chart", lambda kind, payload, **k: payloads.append(payload) or b"png")
+    generator = graph_generator.GraphGenerator(output_dir=tmp_path, cache=None)
+    generator.histogram(df, column="valor", bins=25)
+
+    counts, edges = np.histogram(df["valor"], bins=25)
+    np.testing.assert_array_equal(payloads[0]["counts"], counts)
+    np.testing.assert_allclose(payloads[0]["edges"], edges)
+    assert "values" not in payloads[0]
+
+
+def test_histograma_do_perfil_nao_le_dados(tmp_path, df, inline_render):
+    from src.data.dataset_profile import build_dataset_profile
+
+    profile = build_dataset_profile(df, ingestion_id="ing-1")
+    generator = graph_generator.GraphGenerator(output_dir=tmp_path / "out",
+                                               cache=chart_cache.ChartCache(tmp_path / "cache"))
+    img, stats = generator.histogram_from_profile(profile, "valor")
+    assert img and stats["count"] == len(df)
+    assert generator.histogram_from_profile(profile, "valor") == (img, stats)
+    assert generator.cache.hits == 1
+
+
+def test_dispersao_acima_do_orcamento_vira_densidade(tmp_path, inline_render, monkeypatch):
+    rng = np.random.default_rng(1)
+    big = pd.DataFrame({"x": rng.normal(size=50_000), "y": rng.normal(size=50_000),
+                        "uf": rng.choice(["SP", "RJ"], 50_000)})
+    payloads = []
+    monkeypatch.setattr(graph_generator, "render_chart", lambda kind, payload, **k: payloads.append(payload) or b"png")
+    generator = graph_generator.GraphGenerator(output_dir=tmp_path, cache=None)
+
+    _, stats = generator.scatter_plot(big, "x", "y", max_points=1000)
+    assert stats["rendering"] == "density" and stats["n_points"] == 50_000
+    assert payloads[-1]["density"]["counts"].sum() == 50_000
+
+    _, stats = generator.scatter_plot(big, "x", "y", hue_column="uf", max_points=1000)
+    assert stats["sampled_points"] == 1000 and len(payloads[-1]["x"]) == 1000
+
+
+def test_correlacao_float32_em_cache():
+    rng = np.random.default_rng(2)
+    frame = pd.DataFrame(rng.normal(size=(10_000, 6)), columns=list("abcdef"))
+    frame["g"] = frame["a"] * 2 + rng.normal(scale=0.1, size=len(frame))
+    cache = chart_data.CorrelationCache(max_entries=1)
+
+    corr = cache.get_or_compute("fp", frame)
+    np.testing.assert_allclose(corr.to_numpy(), frame.corr().to_numpy(), atol=1e-5)
+    with pytest.raises(ValueError):
+        corr.loc["a", "g"] = 0.5  # a matriz em cache é compartilhada entre chamadas
+    again = cache.get_or_compute("fp", frame)
+    assert again is not corr and np.shares_memory(again["a"].to_numpy(), corr["a"].to_numpy())
+    assert corr.loc["a", "g"] == again.loc["a", "g"] > 0.99
+
+    frame.loc[0, "b"] = np.nan  # valores ausentes: correlação par a par
+    np.testing.assert_allclose(chart_data._correlation_float32(frame), frame.corr().to_numpy(), atol=1e-5)
+    assert chart_data.select_heatmap_columns(corr, 2) == ["a", "g"]
+
+
+def test_formatos_de_saida_e_nome_por_conteudo(tmp_path, df, inline_render):
+    counts = {"SP": 10.0, "RJ": 7.0, "MG": 3.0}
+    outputs = {}
+    for fmt in ("webp", "svg", "spec"):
+        generator = graph_generator.GraphGenerator(output_dir=tmp_path, cache=None, output_format=fmt)
+        outputs[fmt] = generator.bar_chart(counts, return_base64=False)[0]
+        assert generator.bar_chart(counts, return_base64=False)[0] == outputs[fmt]  # mesmo conteúdo, mesmo arquivo
+
+    webp, svgz, spec = (Path(path) for path in outputs.values())
+    assert webp.read_bytes()[8:12] == b"WEBP"
+    assert svgz.suffix == ".svgz" and b"<svg" in gzip.decompress(svgz.read_bytes())
+    assert spec.name.endswith(".vl.json")
+    assert len(list(tmp_path.iterdir())) == 3
+
+    svg_generator = graph_generator.GraphGenerator(output_dir=tmp_path, cache=None, output_format="svg")
+    assert svg_generator.bar_chart(counts)[0].startswith("data:image/svg+xml;base64,")
+    assert svg_generator.boxplot(df, "valor")[0].startswith("data:image/png;base64,")  # sem SVG para boxplot
+
+
+def test_modo_spec_devolve_vega_lite(tmp_path, df):
+    generator = graph_generator.GraphGenerator(output_dir=tmp_path, cache=None, output_format="spec")
+    spec, stats = generator.histogram(df, column="valor", bins=20)
+    assert spec["$schema"].endswith("vega-lite/v5.json")
+    assert sum(b["count"] for b in spec["layer"][0]["data"]["values"]) == stats["count"]
+
+    big = pd.DataFrame({"x": np.arange(50_000.0), "y": np.arange(50_000.0) % 97})
+    spec, stats = generator.scatter_plot(big, "x", "y")
+    assert stats["rendering"] == "density"
+    assert spec["layer"][0]["mark"]["type"] == "rect"
+
+    with pytest.raises(graph_generator.GraphGeneratorError):
+        graph_generator.GraphGenerator(output_dir=tmp_path, cache=None, output_format="gif")
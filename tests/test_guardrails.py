@@ -0,0 +1,61 @@
+"""Testes da extração de afirmações e das validações do StatisticsGuardrails."""
+import pytest
+
+guardrails = pytest.importorskip("src.tools.guardrails")
+
+RESPOSTA = (
+    "O dataset de fraudes em cartão de crédito possui 284.807 registros e 31 colunas, "
+    "sendo 31 colunas numéricas.\n"
+    "Média: Amount 88,35, Time 94813,86. O mínimo e o máximo de Amount são 0 e 25.691,16.\n"
+    "Class 0: 99,83% das transações; Class 1: 0,17%."
+)
+
+CONTEXTO = {"csv_analysis": {
+    "total_records": 284807,
+    "total_columns": 31,
+    "tipos_dados": {"total_numericos": 31, "total_categoricos": 0},
+    "estatisticas": {
+        "Amount": {"mean": 88.3496, "min": 0.0, "max": 25691.16},
+        "Time": {"mean": 94813.86},
+    },
+    "distribuicao": {"Class": {0: 284315, 1: 492}},
+}}
+
+
+def test_extrai_afirmacoes_com_coluna_e_categoria():
+    claims = guardrails.extract_claims(RESPOSTA, ["Amount", "Time", "Class"], {"Class": {"0": "0", "1": "1"}})
+
+    assert [c.value for c in claims.of("records")] == [284807.0]
+    assert [c.value for c in claims.of("columns")] == [31.0]
+    assert [c.value for c in claims.of("numeric")] == [31.0]
+    assert [(c.column, c.value) for c in claims.of("mean")] == [("Amount", 88.35), ("Time", 94813.86)]
+    assert [(c.column, c.value) for c in claims.of("max")] == [("Amount", 25691.16)]
+    assert [(c.category, c.value) for c in claims.of("percentage")] == [("0", 99.83), ("1", 0.17)]
+
+
+@pytest.mark.parametrize("raw, count, expected", [
+    ("1.234,56", False, 1234.56),
+    ("1,234.56", False, 1234.56),
+    ("88.35", False, 88.35),
+    ("284.807", True, 284807.0),
+    ("2.000.000", False, 2000000.0),
+])
+def test_numeros_em_formato_brasileiro_e_americano(raw, count, expected):
+    assert guardrails.parse_claim_number(raw, count=count) == expected
+
+
+def test_resposta_correta_passa_e_afirmacoes_erradas_sao_apontadas():
+    validator = guardrails.StatisticsGuardrails()
+    assert validator.validate_response(RESPOSTA, CONTEXTO).issues == []
+
+    errada = RESPOSTA.replace("284.807 registros", "300.000 registros").replace("Time 94813,86", "Time 120000")
+    errada = errada.replace("Class 1: 0,17%", "Class 1: 5%")
+    result = validator.validate_response(errada, CONTEXTO)
+    assert not result.is_valid
+    assert set(result.corrected_values) == {"total_records", "Time_mean", "Class_1_pct"}
+
+
+def test_contexto_textual_so_aplica_validacao_semantica():
+    validator = guardrails.StatisticsGuardrails()
+    result = validator.validate_response(RESPOSTA, {"csv_analysis": "Total de registros: 10"})
+    assert result.is_valid
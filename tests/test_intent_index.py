@@ -0,0 +1,80 @@
+"""Testes do índice de protótipos de intenção (src/router/intent_index.py)."""
+import os
+
+import numpy as np
+import pytest
+
+from src.router.intent_index import IntentPrototypeIndex, fit_platt, save_intent_index
+
+
+def _cluster(rng, center, n, noise=0.05):
+    return center + noise * rng.normal(size=(n, center.shape[0]))
+
+
+@pytest.fixture
+def examples():
+    rng = np.random.default_rng(0)
+    centers = {"statistical_analysis": np.eye(16)[0], "fraud_detection": np.eye(16)[1],
+               "data_visualization": np.eye(16)[2]}
+    texts, labels, embeddings = [], [], []
+    for label, center in centers.items():
+        for i, emb in enumerate(_cluster(rng, center, 8)):
+            texts.append(f"{label} {i}")
+            labels.append(label)
+            embeddings.append(emb)
+    return texts, labels, np.array(embeddings), centers
+
+
+def test_classifica_por_votacao_top_k(tmp_path, examples):
+    texts, labels, embeddings, centers = examples
+    path = tmp_path / "intent_index.npz"
+    version = save_intent_index(path, texts, labels, embeddings, model="fake-model")
+
+    index = IntentPrototypeIndex(path, top_k=5)
+    prediction = index.classify(centers["fraud_detection"] + 0.02)
+
+    assert index.version == version and index.size == 24
+    assert index._data.matrix.dtype == np.float32
+    assert prediction.category == "fraud_detection"
+    assert prediction.nearest_example.startswith("fraud_detection")
+    ambiguous = index.classify(centers["fraud_detection"] + centers["statistical_analysis"])
+    assert ambiguous.confidence < prediction.confidence
+    assert index.classify(np.ones(8)) is None  # dimensão diferente
+
+
+def test_hot_reload_troca_versao(tmp_path, examples):
+    texts, labels, embeddings, centers = examples
+    path = tmp_path / "intent_index.npz"
+    save_intent_index(path, texts, labels, embeddings, model="fake-model")
+    index = IntentPrototypeIndex(path, reload_interval=0.0)
+    old_version = index.version
+
+    relabeled = ["data_loading" if label == "fraud_detection" else label for label in labels]
+    new_version = save_intent_index(path, texts, relabeled, embeddings, model="fake-model")
+    os.utime(path, (1, 1))  # garante mtime diferente mesmo em sistemas de arquivos com resolução baixa
+
+    assert new_version != old_version
+    assert index.classify(centers["fraud_detection"]).category == "data_loading"
+    assert index.version == new_version
+
+
+def test_fit_platt():
+    raw = np.array([0.1, 0.2, 0.3, 0.6, 0.7, 0.9, 0.4, 0.5])
+    correct = np.array([0, 0, 0, 1, 1, 1, 0, 1])
+
+    a, b = fit_platt(raw, correct)
+    assert a > 0
+    assert fit_platt(raw, np.ones_like(raw)) is None
+
+
+def test_indice_ausente(tmp_path, examples):
+    texts, labels, embeddings, centers = examples
+    path = tmp_path / "intent_index.npz"
+    index = IntentPrototypeIndex(path, reload_interval=0.0)
+
+    assert not index.loaded
+    assert index.classify([0.1] * 16) is None
+
+    # Índice gerado com o processo já rodando
+    save_intent_index(path, texts, labels, embeddings, model="fake-model")
+    assert index.maybe_reload() and index.loaded
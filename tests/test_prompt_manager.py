@@ -0,0 +1,61 @@
+"""Testes da compilação de templates e da separação prefixo fixo/sufixo volátil."""
+import pytest
+
+prompts = pytest.importorskip("src.prompts.manager")
+
+AgentRole = prompts.AgentRole
+
+
+def test_template_compilado_equivale_a_str_format():
+    manager = prompts.PromptManager()
+    variables = dict(query="Qual a média de Amount?", num_results=3, avg_similarity=0.81234,
+                     context_chunks="chunk 1: Amount médio 88,35")
+    template = manager.prompts["rag_specialist"]["search_context"]
+
+    rendered = manager.render(AgentRole.RAG_SPECIALIST, "search_context", **variables)
+    assert rendered.text == template.content.format(**variables)
+    assert rendered.prefix.startswith("🎯 **INSTRUÇÕES**") and "0.812" in rendered.suffix
+
+    with pytest.raises(ValueError, match="avg_similarity"):
+        manager.get_prompt(AgentRole.RAG_SPECIALIST, "search_context", query="q", num_results=1,
+                           context_chunks="")
+
+
+def test_variaveis_validadas_na_compilacao():
+    manager = prompts.PromptManager()
+    with pytest.raises(ValueError, match="diferem das declaradas"):
+        manager.add_custom_prompt(AgentRole.ORCHESTRATOR, "resumo", "Resuma {dados} para {usuario}",
+                                  variables=["dados"])
+    with pytest.raises(ValueError):
+        manager.add_custom_prompt(AgentRole.ORCHESTRATOR, "indice", "Coluna {colunas[0]}")
+
+    manager.add_custom_prompt(AgentRole.ORCHESTRATOR, "resumo", "Resuma {dados!r:>8}")
+    assert manager.get_prompt(AgentRole.ORCHESTRATOR, "resumo", dados="nfe") == "Resuma    'nfe'"
+
+
+def test_prefixo_estavel_entre_chamadas_com_dados_diferentes():
+    manager = prompts.PromptManager()
+    first = manager.compose(AgentRole.ORCHESTRATOR, ("csv_data_instructions",),
+                            ["📊 ARQUIVO CARREGADO: notas_2024.csv", "❓ CONSULTA DO USUÁRIO: total?"])
+    second = manager.compose(AgentRole.ORCHESTRATOR, ("csv_data_instructions",),
+                             ["📊 ARQUIVO CARREGADO: notas_2025.csv", "❓ CONSULTA DO USUÁRIO: média?"])
+
+    assert first.prefix is second.prefix and first.prefix_hash == second.prefix_hash
+    assert first.text.startswith(first.prefix) and first.text.endswith("total?")
+    assert manager.compose(AgentRole.ORCHESTRATOR, ("conversation_system",)).suffix == ""
+
+    with pytest.raises(ValueError, match="prefixo fixo"):
+        manager.compose(AgentRole.ORCHESTRATOR, ("data_analysis_context",), "dados")
+
+
+def test_metricas_de_render_e_tokens_cacheados():
+    metrics = prompts.PromptMetrics()
+    metrics.record_render(0.00002)
+    metrics.record_usage("abc", prompt_tokens=1000, cached_tokens=768)
+    metrics.record_usage("abc", prompt_tokens=1000, cached_tokens=None)
+    metrics.record_usage(None, prompt_tokens=None, cached_tokens=None)
+
+    stats = metrics.stats
+    assert stats["llm_calls"] == 3 and stats["distinct_prefixes"] == 1
+    assert stats["cached_token_rate"] == pytest.approx(0.384)
+    assert stats["avg_render_us"] == pytest.approx(20.0)
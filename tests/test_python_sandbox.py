@@ -0,0 +1,80 @@
+"""Testes do sandbox de execução de código gerado por LLM."""
+import numpy as np
+import pandas as pd
+import pytest
+
+python_sandbox = pytest.importorskip("src.tools.python_sandbox")
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / "dados.parquet"
+    pd.DataFrame({"valor": np.arange(1000.0), "uf": ["SP", "RJ"] * 500}).to_parquet(path)
+    return python_sandbox.dataset_ref("parquet", path)
+
+
+@pytest.fixture
+def pool():
+    pool = python_sandbox.PythonSandboxPool(size=1, timeout=2, cpu_seconds=30, memory_mb=256, max_runs=3)
+    yield pool
+    pool.close()
+
+
+def test_resultado_e_saida_estruturados(pool, dataset):
+    result = pool.run("print('linhas', len(df))\nresult = df.groupby('uf')['valor'].sum()", dataset=dataset)
+    assert result.success and result.output == "linhas 1000\n"
+    assert result.result.to_dict() == {"RJ": 250000.0, "SP": 249500.0}
+
+    blocked = pool.run("import os\nresult = os.getcwd()")
+    assert not blocked.success and "não permitida" in blocked.error
+
+
+def test_codigo_gerado_tipico(pool, dataset):
+    code = (
+        "class Resumo:\n"
+        "    def __init__(self, serie):\n"
+        "        self.total = serie.sum()\n"
+        "try:\n"
+        "    df['inexistente']\n"
+        "except KeyError as e:\n"
+        "    faltando = repr(e)\n"
+        "df.loc[df['uf'] == 'SP', 'valor'] = 0.0\n"
+        "result = (type(Resumo(df['valor'])).__name__, getattr(Resumo(df['valor']), 'total'), faltando)"
+    )
+    first = pool.run(code, dataset=dataset)
+    assert first.success, first.error
+    assert first.result == ("Resumo", 250000.0, "KeyError('inexistente')")
+
+    # a escrita in-place do trecho anterior não chega ao dataset mantido no processo
+    again = pool.run("result = df['valor'].sum()", dataset=dataset)
+    assert again.worker_pid == first.worker_pid and again.result == 499500.0
+
+
+def test_dataset_regravado_no_mesmo_caminho(pool, dataset):
+    assert pool.run("result = len(df)", dataset=dataset).result == 1000
+
+    pd.DataFrame({"valor": [1.0, 2.0]}).to_parquet(dataset[1])
+    assert pool.run("result = len(df)", dataset=python_sandbox.dataset_ref("parquet", dataset[1])).result == 2
+
+
+def test_timeout_mata_e_substitui_processo(pool):
+    slow = pool.run("while True:\n    pass", timeout=0.5)
+    assert slow.timed_out and pool.stats["timeouts"] == 1
+
+    after = pool.run("result = 1 + 1")
+    assert after.success and after.result == 2 and after.worker_pid != slow.worker_pid
+
+
+def test_limite_de_memoria_e_reciclagem(pool):
+    big = pool.run("x = np.ones(200_000_000)")
+    assert not big.success and "memória" in big.error
+
+    pids = [pool.run("result = 1").worker_pid for _ in range(3)]
+    assert pids[0] == big.worker_pid and pids[1] == big.worker_pid  # 3 execuções por processo
+    assert pids[2] != big.worker_pid and pool.stats["recycled"] == 1
+
+
+def test_execucao_no_processo_quando_desativado(monkeypatch, dataset):
+    monkeypatch.setattr(python_sandbox, "PYTHON_SANDBOX_WORKERS", 0)
+    result = python_sandbox.run_python("resultado = df['valor'].max()", dataset=dataset, result_var="resultado")
+    assert result.success and result.result == 999.0
@@ -28,6 +28,9 @@ class FakeGenerator:
         emb = [marker] + [0.0] * 383
         return FakeEmbeddingResult(emb)
 
+    def embed_texts(self, texts: List[str]):
+        return [self.generate_embedding(text).embedding for text in texts]
+
 
 class DummyVectorStore:
     """Retorna similarities based on embedding[0]."""
@@ -50,6 +53,9 @@ class DummyVectorStore:
             score = 0.0
         return [DummyVectorStore.R(score)]
 
+    def search_similar_many(self, query_embeddings, similarity_threshold=0.0, limit=10):
+        return [self.search_similar(emb, similarity_threshold, limit) for emb in query_embeddings]
+
 
 class FakeLLMResponse:
     """Mock LLM response for paraphrases."""
@@ -39,3 +39,30 @@ def test_logging_decisao(router, caplog):
                 "Resposta contextualizada" in caplog.text or
                 "Nenhuma correspondência semântica encontrada" in caplog.text or
                 "encaminhando para LLM genérica" in caplog.text)
+
+def test_reciprocal_rank_fusion_favorece_consenso():
+    from src.embeddings.vector_store import VectorSearchResult
+    from src.router.semantic_router import reciprocal_rank_fusion
+
+    def r(eid, score):
+        return VectorSearchResult(chunk_text=eid, similarity_score=score, metadata={},
+                                  embedding_id=eid, source="t", chunk_index=0)
+
+    fused = reciprocal_rank_fusion([[r("a", 0.95), r("b", 0.80)], [r("b", 0.85), r("c", 0.70)]])
+    assert [x.embedding_id for x in fused] == ["b", "a", "c"]
+    assert fused[0].similarity_score == 0.85
+
+def test_route_busca_candidatos_uma_vez(router, monkeypatch):
+    from src.embeddings.vector_store import VectorSearchResult
+
+    chamadas = []
+
+    def fake_search(question, base_threshold=0.7, base_limit=3):
+        chamadas.append((question, base_threshold, base_limit))
+        return [VectorSearchResult(chunk_text="contexto", similarity_score=0.65, metadata={},
+                                   embedding_id="e1", source="t", chunk_index=0)]
+
+    monkeypatch.setattr(router, "search_with_expansion", fake_search)
+    resultado = router.route("  Pergunta Sem Intenção  ")
+    assert resultado["route"] == "contextual_embedding"
+    assert chamadas == [("pergunta sem intenção", 0.6, 3)]
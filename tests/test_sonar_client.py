@@ -0,0 +1,108 @@
+"""Testes do cliente Sonar contra um servidor HTTP local."""
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sonar_client = pytest.importorskip("src.api.sonar_client")
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        question = payload["messages"][-1]["content"]
+        with server.lock:
+            server.requests.append((self.client_address, question))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+
+        status = 500 if "falha" in question else 200
+        body = json.dumps({"choices": [{"message": {"content": f"resposta: {question}"}}]}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests, server.in_flight, server.max_in_flight, server.delay = [], 0, 0, 0.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(server, **kwargs):
+    return sonar_client.SonarClient(api_key="teste", api_base=f"http://127.0.0.1:{server.server_port}", **kwargs)
+
+
+def test_cache_por_pergunta_normalizada_e_contexto(server):
+    client = _client(server)
+    first = client.query("Qual a alíquota ICMS interestadual?")
+    again = client.query("  qual a alíquota  ICMS interestadual ")
+    assert again == first and len(server.requests) == 1
+
+    client.query("Qual a alíquota ICMS interestadual?", context={"uf_origem": "SP"})
+    client.query("Qual a alíquota ICMS interestadual?", max_tokens=100)
+    client.query("Qual a alíquota ICMS interestadual?", use_cache=False)
+    assert len(server.requests) == 4
+    assert client.stats["cache_hits"] == 1
+
+
+def test_conexao_keep_alive_reaproveitada(server):
+    client = _client(server)
+    for cfop in ("5102", "6102", "1202"):
+        client.query(f"O que significa o CFOP {cfop}?")
+    ports = {address[1] for address, _ in server.requests}
+    assert len(server.requests) == 3 and len(ports) == 1
+
+
+def test_erro_http_nao_e_cacheado(server):
+    client = _client(server)
+    for _ in range(2):
+        with pytest.raises(sonar_client.SonarAPIError, match="HTTP 500"):
+            client.query("consulta com falha")
+    assert len(server.requests) == 2
+
+
+def test_semaforo_limita_consultas_simultaneas(server):
+    server.delay = 0.1
+    client = _client(server, max_concurrency=2)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(lambda i: client.query(f"pergunta {i}"), range(6)))
+    assert len(server.requests) == 6 and server.max_in_flight == 2
+
+
+def test_variante_assincrona_compartilha_cache(server):
+    server.delay = 0.1
+    client = _client(server, max_concurrency=2)
+
+    async def scenario():
+        results = await asyncio.gather(*(client.aquery(f"NCM {i}") for i in range(4)))
+        cached = await client.aquery("ncm 0")
+        await client.aclose()
+        return results, cached
+
+    results, cached = asyncio.run(scenario())
+    assert cached == results[0]
+    assert len(server.requests) == 4 and server.max_in_flight == 2
+    assert client.query("NCM 3") == results[3] and len(server.requests) == 4
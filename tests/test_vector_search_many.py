@@ -0,0 +1,50 @@
+"""Testes das buscas vetoriais concorrentes (VectorStore.search_similar_many)."""
+import logging
+import threading
+import time
+
+from src.embeddings.vector_store import VectorSearchResult, VectorStore
+
+
+def _result(embedding_id: str, score: float) -> VectorSearchResult:
+    return VectorSearchResult(
+        chunk_text=embedding_id, similarity_score=score, metadata={},
+        embedding_id=embedding_id, source="test", chunk_index=0
+    )
+
+
+class FakeStore(VectorStore):
+    """VectorStore sem Supabase: cada vetor [i] devolve o chunk 'c{i}' após um atraso."""
+
+    def __init__(self, delay: float = 0.05):
+        self.logger = logging.getLogger(__name__)
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def search_similar(self, query_embedding, similarity_threshold=0.7, limit=5, filters=None):
+        with self.lock:
+            self.calls.append(query_embedding[0])
+        time.sleep(self.delay)
+        return [_result(f"c{query_embedding[0]}", 0.9)]
+
+
+def test_results_follow_input_order_and_run_concurrently():
+    store = FakeStore(delay=0.1)
+
+    start = time.perf_counter()
+    results = store.search_similar_many([[i] for i in range(5)], similarity_threshold=0.5, limit=3)
+    elapsed = time.perf_counter() - start
+
+    assert [r[0].embedding_id for r in results] == ["c0", "c1", "c2", "c3", "c4"]
+    assert elapsed < 0.3
+
+
+def test_stop_when_cancels_pending_searches():
+    store = FakeStore(delay=0.02)
+    embeddings = [[i] for i in range(200)]
+
+    results = store.search_similar_many(embeddings, stop_when=lambda arrived: len(arrived) >= 1)
+
+    assert sum(1 for r in results if r) < len(embeddings)
+    assert len(store.calls) < len(embeddings)